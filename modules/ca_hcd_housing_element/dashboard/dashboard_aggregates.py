@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+🏛️ ROMAN EMPIRE DASHBOARD AGGREGATE CACHE
+Roman Engineering Standards: Built to Last 2000+ Years
+Built by Structured Consultants LLC for Colosseum Platform
+
+Server-side snapshot of everything the dashboard callbacks read:
+- strategic totals, the county rollup and the jurisdiction table are built once
+  and held as compact frames (categorical text, downcast integer counts)
+- the snapshot is rebuilt only when the ETL completion stamp changes
+- filter callbacks are answered from precomputed boolean masks on the snapshot
+- rendered callback outputs are memoized per (data version, callback, inputs);
+  the data version doubles as the ETag served with dashboard responses
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+STAMP_PATH_ENV = 'CA_HCD_ETL_STAMP'
+
+
+def default_stamp_path() -> str:
+    """$CA_HCD_ETL_STAMP, else <user cache dir>/ca_hcd_housing_element/etl_completed.json"""
+    configured = os.getenv(STAMP_PATH_ENV)
+    if configured:
+        return os.path.expanduser(configured)
+    cache_home = os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'ca_hcd_housing_element', 'etl_completed.json')
+
+
+# Written by the HCD ETL pipeline when a load completes (hcd_data_loader imports it from here)
+ETL_COMPLETED_STAMP = default_stamp_path()
+
+# Opportunity checklist values -> jurisdiction flag columns
+OPPORTUNITY_FLAGS = {
+    'builders_remedy': 'builders_remedy_exposed',
+    'streamlining': 'ministerial_approval_required',
+    'sb35_50': 'sb35_50_percent_required',
+    'sb35_10': 'sb35_10_percent_required'
+}
+
+AggregateSources = Tuple[Dict[str, Any], pd.DataFrame, pd.DataFrame]
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Repeated text as categoricals, integer counts downcast; floats stay float64 for display"""
+    compact = df.reset_index(drop=True).copy()
+    for column in compact.columns:
+        series = compact[column]
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        if pd.api.types.is_integer_dtype(series):
+            compact[column] = pd.to_numeric(series, downcast='integer')
+        elif ((pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series))
+              and series.nunique(dropna=False) <= len(series) // 2):
+            compact[column] = series.astype('category')
+    return compact
+
+
+def format_opportunities(df: pd.DataFrame) -> pd.Series:
+    """Vectorized opportunity label: Builder's Remedy, then the strongest SB 35 requirement"""
+    builders_remedy = np.where(df['builders_remedy_exposed'].astype(bool), "🏗️ Builder's Remedy", '')
+    streamlining = np.select(
+        [df['sb35_50_percent_required'].astype(bool),
+         df['sb35_10_percent_required'].astype(bool),
+         df['ministerial_approval_required'].astype(bool)],
+        ["⚡ 50% SB35", "📋 10% SB35", "🎯 Streamlining"], default='')
+    separator = np.where((builders_remedy != '') & (streamlining != ''), ' | ', '')
+    labels = pd.Series(np.char.add(np.char.add(builders_remedy, separator), streamlining), index=df.index)
+    return labels.replace('', 'None')
+
+
+def frame_version(*frames: pd.DataFrame, extra: Any = None) -> str:
+    """Content hash of the snapshot, stable across rebuilds of identical data"""
+    digest = hashlib.sha1()
+    for frame in frames:
+        digest.update(pd.util.hash_pandas_object(frame, index=False).values.tobytes())
+        digest.update(','.join(map(str, frame.columns)).encode('utf-8'))
+    digest.update(json.dumps(extra, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+@dataclass
+class DashboardAggregates:
+    """One immutable snapshot of dashboard data"""
+    version: str
+    built_at: datetime
+    strategic: Dict[str, Any]
+    counties: pd.DataFrame
+    jurisdictions: pd.DataFrame     # sorted by overall_progress, with an 'opportunities' label column
+    county_options: List[Dict[str, str]] = field(default_factory=list)
+    flag_masks: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def filter_jurisdictions(self, performance: Optional[List[str]] = None,
+                             opportunities: Optional[List[str]] = None,
+                             counties: Optional[List[str]] = None) -> pd.DataFrame:
+        """Operational table filters: performance AND (any selected opportunity) AND county"""
+        df = self.jurisdictions
+        mask = np.ones(len(df), dtype=bool)
+        if performance:
+            mask &= df['performance_category'].isin(performance).to_numpy()
+        if opportunities:
+            selected = [self.flag_masks[value] for value in opportunities if value in self.flag_masks]
+            if selected:
+                mask &= np.logical_or.reduce(selected)
+        if counties:
+            mask &= df['county_name'].isin(counties).to_numpy()
+        return df[mask]
+
+
+def build_aggregates(strategic: Dict[str, Any], counties: pd.DataFrame,
+                     jurisdictions: pd.DataFrame) -> DashboardAggregates:
+    """Precompute the compact frames, filter masks and dropdown options"""
+    counties = compact_frame(counties)
+
+    jurisdictions = jurisdictions.sort_values('overall_progress', ascending=False).copy()
+    for column in OPPORTUNITY_FLAGS.values():
+        jurisdictions[column] = jurisdictions[column].astype(bool)
+    jurisdictions['opportunities'] = format_opportunities(jurisdictions)
+    jurisdictions = compact_frame(jurisdictions)
+
+    return DashboardAggregates(
+        version=frame_version(counties, jurisdictions, extra=strategic),
+        built_at=datetime.now(),
+        strategic=dict(strategic),
+        counties=counties,
+        jurisdictions=jurisdictions,
+        county_options=[{'label': county, 'value': county}
+                        for county in sorted(counties['county_name'].astype(str).unique())],
+        flag_masks={value: jurisdictions[column].to_numpy()
+                    for value, column in OPPORTUNITY_FLAGS.items()}
+    )
+
+
+class DashboardAggregateCache:
+    """Shared snapshot for every dashboard session, rebuilt when the ETL stamp changes"""
+
+    def __init__(self, loader: Callable[[], AggregateSources],
+                 stamp_path: Optional[str] = ETL_COMPLETED_STAMP, max_responses: int = 512):
+        self.loader = loader
+        self.stamp_path = stamp_path
+        self.max_responses = max_responses
+        self._lock = threading.Lock()
+        self._snapshot: Optional[DashboardAggregates] = None
+        self._stamp = None
+        self._responses: 'OrderedDict[Tuple, Any]' = OrderedDict()
+        self.builds = 0
+
+    def _read_stamp(self):
+        if not self.stamp_path:
+            return None
+        try:
+            stat = os.stat(self.stamp_path)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def get(self) -> DashboardAggregates:
+        """Current snapshot; one stat() call unless the ETL has completed since the last build"""
+        stamp = self._read_stamp()
+        snapshot = self._snapshot
+        if snapshot is not None and stamp == self._stamp:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is None or stamp != self._stamp:
+                self._snapshot = build_aggregates(*self.loader())
+                self._stamp = stamp
+                self._responses.clear()
+                self.builds += 1
+                logger.info(f"🏛️ Dashboard aggregates built: {len(self._snapshot.counties)} counties, "
+                            f"{len(self._snapshot.jurisdictions)} jurisdictions (version {self._snapshot.version})")
+            return self._snapshot
+
+    def invalidate(self):
+        """Force a rebuild on the next request"""
+        with self._lock:
+            self._snapshot = None
+            self._responses.clear()
+
+    @property
+    def version(self) -> str:
+        return self.get().version
+
+    @property
+    def current_version(self) -> Optional[str]:
+        """Version of the snapshot already built, without building or re-checking the ETL stamp"""
+        snapshot = self._snapshot
+        return snapshot.version if snapshot is not None else None
+
+    def memoize(self, name: str, args: Tuple, build: Callable[[DashboardAggregates], Any]) -> Any:
+        """Callback output for these inputs at the current data version, rendered at most once"""
+        snapshot = self.get()
+        key = (snapshot.version, name, json.dumps(args, sort_keys=True, default=str))
+        with self._lock:
+            if key in self._responses:
+                self._responses.move_to_end(key)
+                return self._responses[key]
+
+        response = build(snapshot)
+        with self._lock:
+            self._responses[key] = response
+            while len(self._responses) > self.max_responses:
+                self._responses.popitem(last=False)
+        return response
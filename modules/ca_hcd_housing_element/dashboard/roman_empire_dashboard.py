@@ -23,8 +23,13 @@ import numpy as np
 from datetime import datetime, date
 import os
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import json
+import sys
+from flask import request
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from dashboard_aggregates import DashboardAggregateCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -216,9 +221,13 @@ class ColasseumRomanDashboard:
         self.engine = None
         self.connect_database()
         
+        # Shared aggregate snapshot: built once, rebuilt when the ETL completes
+        self.aggregates = DashboardAggregateCache(self._load_aggregate_sources)
+        
         # Setup layout and callbacks
         self.setup_layout()
         self.setup_callbacks()
+        self.setup_http_caching()
     
     def connect_database(self):
         """Connect to CA HCD Housing Element database"""
@@ -330,9 +339,17 @@ class ColasseumRomanDashboard:
         
         return pd.DataFrame(data).sort_values('overall_progress', ascending=False)
     
+    def _load_aggregate_sources(self) -> Tuple[Dict[str, Any], pd.DataFrame, pd.DataFrame]:
+        """Raw inputs for the aggregate snapshot (strategic totals, counties, jurisdictions)"""
+        return (
+            self.get_strategic_overview_data(),
+            self.get_county_performance_data(),
+            self.get_jurisdiction_opportunities_data()
+        )
+    
     def create_strategic_overview_layout(self) -> dbc.Container:
         """Create Strategic Command Center layout"""
-        data = self.get_strategic_overview_data()
+        data = self.aggregates.get().strategic
         
         # Calculate key metrics
         compliance_rate = (data['compliant_count'] / data['total_jurisdictions']) * 100
@@ -654,27 +671,7 @@ class ColasseumRomanDashboard:
         def update_compliance_pie(active_tab):
             if active_tab != "strategic":
                 return {}
-            
-            data = self.get_strategic_overview_data()
-            
-            # More accurate HCD compliance categories
-            fig = go.Figure(data=[go.Pie(
-                labels=['At Risk (Behind Schedule)', 'Non-Compliant (Builder\'s Remedy)', 'Compliant'],
-                values=[data['at_risk_count'], data['non_compliant_count'], data['compliant_count']],
-                hole=0.4,
-                marker_colors=[ROMAN_COLORS['caution_orange'], ROMAN_COLORS['critical_crimson'], ROMAN_COLORS['victory_green']]
-            )])
-            
-            fig.update_layout(
-                title={
-                    'text': 'Jurisdiction Compliance Status',
-                    'font': {'family': 'Cinzel, serif', 'size': 16}
-                },
-                font={'family': 'Cinzel, serif'},
-                showlegend=True
-            )
-            
-            return fig
+            return self.aggregates.memoize("compliance-pie", (), self._build_compliance_pie)
         
         @self.app.callback(
             Output("opportunities-bar-chart", "figure"),
@@ -683,28 +680,7 @@ class ColasseumRomanDashboard:
         def update_opportunities_bar(active_tab):
             if active_tab != "strategic":
                 return {}
-            
-            data = self.get_strategic_overview_data()
-            
-            fig = go.Figure(data=[
-                go.Bar(
-                    x=['SB 35 Streamlining', "Builder's Remedy", 'Pro-Housing Eligible'],
-                    y=[data['streamlining_count'], data['builders_remedy_count'], 59],
-                    marker_color=[ROMAN_COLORS['caution_orange'], ROMAN_COLORS['critical_crimson'], ROMAN_COLORS['victory_green']]
-                )
-            ])
-            
-            fig.update_layout(
-                title={
-                    'text': 'Development Opportunities',
-                    'font': {'family': 'Cinzel, serif', 'size': 16}
-                },
-                font={'family': 'Cinzel, serif'},
-                xaxis_title="Opportunity Type",
-                yaxis_title="Number of Jurisdictions"
-            )
-            
-            return fig
+            return self.aggregates.memoize("opportunities-bar", (), self._build_opportunities_bar)
         
         @self.app.callback(
             Output("county-performance-table", "children"),
@@ -713,72 +689,7 @@ class ColasseumRomanDashboard:
         def update_county_table(active_tab):
             if active_tab != "strategic":
                 return []
-            
-            df = self.get_county_performance_data()
-            
-            return dash_table.DataTable(
-                data=df.head(15).to_dict('records'),
-                columns=[
-                    {"name": "County", "id": "county_name", "deletable": False, "selectable": False},
-                    {"name": "Cities", "id": "jurisdiction_count", "type": "numeric"},
-                    {"name": "Avg Progress (%)", "id": "avg_progress", "type": "numeric", "format": {"specifier": ".1f"}},
-                    {"name": "Compliant", "id": "compliant_count", "type": "numeric", 
-                     "presentation": "markdown"},
-                    {"name": "Builder's Remedy", "id": "builders_remedy_count", "type": "numeric",
-                     "presentation": "markdown"},
-                    {"name": "Streamlining", "id": "streamlining_count", "type": "numeric",
-                     "presentation": "markdown"}
-                ],
-                tooltip_header={
-                    'compliant_count': 'Cities meeting their RHNA housing production requirements',
-                    'builders_remedy_count': 'Cities exposed to Builder\'s Remedy (streamlined 20% affordable housing)',
-                    'streamlining_count': 'Cities subject to SB 35 ministerial approval requirements'
-                },
-                tooltip_delay=0,
-                tooltip_duration=None,
-                sort_action="native",  # Enable sorting
-                sort_by=[{"column_id": "avg_progress", "direction": "desc"}],  # Default sort by progress
-                style_table={'overflowX': 'auto'},
-                style_cell={
-                    'textAlign': 'left',
-                    'fontFamily': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif',
-                    'padding': '10px',
-                    'color': 'black'
-                },
-                style_header={
-                    'backgroundColor': '#1e40af',
-                    'color': 'white',
-                    'fontWeight': 'bold',
-                    'fontFamily': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif'
-                },
-                style_data_conditional=[
-                    {
-                        'if': {'filter_query': '{avg_progress} >= 80'},
-                        'backgroundColor': f"{ROMAN_COLORS['forest_green']}80",  # 50% opacity
-                        'color': 'black',
-                    },
-                    {
-                        'if': {'filter_query': '{avg_progress} >= 60 && {avg_progress} < 80'},
-                        'backgroundColor': f"{ROMAN_COLORS['victory_green']}80",  # 50% opacity
-                        'color': 'black',
-                    },
-                    {
-                        'if': {'filter_query': '{avg_progress} >= 40 && {avg_progress} < 60'},
-                        'backgroundColor': f"{ROMAN_COLORS['warning_yellow']}80",  # 50% opacity
-                        'color': 'black',
-                    },
-                    {
-                        'if': {'filter_query': '{avg_progress} >= 20 && {avg_progress} < 40'},
-                        'backgroundColor': f"{ROMAN_COLORS['caution_orange']}80",  # 50% opacity
-                        'color': 'black',
-                    },
-                    {
-                        'if': {'filter_query': '{avg_progress} < 20'},
-                        'backgroundColor': f"{ROMAN_COLORS['critical_crimson']}80",  # 50% opacity
-                        'color': 'black',
-                    }
-                ]
-            )
+            return self.aggregates.memoize("county-table", (), self._build_county_table)
         
         @self.app.callback(
             Output("county-selector", "options"),
@@ -787,9 +698,7 @@ class ColasseumRomanDashboard:
         def update_county_selector_options(active_tab):
             if active_tab != "tactical":
                 return []
-            df = self.get_county_performance_data()
-            options = [{'label': county, 'value': county} for county in sorted(df['county_name'].unique())]
-            return options
+            return self.aggregates.get().county_options
         
         @self.app.callback(
             Output("operational-county-filter", "options"),
@@ -798,9 +707,7 @@ class ColasseumRomanDashboard:
         def update_operational_county_options(active_tab):
             if active_tab != "operational":
                 return []
-            df = self.get_county_performance_data()
-            options = [{'label': county, 'value': county} for county in sorted(df['county_name'].unique())]
-            return options
+            return self.aggregates.get().county_options
         
         @self.app.callback(
             Output("county-progress-chart", "figure"),
@@ -809,27 +716,10 @@ class ColasseumRomanDashboard:
         def update_county_progress_chart(selected_counties, active_tab):
             if active_tab != "tactical":
                 return {}
-                
-            df = self.get_county_performance_data()
-            if selected_counties and len(selected_counties) > 0:
-                df = df[df['county_name'].isin(selected_counties)]
-            
-            fig = go.Figure(data=[
-                go.Bar(
-                    x=df['county_name'][:10],  # Limit to top 10 for readability
-                    y=df['avg_progress'][:10],
-                    marker_color=[self._get_performance_color(progress) for progress in df['avg_progress'][:10]]
-                )
-            ])
-            
-            fig.update_layout(
-                title={'text': 'County RHNA Progress Comparison', 'font': {'family': 'Cinzel, serif'}},
-                font={'family': 'Cinzel, serif'},
-                xaxis_title="County",
-                yaxis_title="Average Progress (%)"
-            )
-            
-            return fig
+            selected = sorted(selected_counties or [])
+            return self.aggregates.memoize(
+                "county-progress", (selected,),
+                lambda aggregates: self._build_county_progress_chart(aggregates, selected))
         
         @self.app.callback(
             Output("county-heatmap", "figure"),
@@ -838,29 +728,7 @@ class ColasseumRomanDashboard:
         def update_county_heatmap(selected_counties, active_tab):
             if active_tab != "tactical":
                 return {}
-                
-            df = self.get_county_performance_data()
-            
-            # Create proper heatmap data structure
-            heatmap_data = [
-                df['builders_remedy_count'][:10].tolist(),
-                df['streamlining_count'][:10].tolist(), 
-                df['compliant_count'][:10].tolist()
-            ]
-            
-            fig = go.Figure(data=go.Heatmap(
-                z=heatmap_data,
-                x=df['county_name'][:10].tolist(),
-                y=['Builder\'s Remedy', 'SB 35 Streamlining', 'Compliant'],
-                colorscale='RdYlGn_r'
-            ))
-            
-            fig.update_layout(
-                title={'text': 'Development Opportunities Heatmap', 'font': {'family': 'Cinzel, serif'}},
-                font={'family': 'Cinzel, serif'}
-            )
-            
-            return fig
+            return self.aggregates.memoize("county-heatmap", (), self._build_county_heatmap)
         
         @self.app.callback(
             Output("opportunities-table", "children"),
@@ -872,83 +740,235 @@ class ColasseumRomanDashboard:
         def update_opportunities_table(performance_filter, opportunity_filter, county_filter, active_tab):
             if active_tab != "operational":
                 return []
-            df = self.get_jurisdiction_opportunities_data()
-            
-            # Apply filters
-            if performance_filter:
-                df = df[df['performance_category'].isin(performance_filter)]
-            
-            if opportunity_filter:
-                filter_conditions = []
-                if 'builders_remedy' in opportunity_filter:
-                    filter_conditions.append(df['builders_remedy_exposed'] == True)
-                if 'streamlining' in opportunity_filter:
-                    filter_conditions.append(df['ministerial_approval_required'] == True)
-                if 'sb35_50' in opportunity_filter:
-                    filter_conditions.append(df['sb35_50_percent_required'] == True)
-                if 'sb35_10' in opportunity_filter:
-                    filter_conditions.append(df['sb35_10_percent_required'] == True)
-                
-                if filter_conditions:
-                    combined_filter = filter_conditions[0]
-                    for condition in filter_conditions[1:]:
-                        combined_filter = combined_filter | condition
-                    df = df[combined_filter]
-            
-            if county_filter:
-                df = df[df['county_name'].isin(county_filter)]
-            
-            # Add opportunity indicators
-            df['opportunities'] = df.apply(lambda row: self._format_opportunities(row), axis=1)
-            
-            return dash_table.DataTable(
-                data=df.head(50).to_dict('records'),
-                columns=[
-                    {"name": "Jurisdiction", "id": "jurisdiction_name"},
-                    {"name": "County", "id": "county_name"},
-                    {"name": "Progress (%)", "id": "overall_progress", "type": "numeric", "format": {"specifier": ".1f"}},
-                    {"name": "Status", "id": "compliance_status"},
-                    {"name": "Category", "id": "performance_category"},
-                    {"name": "Opportunities", "id": "opportunities"}
-                ],
-                style_table={'overflowX': 'auto'},
-                style_cell={
-                    'textAlign': 'left',
-                    'fontFamily': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif',
-                    'padding': '10px',
-                    'whiteSpace': 'normal',
-                    'height': 'auto',
-                    'color': 'black'
+            filters = (sorted(performance_filter or []), sorted(opportunity_filter or []), sorted(county_filter or []))
+            return self.aggregates.memoize(
+                "opportunities-table", filters,
+                lambda aggregates: self._build_opportunities_table(aggregates, *filters))
+    
+    def setup_http_caching(self):
+        """ETag every GET response (layout, dependencies, assets) and answer repeats with 304"""
+        @self.app.server.after_request
+        def add_etag(response):
+            # Only stamp once a callback has built the snapshot; asset requests must not trigger the DB load
+            version = self.aggregates.current_version
+            if version:
+                response.headers['X-Data-Version'] = version
+            if request.method == 'GET' and response.status_code == 200 and not response.direct_passthrough:
+                response.add_etag()
+                response = response.make_conditional(request)
+            return response
+    
+    def _build_compliance_pie(self, aggregates) -> go.Figure:
+        data = aggregates.strategic
+        
+        # More accurate HCD compliance categories
+        fig = go.Figure(data=[go.Pie(
+            labels=['At Risk (Behind Schedule)', 'Non-Compliant (Builder\'s Remedy)', 'Compliant'],
+            values=[data['at_risk_count'], data['non_compliant_count'], data['compliant_count']],
+            hole=0.4,
+            marker_colors=[ROMAN_COLORS['caution_orange'], ROMAN_COLORS['critical_crimson'], ROMAN_COLORS['victory_green']]
+        )])
+        
+        fig.update_layout(
+            title={
+                'text': 'Jurisdiction Compliance Status',
+                'font': {'family': 'Cinzel, serif', 'size': 16}
+            },
+            font={'family': 'Cinzel, serif'},
+            showlegend=True
+        )
+        
+        return fig
+    
+    def _build_opportunities_bar(self, aggregates) -> go.Figure:
+        data = aggregates.strategic
+        
+        fig = go.Figure(data=[
+            go.Bar(
+                x=['SB 35 Streamlining', "Builder's Remedy", 'Pro-Housing Eligible'],
+                y=[data['streamlining_count'], data['builders_remedy_count'], 59],
+                marker_color=[ROMAN_COLORS['caution_orange'], ROMAN_COLORS['critical_crimson'], ROMAN_COLORS['victory_green']]
+            )
+        ])
+        
+        fig.update_layout(
+            title={
+                'text': 'Development Opportunities',
+                'font': {'family': 'Cinzel, serif', 'size': 16}
+            },
+            font={'family': 'Cinzel, serif'},
+            xaxis_title="Opportunity Type",
+            yaxis_title="Number of Jurisdictions"
+        )
+        
+        return fig
+    
+    def _build_county_table(self, aggregates) -> dash_table.DataTable:
+        df = aggregates.counties
+        
+        return dash_table.DataTable(
+            data=df.head(15).to_dict('records'),
+            columns=[
+                {"name": "County", "id": "county_name", "deletable": False, "selectable": False},
+                {"name": "Cities", "id": "jurisdiction_count", "type": "numeric"},
+                {"name": "Avg Progress (%)", "id": "avg_progress", "type": "numeric", "format": {"specifier": ".1f"}},
+                {"name": "Compliant", "id": "compliant_count", "type": "numeric", 
+                 "presentation": "markdown"},
+                {"name": "Builder's Remedy", "id": "builders_remedy_count", "type": "numeric",
+                 "presentation": "markdown"},
+                {"name": "Streamlining", "id": "streamlining_count", "type": "numeric",
+                 "presentation": "markdown"}
+            ],
+            tooltip_header={
+                'compliant_count': 'Cities meeting their RHNA housing production requirements',
+                'builders_remedy_count': 'Cities exposed to Builder\'s Remedy (streamlined 20% affordable housing)',
+                'streamlining_count': 'Cities subject to SB 35 ministerial approval requirements'
+            },
+            tooltip_delay=0,
+            tooltip_duration=None,
+            sort_action="native",  # Enable sorting
+            sort_by=[{"column_id": "avg_progress", "direction": "desc"}],  # Default sort by progress
+            style_table={'overflowX': 'auto'},
+            style_cell={
+                'textAlign': 'left',
+                'fontFamily': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif',
+                'padding': '10px',
+                'color': 'black'
+            },
+            style_header={
+                'backgroundColor': '#1e40af',
+                'color': 'white',
+                'fontWeight': 'bold',
+                'fontFamily': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif'
+            },
+            style_data_conditional=[
+                {
+                    'if': {'filter_query': '{avg_progress} >= 80'},
+                    'backgroundColor': f"{ROMAN_COLORS['forest_green']}80",  # 50% opacity
+                    'color': 'black',
                 },
-                style_header={
-                    'backgroundColor': '#1e40af',
-                    'color': 'white',
-                    'fontWeight': 'bold',
-                    'fontFamily': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif'
+                {
+                    'if': {'filter_query': '{avg_progress} >= 60 && {avg_progress} < 80'},
+                    'backgroundColor': f"{ROMAN_COLORS['victory_green']}80",  # 50% opacity
+                    'color': 'black',
                 },
-                style_data_conditional=[
-                    {
-                        'if': {'filter_query': '{performance_category} = Excellent'},
-                        'backgroundColor': f"{ROMAN_COLORS['forest_green']}80",  # 50% opacity
-                        'color': 'black',
-                    },
-                    {
-                        'if': {'filter_query': '{performance_category} = Good'},
-                        'backgroundColor': f"{ROMAN_COLORS['victory_green']}80",  # 50% opacity
-                        'color': 'black',
-                    },
-                    {
-                        'if': {'filter_query': '{performance_category} = "Behind Schedule"'},
-                        'backgroundColor': f"{ROMAN_COLORS['caution_orange']}80",  # 50% opacity
-                        'color': 'black',
-                    },
-                    {
-                        'if': {'filter_query': '{performance_category} = Critical'},
-                        'backgroundColor': f"{ROMAN_COLORS['critical_crimson']}80",  # 50% opacity
-                        'color': 'black',
-                    }
-                ]
+                {
+                    'if': {'filter_query': '{avg_progress} >= 40 && {avg_progress} < 60'},
+                    'backgroundColor': f"{ROMAN_COLORS['warning_yellow']}80",  # 50% opacity
+                    'color': 'black',
+                },
+                {
+                    'if': {'filter_query': '{avg_progress} >= 20 && {avg_progress} < 40'},
+                    'backgroundColor': f"{ROMAN_COLORS['caution_orange']}80",  # 50% opacity
+                    'color': 'black',
+                },
+                {
+                    'if': {'filter_query': '{avg_progress} < 20'},
+                    'backgroundColor': f"{ROMAN_COLORS['critical_crimson']}80",  # 50% opacity
+                    'color': 'black',
+                }
+            ]
+        )
+    
+    def _build_county_progress_chart(self, aggregates, selected_counties: List[str]) -> go.Figure:
+        df = aggregates.counties
+        if selected_counties and len(selected_counties) > 0:
+            df = df[df['county_name'].isin(selected_counties)]
+        
+        fig = go.Figure(data=[
+            go.Bar(
+                x=df['county_name'][:10],  # Limit to top 10 for readability
+                y=df['avg_progress'][:10],
+                marker_color=[self._get_performance_color(progress) for progress in df['avg_progress'][:10]]
             )
+        ])
+        
+        fig.update_layout(
+            title={'text': 'County RHNA Progress Comparison', 'font': {'family': 'Cinzel, serif'}},
+            font={'family': 'Cinzel, serif'},
+            xaxis_title="County",
+            yaxis_title="Average Progress (%)"
+        )
+        
+        return fig
+    
+    def _build_county_heatmap(self, aggregates) -> go.Figure:
+        df = aggregates.counties
+        
+        # Create proper heatmap data structure
+        heatmap_data = [
+            df['builders_remedy_count'][:10].tolist(),
+            df['streamlining_count'][:10].tolist(), 
+            df['compliant_count'][:10].tolist()
+        ]
+        
+        fig = go.Figure(data=go.Heatmap(
+            z=heatmap_data,
+            x=df['county_name'][:10].tolist(),
+            y=['Builder\'s Remedy', 'SB 35 Streamlining', 'Compliant'],
+            colorscale='RdYlGn_r'
+        ))
+        
+        fig.update_layout(
+            title={'text': 'Development Opportunities Heatmap', 'font': {'family': 'Cinzel, serif'}},
+            font={'family': 'Cinzel, serif'}
+        )
+        
+        return fig
+    
+    def _build_opportunities_table(self, aggregates, performance_filter: List[str],
+                               opportunity_filter: List[str], county_filter: List[str]) -> dash_table.DataTable:
+        # Filters answered from the snapshot's precomputed masks; 'opportunities' is precomputed too
+        df = aggregates.filter_jurisdictions(performance_filter, opportunity_filter, county_filter)
+        
+        return dash_table.DataTable(
+            data=df.head(50).to_dict('records'),
+            columns=[
+                {"name": "Jurisdiction", "id": "jurisdiction_name"},
+                {"name": "County", "id": "county_name"},
+                {"name": "Progress (%)", "id": "overall_progress", "type": "numeric", "format": {"specifier": ".1f"}},
+                {"name": "Status", "id": "compliance_status"},
+                {"name": "Category", "id": "performance_category"},
+                {"name": "Opportunities", "id": "opportunities"}
+            ],
+            style_table={'overflowX': 'auto'},
+            style_cell={
+                'textAlign': 'left',
+                'fontFamily': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif',
+                'padding': '10px',
+                'whiteSpace': 'normal',
+                'height': 'auto',
+                'color': 'black'
+            },
+            style_header={
+                'backgroundColor': '#1e40af',
+                'color': 'white',
+                'fontWeight': 'bold',
+                'fontFamily': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif'
+            },
+            style_data_conditional=[
+                {
+                    'if': {'filter_query': '{performance_category} = Excellent'},
+                    'backgroundColor': f"{ROMAN_COLORS['forest_green']}80",  # 50% opacity
+                    'color': 'black',
+                },
+                {
+                    'if': {'filter_query': '{performance_category} = Good'},
+                    'backgroundColor': f"{ROMAN_COLORS['victory_green']}80",  # 50% opacity
+                    'color': 'black',
+                },
+                {
+                    'if': {'filter_query': '{performance_category} = "Behind Schedule"'},
+                    'backgroundColor': f"{ROMAN_COLORS['caution_orange']}80",  # 50% opacity
+                    'color': 'black',
+                },
+                {
+                    'if': {'filter_query': '{performance_category} = Critical'},
+                    'backgroundColor': f"{ROMAN_COLORS['critical_crimson']}80",  # 50% opacity
+                    'color': 'black',
+                }
+            ]
+        )
     
     def _get_performance_color(self, progress: float) -> str:
         """Get color based on performance percentage using strategic gradient"""
@@ -969,21 +989,6 @@ class ColasseumRomanDashboard:
         else:
             return ROMAN_COLORS['critical_crimson']    # Very Bad (<10%)
     
-    def _format_opportunities(self, row) -> str:
-        """Format opportunities for display"""
-        opportunities = []
-        
-        if row.get('builders_remedy_exposed'):
-            opportunities.append("🏗️ Builder's Remedy")
-        if row.get('sb35_50_percent_required'):
-            opportunities.append("⚡ 50% SB35")
-        elif row.get('sb35_10_percent_required'):
-            opportunities.append("📋 10% SB35")
-        elif row.get('ministerial_approval_required'):
-            opportunities.append("🎯 Streamlining")
-        
-        return " | ".join(opportunities) if opportunities else "None"
-    
     def run_server(self, debug=False, port=8050):
         """Run the dashboard server"""
         logger.info("🏛️ LAUNCHING CALIFORNIA HCD HOUSING ELEMENT ROMAN EMPIRE DASHBOARD")
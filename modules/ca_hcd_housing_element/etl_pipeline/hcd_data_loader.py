@@ -15,12 +15,18 @@ import numpy as np
 from pathlib import Path
 import logging
 from datetime import datetime, date
+import io
 import json
 import re
+import time
 from typing import Dict, List, Optional, Tuple, Any
 import warnings
 from dataclasses import dataclass
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dashboard'))
+from dashboard_aggregates import ETL_COMPLETED_STAMP
 
 # Suppress pandas warnings for cleaner output
 warnings.filterwarnings('ignore', category=UserWarning)
@@ -36,6 +42,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# COPY's NULL marker. Missing values are written as \N so an empty string still loads as ''
+# (an unquoted empty CSV field would otherwise be NULL, unlike the old to_sql loads)
+COPY_NULL = r'\N'
+
 @dataclass
 class HCDDataConfig:
     """Configuration for HCD data loading"""
@@ -101,8 +111,9 @@ class ColasseumHCDDataLoader:
         """Establish database connection"""
         try:
             db_config = self.config.database_config
+            # psycopg2 explicitly: the bulk load streams through its cursor.copy_expert
             connection_string = (
-                f"postgresql://{db_config['user']}:{db_config['password']}@"
+                f"postgresql+psycopg2://{db_config['user']}:{db_config['password']}@"
                 f"{db_config['host']}:{db_config['port']}/{db_config['database']}"
             )
             
@@ -170,6 +181,15 @@ class ColasseumHCDDataLoader:
         logger.warning(f"⚠️ Could not parse date: {date_str}")
         return None
     
+    @staticmethod
+    def map_unique(series: pd.Series, func) -> pd.Series:
+        """Apply func once per distinct value (statewide APR files repeat the same few
+        hundred jurisdiction names and dates across hundreds of thousands of rows)"""
+        codes, uniques = pd.factorize(series)
+        # Missing values get code -1, which picks the trailing func(None)
+        values = np.array([func(value) for value in uniques] + [func(None)], dtype=object)
+        return pd.Series(values[codes], index=series.index)
+    
     def standardize_jurisdiction_name(self, name: str) -> str:
         """Standardize jurisdiction names for consistency"""
         if pd.isna(name):
@@ -196,13 +216,13 @@ class ColasseumHCDDataLoader:
         
         # Standardize jurisdiction names
         if 'juris_name' in df.columns:
-            df['juris_name'] = df['juris_name'].apply(self.standardize_jurisdiction_name)
+            df['juris_name'] = self.map_unique(df['juris_name'], self.standardize_jurisdiction_name)
         
         # Parse dates
         date_columns = ['app_submit_dt']
         for col in date_columns:
             if col in df.columns:
-                df[col] = df[col].apply(self.parse_dates)
+                df[col] = self.map_unique(df[col], self.parse_dates)
         
         # Convert numeric columns
         numeric_columns = [
@@ -238,13 +258,13 @@ class ColasseumHCDDataLoader:
         
         # Standardize jurisdiction names
         if 'juris_name' in df.columns:
-            df['juris_name'] = df['juris_name'].apply(self.standardize_jurisdiction_name)
+            df['juris_name'] = self.map_unique(df['juris_name'], self.standardize_jurisdiction_name)
         
         # Parse dates - critical for RHNA compliance tracking
         date_columns = ['ent_approve_dt1', 'bp_issue_dt1', 'co_issue_dt1']
         for col in date_columns:
             if col in df.columns:
-                df[col] = df[col].apply(self.parse_dates)
+                df[col] = self.map_unique(df[col], self.parse_dates)
         
         # Convert all income category columns to numeric
         income_columns = [
@@ -343,24 +363,107 @@ class ColasseumHCDDataLoader:
         
         return None
     
+    @staticmethod
+    def copy_frame(cursor, df: pd.DataFrame, table: str) -> None:
+        """Stream a DataFrame into a table through COPY from an in-memory CSV buffer (NaN -> NULL, '' -> '')"""
+        buffer = io.StringIO()
+        df.to_csv(buffer, index=False, header=False, na_rep=COPY_NULL)
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {table} ({', '.join(df.columns)}) FROM STDIN "
+                           f"WITH (FORMAT csv, NULL '{COPY_NULL}')", buffer)
+    
+    def resolve_jurisdiction_ids(self, cursor, df: pd.DataFrame) -> pd.Series:
+        """
+        Set-based get_or_create_jurisdiction for every row: the distinct jurisdiction/county
+        pairs are staged once, missing ones inserted in a single INSERT ... SELECT, and the
+        IDs merged back onto the rows (NaN where the county is missing, as before)
+        """
+        rows = pd.DataFrame({
+            'jurisdiction_name': df['juris_name'] if 'juris_name' in df.columns else '',
+            'county_name': df['cnty_name'] if 'cnty_name' in df.columns else ''
+        }, index=df.index)
+        keys = rows.dropna().drop_duplicates()
+        
+        cursor.execute("DROP TABLE IF EXISTS staging_jurisdiction_keys")
+        cursor.execute("""
+            CREATE TEMP TABLE staging_jurisdiction_keys (
+                jurisdiction_name VARCHAR(255) NOT NULL,
+                county_name VARCHAR(100) NOT NULL
+            ) ON COMMIT DROP
+        """)
+        self.copy_frame(cursor, keys, 'staging_jurisdiction_keys')
+        cursor.execute("""
+            INSERT INTO jurisdictions (jurisdiction_name, county_name, jurisdiction_type)
+            SELECT k.jurisdiction_name, k.county_name, 'City'
+            FROM staging_jurisdiction_keys k
+            WHERE NOT EXISTS (
+                SELECT 1 FROM jurisdictions j
+                WHERE j.jurisdiction_name = k.jurisdiction_name AND j.county_name = k.county_name
+            )
+        """)
+        if cursor.rowcount:
+            logger.info(f"✅ Created {cursor.rowcount} jurisdictions")
+        
+        cursor.execute("""
+            SELECT k.jurisdiction_name, k.county_name, MIN(j.jurisdiction_id)
+            FROM staging_jurisdiction_keys k
+            JOIN jurisdictions j
+              ON j.jurisdiction_name = k.jurisdiction_name AND j.county_name = k.county_name
+            GROUP BY k.jurisdiction_name, k.county_name
+        """)
+        ids = pd.DataFrame(cursor.fetchall(), columns=['jurisdiction_name', 'county_name', 'jurisdiction_id'])
+        merged = rows.merge(ids, how='left', on=['jurisdiction_name', 'county_name'])
+        return pd.Series(merged['jurisdiction_id'].values, index=df.index)
+    
+    def bulk_load(self, df: pd.DataFrame, table: str, column_mapping: Dict[str, str]) -> int:
+        """
+        Load one fact table in a single transaction: resolve jurisdiction IDs, COPY the rows
+        into a staging table with the target's column types, then one INSERT ... SELECT
+        """
+        started = time.time()
+        raw_connection = self.engine.raw_connection()
+        try:
+            cursor = raw_connection.cursor()
+            
+            df['jurisdiction_id'] = self.resolve_jurisdiction_ids(cursor, df)
+            valid_rows = df[df['jurisdiction_id'].notna()]
+            resolved = time.time()
+            
+            # Select and rename columns that exist
+            available_columns = {k: v for k, v in column_mapping.items() if k in valid_rows.columns}
+            db_df = valid_rows[list(available_columns.keys())].rename(columns=available_columns)
+            db_df['jurisdiction_id'] = db_df['jurisdiction_id'].astype(int)
+            # COPY parses text: whole-number floats (numeric columns with gaps) must not be written as '2023.0'
+            for col in db_df.select_dtypes(include='float').columns:
+                values = db_df[col].dropna()
+                if (values == values.round()).all():
+                    db_df[col] = db_df[col].astype('Int64')
+            column_list = ', '.join(db_df.columns)
+            
+            staging_table = f"staging_{table}"
+            cursor.execute(f"DROP TABLE IF EXISTS {staging_table}")
+            cursor.execute(f"CREATE TEMP TABLE {staging_table} ON COMMIT DROP AS "
+                           f"SELECT {column_list} FROM {table} WITH NO DATA")
+            self.copy_frame(cursor, db_df, staging_table)
+            cursor.execute(f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {staging_table}")
+            raw_connection.commit()
+            
+            logger.info(f"⏱️ {table}: jurisdictions resolved in {resolved - started:.2f}s, "
+                        f"{len(db_df)} rows copied in {time.time() - resolved:.2f}s")
+            return len(db_df)
+        
+        except Exception:
+            raw_connection.rollback()
+            raise
+        
+        finally:
+            raw_connection.close()
+    
     def load_housing_applications(self, df: pd.DataFrame) -> bool:
         """Load housing applications data into database"""
         try:
             logger.info("🔄 Loading housing applications to database...")
             
-            # Process jurisdictions and get IDs
-            df['jurisdiction_id'] = df.apply(
-                lambda row: self.get_or_create_jurisdiction(
-                    row.get('juris_name', ''), 
-                    row.get('cnty_name', ''), 
-                    row.get('year', 2023)
-                ), axis=1
-            )
-            
-            # Filter out rows without jurisdiction_id
-            valid_rows = df[df['jurisdiction_id'].notna()]
-            logger.info(f"📊 Loading {len(valid_rows)} valid application records")
-            
             # Map DataFrame columns to database columns
             column_mapping = {
                 'jurisdiction_id': 'jurisdiction_id',
@@ -372,29 +475,20 @@ class ColasseumHCDDataLoader:
                 'unit_cat': 'unit_category',
                 'tenure': 'tenure',
                 'app_submit_dt': 'app_submit_date',
+                # Income categories
                 'vlow_income_dr': 'vlow_income_dr',
                 'vlow_income_ndr': 'vlow_income_ndr',
-                # ... add more mappings as needed
+                'low_income_dr': 'low_income_dr',
+                'low_income_ndr': 'low_income_ndr',
+                'mod_income_dr': 'mod_income_dr',
+                'mod_income_ndr': 'mod_income_ndr',
+                'above_mod_income': 'above_mod_income',
+                'tot_proposed_units': 'total_proposed_units',
+                'tot_approved_units': 'total_approved_units',
                 'year': 'reporting_year'
             }
             
-            # Select and rename columns
-            db_df = valid_rows.rename(columns=column_mapping)
-            
-            # Load to database in batches
-            batch_size = self.config.batch_size
-            total_rows = len(db_df)
-            
-            for i in range(0, total_rows, batch_size):
-                batch = db_df.iloc[i:i+batch_size]
-                batch.to_sql(
-                    'housing_applications', 
-                    self.engine, 
-                    if_exists='append', 
-                    index=False,
-                    method='multi'
-                )
-                logger.info(f"✅ Loaded batch {i//batch_size + 1}: {len(batch)} records")
+            total_rows = self.bulk_load(df, 'housing_applications', column_mapping)
             
             logger.info(f"✅ Successfully loaded {total_rows} housing application records")
             return True
@@ -408,19 +502,6 @@ class ColasseumHCDDataLoader:
         try:
             logger.info("🔄 Loading building permits to database...")
             
-            # Process jurisdictions and get IDs
-            df['jurisdiction_id'] = df.apply(
-                lambda row: self.get_or_create_jurisdiction(
-                    row.get('juris_name', ''), 
-                    row.get('cnty_name', ''), 
-                    row.get('year', 2023)
-                ), axis=1
-            )
-            
-            # Filter out rows without jurisdiction_id
-            valid_rows = df[df['jurisdiction_id'].notna()]
-            logger.info(f"📊 Loading {len(valid_rows)} valid building permit records")
-            
             # Map DataFrame columns to database columns
             column_mapping = {
                 'jurisdiction_id': 'jurisdiction_id',
@@ -463,24 +544,7 @@ class ColasseumHCDDataLoader:
                 'year': 'reporting_year'
             }
             
-            # Select and rename columns that exist
-            available_columns = {k: v for k, v in column_mapping.items() if k in valid_rows.columns}
-            db_df = valid_rows[list(available_columns.keys())].rename(columns=available_columns)
-            
-            # Load to database in batches
-            batch_size = self.config.batch_size
-            total_rows = len(db_df)
-            
-            for i in range(0, total_rows, batch_size):
-                batch = db_df.iloc[i:i+batch_size]
-                batch.to_sql(
-                    'building_permits', 
-                    self.engine, 
-                    if_exists='append', 
-                    index=False,
-                    method='multi'
-                )
-                logger.info(f"✅ Loaded batch {i//batch_size + 1}: {len(batch)} records")
+            total_rows = self.bulk_load(df, 'building_permits', column_mapping)
             
             logger.info(f"✅ Successfully loaded {total_rows} building permit records")
             return True
@@ -549,6 +613,22 @@ class ColasseumHCDDataLoader:
             logger.error(f"❌ Failed to generate data summary: {e}")
             return {'error': str(e)}
     
+    def write_completion_stamp(self, success_count: int, summary: Dict[str, Any]) -> None:
+        """Atomically rewrite the ETL completion stamp; the dashboard rebuilds its aggregate cache when it changes"""
+        stamp = {
+            'completed_at': datetime.now().isoformat(),
+            'successful_loads': success_count,
+            'tables_loaded': summary.get('tables_loaded', {})
+        }
+        try:
+            os.makedirs(os.path.dirname(ETL_COMPLETED_STAMP), exist_ok=True)
+            tmp_path = f"{ETL_COMPLETED_STAMP}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(stamp, f, indent=2, default=str)
+            os.replace(tmp_path, ETL_COMPLETED_STAMP)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write ETL completion stamp {ETL_COMPLETED_STAMP}: {e}")
+    
     def load_all_hcd_data(self) -> bool:
         """Load all HCD Housing Element data"""
         logger.info("🏛️ STARTING CALIFORNIA HCD HOUSING ELEMENT DATA LOADING")
@@ -605,6 +685,9 @@ class ColasseumHCDDataLoader:
             with open(summary_path, 'w') as f:
                 json.dump(summary, f, indent=2, default=str)
             
+            # Signal downstream caches (Roman Empire dashboard) that new data is in
+            self.write_completion_stamp(success_count, summary)
+            
             logger.info("=" * 80)
             logger.info(f"🎉 DATA LOADING COMPLETE: {success_count}/{total_operations} successful")
             logger.info(f"📊 Total jurisdictions: {summary['tables_loaded'].get('jurisdictions', 0)}")
@@ -16,6 +16,7 @@ from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
 import logging
 import json
+import time
 from pathlib import Path
 import os
 
@@ -30,6 +31,105 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Per jurisdiction and APR reporting year: the in-cycle permit sums behind progress,
+# velocity and completion rate. All of them add up across years, so a new APR year
+# only means rolling up that year's permits.
+ROLLUP_TABLES_SQL = """
+CREATE TABLE IF NOT EXISTS rhna_permit_rollup (
+    jurisdiction_id INTEGER NOT NULL,
+    reporting_year INTEGER NOT NULL,          -- -1 for permits without a reporting year
+    very_low_progress BIGINT,
+    low_progress BIGINT,
+    moderate_progress BIGINT,
+    above_moderate_progress BIGINT,
+    total_progress BIGINT,
+    permit_count BIGINT NOT NULL,
+    min_bp_year INTEGER,
+    max_bp_year INTEGER,
+    total_permitted BIGINT,
+    total_completed BIGINT,
+    PRIMARY KEY (jurisdiction_id, reporting_year)
+);
+CREATE TABLE IF NOT EXISTS rhna_rollup_state (
+    reporting_year INTEGER PRIMARY KEY,
+    permit_count BIGINT NOT NULL,
+    max_permit_id INTEGER,
+    max_updated_at TIMESTAMP,
+    cycle_start DATE NOT NULL,
+    cycle_end DATE NOT NULL,
+    refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Same expressions and cycle filter as calculate_jurisdiction_progress,
+# calculate_permitting_velocity and calculate_completion_rate
+ROLLUP_INSERT_SQL = """
+INSERT INTO rhna_permit_rollup
+SELECT 
+    jurisdiction_id,
+    COALESCE(reporting_year, -1),
+    SUM(bp_vlow_income_dr + bp_vlow_income_ndr),
+    SUM(bp_low_income_dr + bp_low_income_ndr),
+    SUM(bp_mod_income_dr + bp_mod_income_ndr),
+    SUM(bp_above_mod_income),
+    SUM(bp_vlow_income_dr + bp_vlow_income_ndr + 
+        bp_low_income_dr + bp_low_income_ndr + 
+        bp_mod_income_dr + bp_mod_income_ndr + 
+        bp_above_mod_income),
+    COUNT(*),
+    MIN(EXTRACT(YEAR FROM bp_issue_date))::INTEGER,
+    MAX(EXTRACT(YEAR FROM bp_issue_date))::INTEGER,
+    SUM(bp_vlow_income_dr + bp_vlow_income_ndr + 
+        bp_low_income_dr + bp_low_income_ndr + 
+        bp_mod_income_dr + bp_mod_income_ndr + 
+        bp_above_mod_income),
+    SUM(co_vlow_income_dr + co_vlow_income_ndr + 
+        co_low_income_dr + co_low_income_ndr + 
+        co_mod_income_dr + co_mod_income_ndr + 
+        co_above_mod_income)
+FROM building_permits 
+WHERE COALESCE(reporting_year, -1) = ANY(:years)
+AND jurisdiction_id IS NOT NULL
+AND bp_issue_date BETWEEN :cycle_start AND :cycle_end
+GROUP BY 1, 2
+"""
+
+# One row per jurisdiction: allocation (latest row if several) and the rolled-up permit metrics
+JURISDICTION_METRICS_SQL = """
+SELECT 
+    j.jurisdiction_id,
+    j.jurisdiction_name,
+    j.county_name,
+    a.jurisdiction_id IS NOT NULL AS has_allocation,
+    COALESCE(a.very_low_income_units, 0) AS very_low_allocation,
+    COALESCE(a.low_income_units, 0) AS low_allocation,
+    COALESCE(a.moderate_income_units, 0) AS moderate_allocation,
+    COALESCE(a.above_moderate_units, 0) AS above_moderate_allocation,
+    COALESCE(a.total_units, 0) AS total_allocation,
+    COALESCE(SUM(r.very_low_progress), 0) AS very_low_progress,
+    COALESCE(SUM(r.low_progress), 0) AS low_progress,
+    COALESCE(SUM(r.moderate_progress), 0) AS moderate_progress,
+    COALESCE(SUM(r.above_moderate_progress), 0) AS above_moderate_progress,
+    COALESCE(SUM(r.total_progress), 0) AS total_progress,
+    COALESCE(SUM(r.permit_count), 0) AS permit_count,
+    COALESCE(MAX(r.max_bp_year) - MIN(r.min_bp_year) + 1, 0) AS years_span,
+    COALESCE(SUM(r.total_permitted), 0) AS total_permitted,
+    COALESCE(SUM(r.total_completed), 0) AS total_completed
+FROM jurisdictions j
+LEFT JOIN (
+    SELECT DISTINCT ON (jurisdiction_id) *
+    FROM rhna_allocations
+    ORDER BY jurisdiction_id, allocation_id DESC
+) a ON a.jurisdiction_id = j.jurisdiction_id
+LEFT JOIN rhna_permit_rollup r ON r.jurisdiction_id = j.jurisdiction_id
+GROUP BY j.jurisdiction_id, j.jurisdiction_name, j.county_name, a.jurisdiction_id,
+         a.very_low_income_units, a.low_income_units, a.moderate_income_units,
+         a.above_moderate_units, a.total_units
+ORDER BY j.jurisdiction_name
+"""
+
+CATEGORIES = ['very_low', 'low', 'moderate', 'above_moderate', 'total']
+
 @dataclass
 class RHNAIntelligenceConfig:
     """Configuration for RHNA compliance intelligence"""
@@ -114,7 +214,7 @@ class ColasseumRHNAIntelligence:
         try:
             db_config = self.config.database_config
             connection_string = (
-                f"postgresql://{db_config['user']}:{db_config['password']}@"
+                f"postgresql+psycopg2://{db_config['user']}:{db_config['password']}@"
                 f"{db_config['host']}:{db_config['port']}/{db_config['database']}"
             )
             
@@ -250,7 +350,7 @@ class ColasseumRHNAIntelligence:
             }).fetchone()
             
             if result and result[0] > 0 and result[1] > 0:
-                permits_per_year = result[0] / result[1]
+                permits_per_year = result[0] / float(result[1])  # EXTRACT returns numeric on Postgres 14+
                 return permits_per_year / 12  # Convert to monthly
             
             return 0.0
@@ -541,6 +641,249 @@ class ColasseumRHNAIntelligence:
             self.connection.rollback()
             return False
     
+    def refresh_permit_rollup(self) -> Dict[str, Any]:
+        """
+        Bring rhna_permit_rollup up to date with building_permits, re-rolling only the
+        reporting years whose permits changed (row count, max permit_id or max updated_at)
+        since the last refresh; everything is rebuilt if the RHNA cycle dates changed
+        """
+        started = time.time()
+        for statement in ROLLUP_TABLES_SQL.split(';'):
+            if statement.strip():
+                self.connection.execute(text(statement))
+        
+        current = {
+            row[0]: tuple(row[1:]) for row in self.connection.execute(text("""
+                SELECT COALESCE(reporting_year, -1), COUNT(*), MAX(permit_id), MAX(updated_at)
+                FROM building_permits
+                GROUP BY 1
+            """)).fetchall()
+        }
+        cycle = (self.config.rhna_cycle_start, self.config.rhna_cycle_end)
+        stored = {
+            row[0]: (tuple(row[1:4]), tuple(row[4:])) for row in self.connection.execute(text("""
+                SELECT reporting_year, permit_count, max_permit_id, max_updated_at, cycle_start, cycle_end
+                FROM rhna_rollup_state
+            """)).fetchall()
+        }
+        
+        stale = [year for year, signature in current.items() if stored.get(year) != (signature, cycle)]
+        removed = [year for year in stored if year not in current]
+        
+        if stale or removed:
+            params = {'years': stale + removed}
+            self.connection.execute(text("DELETE FROM rhna_permit_rollup WHERE reporting_year = ANY(:years)"), params)
+            self.connection.execute(text("DELETE FROM rhna_rollup_state WHERE reporting_year = ANY(:years)"), params)
+        if stale:
+            self.connection.execute(text(ROLLUP_INSERT_SQL), {
+                'years': stale,
+                'cycle_start': self.config.rhna_cycle_start,
+                'cycle_end': self.config.rhna_cycle_end
+            })
+            self.connection.execute(text("""
+                INSERT INTO rhna_rollup_state
+                    (reporting_year, permit_count, max_permit_id, max_updated_at, cycle_start, cycle_end)
+                VALUES (:year, :permit_count, :max_permit_id, :max_updated_at, :cycle_start, :cycle_end)
+            """), [{
+                'year': year,
+                'permit_count': current[year][0],
+                'max_permit_id': current[year][1],
+                'max_updated_at': current[year][2],
+                'cycle_start': self.config.rhna_cycle_start,
+                'cycle_end': self.config.rhna_cycle_end
+            } for year in stale])
+        self.connection.commit()
+        
+        stats = {
+            'years_total': len(current),
+            'years_refreshed': sorted(stale),
+            'years_removed': sorted(removed),
+            'seconds': round(time.time() - started, 3)
+        }
+        logger.info(f"✅ Permit rollup: {len(stale)}/{len(current)} reporting years refreshed in {stats['seconds']}s")
+        return stats
+    
+    def load_jurisdiction_metrics(self) -> pd.DataFrame:
+        """Allocation and permit metrics for every jurisdiction in one grouped query"""
+        metrics = pd.read_sql(text(JURISDICTION_METRICS_SQL), self.connection)
+        
+        # Same fallback as get_jurisdiction_rhna_allocation
+        missing = ~metrics['has_allocation'].astype(bool)
+        if missing.any():
+            logger.warning(f"⚠️ No RHNA allocation found for {missing.sum()} jurisdictions - using state average estimates")
+            estimates = pd.DataFrame([
+                self._estimate_rhna_allocation(jurisdiction_id)
+                for jurisdiction_id in metrics.loc[missing, 'jurisdiction_id']
+            ], index=metrics.index[missing])
+            for category in CATEGORIES:
+                metrics.loc[missing, f'{category}_allocation'] = estimates[category]
+        return metrics
+    
+    def score_jurisdictions(self, metrics: pd.DataFrame) -> pd.DataFrame:
+        """
+        Vectorized calculate_progress_percentages, permitting velocity, completion rate,
+        classification, compliance, risk score and SB 35 / builder's remedy flags
+        """
+        scored = metrics.copy()
+        
+        for category in CATEGORIES:
+            allocation = scored[f'{category}_allocation'].astype(float)
+            progress = scored[f'{category}_progress'].astype(float)
+            scored[f'{category}_pct'] = np.where(allocation > 0, progress / allocation.where(allocation > 0, 1) * 100, 0.0)
+        scored['overall_progress'] = scored['total_pct']
+        
+        permit_count = scored['permit_count'].astype(float)
+        years_span = scored['years_span'].astype(float)
+        active = (permit_count > 0) & (years_span > 0)
+        scored['permitting_velocity'] = np.where(active, permit_count / years_span.where(active, 1) / 12, 0.0)
+        
+        permitted = scored['total_permitted'].astype(float)
+        completed = scored['total_completed'].astype(float)
+        scored['completion_rate'] = np.where(permitted > 0, completed / permitted.where(permitted > 0, 1) * 100, 0.0)
+        
+        overall = scored['overall_progress']
+        scored['performance_category'] = np.select(
+            [overall >= self.performance_thresholds['excellent'],
+             overall >= self.performance_thresholds['good'],
+             overall >= self.performance_thresholds['behind']],
+            ['Excellent', 'Good', 'Behind Schedule'], default='Critical')
+        
+        expected_progress = self.cycle_progress * 100
+        scored['compliance_status'] = np.select(
+            [overall >= expected_progress, overall >= expected_progress * 0.75],
+            ['Compliant', 'At Risk'], default='Non-Compliant')
+        
+        # calculate_risk_score: progress (40%), velocity (30%) and completion (30%) shortfalls
+        avg_velocity = 5.0
+        progress_risk = np.maximum(0, (expected_progress - overall) / expected_progress * 40)
+        velocity_risk = np.maximum(0, (avg_velocity - scored['permitting_velocity']) / avg_velocity * 30)
+        completion_risk = np.maximum(0, (75 - scored['completion_rate']) / 75 * 30)
+        scored['risk_score'] = np.minimum(100, progress_risk + velocity_risk + completion_risk).round(2)
+        
+        # assess_sb35_streamlining_requirements
+        scored['streamlining_required'] = scored['above_moderate_pct'] < 25
+        scored['streamlining_percentage'] = np.where(
+            scored['streamlining_required'], np.where(scored['total_pct'] >= 75, 50, 10), 0)
+        scored['builders_remedy_active'] = scored['compliance_status'] == 'Non-Compliant'
+        scored['pro_housing_eligible'] = (overall >= 50) & (scored['completion_rate'] >= 70)
+        return scored
+    
+    def _intelligence_from_frame(self, scored: pd.DataFrame) -> List[JurisdictionIntelligence]:
+        """JurisdictionIntelligence profiles (with opportunities and risk factors) from scored rows"""
+        results = []
+        for row in scored.to_dict('records'):
+            intelligence = JurisdictionIntelligence(
+                jurisdiction_id=int(row['jurisdiction_id']),
+                jurisdiction_name=row['jurisdiction_name'],
+                county_name=row['county_name'],
+                rhna_allocation={c: int(row[f'{c}_allocation']) for c in CATEGORIES},
+                current_progress={c: int(row[f'{c}_progress']) for c in CATEGORIES},
+                progress_percentages={c: float(row[f'{c}_pct']) for c in CATEGORIES},
+                overall_progress=float(row['overall_progress']),
+                permitting_velocity=float(row['permitting_velocity']),
+                approval_timeline=0.0,  # TODO: Calculate from application data
+                completion_rate=float(row['completion_rate']),
+                performance_category=row['performance_category'],
+                compliance_status=row['compliance_status'],
+                risk_score=float(row['risk_score']),
+                streamlining_required=bool(row['streamlining_required']),
+                streamlining_percentage=int(row['streamlining_percentage']),
+                builders_remedy_active=bool(row['builders_remedy_active']),
+                pro_housing_eligible=bool(row['pro_housing_eligible']),
+                development_opportunities=[],
+                risk_factors=[],
+                competitive_advantages=[]
+            )
+            intelligence.development_opportunities = self.identify_development_opportunities(intelligence)
+            intelligence.risk_factors = self.identify_risk_factors(intelligence)
+            results.append(intelligence)
+        return results
+    
+    def bulk_update_compliance_status(self, scored: pd.DataFrame) -> int:
+        """
+        Write every jurisdiction's status in one transaction: stage the rows, UPDATE the
+        existing compliance_status records from the stage, INSERT the missing ones
+        """
+        # compliance_status stores DECIMAL(5,2) percentages
+        pct = lambda column: scored[column].clip(upper=999.99).round(2)
+        staged = pd.DataFrame({
+            'jurisdiction_id': scored['jurisdiction_id'].astype(int),
+            'progress_very_low': pct('very_low_pct'),
+            'progress_low': pct('low_pct'),
+            'progress_moderate': pct('moderate_pct'),
+            'progress_above_moderate': pct('above_moderate_pct'),
+            'overall_progress': pct('overall_progress'),
+            'sb35_10_percent': scored['streamlining_required'] & (scored['streamlining_percentage'] == 10),
+            'sb35_50_percent': scored['streamlining_required'] & (scored['streamlining_percentage'] == 50),
+            'ministerial_required': scored['streamlining_required'].astype(bool),
+            'builders_remedy_exposed': scored['builders_remedy_active'].astype(bool)
+        })
+        
+        try:
+            self.connection.execute(text("DROP TABLE IF EXISTS staging_compliance_status"))
+            self.connection.execute(text("""
+                CREATE TEMP TABLE staging_compliance_status (
+                    jurisdiction_id INTEGER PRIMARY KEY,
+                    progress_very_low DECIMAL(5,2), progress_low DECIMAL(5,2),
+                    progress_moderate DECIMAL(5,2), progress_above_moderate DECIMAL(5,2),
+                    overall_progress DECIMAL(5,2),
+                    sb35_10_percent BOOLEAN, sb35_50_percent BOOLEAN,
+                    ministerial_required BOOLEAN, builders_remedy_exposed BOOLEAN
+                ) ON COMMIT DROP
+            """))
+            columns = list(staged.columns)
+            self.connection.execute(text(
+                f"INSERT INTO staging_compliance_status ({', '.join(columns)}) "
+                f"VALUES ({', '.join(':' + c for c in columns)})"
+            ), [
+                {k: (v.item() if hasattr(v, 'item') else v) for k, v in record.items()}
+                for record in staged.to_dict('records')
+            ])
+            
+            updated = self.connection.execute(text("""
+                UPDATE compliance_status cs SET
+                    progress_very_low = s.progress_very_low,
+                    progress_low = s.progress_low,
+                    progress_moderate = s.progress_moderate,
+                    progress_above_moderate = s.progress_above_moderate,
+                    overall_progress = s.overall_progress,
+                    sb35_10_percent_required = s.sb35_10_percent,
+                    sb35_50_percent_required = s.sb35_50_percent,
+                    ministerial_approval_required = s.ministerial_required,
+                    builders_remedy_exposed = s.builders_remedy_exposed,
+                    status_effective_date = CURRENT_DATE,
+                    updated_at = CURRENT_TIMESTAMP
+                FROM staging_compliance_status s
+                WHERE cs.jurisdiction_id = s.jurisdiction_id
+            """)).rowcount
+            inserted = self.connection.execute(text("""
+                INSERT INTO compliance_status (
+                    jurisdiction_id, progress_very_low, progress_low, 
+                    progress_moderate, progress_above_moderate, overall_progress,
+                    sb35_10_percent_required, sb35_50_percent_required,
+                    ministerial_approval_required, builders_remedy_exposed,
+                    status_effective_date
+                )
+                SELECT 
+                    s.jurisdiction_id, s.progress_very_low, s.progress_low,
+                    s.progress_moderate, s.progress_above_moderate, s.overall_progress,
+                    s.sb35_10_percent, s.sb35_50_percent, s.ministerial_required,
+                    s.builders_remedy_exposed, CURRENT_DATE
+                FROM staging_compliance_status s
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM compliance_status cs WHERE cs.jurisdiction_id = s.jurisdiction_id
+                )
+            """)).rowcount
+            self.connection.commit()
+            
+            logger.info(f"✅ Compliance status: {updated} updated, {inserted} inserted")
+            return updated + inserted
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to update compliance status: {e}")
+            self.connection.rollback()
+            return 0
+    
     def analyze_all_jurisdictions(self) -> List[JurisdictionIntelligence]:
         """Analyze all jurisdictions and generate comprehensive intelligence"""
         logger.info("🔄 Starting comprehensive jurisdiction intelligence analysis...")
@@ -549,28 +892,21 @@ class ColasseumRHNAIntelligence:
             return []
         
         try:
-            # Get all jurisdiction IDs
-            query = text("SELECT jurisdiction_id FROM jurisdictions ORDER BY jurisdiction_name")
-            jurisdiction_ids = [row[0] for row in self.connection.execute(query).fetchall()]
-            
-            logger.info(f"📊 Analyzing {len(jurisdiction_ids)} jurisdictions...")
-            
-            intelligence_results = []
-            processed_count = 0
-            
-            for jurisdiction_id in jurisdiction_ids:
-                intelligence = self.analyze_jurisdiction_intelligence(jurisdiction_id)
-                if intelligence:
-                    intelligence_results.append(intelligence)
-                    
-                    # Update database
-                    self.update_compliance_status_table(intelligence)
-                    
-                    processed_count += 1
-                    if processed_count % 50 == 0:
-                        logger.info(f"✅ Processed {processed_count}/{len(jurisdiction_ids)} jurisdictions")
-            
-            logger.info(f"✅ Completed analysis of {processed_count} jurisdictions")
+            started = time.time()
+            
+            # Roll up any newly loaded APR years, then one grouped query for every jurisdiction
+            self.refresh_permit_rollup()
+            metrics = self.load_jurisdiction_metrics()
+            logger.info(f"📊 Analyzing {len(metrics)} jurisdictions...")
+            
+            scored = self.score_jurisdictions(metrics)
+            intelligence_results = self._intelligence_from_frame(scored)
+            
+            # Update database
+            self.bulk_update_compliance_status(scored)
+            
+            logger.info(f"✅ Completed analysis of {len(intelligence_results)} jurisdictions "
+                        f"in {time.time() - started:.2f}s")
             
             # Generate summary statistics
             self._generate_intelligence_summary(intelligence_results)
@@ -1,228 +1,349 @@
 #!/usr/bin/env python3
 """
 TDHCA Batch Processor with Checkpoint System
-- Saves progress after each file
-- Can resume from interruptions
+- Extracts applications in parallel on a process pool (one extractor per worker)
+- Per-file timeout: page loop deadline plus a hard SIGALRM stop inside the worker
+- Append-only JSONL journal: one fsync'd line per finished file, resume is a single read
 - Creates status log file for monitoring
 """
 
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 import json
+import os
+import signal
 import sys
+import time
 from improved_tdhca_extractor import ImprovedTDHCAExtractor
 
+RESULT_COLUMNS = ['File Name', 'Project Name', 'Street Address', 'City', 'ZIP Code', 'County',
+                  'Total Units', 'Developer', 'Processing Time', 'Status']
+
+# Set once per worker process by _init_worker
+_worker_extractor = None
+_worker_timeout = None
+
+
+class FileTimeout(BaseException):
+    """Raised inside a worker when one application runs past its hard timeout
+
+    A BaseException so the extractors' own `except Exception` handlers cannot swallow it.
+    """
+
+
+def _on_alarm(signum, frame):
+    raise FileTimeout()
+
+
+def _init_worker(base_path, timeout_seconds):
+    """Build the (expensive) extractor once per worker process, not once per file"""
+    global _worker_extractor, _worker_timeout
+    _worker_extractor = ImprovedTDHCAExtractor(base_path)
+    _worker_timeout = timeout_seconds
+    if timeout_seconds:
+        # Stop the page loop at the deadline; keep a little slack for field extraction
+        _worker_extractor.max_extraction_seconds = timeout_seconds * 0.8
+        if hasattr(signal, 'SIGALRM'):
+            signal.signal(signal.SIGALRM, _on_alarm)
+
+
+def _failure_row(filename, project_name, processing_time, status):
+    return {
+        'File Name': filename,
+        'Project Name': project_name,
+        'Street Address': '', 'City': '', 'ZIP Code': '',
+        'County': '', 'Total Units': 0, 'Developer': '',
+        'Processing Time': f"{processing_time:.1f}s",
+        'Status': status
+    }
+
+
+def extract_one(pdf_file):
+    """Worker entry point: extract one application and return its result row"""
+    pdf_file = Path(pdf_file)
+    filename = pdf_file.name
+    file_start_time = time.time()
+    use_alarm = bool(_worker_timeout) and hasattr(signal, 'SIGALRM')
+    if use_alarm:
+        signal.alarm(max(1, int(_worker_timeout)))
+
+    try:
+        result = _worker_extractor.process_application_improved(pdf_file)
+        processing_time = time.time() - file_start_time
+        if result:
+            return {
+                'File Name': filename,
+                'Project Name': result.project_name or 'NOT_FOUND',
+                'Street Address': result.street_address or 'NOT_FOUND',
+                'City': result.city or 'NOT_FOUND',
+                'ZIP Code': result.zip_code or 'NOT_FOUND',
+                'County': result.county or 'NOT_FOUND',
+                'Total Units': result.total_units or 0,
+                'Developer': result.developer_name or 'NOT_FOUND',
+                'Processing Time': f"{processing_time:.1f}s",
+                'Status': 'SUCCESS'
+            }
+        return _failure_row(filename, 'EXTRACTION_FAILED', processing_time, 'FAILED')
+
+    except FileTimeout:
+        return _failure_row(filename, 'TIMEOUT', time.time() - file_start_time, f'TIMEOUT: > {_worker_timeout}s')
+    except Exception as e:
+        return _failure_row(filename, 'ERROR', time.time() - file_start_time, f'ERROR: {str(e)[:50]}')
+    finally:
+        if use_alarm:
+            signal.alarm(0)
+        # Extraction results are cached per extractor; drop them before the next file
+        _worker_extractor._last_extraction = None
+
+
+class CheckpointJournal:
+    """Append-only JSONL checkpoint: one complete line per processed file
+
+    A crash can at worst leave a torn final line, which is ignored on load,
+    so earlier records are never lost and nothing is ever rewritten.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._checked_tail = False
+
+    def exists(self):
+        return self.path.exists() and self.path.stat().st_size > 0
+
+    def load(self):
+        """Return {file key: result row} for every complete record"""
+        records = {}
+        if not self.path.exists():
+            return records
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn write from an interrupted run
+                records[record['key']] = record['result']
+        return records
+
+    def append(self, key, result):
+        line = json.dumps({'key': key, 'result': result, 'at': datetime.now().isoformat()}, default=str)
+        prefix = ''
+        if not self._checked_tail:
+            # Start on a fresh line if the previous run died mid-write
+            if self.path.exists() and self.path.stat().st_size > 0:
+                with open(self.path, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    prefix = '' if f.read(1) == b'\n' else '\n'
+            self._checked_tail = True
+        with open(self.path, 'a') as f:
+            f.write(prefix + line + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear(self):
+        if self.path.exists():
+            self.path.unlink()
+        self._checked_tail = False
+
+
 class CheckpointBatchProcessor:
-    def __init__(self, base_path):
+    def __init__(self, base_path, max_workers=None, timeout_seconds=600, max_pool_restarts=3):
         self.base_path = base_path
-        self.checkpoint_file = "batch_checkpoint.json"
+        self.checkpoint_file = "batch_checkpoint.jsonl"
         self.status_log_file = "batch_status.log"
         self.results_csv = "batch_results_temp.csv"
-        self.extractor = ImprovedTDHCAExtractor(base_path)
-        
+        self.max_workers = max_workers or max(1, min(8, (os.cpu_count() or 2) - 1))
+        self.timeout_seconds = timeout_seconds
+        self.max_pool_restarts = max_pool_restarts
+        self.journal = CheckpointJournal(self.checkpoint_file)
+        self._extractor = None
+
+    @property
+    def extractor(self):
+        """In-process extractor for callers that run files one at a time (run_batch_5_files)"""
+        if self._extractor is None:
+            self._extractor = ImprovedTDHCAExtractor(self.base_path)
+        return self._extractor
+
     def log_status(self, message):
         """Write status to both console and log file"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         log_message = f"[{timestamp}] {message}"
         print(log_message)
-        
+
         with open(self.status_log_file, 'a') as f:
             f.write(log_message + '\n')
-    
-    def save_checkpoint(self, processed_files, total_files, results):
-        """Save current progress"""
-        checkpoint = {
-            'processed_files': processed_files,
-            'total_files': total_files,
-            'last_update': datetime.now().isoformat(),
-            'results_count': len(results)
-        }
-        
-        with open(self.checkpoint_file, 'w') as f:
-            json.dump(checkpoint, f, indent=2)
-        
-        # Also save results to CSV for safety
-        if results:
-            df = pd.DataFrame(results)
-            df.to_csv(self.results_csv, index=False)
-    
+
+    def file_key(self, pdf_file):
+        """Journal key: path relative to base_path (file names repeat across folders)"""
+        try:
+            return str(Path(pdf_file).relative_to(self.base_path))
+        except ValueError:
+            return str(pdf_file)
+
     def load_checkpoint(self):
         """Load previous progress if exists"""
-        if Path(self.checkpoint_file).exists():
-            with open(self.checkpoint_file, 'r') as f:
-                checkpoint = json.load(f)
-            
-            # Load previous results
-            results = []
-            if Path(self.results_csv).exists():
-                df = pd.read_csv(self.results_csv)
-                results = df.to_dict('records')
-            
-            return checkpoint['processed_files'], results
-        
-        return [], []
-    
+        return self.journal.load()
+
     def process_batch(self, resume=True):
-        """Process all PDFs with checkpoint support"""
-        
+        """Process all PDFs on a process pool with journal checkpoints"""
+
         # Find all PDFs
         pdf_path = Path(self.base_path)
         all_pdfs = sorted(list(pdf_path.glob("**/*.pdf")))
         total_files = len(all_pdfs)
-        
+
         # Load checkpoint if resuming
-        processed_files = []
-        results = []
-        
+        done = {}
         if resume:
-            processed_files, results = self.load_checkpoint()
-            if processed_files:
-                self.log_status(f"RESUMING from checkpoint: {len(processed_files)} files already processed")
-        
-        self.log_status(f"BATCH START: {total_files} total files to process")
+            done = self.load_checkpoint()
+            if done:
+                self.log_status(f"RESUMING from checkpoint: {len(done)} files already processed")
+        else:
+            self.journal.clear()
+
+        pending = [pdf for pdf in all_pdfs if self.file_key(pdf) not in done]
+        self.log_status(f"BATCH START: {total_files} total files, {len(pending)} to process on {self.max_workers} workers")
         self.log_status(f"Base path: {self.base_path}")
-        
-        # Process each file
+
         start_time = datetime.now()
-        
-        for i, pdf_file in enumerate(all_pdfs):
-            filename = pdf_file.name
-            
-            # Skip if already processed
-            if filename in processed_files:
-                self.log_status(f"Skipping {filename} - already processed")
-                continue
-            
-            # Process file
-            file_start_time = datetime.now()
-            self.log_status(f"Processing [{i+1}/{total_files}]: {filename}")
-            
-            try:
-                result = self.extractor.process_application_improved(pdf_file)
-                processing_time = (datetime.now() - file_start_time).total_seconds()
-                
-                if result:
-                    result_dict = {
-                        'File Name': filename,
-                        'Project Name': result.project_name or 'NOT_FOUND',
-                        'Street Address': result.street_address or 'NOT_FOUND',
-                        'City': result.city or 'NOT_FOUND',
-                        'ZIP Code': result.zip_code or 'NOT_FOUND',
-                        'County': result.county or 'NOT_FOUND',
-                        'Total Units': result.total_units or 0,
-                        'Developer': result.developer_name or 'NOT_FOUND',
-                        'Processing Time': f"{processing_time:.1f}s",
-                        'Status': 'SUCCESS'
-                    }
-                    results.append(result_dict)
-                    
-                    self.log_status(f"✅ SUCCESS: {result.project_name} ({processing_time:.1f}s)")
-                else:
-                    results.append({
-                        'File Name': filename,
-                        'Project Name': 'EXTRACTION_FAILED',
-                        'Street Address': '', 'City': '', 'ZIP Code': '', 
-                        'County': '', 'Total Units': 0, 'Developer': '',
-                        'Processing Time': f"{processing_time:.1f}s",
-                        'Status': 'FAILED'
-                    })
-                    
-                    self.log_status(f"❌ FAILED: No data extracted ({processing_time:.1f}s)")
-                    
-            except Exception as e:
-                processing_time = (datetime.now() - file_start_time).total_seconds()
-                results.append({
-                    'File Name': filename,
-                    'Project Name': 'ERROR',
-                    'Street Address': '', 'City': '', 'ZIP Code': '', 
-                    'County': '', 'Total Units': 0, 'Developer': '',
-                    'Processing Time': f"{processing_time:.1f}s",
-                    'Status': f'ERROR: {str(e)[:50]}'
-                })
-                
-                self.log_status(f"💥 ERROR: {str(e)[:100]} ({processing_time:.1f}s)")
-            
-            # Update checkpoint after each file
-            processed_files.append(filename)
-            self.save_checkpoint(processed_files, total_files, results)
-            
-            # Progress update every 5 files
-            if len(processed_files) % 5 == 0:
-                elapsed = (datetime.now() - start_time).total_seconds()
-                avg_time = elapsed / len(processed_files)
-                remaining = total_files - len(processed_files)
-                eta_seconds = avg_time * remaining
-                
-                self.log_status(f"PROGRESS: {len(processed_files)}/{total_files} files")
-                self.log_status(f"Average: {avg_time:.1f}s/file | ETA: {eta_seconds/60:.1f} minutes")
-        
+        progress = {'finished': 0, 'to_process': len(pending)}
+
+        restarts = 0
+        while pending:
+            pool_broke = self._run_pool(pending, done, total_files, start_time, progress)
+            pending = [pdf for pdf in pending if self.file_key(pdf) not in done]
+            if not pool_broke or not pending:
+                break
+            restarts += 1
+            if restarts > self.max_pool_restarts:
+                self.log_status(f"💥 Worker pool broke {restarts} times - leaving {len(pending)} files for the next resume")
+                break
+            self.log_status(f"⚠️ Worker pool broke - restarting it for {len(pending)} unfinished files")
+
+        # Final results straight from the journal, in file order
+        results = [done[self.file_key(pdf)] for pdf in all_pdfs if self.file_key(pdf) in done]
+
         # Final summary
         total_time = (datetime.now() - start_time).total_seconds()
         successful = len([r for r in results if r['Status'] == 'SUCCESS'])
-        
+
         self.log_status("="*60)
         self.log_status(f"BATCH COMPLETE!")
         self.log_status(f"Total files: {total_files}")
         self.log_status(f"Successful: {successful}")
         self.log_status(f"Failed: {total_files - successful}")
         self.log_status(f"Total time: {total_time/60:.1f} minutes")
-        self.log_status(f"Success rate: {successful/total_files*100:.1f}%")
-        
-        # Create final Excel
+        self.log_status(f"Success rate: {successful/total_files*100:.1f}%" if total_files else "Success rate: n/a")
+
+        # Create final CSV and Excel
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        csv_filename = f"TDHCA_Batch_Results_{timestamp}.csv"
         excel_filename = f"TDHCA_Batch_Results_{timestamp}.xlsx"
-        
-        df = pd.DataFrame(results)
+
+        df = pd.DataFrame(results, columns=RESULT_COLUMNS)
+        df.to_csv(csv_filename, index=False)
         with pd.ExcelWriter(excel_filename, engine='openpyxl') as writer:
             df.to_excel(writer, sheet_name='All Results', index=False)
-            
+
             # Summary sheet
             summary_data = {
                 'Metric': ['Total Files', 'Successful', 'Failed', 'Success Rate', 'Total Time (min)'],
-                'Value': [total_files, successful, total_files-successful, 
-                         f"{successful/total_files*100:.1f}%", f"{total_time/60:.1f}"]
+                'Value': [total_files, successful, total_files-successful,
+                         f"{successful/total_files*100:.1f}%" if total_files else "n/a", f"{total_time/60:.1f}"]
             }
             summary_df = pd.DataFrame(summary_data)
             summary_df.to_excel(writer, sheet_name='Summary', index=False)
-        
+
+        self.log_status(f"CSV saved: {csv_filename}")
         self.log_status(f"Excel saved: {excel_filename}")
-        
-        # Cleanup checkpoint files
-        for file in [self.checkpoint_file, self.results_csv]:
-            if Path(file).exists():
-                Path(file).unlink()
-        
+
+        # Cleanup checkpoint files (kept while files are still unprocessed, so the next run resumes)
+        if pending:
+            self.log_status(f"Checkpoint kept: {len(pending)} files not processed - run again to resume")
+        else:
+            self.journal.clear()
+        if Path(self.results_csv).exists():
+            Path(self.results_csv).unlink()
+
         return excel_filename
 
+    def _run_pool(self, pending, done, total_files, start_time, progress):
+        """Extract `pending` on one process pool, journaling each finished file
+
+        Returns True when the pool broke (a worker process died). Futures that fail
+        only because the pool broke never ran, so they are not journaled.
+        """
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                 initargs=(self.base_path, self.timeout_seconds)) as executor:
+            futures = {executor.submit(extract_one, str(pdf)): pdf for pdf in pending}
+            pool_broke = False
+
+            for future in as_completed(futures):
+                pdf_file = futures[future]
+                try:
+                    result_dict = future.result()
+                except BrokenProcessPool:
+                    # Worker process died (e.g. out of memory): every unfinished future fails with it
+                    pool_broke = True
+                    continue
+                except Exception as e:
+                    result_dict = _failure_row(pdf_file.name, 'ERROR', 0.0, f'ERROR: {str(e)[:50]}')
+
+                key = self.file_key(pdf_file)
+                self.journal.append(key, result_dict)
+                done[key] = result_dict
+                progress['finished'] += 1
+
+                if result_dict['Status'] == 'SUCCESS':
+                    self.log_status(f"✅ SUCCESS [{len(done)}/{total_files}]: {result_dict['Project Name']} ({result_dict['Processing Time']})")
+                elif result_dict['Status'] == 'FAILED':
+                    self.log_status(f"❌ FAILED [{len(done)}/{total_files}]: {pdf_file.name} - no data extracted ({result_dict['Processing Time']})")
+                else:
+                    self.log_status(f"💥 {result_dict['Status']} [{len(done)}/{total_files}]: {pdf_file.name} ({result_dict['Processing Time']})")
+
+                # Progress update every 5 files
+                finished = progress['finished']
+                if finished % 5 == 0:
+                    elapsed = (datetime.now() - start_time).total_seconds()
+                    avg_time = elapsed / finished
+                    remaining = progress['to_process'] - finished
+                    eta_seconds = avg_time * remaining
+
+                    self.log_status(f"PROGRESS: {len(done)}/{total_files} files")
+                    self.log_status(f"Throughput: {avg_time:.1f}s/file wall clock | ETA: {eta_seconds/60:.1f} minutes")
+        return pool_broke
+
 def main():
     """Run batch processing with monitoring"""
     print("🚀 TDHCA Batch Processor with Checkpoint System")
     print("="*60)
     print("This process will:")
-    print("1. Save progress after each file")
-    print("2. Create status.log file you can monitor")  
-    print("3. Resume from interruptions automatically")
-    print("4. Work in small batches to avoid timeouts")
+    print("1. Extract applications in parallel worker processes")
+    print("2. Journal each finished file to batch_checkpoint.jsonl")
+    print("3. Create status.log file you can monitor")
+    print("4. Resume from interruptions automatically")
     print("="*60)
-    
+
     base_path = "/Users/williamrice/Library/CloudStorage/Dropbox-HERR/Bill Rice/Structured Consultants/AI Projects/TDHCA_RAG/D'Marco_Sites"
-    
+
     processor = CheckpointBatchProcessor(base_path)
-    
+
     # Check if resuming
-    if Path("batch_checkpoint.json").exists():
+    if processor.journal.exists():
         print("\n⚠️  Found previous checkpoint!")
         response = input("Resume from checkpoint? (y/n): ")
         resume = response.lower() == 'y'
     else:
         resume = False
-    
+
     try:
         excel_file = processor.process_batch(resume=resume)
         print(f"\n✅ COMPLETE! Results in: {excel_file}")
         print(f"📋 Check batch_status.log for detailed history")
-        
+
     except KeyboardInterrupt:
         print("\n\n⚠️  INTERRUPTED - Progress saved!")
         print("Run again to resume from checkpoint")
@@ -233,4 +354,4 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
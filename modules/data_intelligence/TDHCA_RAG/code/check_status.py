@@ -15,24 +15,29 @@ def check_batch_status():
     print("📊 TDHCA BATCH PROCESSING STATUS")
     print("="*60)
     
-    # Check for checkpoint file
-    checkpoint_file = "batch_checkpoint.json"
+    # Check for checkpoint journal
+    checkpoint_file = "batch_checkpoint.jsonl"
     status_log = "batch_status.log"
-    temp_csv = "batch_results_temp.csv"
     
     if Path(checkpoint_file).exists():
+        rows = []
+        last_update = None
         with open(checkpoint_file, 'r') as f:
-            checkpoint = json.load(f)
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn final line from an interrupted run
+                rows.append(record['result'])
+                last_update = record.get('at')
         
         print(f"✅ Active checkpoint found!")
-        print(f"📁 Processed files: {len(checkpoint['processed_files'])}")
-        print(f"📁 Total files: {checkpoint['total_files']}")
-        print(f"📊 Progress: {len(checkpoint['processed_files'])/checkpoint['total_files']*100:.1f}%")
-        print(f"⏰ Last update: {checkpoint['last_update']}")
+        print(f"📁 Processed files: {len(rows)}")
+        print(f"⏰ Last update: {last_update}")
         
-        # Show temporary results
-        if Path(temp_csv).exists():
-            df = pd.read_csv(temp_csv)
+        # Show results so far
+        if rows:
+            df = pd.DataFrame(rows)
             successful = len(df[df['Status'] == 'SUCCESS'])
             failed = len(df[df['Status'] != 'SUCCESS'])
             
@@ -9,7 +9,10 @@ import requests
 import time
 import re
 from datetime import datetime
-from geopy.distance import geodesic
+import sys
+
+sys.path.append(str(Path(__file__).parent))
+from environmental_hazard_index import EnvironmentalHazardIndex, load_hazard_file, load_site_centers
 
 class ComprehensiveEnvironmentalAnalyzer:
     """
@@ -26,6 +29,28 @@ class ComprehensiveEnvironmentalAnalyzer:
         self.base_dir = "/Users/williamrice/HERR Dropbox/Bill Rice/Structured Consultants/AI Projects/TDHCA_RAG"
         self.data_dir = "/Users/williamrice/HERR Dropbox/Bill Rice/Data_Sets/texas/Environmental/TX_Commission_on_Env"
         self.output_dir = f"{self.base_dir}/D'Marco_Sites/"
+        self.sites_file = "/Users/williamrice/priority_sites_data.json"
+        
+        # Persisted spatial index over every hazard point (rebuilt only when a source file changes)
+        self.hazard_index_dir = f"{self.output_dir}Environmental_Hazard_Index_Comprehensive"
+        
+        # Point datasets maintained by the data_intelligence pipelines, included when present
+        colosseum_data = Path("/Users/williamrice/Library/CloudStorage/Dropbox-HERR/Bill Rice/Colosseum/data_sets")
+        ca_env_data = colosseum_data / "california" / "CA_Environmental_Data"
+        self.external_hazard_sources = {
+            'envirostor': {
+                'files': [ca_env_data / "EnviroStorCleanupSites" / "sites.txt"],
+                'risk_type': 'DTSC Cleanup Sites (EnviroStor)'
+            },
+            'geotracker': {
+                'files': sorted(ca_env_data.glob("*/*_geotracker_*.csv")) if ca_env_data.exists() else [],
+                'risk_type': 'Leaking Tanks and Cleanup Sites (GeoTracker)'
+            },
+            'epa_npl': {
+                'files': [colosseum_data / "federal" / "Federal_Unified" / "federal_environmental_unified.parquet"],
+                'risk_type': 'Superfund National Priorities List'
+            }
+        }
         
         # Environmental datasets configuration
         self.datasets = {
@@ -321,90 +346,91 @@ class ComprehensiveEnvironmentalAnalyzer:
         print(f"   ✅ Successfully loaded {len(locations)} LPST sites")
         return locations
     
-    def calculate_distances_to_dmarco_sites(self, environmental_sites):
-        """Calculate distances from environmental sites to all D'Marco sites"""
+    def load_external_hazard_points(self):
+        """EnviroStor, GeoTracker and EPA NPL points from the data_intelligence outputs"""
+        frames = []
+        for dataset, config in self.external_hazard_sources.items():
+            for path in config['files']:
+                if not Path(path).exists():
+                    continue
+                try:
+                    points = load_hazard_file(path, dataset, config['risk_type'])
+                    frames.append(points)
+                    print(f"   ✅ {dataset}: {len(points)} sites from {Path(path).name}")
+                except Exception as e:
+                    print(f"   ⚠️ {dataset}: could not load {Path(path).name}: {e}")
+        return frames
+    
+    def source_files(self):
+        """Files the hazard index is built from"""
+        tceq_files = [f"{self.data_dir}/{config['file']}" for name, config in self.datasets.items() if name != 'lpst']
+        external_files = [path for config in self.external_hazard_sources.values() for path in config['files']]
+        return [self.datasets['lpst']['database_file']] + tceq_files + external_files
+    
+    def collect_environmental_frames(self):
+        """Load every dataset as a DataFrame of hazard points"""
+        datasets_processed = {
+            'lpst': self.load_existing_lpst_data(),
+            'operating_dry_cleaners': self.process_operating_dry_cleaners(),
+            'enforcement': self.process_enforcement_notices(),
+            'historical_dry_cleaners': self.process_historical_dry_cleaners()
+        }
+        
+        for dataset_name, sites in datasets_processed.items():
+            print(f"   ✅ {dataset_name}: {len(sites)} sites processed")
+        
+        return [pd.DataFrame(sites) for sites in datasets_processed.values()] + self.load_external_hazard_points()
+    
+    def calculate_distances_to_dmarco_sites(self, hazard_index, radius_miles=1.0):
+        """All hazards within radius_miles of each D'Marco site (one row per site/hazard pair)"""
         print("📏 Calculating distances to D'Marco sites...")
         
-        # Load D'Marco site coordinates
-        sites_file = "/Users/williamrice/priority_sites_data.json"
-        with open(sites_file, 'r') as f:
-            dmarco_sites = json.load(f)
+        # Load D'Marco site centers (average of the 4 corners)
+        dmarco_sites = load_site_centers(self.sites_file)
         
-        # Parse D'Marco coordinates
-        dmarco_coords = {}
-        for i, site in enumerate(dmarco_sites):
-            site_id = f"dmarco_site_{str(i+1).zfill(2)}"
-            
-            # Calculate center from 4 corners
-            corners = []
-            for corner in ['SW', 'SE', 'NE', 'NW']:
-                coord_str = site.get(corner, "")
-                if coord_str and ',' in coord_str:
-                    try:
-                        lat_str, lon_str = coord_str.split(',')
-                        lat, lon = float(lat_str.strip()), float(lon_str.strip())
-                        corners.append((lat, lon))
-                    except:
-                        continue
-            
-            if len(corners) == 4:
-                center_lat = sum(c[0] for c in corners) / 4
-                center_lon = sum(c[1] for c in corners) / 4
-                dmarco_coords[site_id] = {
-                    'lat': center_lat,
-                    'lon': center_lon,
-                    'address': site.get('Address', 'Unknown')
-                }
-        
-        print(f"   📊 Calculating distances for {len(environmental_sites)} environmental sites to {len(dmarco_coords)} D'Marco sites")
-        
-        # Calculate distances and risk levels
-        for env_site in environmental_sites:
-            env_lat, env_lon = env_site['latitude'], env_site['longitude']
-            
-            for dmarco_id, dmarco_data in dmarco_coords.items():
-                distance_miles = geodesic(
-                    (env_lat, env_lon),
-                    (dmarco_data['lat'], dmarco_data['lon'])
-                ).miles
-                
-                # Determine risk level
-                risk_level = 'LOW'
-                if distance_miles <= self.risk_thresholds['IMMEDIATE']:
-                    risk_level = 'IMMEDIATE'
-                elif distance_miles <= self.risk_thresholds['CRITICAL']:
-                    risk_level = 'CRITICAL'
-                elif distance_miles <= self.risk_thresholds['HIGH']:
-                    risk_level = 'HIGH'
-                elif distance_miles <= self.risk_thresholds['MEDIUM']:
-                    risk_level = 'MEDIUM'
-                
-                # Add distance data to environmental site
-                env_site[f'{dmarco_id}_distance_miles'] = round(distance_miles, 3)
-                env_site[f'{dmarco_id}_risk_level'] = risk_level
-                env_site[f'{dmarco_id}_within_1_mile'] = distance_miles <= 1.0
+        print(f"   📊 Screening {len(dmarco_sites)} D'Marco sites against {len(hazard_index)} environmental sites")
         
-        return environmental_sites
+        return hazard_index.query_radius(dmarco_sites, radius_miles, self.risk_thresholds)
+    
+    def screen_sites(self, candidate_sites, radius_miles=1.0):
+        """
+        Screen any number of candidate sites (site_id, latitude, longitude) against the hazard index.
+        Returns (long-format hits, per-site summary).
+        """
+        hazard_index = EnvironmentalHazardIndex.load_or_build(
+            self.hazard_index_dir, self.source_files(), self.collect_environmental_frames
+        )
+        hits = hazard_index.query_radius(candidate_sites, radius_miles, self.risk_thresholds)
+        return hits, EnvironmentalHazardIndex.summarize_hits(hits, candidate_sites)
     
-    def create_comprehensive_database(self, all_environmental_sites):
+    def create_comprehensive_database(self, all_environmental_sites, dmarco_hits):
         """Create comprehensive environmental database with all datasets"""
         print("💾 Creating comprehensive environmental database...")
         
-        # Convert to DataFrame
-        df = pd.DataFrame(all_environmental_sites)
+        df = all_environmental_sites
         
         # Save to CSV
         output_file = f"{self.output_dir}Comprehensive_Environmental_Database.csv"
         df.to_csv(output_file, index=False)
         
-        # Create summary by dataset
+        # D'Marco proximity hits (long format: one row per D'Marco site / hazard pair)
+        hits_file = f"{self.output_dir}DMarco_Environmental_Hazard_Hits.csv"
+        dmarco_hits.to_csv(hits_file, index=False)
+        
+        # Create summary by dataset (external sources only when they contributed points)
         summary = {}
-        for dataset in self.datasets.keys():
-            dataset_sites = [s for s in all_environmental_sites if s['dataset'] == dataset]
+        risk_types = {name: config['risk_type'] for name, config in self.datasets.items()}
+        risk_types.update({name: config['risk_type'] for name, config in self.external_hazard_sources.items()})
+        confidence = (pd.to_numeric(df['geocoding_confidence'], errors='coerce').fillna(1.0)
+                      if 'geocoding_confidence' in df.columns else pd.Series(1.0, index=df.index))
+        for dataset, risk_type in risk_types.items():
+            in_dataset = df['dataset'] == dataset if len(df) else pd.Series(False, index=df.index)
+            if dataset in self.external_hazard_sources and not in_dataset.any():
+                continue
             summary[dataset] = {
-                'count': len(dataset_sites),
-                'risk_type': self.datasets[dataset]['risk_type'],
-                'geocoded': len([s for s in dataset_sites if s['geocoding_confidence'] > 0])
+                'count': int(in_dataset.sum()),
+                'risk_type': risk_type,
+                'geocoded': int((confidence[in_dataset] > 0).sum())
             }
         
         # Save summary
@@ -414,7 +440,8 @@ class ComprehensiveEnvironmentalAnalyzer:
             'total_environmental_sites': len(all_environmental_sites),
             'datasets_processed': len(self.datasets),
             'dataset_summary': summary,
-            'database_file': output_file
+            'database_file': output_file,
+            'dmarco_hazard_hits_file': hits_file
         }
         
         with open(summary_file, 'w') as f:
@@ -432,28 +459,19 @@ class ComprehensiveEnvironmentalAnalyzer:
         print("=" * 60)
         print("Processing all 6 TCEQ environmental datasets...")
         
-        all_environmental_sites = []
-        
-        # Process each dataset
-        datasets_processed = {
-            'lpst': self.load_existing_lpst_data(),
-            'operating_dry_cleaners': self.process_operating_dry_cleaners(),
-            'enforcement': self.process_enforcement_notices(),
-            'historical_dry_cleaners': self.process_historical_dry_cleaners()
-        }
-        
-        # Combine all sites
-        for dataset_name, sites in datasets_processed.items():
-            all_environmental_sites.extend(sites)
-            print(f"   ✅ {dataset_name}: {len(sites)} sites processed")
+        # Process each dataset (skipped when the persisted index is current)
+        hazard_index = EnvironmentalHazardIndex.load_or_build(
+            self.hazard_index_dir, self.source_files(), self.collect_environmental_frames
+        )
+        all_environmental_sites = hazard_index.hazards
         
         print(f"\n📊 TOTAL ENVIRONMENTAL SITES: {len(all_environmental_sites)}")
         
         # Calculate distances to D'Marco sites
-        all_environmental_sites = self.calculate_distances_to_dmarco_sites(all_environmental_sites)
+        dmarco_hits = self.calculate_distances_to_dmarco_sites(hazard_index)
         
         # Create comprehensive database
-        df, summary = self.create_comprehensive_database(all_environmental_sites)
+        df, summary = self.create_comprehensive_database(all_environmental_sites, dmarco_hits)
         
         # Update todo status
         print("\n✅ COMPREHENSIVE ENVIRONMENTAL ANALYSIS COMPLETE!")
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Environmental Hazard Spatial Index
+One grid index over every environmental hazard point (LPST, dry cleaners, enforcement
+notices, EnviroStor, GeoTracker, EPA NPL, ...) answering "all hazards within R miles of
+these N sites" as a single vectorized, long-format result with risk tiers.
+
+The index is persisted on disk (hazards.parquet + grid.npz + index_meta.json) and rebuilt
+only when one of its source files changes.
+"""
+
+import json
+import math
+from pathlib import Path
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# WGS84 ellipsoid (same model geopy.geodesic uses)
+WGS84_A_MILES = 6378137.0 / 1609.344
+WGS84_E2 = 6.69437999014e-3
+# Lower bounds on miles per degree, so search boxes never undershoot the radius
+MIN_MILES_PER_DEGREE_LAT = 68.7
+MIN_MILES_PER_DEGREE_LON_AT_EQUATOR = 69.0
+INDEX_FORMAT_VERSION = 1
+
+# Risk thresholds (miles) shared by the D'Marco analyzers
+DEFAULT_RISK_THRESHOLDS = {
+    'IMMEDIATE': 0.095,    # 500 feet
+    'CRITICAL': 0.25,      # 1/4 mile
+    'HIGH': 0.5,           # 1/2 mile
+    'MEDIUM': 1.0          # 1 mile
+}
+RISK_ORDER = ['IMMEDIATE', 'CRITICAL', 'HIGH', 'MEDIUM', 'LOW']
+
+# Column names seen across TCEQ, CalEPA and EPA extracts
+LATITUDE_COLUMNS = ['latitude', 'Latitude', 'LATITUDE', 'LAT', 'lat', 'LATITUDE_WGS84']
+LONGITUDE_COLUMNS = ['longitude', 'Longitude', 'LONGITUDE', 'LON', 'lon', 'lng', 'LONGITUDE_WGS84']
+ID_COLUMNS = ['site_id', 'SITE_ID', 'GLOBAL_ID', 'ENVIROSTOR_ID', 'EPA_ID', 'SiteID', 'ID']
+NAME_COLUMNS = ['site_name', 'SITE_NAME', 'BUSINESS_NAME', 'SiteName', 'NAME', 'Name', 'Regulated Entity Name']
+
+
+def distance_miles(lat1, lon1, lat2, lon2):
+    """
+    WGS84 distance in miles between coordinate arrays, using the ellipsoid's radii of curvature
+    at the mean latitude. Agrees with geopy.geodesic to well under a foot at screening radii.
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=float)) for a in (lat1, lon1, lat2, lon2))
+    mean_lat = (lat1 + lat2) / 2
+    w = 1 - WGS84_E2 * np.sin(mean_lat) ** 2
+    meridional = WGS84_A_MILES * (1 - WGS84_E2) / w ** 1.5
+    prime_vertical = WGS84_A_MILES / np.sqrt(w)
+    return np.hypot(meridional * (lat2 - lat1), prime_vertical * np.cos(mean_lat) * (lon2 - lon1))
+
+
+def assign_risk_levels(distances, thresholds: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """Risk tier per distance: first threshold (IMMEDIATE..MEDIUM) it falls within, else LOW"""
+    thresholds = thresholds or DEFAULT_RISK_THRESHOLDS
+    distances = np.asarray(distances, dtype=float)
+    levels = [level for level in RISK_ORDER if level in thresholds]
+    return np.select([distances <= thresholds[level] for level in levels], levels, default='LOW')
+
+
+def _first_column(df: pd.DataFrame, candidates: List[str]) -> Optional[str]:
+    return next((column for column in candidates if column in df.columns), None)
+
+
+def standardize_hazard_points(df: pd.DataFrame, dataset: str, risk_type: str) -> pd.DataFrame:
+    """Map an arbitrary hazard extract onto dataset/site_id/site_name/risk_type/latitude/longitude"""
+    lat_col = _first_column(df, LATITUDE_COLUMNS)
+    lon_col = _first_column(df, LONGITUDE_COLUMNS)
+    if lat_col is None or lon_col is None:
+        raise ValueError(f"{dataset}: no latitude/longitude columns in {list(df.columns)[:10]}")
+
+    points = df.copy()
+    points['latitude'] = pd.to_numeric(df[lat_col], errors='coerce')
+    points['longitude'] = pd.to_numeric(df[lon_col], errors='coerce')
+
+    id_col = _first_column(df, ID_COLUMNS)
+    name_col = _first_column(df, NAME_COLUMNS)
+    points['site_id'] = df[id_col].astype(str) if id_col else [f"{dataset}_{i}" for i in range(len(df))]
+    points['site_name'] = df[name_col].astype(str) if name_col else 'Unknown'
+    points['dataset'] = dataset
+    points['risk_type'] = risk_type
+    return points
+
+
+def load_hazard_file(path, dataset: str, risk_type: str) -> pd.DataFrame:
+    """Read a CSV, tab-delimited .txt (EnviroStor) or Parquet extract and standardize it"""
+    path = Path(path)
+    if path.suffix == '.parquet':
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path, sep='\t' if path.suffix == '.txt' else ',', dtype=str, low_memory=False)
+    return standardize_hazard_points(df, dataset, risk_type)
+
+
+def load_site_centers(sites_file) -> pd.DataFrame:
+    """D'Marco-style site list (SW/SE/NE/NW "lat, lon" corners) -> site_id, latitude, longitude, address"""
+    with open(sites_file, 'r') as f:
+        sites = json.load(f)
+
+    centers = []
+    for i, site in enumerate(sites):
+        site_id = f"dmarco_site_{str(i+1).zfill(2)}"
+
+        # Calculate center from 4 corners
+        corners = []
+        for corner in ['SW', 'SE', 'NE', 'NW']:
+            coord_str = site.get(corner, "")
+            if coord_str and ',' in coord_str:
+                try:
+                    lat_str, lon_str = coord_str.split(',')
+                    corners.append((float(lat_str.strip()), float(lon_str.strip())))
+                except:
+                    continue
+
+        if len(corners) == 4:
+            centers.append({
+                'site_id': site_id,
+                'latitude': sum(c[0] for c in corners) / 4,
+                'longitude': sum(c[1] for c in corners) / 4,
+                'address': site.get('Address', 'Unknown')
+            })
+
+    return pd.DataFrame(centers, columns=['site_id', 'latitude', 'longitude', 'address'])
+
+
+class EnvironmentalHazardIndex:
+    """Uniform lat/lon grid over hazard points, stored sorted by cell so each grid row is a contiguous slice"""
+
+    def __init__(self, hazards: pd.DataFrame, cell_degrees: float = 0.02):
+        valid = (hazards['latitude'].between(-90, 90) & hazards['longitude'].between(-180, 180)
+                 & hazards['latitude'].notna() & hazards['longitude'].notna())
+        hazards = hazards[valid]
+
+        self.cell_degrees = cell_degrees
+        self.n_lon_cells = int(math.ceil(360.0 / cell_degrees)) + 1
+
+        lat = hazards['latitude'].to_numpy(dtype=float)
+        lon = hazards['longitude'].to_numpy(dtype=float)
+        keys = self._cell_keys(lat, lon)
+        order = np.argsort(keys, kind='stable')
+
+        self.hazards = hazards.iloc[order].reset_index(drop=True)
+        self.lat = lat[order]
+        self.lon = lon[order]
+        self.keys = keys[order]
+
+    def __len__(self):
+        return len(self.hazards)
+
+    def _lat_cells(self, lat):
+        return np.floor((np.asarray(lat) + 90.0) / self.cell_degrees).astype(np.int64)
+
+    def _lon_cells(self, lon):
+        return np.floor((np.asarray(lon) + 180.0) / self.cell_degrees).astype(np.int64)
+
+    def _cell_keys(self, lat, lon):
+        return self._lat_cells(lat) * self.n_lon_cells + self._lon_cells(lon)
+
+    @classmethod
+    def from_frames(cls, frames: Iterable[pd.DataFrame], cell_degrees: float = 0.02) -> 'EnvironmentalHazardIndex':
+        frames = [frame for frame in frames if frame is not None and len(frame)]
+        hazards = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+            columns=['dataset', 'site_id', 'site_name', 'risk_type', 'latitude', 'longitude'])
+        return cls(hazards, cell_degrees)
+
+    # ------------------------------------------------------------------ persistence
+
+    def save(self, index_dir, sources: Optional[List] = None):
+        index_dir = Path(index_dir)
+        index_dir.mkdir(parents=True, exist_ok=True)
+
+        # Mixed-type object columns from the raw extracts are stored as text
+        hazards = self.hazards.copy()
+        for column in hazards.columns:
+            if hazards[column].dtype == object:
+                hazards[column] = hazards[column].map(lambda v: None if pd.isna(v) else str(v))
+        hazards.to_parquet(index_dir / "hazards.parquet", index=False)
+        np.savez(index_dir / "grid.npz", lat=self.lat, lon=self.lon, keys=self.keys)
+
+        meta = {
+            'version': INDEX_FORMAT_VERSION,
+            'cell_degrees': self.cell_degrees,
+            'hazard_count': len(self),
+            'datasets': self.hazards['dataset'].value_counts().to_dict() if len(self) else {},
+            'sources': self.source_signatures(sources or []),
+            'built': datetime.now().isoformat()
+        }
+        with open(index_dir / "index_meta.json", 'w') as f:
+            json.dump(meta, f, indent=2)
+
+    @classmethod
+    def load(cls, index_dir) -> 'EnvironmentalHazardIndex':
+        index_dir = Path(index_dir)
+        with open(index_dir / "index_meta.json", 'r') as f:
+            meta = json.load(f)
+
+        index = cls.__new__(cls)
+        index.cell_degrees = meta['cell_degrees']
+        index.n_lon_cells = int(math.ceil(360.0 / index.cell_degrees)) + 1
+        index.hazards = pd.read_parquet(index_dir / "hazards.parquet")
+        with np.load(index_dir / "grid.npz") as grid:
+            index.lat, index.lon, index.keys = grid['lat'], grid['lon'], grid['keys']
+        return index
+
+    @staticmethod
+    def source_signatures(sources: List) -> Dict[str, List]:
+        signatures = {}
+        for source in sources:
+            path = Path(source)
+            if path.exists():
+                stat = path.stat()
+                signatures[str(path)] = [stat.st_size, stat.st_mtime_ns]
+            else:
+                signatures[str(path)] = None
+        return signatures
+
+    @classmethod
+    def load_or_build(cls, index_dir, sources: List, build: Callable[[], Iterable[pd.DataFrame]],
+                      cell_degrees: float = 0.02) -> 'EnvironmentalHazardIndex':
+        """Load the persisted index if its source files are unchanged, otherwise build and save it"""
+        meta_file = Path(index_dir) / "index_meta.json"
+        if meta_file.exists():
+            with open(meta_file, 'r') as f:
+                meta = json.load(f)
+            if (meta.get('version') == INDEX_FORMAT_VERSION
+                    and meta.get('cell_degrees') == cell_degrees
+                    and meta.get('sources') == cls.source_signatures(sources)):
+                print(f"   ⚡ Loaded hazard index ({meta['hazard_count']:,} points)")
+                return cls.load(index_dir)
+
+        index = cls.from_frames(build(), cell_degrees)
+        index.save(index_dir, sources)
+        print(f"   💾 Built hazard index ({len(index):,} points) → {index_dir}")
+        return index
+
+    # ------------------------------------------------------------------ queries
+
+    def query_radius(self, sites: pd.DataFrame, radius_miles: float = 1.0,
+                     thresholds: Optional[Dict[str, float]] = None,
+                     hazard_columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        All hazards within radius_miles of each site, one row per (site, hazard) pair.
+        sites needs site_id, latitude, longitude. Result is sorted by site then distance.
+        """
+        hazard_columns = hazard_columns or [c for c in ['dataset', 'site_id', 'site_name', 'risk_type', 'address', 'city']
+                                            if c in self.hazards.columns]
+        result_columns = ['site_id'] + [f'hazard_{c}' if c == 'site_id' else c for c in hazard_columns] + \
+                         ['hazard_latitude', 'hazard_longitude', 'distance_miles', 'risk_level']
+
+        site_lat = sites['latitude'].to_numpy(dtype=float)
+        site_lon = sites['longitude'].to_numpy(dtype=float)
+        usable = ~(np.isnan(site_lat) | np.isnan(site_lon))
+        if len(self) == 0 or not usable.any():
+            return pd.DataFrame(columns=result_columns)
+
+        site_idx = np.flatnonzero(usable)
+        site_lat, site_lon = site_lat[usable], site_lon[usable]
+
+        # Bounding box of the radius in degrees (longitude span widens toward the poles)
+        dlat = radius_miles / MIN_MILES_PER_DEGREE_LAT
+        max_abs_lat = np.minimum(np.abs(site_lat) + dlat, 89.9)
+        dlon = radius_miles / (MIN_MILES_PER_DEGREE_LON_AT_EQUATOR * np.cos(np.radians(max_abs_lat)))
+
+        row_lo = self._lat_cells(site_lat - dlat)
+        row_hi = self._lat_cells(site_lat + dlat)
+        col_lo = self._lon_cells(site_lon - dlon)
+        col_hi = self._lon_cells(site_lon + dlon)
+
+        # One contiguous key range per (site, grid row) - all rows of all sites at once
+        n_rows = int((row_hi - row_lo).max()) + 1
+        rows = row_lo[:, None] + np.arange(n_rows)[None, :]
+        row_valid = rows <= row_hi[:, None]
+        starts = np.searchsorted(self.keys, rows * self.n_lon_cells + col_lo[:, None], side='left')
+        ends = np.searchsorted(self.keys, rows * self.n_lon_cells + col_hi[:, None], side='right')
+        counts = np.where(row_valid, ends - starts, 0).ravel()
+
+        total = int(counts.sum())
+        if total == 0:
+            return pd.DataFrame(columns=result_columns)
+
+        # Expand ranges into candidate (site, hazard) pairs without a Python loop
+        pair_site = np.repeat(np.repeat(np.arange(len(site_lat)), n_rows), counts)
+        offsets = np.repeat(np.cumsum(counts) - counts, counts)
+        pair_hazard = np.repeat(starts.ravel(), counts) + (np.arange(total) - offsets)
+
+        distances = distance_miles(site_lat[pair_site], site_lon[pair_site],
+                                    self.lat[pair_hazard], self.lon[pair_hazard])
+        within = distances <= radius_miles
+        pair_site, pair_hazard, distances = pair_site[within], pair_hazard[within], distances[within]
+
+        hazards = self.hazards.iloc[pair_hazard][hazard_columns].reset_index(drop=True)
+        hazards = hazards.rename(columns={'site_id': 'hazard_site_id'})
+        hits = pd.concat([
+            pd.DataFrame({'site_id': sites['site_id'].to_numpy()[site_idx[pair_site]]}),
+            hazards,
+            pd.DataFrame({
+                'hazard_latitude': self.lat[pair_hazard],
+                'hazard_longitude': self.lon[pair_hazard],
+                'distance_miles': np.round(distances, 3),
+                'risk_level': assign_risk_levels(distances, thresholds)
+            })
+        ], axis=1)
+        return hits.sort_values(['site_id', 'distance_miles'], kind='stable').reset_index(drop=True)
+
+    @staticmethod
+    def summarize_hits(hits: pd.DataFrame, sites: pd.DataFrame) -> pd.DataFrame:
+        """Per site: hazard count, worst risk tier and nearest distance ('NO RISK' when nothing is in range)"""
+        summary = pd.DataFrame({'site_id': sites['site_id']})
+        if hits.empty:
+            summary['hazard_count'] = 0
+            summary['overall_risk_level'] = 'NO RISK'
+            summary['nearest_hazard_miles'] = np.nan
+            return summary
+
+        rank = hits['risk_level'].map({level: i for i, level in enumerate(RISK_ORDER)})
+        grouped = hits.assign(_rank=rank).groupby('site_id').agg(
+            hazard_count=('distance_miles', 'size'),
+            _worst=('_rank', 'min'),
+            nearest_hazard_miles=('distance_miles', 'min')
+        )
+        grouped['overall_risk_level'] = grouped['_worst'].map(dict(enumerate(RISK_ORDER)))
+        summary = summary.merge(grouped.drop(columns='_worst'), left_on='site_id', right_index=True, how='left')
+        summary['hazard_count'] = summary['hazard_count'].fillna(0).astype(int)
+        summary['overall_risk_level'] = summary['overall_risk_level'].fillna('NO RISK')
+        return summary
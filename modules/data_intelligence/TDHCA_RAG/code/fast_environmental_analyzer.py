@@ -9,7 +9,10 @@ import requests
 import time
 import re
 from datetime import datetime
-from geopy.distance import geodesic
+import sys
+
+sys.path.append(str(Path(__file__).parent))
+from environmental_hazard_index import EnvironmentalHazardIndex, load_site_centers, RISK_ORDER
 
 class FastEnvironmentalAnalyzer:
     """
@@ -20,6 +23,10 @@ class FastEnvironmentalAnalyzer:
         self.base_dir = "/Users/williamrice/HERR Dropbox/Bill Rice/Structured Consultants/AI Projects/TDHCA_RAG"
         self.data_dir = "/Users/williamrice/HERR Dropbox/Bill Rice/Data_Sets/texas/Environmental/TX_Commission_on_Env"
         self.output_dir = f"{self.base_dir}/D'Marco_Sites/"
+        self.sites_file = "/Users/williamrice/priority_sites_data.json"
+        
+        # Persisted spatial index over every hazard point (rebuilt only when a source file changes)
+        self.hazard_index_dir = f"{self.output_dir}Environmental_Hazard_Index"
         
         # Environmental datasets configuration
         self.datasets = {
@@ -172,117 +179,62 @@ class FastEnvironmentalAnalyzer:
         print(f"   ✅ Successfully processed {processed} enforcement notice sites")
         return locations
     
-    def calculate_distances_to_dmarco_sites(self, environmental_sites):
-        """Calculate distances from environmental sites to all D'Marco sites"""
+    def source_files(self):
+        """Files the hazard index is built from"""
+        return [f"{self.base_dir}/D'Marco_Sites/D_Marco_LPST_Sites_Database.csv"] + [
+            f"{self.data_dir}/{config['file']}" for config in self.datasets.values() if config['file'] != 'existing'
+        ]
+    
+    def collect_environmental_frames(self):
+        """Load every dataset as a DataFrame of hazard points"""
+        datasets_processed = {
+            'lpst': self.load_existing_lpst_data(),
+            'operating_dry_cleaners': self.process_operating_dry_cleaners(),
+            'enforcement': self.process_enforcement_notices()
+        }
+        
+        for dataset_name, sites in datasets_processed.items():
+            print(f"   ✅ {dataset_name}: {len(sites)} sites processed")
+        
+        return [pd.DataFrame(sites) for sites in datasets_processed.values()]
+    
+    def calculate_distances_to_dmarco_sites(self, hazard_index, radius_miles=1.0):
+        """All hazards within radius_miles of each D'Marco site (one row per site/hazard pair)"""
         print("📏 Calculating distances to D'Marco sites...")
         
-        # Load D'Marco site coordinates
-        sites_file = "/Users/williamrice/priority_sites_data.json"
-        with open(sites_file, 'r') as f:
-            dmarco_sites = json.load(f)
+        # Load D'Marco site centers (average of the 4 corners)
+        dmarco_sites = load_site_centers(self.sites_file)
         
-        # Parse D'Marco coordinates
-        dmarco_coords = {}
-        for i, site in enumerate(dmarco_sites):
-            site_id = f"dmarco_site_{str(i+1).zfill(2)}"
-            
-            # Calculate center from 4 corners
-            corners = []
-            for corner in ['SW', 'SE', 'NE', 'NW']:
-                coord_str = site.get(corner, "")
-                if coord_str and ',' in coord_str:
-                    try:
-                        lat_str, lon_str = coord_str.split(',')
-                        lat, lon = float(lat_str.strip()), float(lon_str.strip())
-                        corners.append((lat, lon))
-                    except:
-                        continue
-            
-            if len(corners) == 4:
-                center_lat = sum(c[0] for c in corners) / 4
-                center_lon = sum(c[1] for c in corners) / 4
-                dmarco_coords[site_id] = {
-                    'lat': center_lat,
-                    'lon': center_lon,
-                    'address': site.get('Address', 'Unknown')
-                }
-        
-        print(f"   📊 Calculating distances for {len(environmental_sites)} environmental sites to {len(dmarco_coords)} D'Marco sites")
-        
-        # Calculate distances and risk levels
-        for env_site in environmental_sites:
-            env_lat, env_lon = env_site['latitude'], env_site['longitude']
-            
-            for dmarco_id, dmarco_data in dmarco_coords.items():
-                distance_miles = geodesic(
-                    (env_lat, env_lon),
-                    (dmarco_data['lat'], dmarco_data['lon'])
-                ).miles
-                
-                # Determine risk level
-                risk_level = 'LOW' 
-                if distance_miles <= self.risk_thresholds['IMMEDIATE']:
-                    risk_level = 'IMMEDIATE'
-                elif distance_miles <= self.risk_thresholds['CRITICAL']:
-                    risk_level = 'CRITICAL'
-                elif distance_miles <= self.risk_thresholds['HIGH']:
-                    risk_level = 'HIGH'
-                elif distance_miles <= self.risk_thresholds['MEDIUM']:
-                    risk_level = 'MEDIUM'
-                
-                # Add distance data to environmental site
-                env_site[f'{dmarco_id}_distance_miles'] = round(distance_miles, 3)
-                env_site[f'{dmarco_id}_risk_level'] = risk_level
-                env_site[f'{dmarco_id}_within_1_mile'] = distance_miles <= 1.0
-        
-        return environmental_sites
+        print(f"   📊 Screening {len(dmarco_sites)} D'Marco sites against {len(hazard_index)} environmental sites")
+        
+        return hazard_index.query_radius(dmarco_sites, radius_miles, self.risk_thresholds)
     
-    def analyze_dmarco_environmental_risks(self, all_environmental_sites):
+    def analyze_dmarco_environmental_risks(self, dmarco_hits):
         """Analyze environmental risks for each D'Marco site"""
         print("🎯 Analyzing D'Marco Environmental Risks...")
         
         # Group sites by D'Marco location
         dmarco_risk_analysis = {}
+        hits_by_site = {site_id: group for site_id, group in dmarco_hits.groupby('site_id')}
         
         for i in range(1, 12):  # D'Marco sites 1-11
             site_id = f"dmarco_site_{str(i).zfill(2)}"
             
             # Find all environmental risks within 1 mile
-            risks_within_1_mile = []
-            risks_by_type = {}
+            site_hits = hits_by_site.get(site_id, dmarco_hits.iloc[0:0])
+            risks_within_1_mile = site_hits[['dataset', 'site_name', 'risk_type', 'distance_miles', 'risk_level']].to_dict('records')
             
-            for env_site in all_environmental_sites:
-                if env_site.get(f'{site_id}_within_1_mile', False):
-                    risk_info = {
-                        'dataset': env_site['dataset'],
-                        'site_name': env_site['site_name'],
-                        'risk_type': env_site['risk_type'],
-                        'distance_miles': env_site[f'{site_id}_distance_miles'],
-                        'risk_level': env_site[f'{site_id}_risk_level']
-                    }
-                    risks_within_1_mile.append(risk_info)
-                    
-                    # Group by risk type
-                    risk_type = env_site['risk_type']
-                    if risk_type not in risks_by_type:
-                        risks_by_type[risk_type] = []
-                    risks_by_type[risk_type].append(risk_info)
+            # Group by risk type
+            risks_by_type = {}
+            for risk_info in risks_within_1_mile:
+                risks_by_type.setdefault(risk_info['risk_type'], []).append(risk_info)
             
             # Determine overall risk level for this D'Marco site
             if not risks_within_1_mile:
                 overall_risk = 'NO RISK'
             else:
-                risk_levels = [r['risk_level'] for r in risks_within_1_mile]
-                if 'IMMEDIATE' in risk_levels:
-                    overall_risk = 'IMMEDIATE'
-                elif 'CRITICAL' in risk_levels:
-                    overall_risk = 'CRITICAL'  
-                elif 'HIGH' in risk_levels:
-                    overall_risk = 'HIGH'
-                elif 'MEDIUM' in risk_levels:
-                    overall_risk = 'MEDIUM'
-                else:
-                    overall_risk = 'LOW'
+                risk_levels = set(site_hits['risk_level'])
+                overall_risk = next(level for level in RISK_ORDER if level in risk_levels)
             
             dmarco_risk_analysis[site_id] = {
                 'overall_risk_level': overall_risk,
@@ -295,17 +247,20 @@ class FastEnvironmentalAnalyzer:
         print(f"   ✅ Risk analysis complete for all 11 D'Marco sites")
         return dmarco_risk_analysis
     
-    def create_comprehensive_database(self, all_environmental_sites, dmarco_risk_analysis):
+    def create_comprehensive_database(self, all_environmental_sites, dmarco_risk_analysis, dmarco_hits):
         """Create comprehensive environmental database"""
         print("💾 Creating comprehensive environmental database...")
         
-        # Convert to DataFrame
-        df = pd.DataFrame(all_environmental_sites)
+        df = all_environmental_sites
         
         # Save environmental sites database
         env_output_file = f"{self.output_dir}Comprehensive_Environmental_Database.csv"
         df.to_csv(env_output_file, index=False)
         
+        # Save D'Marco proximity hits (long format: one row per D'Marco site / hazard pair)
+        hits_output_file = f"{self.output_dir}DMarco_Environmental_Hazard_Hits.csv"
+        dmarco_hits.to_csv(hits_output_file, index=False)
+        
         # Save D'Marco risk analysis
         risk_output_file = f"{self.output_dir}DMarco_Environmental_Risk_Analysis.json"
         with open(risk_output_file, 'w') as f:
@@ -319,14 +274,15 @@ class FastEnvironmentalAnalyzer:
             'dmarco_sites_analyzed': 11,
             'database_files': {
                 'environmental_sites': env_output_file,
+                'dmarco_hazard_hits': hits_output_file,
                 'dmarco_risk_analysis': risk_output_file
             }
         }
         
         # Dataset breakdown
+        dataset_counts = df['dataset'].value_counts() if len(df) else {}
         for dataset in self.datasets.keys():
-            dataset_sites = [s for s in all_environmental_sites if s['dataset'] == dataset]
-            summary[f'{dataset}_count'] = len(dataset_sites)
+            summary[f'{dataset}_count'] = int(dataset_counts.get(dataset, 0))
         
         # D'Marco risk summary
         summary['dmarco_risk_summary'] = {}
@@ -355,30 +311,22 @@ class FastEnvironmentalAnalyzer:
         print("=" * 65)
         print("Processing 3 datasets with existing coordinates...")
         
-        all_environmental_sites = []
-        
-        # Process each dataset
-        datasets_processed = {
-            'lpst': self.load_existing_lpst_data(),
-            'operating_dry_cleaners': self.process_operating_dry_cleaners(),
-            'enforcement': self.process_enforcement_notices()
-        }
-        
-        # Combine all sites
-        for dataset_name, sites in datasets_processed.items():
-            all_environmental_sites.extend(sites)
-            print(f"   ✅ {dataset_name}: {len(sites)} sites processed")
+        # Process each dataset (skipped when the persisted index is current)
+        hazard_index = EnvironmentalHazardIndex.load_or_build(
+            self.hazard_index_dir, self.source_files(), self.collect_environmental_frames
+        )
+        all_environmental_sites = hazard_index.hazards
         
         print(f"\n📊 TOTAL ENVIRONMENTAL SITES: {len(all_environmental_sites)}")
         
         # Calculate distances to D'Marco sites
-        all_environmental_sites = self.calculate_distances_to_dmarco_sites(all_environmental_sites)
+        dmarco_hits = self.calculate_distances_to_dmarco_sites(hazard_index)
         
         # Analyze D'Marco environmental risks
-        dmarco_risk_analysis = self.analyze_dmarco_environmental_risks(all_environmental_sites)
+        dmarco_risk_analysis = self.analyze_dmarco_environmental_risks(dmarco_hits)
         
         # Create comprehensive database
-        df, summary = self.create_comprehensive_database(all_environmental_sites, dmarco_risk_analysis)
+        df, summary = self.create_comprehensive_database(all_environmental_sites, dmarco_risk_analysis, dmarco_hits)
         
         print("\n✅ FAST COMPREHENSIVE ENVIRONMENTAL ANALYSIS COMPLETE!")
         print(f"   📊 {len(all_environmental_sites)} environmental sites analyzed")
@@ -8,14 +8,20 @@ Intelligently routes extraction tasks between:
 
 Achieves 90%+ cost reduction while maintaining high quality.
 
+Batches run as a tiered pipeline: every document starts on the local tier at once,
+and only low-confidence documents are queued to Sonnet/Opus. Each tier has its own
+concurrency limit and records latency, token and cost histograms per call.
+
 Author: Hybrid AI Architecture
 Date: July 2025
 """
 
 import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Callable, Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, field
 from enum import Enum
 import time
@@ -32,6 +38,85 @@ class ModelType(Enum):
     CLAUDE_OPUS = "claude-opus"
 
 
+# $/call estimate when a backend reports no token usage, $/1M tokens when it does
+TIER_PRICING = {
+    ModelType.LLAMA: {'per_call': 0.0, 'input_per_mtok': 0.0, 'output_per_mtok': 0.0},
+    ModelType.CLAUDE_SONNET: {'per_call': 0.10, 'input_per_mtok': 3.0, 'output_per_mtok': 15.0},
+    ModelType.CLAUDE_OPUS: {'per_call': 0.50, 'input_per_mtok': 15.0, 'output_per_mtok': 75.0},
+}
+
+# Concurrent calls allowed per tier (local GPU is the scarce one, API tiers are rate limited)
+DEFAULT_TIER_LIMITS = {
+    ModelType.LLAMA: 2,
+    ModelType.CLAUDE_SONNET: 4,
+    ModelType.CLAUDE_OPUS: 2,
+}
+
+# Pipeline stage -> tier that serves it
+STAGE_TIERS = {
+    'llama': ModelType.LLAMA,
+    'claude_enhance': ModelType.CLAUDE_SONNET,
+    'claude_complete': ModelType.CLAUDE_SONNET,
+    'opus_validate': ModelType.CLAUDE_OPUS,
+}
+
+LATENCY_BUCKETS = [0.5, 1, 2, 5, 10, 30, 60, 120, 300]  # seconds
+TOKEN_BUCKETS = [1_000, 5_000, 20_000, 50_000, 100_000, 200_000]
+COST_BUCKETS = [0.01, 0.05, 0.10, 0.25, 0.50, 1.00, 2.00]  # dollars
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _histogram(values: List[float], bounds: List[float]) -> Dict[str, int]:
+    """Bucket counts keyed '<=bound', plus '>last' for the tail"""
+    counts = {f"<={b:g}": 0 for b in bounds}
+    counts[f">{bounds[-1]:g}"] = 0
+    for value in values:
+        for bound in bounds:
+            if value <= bound:
+                counts[f"<={bound:g}"] += 1
+                break
+        else:
+            counts[f">{bounds[-1]:g}"] += 1
+    return counts
+
+
+@dataclass
+class TierTelemetry:
+    """Latency, token and cost samples for every call made to one model tier"""
+    calls: int = 0
+    failures: int = 0
+    latencies: List[float] = field(default_factory=list)
+    tokens: List[int] = field(default_factory=list)
+    costs: List[float] = field(default_factory=list)
+
+    def record(self, latency: float, tokens: int, cost: float, failed: bool = False):
+        self.calls += 1
+        self.failures += int(failed)
+        self.latencies.append(latency)
+        self.tokens.append(tokens)
+        self.costs.append(cost)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'failures': self.failures,
+            'latency_p50': round(_percentile(self.latencies, 50), 3),
+            'latency_p95': round(_percentile(self.latencies, 95), 3),
+            'latency_max': round(max(self.latencies), 3) if self.latencies else 0.0,
+            'total_tokens': sum(self.tokens),
+            'total_cost': round(sum(self.costs), 4),
+            'latency_histogram': _histogram(self.latencies, LATENCY_BUCKETS),
+            'token_histogram': _histogram(self.tokens, TOKEN_BUCKETS),
+            'cost_histogram': _histogram(self.costs, COST_BUCKETS),
+        }
+
+
 @dataclass
 class ExtractionMetrics:
     """Track extraction performance and costs"""
@@ -61,7 +146,8 @@ class HybridExtractionOrchestrator:
     
     def __init__(self, base_path: str, 
                  claude_api_key: Optional[str] = None,
-                 ollama_host: str = "http://localhost:11434"):
+                 ollama_host: str = "http://localhost:11434",
+                 tier_limits: Optional[Dict[ModelType, int]] = None):
         
         self.base_path = Path(base_path)
         self.ollama_extractor = OllamaTDHCAExtractor(base_path, ollama_host)
@@ -87,6 +173,49 @@ class HybridExtractionOrchestrator:
         
         # Results cache
         self.results_cache = {}
+        
+        # Model backends per pipeline stage; a backend returns a project or (project, usage)
+        # with usage = {'input_tokens': n, 'output_tokens': n}. Swap these out to stub models.
+        self.backends: Dict[str, Callable] = {
+            'llama': self._extract_with_llama,
+            'claude_enhance': self._enhance_with_claude,
+            'claude_complete': self._extract_with_claude_complete,
+            'opus_validate': self._validate_with_opus,
+        }
+        
+        # Per-tier concurrency limits and telemetry
+        self.tier_limits = {**DEFAULT_TIER_LIMITS, **(tier_limits or {})}
+        self._tier_slots = {tier: threading.BoundedSemaphore(limit) for tier, limit in self.tier_limits.items()}
+        self.telemetry = {tier: TierTelemetry() for tier in ModelType}
+        self._metrics_lock = threading.Lock()
+    
+    def _call_tier(self, stage: str, *args) -> Optional[UltimateProjectData]:
+        """Run one pipeline stage on its tier's backend, within the tier's concurrency limit"""
+        tier = STAGE_TIERS[stage]
+        with self._tier_slots[tier]:
+            start = time.time()
+            try:
+                output = self.backends[stage](*args)
+            except Exception:
+                self._record_call(tier, time.time() - start, {}, failed=True)
+                raise
+            latency = time.time() - start
+        
+        project, usage = output if isinstance(output, tuple) else (output, {})
+        self._record_call(tier, latency, usage or {}, failed=project is None)
+        return project
+    
+    def _record_call(self, tier: ModelType, latency: float, usage: Dict[str, int], failed: bool = False):
+        pricing = TIER_PRICING[tier]
+        input_tokens = usage.get('input_tokens', 0)
+        output_tokens = usage.get('output_tokens', 0)
+        if input_tokens or output_tokens:
+            cost = (input_tokens * pricing['input_per_mtok'] + output_tokens * pricing['output_per_mtok']) / 1_000_000
+        else:
+            cost = pricing['per_call']
+        with self._metrics_lock:
+            self.telemetry[tier].record(latency, input_tokens + output_tokens, cost, failed)
+            self.metrics.estimated_cost += cost
     
     def extract_hybrid(self, pdf_path: Path) -> HybridExtractionResult:
         """Main hybrid extraction method"""
@@ -100,14 +229,14 @@ class HybridExtractionOrchestrator:
         
         # Step 1: Always start with Llama for bulk extraction
         logger.info("📊 Phase 1: Llama 3.3 70B bulk extraction")
-        llama_result = self._extract_with_llama(pdf_path)
+        llama_result = self._call_tier('llama', pdf_path)
         models_used.append(ModelType.LLAMA)
         
         if not llama_result:
             logger.error("Llama extraction failed completely")
             quality_notes.append("Llama extraction failed - escalating to Claude")
             # Fallback to Claude for entire extraction
-            claude_result = self._extract_with_claude_complete(pdf_path)
+            claude_result = self._call_tier('claude_complete', pdf_path)
             models_used.append(ModelType.CLAUDE_SONNET)
             
             return HybridExtractionResult(
@@ -135,13 +264,13 @@ class HybridExtractionOrchestrator:
         
         # Step 3: Selective escalation to Claude
         logger.info(f"📈 Phase 2: Escalating {len(escalation_needed)} fields to Claude")
-        enhanced_result = self._enhance_with_claude(llama_result, escalation_needed, pdf_path)
+        enhanced_result = self._call_tier('claude_enhance', llama_result, escalation_needed, pdf_path)
         models_used.append(ModelType.CLAUDE_SONNET)
         
         # Step 4: For critical financial data, consider Opus review
         if self._needs_opus_review(enhanced_result):
             logger.info("🎯 Phase 3: Critical review with Claude Opus")
-            final_result = self._validate_with_opus(enhanced_result)
+            final_result = self._call_tier('opus_validate', enhanced_result)
             models_used.append(ModelType.CLAUDE_OPUS)
             quality_notes.append("Opus validation for critical financial data")
         else:
@@ -364,6 +493,11 @@ class HybridExtractionOrchestrator:
                        models_used: Optional[List[ModelType]] = None):
         """Update extraction metrics"""
         
+        with self._metrics_lock:
+            self._update_metrics_locked(llama_only, confidence, models_used)
+    
+    def _update_metrics_locked(self, llama_only: bool, confidence: float,
+                               models_used: Optional[List[ModelType]] = None):
         self.metrics.total_extractions += 1
         self.metrics.quality_scores.append(confidence)
         
@@ -388,32 +522,47 @@ class HybridExtractionOrchestrator:
                 self.metrics.llama_extractions / self.metrics.total_extractions
             )
     
-    def process_batch_hybrid(self, pdf_files: List[Path]) -> List[HybridExtractionResult]:
-        """Process multiple PDFs with hybrid approach"""
+    def process_batch_hybrid(self, pdf_files: List[Path], max_workers: Optional[int] = None) -> List[HybridExtractionResult]:
+        """Process multiple PDFs with hybrid approach
         
-        results = []
+        Documents flow through the tiers independently: while one is waiting on Opus,
+        others are already on Llama or Sonnet. Tier semaphores cap each model's
+        concurrency, so batch wall time tracks the slowest tier rather than the sum.
+        """
         
         logger.info(f"🚀 Processing {len(pdf_files)} files with hybrid approach")
+        if not pdf_files:
+            return []
         
-        for i, pdf_file in enumerate(pdf_files, 1):
-            logger.info(f"\n[{i}/{len(pdf_files)}] Processing: {pdf_file.name}")
-            
+        batch_start = time.time()
+        workers = max_workers or sum(self.tier_limits.values())
+        
+        def run(indexed_file):
+            i, pdf_file = indexed_file
             try:
                 result = self.extract_hybrid(pdf_file)
-                results.append(result)
-                
-                # Log result summary
                 models_str = ', '.join(m.value for m in result.models_used)
-                logger.info(f"✅ Success - Models used: {models_str}, Confidence: {result.final_confidence:.2f}")
-                
+                logger.info(f"✅ [{i}/{len(pdf_files)}] {pdf_file.name} - Models used: {models_str}, Confidence: {result.final_confidence:.2f}")
+                return result
             except Exception as e:
-                logger.error(f"❌ Failed: {e}")
+                logger.error(f"❌ [{i}/{len(pdf_files)}] {pdf_file.name} failed: {e}")
+                return None
+        
+        with ThreadPoolExecutor(max_workers=min(workers, len(pdf_files))) as executor:
+            results = [r for r in executor.map(run, enumerate(pdf_files, 1)) if r is not None]
+        
+        self.metrics.total_processing_time += time.time() - batch_start
         
         # Print final metrics
         self._print_metrics_summary()
         
         return results
     
+    def telemetry_summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per-tier latency/token/cost histograms and percentiles"""
+        with self._metrics_lock:
+            return {tier.value: self.telemetry[tier].summary() for tier in ModelType}
+    
     def _print_metrics_summary(self):
         """Print summary of extraction metrics"""
         
@@ -430,14 +579,20 @@ class HybridExtractionOrchestrator:
             avg_quality = sum(self.metrics.quality_scores) / len(self.metrics.quality_scores)
             print(f"Average Quality Score: {avg_quality:.2f}")
         
-        # Cost estimate (rough approximation)
-        llama_cost = 0  # Free local
-        claude_cost = self.metrics.claude_extractions * 0.10  # ~$0.10 per escalation
-        opus_cost = self.metrics.opus_extractions * 0.50  # ~$0.50 per review
-        total_cost = claude_cost + opus_cost
+        print(f"\n⏱️ Per-tier telemetry (limit / calls / p50 / p95 / tokens / cost):")
+        for tier_name, tier in self.telemetry_summary().items():
+            limit = self.tier_limits[ModelType(tier_name)]
+            print(f"   {tier_name:<14} {limit:>2} / {tier['calls']:>4} / {tier['latency_p50']:.1f}s / "
+                  f"{tier['latency_p95']:.1f}s / {tier['total_tokens']:,} / ${tier['total_cost']:.2f}")
+        if self.metrics.total_processing_time:
+            print(f"Batch wall time: {self.metrics.total_processing_time:.1f}s")
+        
+        # Cost from recorded calls (token based where backends report usage)
+        total_cost = self.metrics.estimated_cost
         
         print(f"\nEstimated Cost: ${total_cost:.2f}")
-        print(f"Cost per Extraction: ${total_cost/self.metrics.total_extractions:.3f}")
+        if self.metrics.total_extractions:
+            print(f"Cost per Extraction: ${total_cost/self.metrics.total_extractions:.3f}")
         print(f"Savings vs Full Claude: ~${(self.metrics.total_extractions * 0.50 - total_cost):.2f}")
         print("="*60)
 
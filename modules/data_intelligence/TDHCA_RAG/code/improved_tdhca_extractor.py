@@ -298,7 +298,7 @@ class ImprovedTDHCAExtractor(UltimateTDHCAExtractor):
                     # Reasonable unit count range
                     if 10 <= count <= 500:
                         candidates.append(count)
-                except:
+                except ValueError:
                     continue
         
         # Return most common unit count, or largest reasonable one
@@ -5,6 +5,7 @@ Combines multiple strategies for very large files like 25449.pdf (124MB)
 """
 
 from improved_tdhca_extractor import ImprovedTDHCAExtractor
+from lazy_pdf_reader import LazyPDFReader
 from pathlib import Path
 import time
 import logging
@@ -127,11 +128,9 @@ class LargeFileTDHCAExtractor(ImprovedTDHCAExtractor):
         start_time = time.time()
         
         try:
-            # First, try to get a quick page count
-            with open(pdf_path, 'rb') as file:
-                import PyPDF2
-                reader = PyPDF2.PdfReader(file)
-                total_pages = len(reader.pages)
+            # Page count from the same lazy reader the extraction uses (no text parsed yet)
+            with LazyPDFReader(pdf_path) as reader:
+                total_pages = reader.page_count
                 print(f"📄 Total pages: {total_pages}")
             
             # Estimate processing time
@@ -139,7 +138,7 @@ class LargeFileTDHCAExtractor(ImprovedTDHCAExtractor):
             print(f"⏱️ Estimated processing: {estimated_minutes:.1f} minutes")
             
             if estimated_minutes > timeout_minutes:
-                print(f"⚠️ WARNING: Estimated time exceeds timeout!")
+                print(f"⚠️ WARNING: Estimated time exceeds timeout - extraction stops at the deadline")
                 print(f"   Consider increasing timeout to {estimated_minutes * 1.2:.0f} minutes")
             
             print()
@@ -152,12 +151,20 @@ class LargeFileTDHCAExtractor(ImprovedTDHCAExtractor):
             original_length_method = self._estimate_section_length
             self._estimate_section_length = lambda section_type: self._estimate_large_file_section_length(section_type)
             
-            # Process with improved extraction
-            result = self.process_application_improved(pdf_path)
+            # Enforce the timeout inside the page loop instead of only warning about it
+            original_deadline = self.max_extraction_seconds
+            self.max_extraction_seconds = timeout_minutes * 60
             
-            # Restore original methods
-            self._identify_skip_section = original_method
-            self._estimate_section_length = original_length_method
+            try:
+                # Process with improved extraction (both passes share one cached extraction)
+                result = self.process_application_improved(pdf_path)
+            finally:
+                # Restore original methods
+                self._identify_skip_section = original_method
+                self._estimate_section_length = original_length_method
+                self.max_extraction_seconds = original_deadline
+                deadline_hit = bool(self._last_extraction and self._last_extraction[1][1].get('timed_out'))
+                self._last_extraction = None
             
             processing_time = time.time() - start_time
             print(f"⏱️ Processing completed in {processing_time/60:.1f} minutes")
@@ -165,6 +172,8 @@ class LargeFileTDHCAExtractor(ImprovedTDHCAExtractor):
             if result:
                 result.processing_notes.append(f"Large file processing: {processing_time/60:.1f} min")
                 result.processing_notes.append("Used aggressive skip patterns for efficiency")
+                if deadline_hit:
+                    result.processing_notes.append(f"Extraction stopped at {timeout_minutes} min deadline - partial text")
             
             return result
             
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Lazy PDF Reader - single open, page-at-a-time access for 1-2k page TDHCA applications
+
+The PDF is parsed once; pages are only touched when asked for, and callers can look at
+cheap signals before paying for full text extraction:
+- page size (drawing sheets are much larger than letter/legal)
+- number of text-show operators in the content stream and of form/image XObjects
+  (no text operators and no forms = scanned/image-only page, nothing to extract)
+- text head (first N characters) for section classification
+- a content stream that cannot be decoded is reported as a content_error, so a corrupt
+  page is never mistaken for a blank one
+Full page text is extracted at most once per page and every extraction is timed.
+
+Author: Enhanced for M4 Beast processing
+Date: July 2025
+"""
+
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import PyPDF2
+
+# Larger than 17" x 22" on either side -> plan/drawing sheet, never application text
+DRAWING_SHEET_POINTS = 17 * 72
+TEXT_SHOW_OPERATOR = re.compile(rb'(?:\)|\]|>)\s*T[jJ]\b|\'|"')
+
+
+class LazyPDFReader:
+    """One open file handle and one PdfReader per PDF, with per-page signals, text and timings"""
+
+    def __init__(self, pdf_path: Path):
+        self.pdf_path = Path(pdf_path)
+        self._file = open(self.pdf_path, 'rb')
+        try:
+            self.reader = PyPDF2.PdfReader(self._file)
+        except Exception:
+            self._file.close()
+            raise
+        self.page_count = len(self.reader.pages)
+        self._text: Dict[int, str] = {}
+        self.timings: Dict[int, float] = {}
+
+    def __enter__(self) -> 'LazyPDFReader':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    @staticmethod
+    def _encoded_content_bytes(page) -> int:
+        """Size of the raw (still encoded) content stream data behind /Contents"""
+        contents = page.get('/Contents')
+        if contents is None:
+            return 0
+        contents = contents.get_object()
+        streams = contents if isinstance(contents, list) else [contents]
+        return sum(len(getattr(stream.get_object(), '_data', b'') or b'') for stream in streams)
+
+    def page_signals(self, page_num: int) -> Dict:
+        """Cheap per-page facts read without running text extraction"""
+        page = self.reader.pages[page_num]
+        box = page.mediabox
+        width, height = float(box.width), float(box.height)
+        content_error = None
+        try:
+            contents = page.get_contents()
+            data = contents.get_data() if contents is not None else b''
+        except Exception as e:
+            data = b''
+            content_error = f"{type(e).__name__}: {e}"
+        else:
+            # PyPDF2 swallows inflate errors and hands back b'' for a corrupt stream
+            if not data and self._encoded_content_bytes(page):
+                content_error = "content stream could not be decoded"
+        forms = images = 0
+        try:
+            xobjects = page['/Resources'].get_object().get('/XObject')
+            for xobject in (xobjects.get_object().values() if xobjects else []):
+                subtype = xobject.get_object().get('/Subtype')
+                forms += subtype == '/Form'
+                images += subtype == '/Image'
+        except (KeyError, AttributeError):
+            pass
+        return {
+            'width': width,
+            'height': height,
+            'drawing_sheet': max(width, height) > DRAWING_SHEET_POINTS,
+            'content_bytes': len(data),
+            'text_ops': len(TEXT_SHOW_OPERATOR.findall(data)),
+            'forms': forms,
+            'images': images,
+            'content_error': content_error
+        }
+
+    def has_text(self, signals: Dict) -> bool:
+        """False only when extract_text could not return anything for the page"""
+        return signals['text_ops'] > 0 or signals['forms'] > 0
+
+    def page_text(self, page_num: int) -> str:
+        """Full text of a page, extracted once and timed"""
+        if page_num not in self._text:
+            start = time.perf_counter()
+            try:
+                text = self.reader.pages[page_num].extract_text() or ''
+            finally:
+                self.timings[page_num] = time.perf_counter() - start
+            self._text[page_num] = text
+        return self._text[page_num]
+
+    def page_head(self, page_num: int, chars: int = 1500) -> str:
+        """First `chars` characters of a page (headings, report titles)"""
+        return self.page_text(page_num)[:chars]
+
+    def release(self, page_num: int):
+        """Drop a cached page text once the caller has consumed it"""
+        self._text.pop(page_num, None)
+
+    def timing_summary(self, slowest: int = 5) -> Dict:
+        total = sum(self.timings.values())
+        worst: List[Tuple[int, float]] = sorted(self.timings.items(), key=lambda kv: kv[1], reverse=True)[:slowest]
+        return {
+            'pages_extracted': len(self.timings),
+            'extraction_seconds': round(total, 3),
+            'avg_ms_per_page': round(1000 * total / len(self.timings), 1) if self.timings else 0.0,
+            'slowest_pages': [{'page': page + 1, 'seconds': round(seconds, 3)} for page, seconds in worst]
+        }
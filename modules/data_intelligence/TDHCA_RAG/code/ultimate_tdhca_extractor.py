@@ -28,6 +28,8 @@ from dataclasses import dataclass, field
 import requests
 import time
 
+from lazy_pdf_reader import LazyPDFReader
+
 # Import financing intelligence components
 from financing_intelligence_prompts import FinancingIntelligenceExtractor
 from financing_validation_framework import FinancingValidationFramework
@@ -275,6 +277,7 @@ class UltimateProjectData:
     gp_equity: float = 0.0
     other_equity: float = 0.0
     first_lien_loan: float = 0.0  # Now maps to permanent_loan_amount
+    second_lien_loan: float = 0.0  # Now maps to second_lien_amount
     other_debt: float = 0.0
     total_debt: float = 0.0
     equity_percentage: float = 0.0
@@ -371,115 +374,114 @@ class UltimateTDHCAExtractor:
             r'rent\s+schedule', r'unit\s+mix', r'site\s+information'
         ]
         
+        # Report title pages announce themselves near the top; classify on the page head only
+        self.classify_head_chars = 1500
+        self.max_extraction_seconds: Optional[float] = None
+        self._last_extraction = None
+        
         # Initialize financing intelligence components
         self.financing_extractor = FinancingIntelligenceExtractor("granite")  # Will integrate with actual models
         self.financing_validator = FinancingValidationFramework()
         
         logger.info(f"Initialized Ultimate TDHCA Extractor with Financing Intelligence at {self.base_path}")
     
-    def smart_extract_pdf_text(self, pdf_path: Path) -> Tuple[str, Dict[str, Any]]:
-        """Extract text using smart chunking to skip third-party reports"""
-        
-        sections = self._analyze_document_structure(pdf_path)
-        extracted_text = ""
-        
+    def smart_extract_pdf_text(self, pdf_path: Path, max_seconds: Optional[float] = None) -> Tuple[str, Dict[str, Any]]:
+        """Extract text using smart chunking to skip third-party reports
+
+        Single pass over one open PDF. Each page is classified from cheap signals first
+        (page size, text operators) and only then from the head of its text; pages inside
+        a detected third-party report are never extracted at all.
+        """
+        pdf_path = Path(pdf_path)
+        if max_seconds is None:
+            max_seconds = self.max_extraction_seconds
+        try:
+            stat = pdf_path.stat()
+            cache_key = (str(pdf_path), stat.st_mtime, stat.st_size, max_seconds,
+                         self._identify_skip_section, self._estimate_section_length)
+        except OSError:
+            cache_key = None
+        last = self._last_extraction  # single read: other threads may replace it
+        if cache_key is not None and last and last[0] == cache_key:
+            return last[1]
+
         stats = {
             'total_pages': 0,
             'processed_pages': 0,
             'skipped_pages': 0,
-            'efficiency_gain': 0.0
+            'efficiency_gain': 0.0,
+            'sections': [],
+            'timed_out': False
         }
-        
+        page_texts = []
+        started = time.perf_counter()
+
         try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                stats['total_pages'] = len(pdf_reader.pages)
-                
-                for section in sections:
-                    if section.get('skip', False):
-                        stats['skipped_pages'] += (section['end'] - section['start'])
-                        logger.info(f"⏭️  Skipping {section['type']} (pages {section['start']+1}-{section['end']})")
-                        continue
-                    
-                    # Process TDHCA section
-                    for page_num in range(section['start'], min(section['end'], len(pdf_reader.pages))):
+            with LazyPDFReader(pdf_path) as reader:
+                total_pages = reader.page_count
+                stats['total_pages'] = total_pages
+                skip_until = 0
+                current = None
+
+                for page_num in range(total_pages):
+                    if max_seconds and time.perf_counter() - started > max_seconds:
+                        stats['timed_out'] = True
+                        logger.warning(f"⏱️ Extraction deadline hit at page {page_num+1}/{total_pages}")
+                        break
+
+                    section_type = current['type'] if current and page_num < skip_until else None
+                    if section_type is None:
                         try:
-                            page = pdf_reader.pages[page_num]
-                            page_text = page.extract_text()
-                            if page_text.strip():
-                                extracted_text += f"\n--- Page {page_num+1} ---\n{page_text}"
-                                stats['processed_pages'] += 1
+                            signals = reader.page_signals(page_num)
+                            if signals['content_error']:
+                                logger.warning(f"Unreadable content on page {page_num+1}: {signals['content_error']}")
+                                section_type = 'unreadable'
+                            elif signals['drawing_sheet']:
+                                section_type = 'architectural'
+                            elif not reader.has_text(signals):
+                                section_type = 'no_text'
+                            else:
+                                skip_section = self._identify_skip_section(reader.page_head(page_num, self.classify_head_chars).lower())
+                                if skip_section:
+                                    section_type = skip_section['type']
+                                    skip_until = page_num + self._estimate_section_length(section_type)
+                                    logger.info(f"⏭️  Skipping {section_type} (pages {page_num+1}-{min(skip_until, total_pages)})")
                         except Exception as e:
-                            logger.warning(f"Error extracting page {page_num+1}: {e}")
-                
-                stats['efficiency_gain'] = stats['skipped_pages'] / stats['total_pages'] if stats['total_pages'] > 0 else 0
-                logger.info(f"🎯 Smart extraction: {stats['processed_pages']}/{stats['total_pages']} pages processed ({stats['efficiency_gain']*100:.1f}% skipped)")
-        
+                            logger.warning(f"Error reading page {page_num+1}: {e}")
+                            section_type = 'unreadable'
+
+                    if section_type is None:
+                        page_text = reader.page_text(page_num)
+                        reader.release(page_num)
+                        if page_text.strip():
+                            page_texts.append(f"\n--- Page {page_num+1} ---\n{page_text}")
+                            stats['processed_pages'] += 1
+                        section_type = 'tdhca_application'
+                    else:
+                        reader.release(page_num)
+                        stats['skipped_pages'] += 1
+
+                    if current and current['type'] == section_type and current['end'] == page_num:
+                        current['end'] = page_num + 1
+                    else:
+                        current = {'start': page_num, 'end': page_num + 1, 'type': section_type,
+                                   'skip': section_type != 'tdhca_application'}
+                        stats['sections'].append(current)
+
+                stats['efficiency_gain'] = stats['skipped_pages'] / total_pages if total_pages > 0 else 0
+                stats['page_timings'] = reader.timing_summary()
+                stats['seconds'] = round(time.perf_counter() - started, 2)
+                logger.info(f"🎯 Smart extraction: {stats['processed_pages']}/{stats['total_pages']} pages processed "
+                            f"({stats['efficiency_gain']*100:.1f}% skipped, {stats['page_timings']['avg_ms_per_page']} ms/page)")
+
         except Exception as e:
             logger.error(f"Smart extraction failed: {e}")
             return "", stats
-        
-        return extracted_text, stats
-    
-    def _analyze_document_structure(self, pdf_path: Path) -> List[Dict]:
-        """Analyze PDF structure to identify sections for smart processing"""
-        sections = []
-        
-        try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                total_pages = len(pdf_reader.pages)
-                
-                skip_until = 0
-                for page_num in range(min(total_pages, 200)):  # Analyze first 200 pages
-                    if page_num < skip_until:
-                        continue
-                    
-                    try:
-                        page_text = pdf_reader.pages[page_num].extract_text().lower()
-                        
-                        # Check for third-party reports to skip
-                        skip_section = self._identify_skip_section(page_text)
-                        if skip_section:
-                            section_length = self._estimate_section_length(skip_section['type'])
-                            end_page = min(page_num + section_length, total_pages)
-                            
-                            sections.append({
-                                'start': page_num,
-                                'end': end_page,
-                                'type': skip_section['type'],
-                                'skip': True
-                            })
-                            skip_until = end_page
-                        
-                        # Otherwise, treat as TDHCA content
-                        elif self._is_tdhca_section(page_text):
-                            section_end = min(page_num + 15, total_pages)  # TDHCA sections are typically 5-15 pages
-                            sections.append({
-                                'start': page_num,
-                                'end': section_end,
-                                'type': 'tdhca_application',
-                                'skip': False
-                            })
-                    
-                    except Exception:
-                        continue
-                
-                # Fill gaps as TDHCA content
-                sections = self._fill_section_gaps(sections, total_pages)
-        
-        except Exception as e:
-            logger.error(f"Document analysis failed: {e}")
-            # Default fallback - assume 100 pages if we can't read the PDF
-            try:
-                with open(pdf_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    total_pages = len(pdf_reader.pages)
-            except:
-                total_pages = 100  # Conservative fallback
-            sections = [{'start': 0, 'end': total_pages, 'type': 'tdhca_application', 'skip': False}]
-        
-        return sections
+
+        result = ("".join(page_texts), stats)
+        if cache_key is not None:
+            self._last_extraction = (cache_key, result)
+        return result
     
     def _identify_skip_section(self, page_text: str) -> Optional[Dict[str, str]]:
         """Identify if page starts a third-party report section"""
@@ -504,35 +506,6 @@ class UltimateTDHCAExtractor:
         }
         return lengths.get(section_type, 20)
     
-    def _fill_section_gaps(self, sections: List[Dict], total_pages: int) -> List[Dict]:
-        """Fill gaps between sections as TDHCA content"""
-        if not sections:
-            return [{'start': 0, 'end': total_pages, 'type': 'tdhca_application', 'skip': False}]
-        
-        filled = []
-        last_end = 0
-        
-        for section in sorted(sections, key=lambda x: x['start']):
-            if section['start'] > last_end:
-                filled.append({
-                    'start': last_end,
-                    'end': section['start'],
-                    'type': 'tdhca_application',
-                    'skip': False
-                })
-            filled.append(section)
-            last_end = section['end']
-        
-        if last_end < total_pages:
-            filled.append({
-                'start': last_end,
-                'end': total_pages,
-                'type': 'tdhca_application',
-                'skip': False
-            })
-        
-        return filled
-    
     def extract_comprehensive_data(self, text: str, app_number: str) -> UltimateProjectData:
         """Extract comprehensive project data using enhanced patterns"""
         
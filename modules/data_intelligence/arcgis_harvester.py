@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+ArcGIS Feature Service Harvester
+Complete, parallel, incremental copies of ArcGIS REST layers (FeatureServer / MapServer)
+
+A single /query call silently stops at the server's maxRecordCount. The harvester instead:
+- Reads the layer description (maxRecordCount, object-ID field, pagination support, edit-date field)
+- Plans pages by object-ID ranges (stable under edits, cheap at any depth), or by
+  resultOffset when the layer will not list its IDs
+- Fetches pages in parallel and keeps following exceededTransferLimit inside a page
+- Streams every page straight to a GeoParquet part file (bounded memory)
+- Incremental sync: later runs fetch only features edited since the last sync and
+  reconcile deletions against the current object-ID list
+WINGMAN Environmental Data Infrastructure
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlparse, parse_qs, urlunparse
+
+import pandas as pd
+import geopandas as gpd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import requests
+from requests.adapters import HTTPAdapter
+
+STATE_FILE = "harvest_state.json"
+OBJECT_IDS_FILE = "object_ids.parquet"
+STATE_VERSION = 1
+DEFAULT_MAX_RECORD_COUNT = 1000
+COMPACT_AFTER_DELTAS = 50
+
+
+class ArcGISError(RuntimeError):
+    """Error payload returned by an ArcGIS REST endpoint (usually with HTTP 200)"""
+
+
+def parse_query_url(url: str) -> Optional[Dict]:
+    """
+    Split a '<layer>/query?where=...&outFields=...' URL into layer_url, where and out_fields.
+    Returns None for URLs that are not ArcGIS layer queries (hub downloads, CKAN, ...).
+    """
+    parsed = urlparse(url)
+    path = parsed.path.rstrip('/')
+    if not path.endswith('/query') or ('/FeatureServer/' not in path and '/MapServer/' not in path):
+        return None
+    query = parse_qs(parsed.query)
+    return {
+        'layer_url': urlunparse(parsed._replace(path=path[:-len('/query')], query='')),
+        'where': query.get('where', ['1=1'])[0],
+        'out_fields': query.get('outFields', ['*'])[0]
+    }
+
+
+class ArcGISHarvester:
+    """Paginated, parallel, incremental harvester for one ArcGIS layer"""
+
+    def __init__(self, layer_url: str, where: str = '1=1', out_fields: str = '*',
+                 page_size: Optional[int] = None, max_workers: int = 4, timeout: int = 120,
+                 retries: int = 3, headers: Optional[Dict] = None,
+                 session: Optional[requests.Session] = None):
+        self.layer_url = layer_url.rstrip('/')
+        self.where = where or '1=1'
+        self.out_fields = out_fields or '*'
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.retries = retries
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        if headers:
+            session.headers.update(headers)
+        self.session = session
+        self._info = None
+
+    # ------------------------------------------------------------------
+    # REST calls
+    # ------------------------------------------------------------------
+    def _request(self, url: str, params: Dict) -> Dict:
+        for attempt in range(1, self.retries + 1):
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+                response.raise_for_status()
+                data = response.json()
+                if isinstance(data, dict) and 'error' in data:
+                    error = data['error']
+                    raise ArcGISError(f"{error.get('code')}: {error.get('message')} {error.get('details') or ''}".strip())
+                return data
+            except (requests.RequestException, ValueError, ArcGISError):
+                if attempt == self.retries:
+                    raise
+                time.sleep(min(2 ** attempt, 30))
+
+    def layer_info(self) -> Dict:
+        """Layer description (fetched once)"""
+        if self._info is None:
+            self._info = self._request(self.layer_url, {'f': 'json'})
+        return self._info
+
+    @property
+    def object_id_field(self) -> Optional[str]:
+        info = self.layer_info()
+        if info.get('objectIdField'):
+            return info['objectIdField']
+        for field in info.get('fields') or []:
+            if field.get('type') == 'esriFieldTypeOID':
+                return field['name']
+        return None
+
+    @property
+    def edit_date_field(self) -> Optional[str]:
+        return (self.layer_info().get('editFieldsInfo') or {}).get('editDateField')
+
+    @property
+    def max_record_count(self) -> int:
+        return int(self.layer_info().get('maxRecordCount') or DEFAULT_MAX_RECORD_COUNT)
+
+    @property
+    def supports_pagination(self) -> bool:
+        return bool((self.layer_info().get('advancedQueryCapabilities') or {}).get('supportsPagination'))
+
+    def count(self, where: Optional[str] = None) -> int:
+        data = self._request(f"{self.layer_url}/query",
+                             {'where': where or self.where, 'returnCountOnly': 'true', 'f': 'json'})
+        return int(data.get('count', 0))
+
+    def object_ids(self, where: Optional[str] = None) -> List[int]:
+        data = self._request(f"{self.layer_url}/query",
+                             {'where': where or self.where, 'returnIdsOnly': 'true', 'f': 'json'})
+        return sorted(data.get('objectIds') or [])
+
+    # ------------------------------------------------------------------
+    # Paging
+    # ------------------------------------------------------------------
+    def _out_fields(self) -> str:
+        fields = [f.strip() for f in self.out_fields.split(',')]
+        if '*' in fields:
+            return '*'
+        for required in (self.object_id_field, self.edit_date_field):
+            if required and required not in fields:
+                fields.append(required)
+        return ','.join(fields)
+
+    def plan_pages(self, where: Optional[str] = None) -> List[Dict]:
+        """Query parameter sets that together cover every feature matching `where`"""
+        where = where or self.where
+        page_size = min(self.page_size or self.max_record_count, self.max_record_count)
+        oid_field = self.object_id_field
+
+        if oid_field:
+            ids = self.object_ids(where)
+            return [{'where': f"({where}) AND {oid_field} >= {chunk[0]} AND {oid_field} <= {chunk[-1]}"}
+                    for chunk in (ids[i:i + page_size] for i in range(0, len(ids), page_size))]
+
+        if self.supports_pagination:
+            total = self.count(where)
+            return [{'where': where, 'resultOffset': offset, 'resultRecordCount': page_size}
+                    for offset in range(0, total, page_size)]
+
+        # No way to page: one request, continued while the server reports truncation
+        return [{'where': where}]
+
+    def _fetch_page(self, page: Dict) -> List[Dict]:
+        """All features for one planned page, following exceededTransferLimit"""
+        base = {'outFields': self._out_fields(), 'outSR': 4326, 'returnGeometry': 'true', 'f': 'geojson'}
+        oid_field = self.object_id_field
+        page = dict(page)
+        features = []
+        while True:
+            data = self._request(f"{self.layer_url}/query", dict(base, **page))
+            batch = data.get('features') or []
+            features.extend(batch)
+            exceeded = data.get('exceededTransferLimit') or (data.get('properties') or {}).get('exceededTransferLimit')
+            if not exceeded or not batch:
+                return features
+            if 'resultOffset' in page:
+                page['resultOffset'] += len(batch)
+                page['resultRecordCount'] -= len(batch)
+                if page['resultRecordCount'] <= 0:
+                    return features
+            elif oid_field:
+                last_oid = max(f.get('id', f.get('properties', {}).get(oid_field)) for f in batch)
+                page['where'] = f"({page['where']}) AND {oid_field} > {last_oid}"
+            elif self.supports_pagination:
+                page.update(resultOffset=len(features), resultRecordCount=self.max_record_count)
+            else:
+                raise ArcGISError(f"{self.layer_url} truncates results and supports neither "
+                                  f"object-ID nor offset paging")
+
+    def iter_pages(self, where: Optional[str] = None) -> Iterator[List[Dict]]:
+        """Feature lists per page, fetched in parallel and yielded in plan order"""
+        pages = self.plan_pages(where)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            yield from executor.map(self._fetch_page, pages)
+
+    # ------------------------------------------------------------------
+    # GeoParquet output and incremental sync
+    # ------------------------------------------------------------------
+    def _write_parts(self, output_dir: Path, prefix: str, where: str) -> Dict:
+        written = {'parts': [], 'features': 0, 'max_edit': None}
+        edit_field = self.edit_date_field
+        for i, features in enumerate(self.iter_pages(where)):
+            if not features:
+                continue
+            gdf = features_to_geodataframe(features)
+            part_name = f"{prefix}-{i:05d}.parquet"
+            tmp_path = output_dir / (part_name + '.tmp')
+            gdf.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, output_dir / part_name)
+            written['parts'].append(part_name)
+            written['features'] += len(gdf)
+            if edit_field and edit_field in gdf.columns:
+                page_max = pd.to_numeric(gdf[edit_field], errors='coerce').max()
+                if pd.notna(page_max):
+                    written['max_edit'] = max(written['max_edit'] or 0, int(page_max))
+        return written
+
+    def harvest(self, output_dir: Path) -> Dict:
+        """Full copy of the layer as a new generation of GeoParquet parts"""
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        state = load_state(output_dir)
+        generation = (state or {}).get('generation', 0) + 1
+        start = time.time()
+
+        written = self._write_parts(output_dir, f"g{generation:04d}-full", self.where)
+
+        # Only now that the new generation is complete are the old files dropped
+        for path in output_dir.glob('g*.parquet'):
+            if path.name not in written['parts']:
+                path.unlink()
+        ids_path = output_dir / OBJECT_IDS_FILE
+        if ids_path.exists():
+            ids_path.unlink()
+
+        state = {
+            'version': STATE_VERSION,
+            'layer_url': self.layer_url,
+            'where': self.where,
+            'out_fields': self.out_fields,
+            'object_id_field': self.object_id_field,
+            'edit_date_field': self.edit_date_field,
+            'last_edit': written['max_edit'],
+            'generation': generation,
+            'parts': written['parts'],
+            'deltas': 0,
+            'synced': datetime.now().isoformat()
+        }
+        save_state(output_dir, state)
+        return {'mode': 'full', 'features_fetched': written['features'], 'total_features': written['features'],
+                'parts': len(written['parts']), 'seconds': round(time.time() - start, 1)}
+
+    def sync(self, output_dir: Path, full: bool = False) -> Dict:
+        """
+        Bring output_dir up to date. The first run (or any run where the layer has no
+        edit-date field, or the query changed) is a full harvest; later runs fetch only
+        features edited since the last sync and record the current object IDs so
+        deleted features drop out on read.
+        """
+        output_dir = Path(output_dir)
+        state = load_state(output_dir)
+        edit_field = self.edit_date_field
+        incremental = (not full and state is not None and edit_field and self.object_id_field
+                       and state.get('last_edit') is not None
+                       and state.get('layer_url') == self.layer_url
+                       and state.get('where') == self.where
+                       and state.get('out_fields') == self.out_fields)
+        if not incremental:
+            return self.harvest(output_dir)
+        if state.get('deltas', 0) >= COMPACT_AFTER_DELTAS:
+            return self.harvest(output_dir)
+
+        start = time.time()
+        since = datetime.fromtimestamp(state['last_edit'] / 1000, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        changed_where = f"({self.where}) AND {edit_field} >= TIMESTAMP '{since}'"
+        delta = state.get('deltas', 0) + 1
+        written = self._write_parts(output_dir, f"g{state['generation']:04d}-delta{delta:04d}", changed_where)
+
+        ids = self.object_ids(self.where)
+        pq.write_table(pa.table({'object_id': pa.array(ids, pa.int64())}), output_dir / OBJECT_IDS_FILE)
+
+        state.update(
+            last_edit=max(state['last_edit'], written['max_edit'] or 0),
+            parts=state['parts'] + written['parts'],
+            deltas=delta,
+            synced=datetime.now().isoformat()
+        )
+        save_state(output_dir, state)
+        return {'mode': 'incremental', 'features_fetched': written['features'], 'total_features': len(ids),
+                'parts': len(written['parts']), 'seconds': round(time.time() - start, 1)}
+
+
+def features_to_geodataframe(features: List[Dict]) -> gpd.GeoDataFrame:
+    """GeoJSON features -> GeoDataFrame in EPSG:4326 (features without geometry are kept)"""
+    return gpd.GeoDataFrame.from_features(features, crs='EPSG:4326')
+
+
+def load_state(output_dir: Path) -> Optional[Dict]:
+    state_path = Path(output_dir) / STATE_FILE
+    if not state_path.exists():
+        return None
+    with open(state_path, 'r') as f:
+        state = json.load(f)
+    return state if state.get('version') == STATE_VERSION else None
+
+
+def save_state(output_dir: Path, state: Dict):
+    state_path = Path(output_dir) / STATE_FILE
+    tmp_path = state_path.with_suffix('.json.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, state_path)
+
+
+def read_layer(output_dir: Path) -> gpd.GeoDataFrame:
+    """
+    Current state of a harvested layer: full parts plus deltas in sync order, latest
+    version of each feature, features deleted upstream removed.
+    """
+    output_dir = Path(output_dir)
+    state = load_state(output_dir)
+    if state is None:
+        raise FileNotFoundError(f"No harvested layer in {output_dir}")
+
+    frames = [gpd.read_parquet(output_dir / part) for part in state['parts']]
+    if not frames:
+        return gpd.GeoDataFrame(geometry=[], crs='EPSG:4326')
+    gdf = gpd.GeoDataFrame(pd.concat(frames, ignore_index=True), crs='EPSG:4326')
+
+    oid_field = state.get('object_id_field')
+    if oid_field and oid_field in gdf.columns:
+        gdf = gdf.drop_duplicates(subset=oid_field, keep='last')
+        ids_path = output_dir / OBJECT_IDS_FILE
+        if ids_path.exists():
+            current = pq.read_table(ids_path)['object_id'].to_numpy()
+            gdf = gdf[gdf[oid_field].isin(current)]
+    return gdf.reset_index(drop=True)
+
+
+def read_feature_collection(output_dir: Path) -> Dict:
+    """Harvested layer as a GeoJSON FeatureCollection dict"""
+    return json.loads(read_layer(output_dir).to_json(drop_id=True))
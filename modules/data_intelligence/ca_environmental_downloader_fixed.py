@@ -2,23 +2,27 @@
 """
 California Environmental Data Downloader - FIXED VERSION
 With proper API endpoints and README.txt generation
+Statewide files are fetched once through the shared DownloadEngine and filtered per county
 WINGMAN Execution - Mission CA-ENV-2025-002
 Date: 2025-08-09
 """
 
 import os
+import sys
 import json
 import time
 import logging
-import requests
+import threading
 import pandas as pd
 import geopandas as gpd
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional
-from io import StringIO
 import zipfile
 
+sys.path.append(str(Path(__file__).parent))
+from download_engine import DownloadEngine, DownloadJob
+
 class CaliforniaEnvironmentalDownloader:
     """Download California environmental data with proper documentation"""
     
@@ -32,6 +36,26 @@ class CaliforniaEnvironmentalDownloader:
         self.setup_logging()
         self.download_date = datetime.now().strftime('%Y-%m-%d')
         
+        # Pooled sessions + resumable statewide downloads shared by every county
+        self.statewide_path = self.data_path / "_statewide"
+        self.engine = DownloadEngine(self.data_path / "download_manifest.json")
+        self._statewide_frames: Dict[str, Optional[pd.DataFrame]] = {}
+        self._statewide_lock = threading.Lock()
+        
+    def load_statewide_csv(self, name: str, url: str) -> Optional[pd.DataFrame]:
+        """Download a statewide CSV once (resumable, skipped when complete) and parse it once"""
+        with self._statewide_lock:
+            if name not in self._statewide_frames:
+                output_file = self.statewide_path / f"{name}.csv"
+                result = self.engine.download(DownloadJob(url, output_file, description=name))
+                if result.ok and result.size > 100:
+                    self.logger.info(f"Statewide {name}: {result.status} ({result.size_mb:.1f} MB)")
+                    self._statewide_frames[name] = pd.read_csv(output_file, low_memory=False)
+                else:
+                    self.logger.warning(f"Statewide {name} unavailable: {result.error}")
+                    self._statewide_frames[name] = None
+            return self._statewide_frames[name]
+        
     def setup_logging(self):
         """Configure logging"""
         log_file = self.data_path / f"download_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
@@ -111,7 +135,7 @@ MISSION: CA Environmental Data Acquisition
                 'q': county_name
             }
             
-            response = requests.get(url, params=params, timeout=60)
+            response = self.engine.get(url, params=params, timeout=60)
             
             if response.status_code == 200:
                 data = response.json()
@@ -174,13 +198,10 @@ MISSION: CA Environmental Data Acquisition
                 try:
                     url = base_url + endpoint
                     
-                    # GeoTracker returns CSV directly
-                    response = requests.get(url, timeout=120)
+                    # GeoTracker returns one statewide CSV; every county filters the same copy
+                    df = self.load_statewide_csv(f"geotracker_{dataset_type}", url)
                     
-                    if response.status_code == 200 and len(response.content) > 100:
-                        # Parse CSV
-                        df = pd.read_csv(StringIO(response.text), low_memory=False)
-                        
+                    if df is not None:
                         # Filter for county
                         if 'COUNTY' in df.columns:
                             county_df = df[df['COUNTY'].str.contains(county_name, case=False, na=False)]
@@ -242,7 +263,7 @@ MISSION: CA Environmental Data Acquisition
                         'resultRecordCount': 5000
                     }
                     
-                    response = requests.get(endpoint, params=params, timeout=60)
+                    response = self.engine.get(endpoint, params=params, timeout=60)
                     
                     if response.status_code == 200:
                         data = response.json()
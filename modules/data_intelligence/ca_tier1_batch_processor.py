@@ -9,20 +9,24 @@ Date: 2025-08-07
 """
 
 import os
+import sys
 import json
 import time
 import logging
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
-import requests
 import pandas as pd
 import geopandas as gpd
-from io import StringIO
 import zipfile
 import shutil
 
+sys.path.append(str(Path(__file__).parent))
+from download_engine import DownloadEngine, DownloadJob
+from arcgis_harvester import ArcGISHarvester, read_feature_collection
+
 class CaliforniaTier1Processor:
     """Batch processor for Tier 1 California counties"""
     
@@ -94,6 +98,12 @@ class CaliforniaTier1Processor:
         self.processing_status = {}
         self.start_time = datetime.now()
         
+        # Pooled per-host sessions; statewide GeoTracker ZIPs are fetched once for all counties
+        self.engine = DownloadEngine(self.data_path / "download_manifest.json", max_workers=3)
+        self.statewide_path = self.data_path / "_statewide"
+        self._statewide_frames: Dict[str, Optional[pd.DataFrame]] = {}
+        self._statewide_lock = threading.Lock()
+        
     def setup_logging(self):
         """Configure logging for batch processing"""
         log_file = self.data_path / f"batch_processing_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
@@ -203,36 +213,32 @@ class CaliforniaTier1Processor:
         }
         
         try:
-            # Query FEMA MapServer for flood zones
-            endpoint = f"{self.API_ENDPOINTS['fema_flood']['base']}/28/query"
-            params = {
-                'where': f"COUNTY_FIPS = '{county_info['fips']}'",
-                'outFields': 'FLD_ZONE,ZONE_SUBTY,SFHA_TF,STATIC_BFE,COUNTY_FIPS',
-                'f': 'geojson',
-                'outSR': '4326',
-                'returnGeometry': 'true'
-            }
+            # Harvest FEMA flood zones page by page; a single query stops at the
+            # service's maxRecordCount, which large counties exceed
+            harvester = ArcGISHarvester(
+                f"{self.API_ENDPOINTS['fema_flood']['base']}/28",
+                where=f"COUNTY_FIPS = '{county_info['fips']}'",
+                out_fields='FLD_ZONE,ZONE_SUBTY,SFHA_TF,STATIC_BFE,COUNTY_FIPS',
+                session=self.engine.session_for(self.API_ENDPOINTS['fema_flood']['base'])
+            )
+            layer_dir = county_path / "fema_flood_layer"
+            harvest = harvester.sync(layer_dir)
             
-            response = requests.get(endpoint, params=params, timeout=60)
-            if response.status_code == 200:
-                data = response.json()
+            if harvest['total_features'] > 0:
+                # GeoParquet copy stays in layer_dir; GeoJSON kept for existing consumers
+                data = read_feature_collection(layer_dir)
+                output_file = county_path / f"{county_name.replace(' ', '_')}_fema_flood.geojson"
+                with open(output_file, 'w') as f:
+                    json.dump(data, f)
                 
-                if 'features' in data and len(data['features']) > 0:
-                    # Save as GeoJSON
-                    output_file = county_path / f"{county_name.replace(' ', '_')}_fema_flood.geojson"
-                    with open(output_file, 'w') as f:
-                        json.dump(data, f)
-                    
-                    result['status'] = 'completed'
-                    result['records'] = len(data['features'])
-                    result['file'] = str(output_file.name)
-                    self.logger.info(f"    ✓ Downloaded {result['records']} FEMA flood zones")
-                else:
-                    # Try alternative endpoint if no data
-                    self.logger.warning(f"    No FEMA data found, trying alternative endpoint")
-                    result['status'] = 'no_data'
+                result['status'] = 'completed'
+                result['records'] = len(data['features'])
+                result['file'] = str(output_file.name)
+                result['harvest'] = harvest
+                self.logger.info(f"    ✓ Harvested {result['records']} FEMA flood zones ({harvest['mode']})")
             else:
-                self.logger.error(f"    FEMA API returned status {response.status_code}")
+                self.logger.warning(f"    No FEMA data found for {county_name}")
+                result['status'] = 'no_data'
                 
         except Exception as e:
             self.logger.error(f"    Failed to download FEMA data: {str(e)}")
@@ -271,7 +277,7 @@ class CaliforniaTier1Processor:
                 'format': 'csv'
             }
             
-            response = requests.get(url, params=params, timeout=60)
+            response = self.engine.get(url, params=params, timeout=60)
             if response.status_code == 200 and len(response.content) > 100:
                 # Save CSV data
                 output_file = county_path / f"{county_name.replace(' ', '_')}_envirostor.csv"
@@ -294,6 +300,23 @@ class CaliforniaTier1Processor:
             
         return result
     
+    def _load_statewide_zip(self, url: str) -> Optional[pd.DataFrame]:
+        """Resumable one-time download of a statewide ZIP; the CSV inside is read without extracting"""
+        file_type = url.rsplit('/', 1)[-1]
+        with self._statewide_lock:
+            if file_type not in self._statewide_frames:
+                zip_file = self.statewide_path / file_type
+                download = self.engine.download(DownloadJob(url, zip_file, description=file_type))
+                if not download.ok:
+                    self.logger.warning(f"    {file_type} unavailable: {download.error}")
+                    self._statewide_frames[file_type] = None
+                else:
+                    self.logger.info(f"    Statewide {file_type}: {download.status} ({download.size_mb:.1f} MB)")
+                    with zipfile.ZipFile(zip_file, 'r') as z:
+                        with z.open(file_type.replace('.zip', '.csv')) as csv_file:
+                            self._statewide_frames[file_type] = pd.read_csv(csv_file, low_memory=False)
+            return self._statewide_frames[file_type]
+    
     def _download_geotracker(self, county_name: str, county_path: Path) -> Dict:
         """Download GeoTracker LUST/SLIC sites"""
         result = {
@@ -306,41 +329,20 @@ class CaliforniaTier1Processor:
         try:
             base_url = 'https://geotracker.waterboards.ca.gov/data_download/'
             
-            # Download each GeoTracker file type
+            # Each GeoTracker file is statewide: downloaded once, parsed once, filtered per county
             for file_type in ['lust_public.zip', 'slic_public.zip']:
                 try:
-                    url = base_url + file_type
-                    response = requests.get(url, timeout=120)
-                    
-                    if response.status_code == 200:
-                        # Save and extract ZIP
-                        zip_file = county_path / file_type
-                        with open(zip_file, 'wb') as f:
-                            f.write(response.content)
+                    df = self._load_statewide_zip(base_url + file_type)
+                    if df is not None and 'COUNTY' in df.columns:
+                        county_df = df[df['COUNTY'].str.upper() == county_name.upper()]
                         
-                        # Extract CSV from ZIP
-                        with zipfile.ZipFile(zip_file, 'r') as z:
-                            csv_name = file_type.replace('.zip', '.csv')
-                            z.extract(csv_name, county_path)
-                            
-                            # Filter for county
-                            df = pd.read_csv(county_path / csv_name, low_memory=False)
-                            if 'COUNTY' in df.columns:
-                                county_df = df[df['COUNTY'].str.upper() == county_name.upper()]
-                                
-                                if len(county_df) > 0:
-                                    output_file = county_path / f"{county_name.replace(' ', '_')}_{file_type.replace('_public.zip', '')}.csv"
-                                    county_df.to_csv(output_file, index=False)
-                                    
-                                    result['files'].append(str(output_file.name))
-                                    result['total_records'] += len(county_df)
-                                    self.logger.info(f"    ✓ Extracted {len(county_df)} {file_type.replace('_public.zip', '')} sites")
+                        if len(county_df) > 0:
+                            output_file = county_path / f"{county_name.replace(' ', '_')}_{file_type.replace('_public.zip', '')}.csv"
+                            county_df.to_csv(output_file, index=False)
                             
-                            # Clean up full dataset
-                            os.remove(county_path / csv_name)
-                        
-                        # Clean up ZIP
-                        os.remove(zip_file)
+                            result['files'].append(str(output_file.name))
+                            result['total_records'] += len(county_df)
+                            self.logger.info(f"    ✓ Extracted {len(county_df)} {file_type.replace('_public.zip', '')} sites")
                         
                 except Exception as e:
                     self.logger.warning(f"    Could not process {file_type}: {str(e)}")
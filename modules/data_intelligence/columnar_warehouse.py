@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Columnar Environmental Warehouse
+Converts raw environmental CSV dumps to Parquet once, then serves column-pruned
+single-pass aggregations from the Parquet copies.
+
+- Each source CSV is streamed block by block into <warehouse>/<name>.parquet (bounded memory)
+- manifest.json records each source's size/mtime; unchanged sources are never re-converted
+- Extra partitions (e.g. one per EPA geodatabase) are tracked the same way
+WINGMAN Environmental Data Infrastructure
+"""
+
+import csv
+import json
+import os
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Optional, Callable
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+MANIFEST_VERSION = 1
+CSV_BLOCK_SIZE = 16 * 1024 * 1024  # bytes of CSV parsed per record batch
+ROW_GROUP_SIZE = 250_000
+
+
+def source_signature(path: Path) -> Dict:
+    """Cheap change detector for a source file"""
+    stat = Path(path).stat()
+    return {'path': str(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+class ColumnarWarehouse:
+    """Parquet copies of raw source files with change-aware rebuilds"""
+
+    def __init__(self, warehouse_dir: Path):
+        self.warehouse_dir = Path(warehouse_dir)
+        self.warehouse_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.warehouse_dir / "manifest.json"
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Dict:
+        if self.manifest_path.exists():
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == MANIFEST_VERSION:
+                return manifest
+        return {'version': MANIFEST_VERSION, 'tables': {}}
+
+    def _save_manifest(self):
+        tmp_path = self.manifest_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def table_path(self, name: str) -> Path:
+        return self.warehouse_dir / f"{name}.parquet"
+
+    def is_current(self, name: str, source_path: Path, options: Optional[Dict] = None) -> bool:
+        """True when the Parquet copy of `name` was built from this exact source file"""
+        entry = self.manifest['tables'].get(name)
+        return (entry is not None
+                and entry['source'] == source_signature(source_path)
+                and entry.get('options', {}) == (options or {})
+                and Path(entry['parquet']).exists())
+
+    def _record(self, name: str, source_path: Path, parquet_path: Path, rows: int, options: Optional[Dict] = None):
+        self.manifest['tables'][name] = {
+            'source': source_signature(source_path),
+            'parquet': str(parquet_path),
+            'rows': rows,
+            'options': options or {},
+            'built': datetime.now().isoformat()
+        }
+        self._save_manifest()
+
+    def ingest_csv(self, name: str, csv_path: Path, all_strings: bool = True) -> bool:
+        """
+        Stream a CSV into Parquet unless the existing copy is current.
+        all_strings keeps every column as text (like pandas dtype=str); set False to let
+        pyarrow infer types for small, well-formed files.
+        Returns True when the table was (re)built.
+        """
+        csv_path = Path(csv_path)
+        options = {'all_strings': all_strings}
+        if self.is_current(name, csv_path, options):
+            return False
+
+        convert_options = pa_csv.ConvertOptions(strings_can_be_null=True)
+        if all_strings:
+            # utf-8-sig: a BOM must not end up in the first column name, or its override is missed
+            with open(csv_path, 'r', newline='', encoding='utf-8-sig', errors='replace') as f:
+                header = next(csv.reader(f))
+            convert_options = pa_csv.ConvertOptions(
+                column_types={column: pa.string() for column in header},
+                strings_can_be_null=True
+            )
+
+        parquet_path = self.table_path(name)
+        tmp_path = parquet_path.with_suffix('.parquet.tmp')
+        rows = 0
+        reader = pa_csv.open_csv(
+            csv_path,
+            read_options=pa_csv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+            parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+            convert_options=convert_options
+        )
+        writer = None
+        try:
+            for batch in reader:
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, batch.schema, compression='snappy')
+                writer.write_table(pa.Table.from_batches([batch]), row_group_size=ROW_GROUP_SIZE)
+                rows += batch.num_rows
+            if writer is None:
+                pq.write_table(reader.schema.empty_table(), tmp_path)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        os.replace(tmp_path, parquet_path)
+        self._record(name, csv_path, parquet_path, rows, options)
+        return True
+
+    def ingest_partition(self, name: str, partition: str, source_path: Path,
+                         build: Callable[[], Optional[pd.DataFrame]]) -> bool:
+        """
+        Store build()'s frame as <name>/<partition>.parquet unless the source is unchanged.
+        Used for sources that need custom extraction (one partition per geodatabase).
+        build() returns None when the source could not be read: the stale partition is
+        dropped and nothing is recorded, so the source is retried on the next run.
+        Returns True when the partition was (re)built.
+        """
+        key = f"{name}/{partition}"
+        partition_dir = self.warehouse_dir / name
+        parquet_path = partition_dir / f"{partition}.parquet"
+        if self.is_current(key, source_path):
+            return False
+
+        df = build()
+        if df is None:
+            self.drop(key)
+            return False
+
+        partition_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = parquet_path.with_suffix('.parquet.tmp')
+        df.to_parquet(tmp_path, index=False, compression='snappy')
+        os.replace(tmp_path, parquet_path)
+        self._record(key, source_path, parquet_path, len(df))
+        return True
+
+    def drop(self, key: str):
+        """Forget a table or partition and delete its Parquet file"""
+        entry = self.manifest['tables'].pop(key, None)
+        parquet_path = Path(entry['parquet']) if entry else self.warehouse_dir / f"{key}.parquet"
+        parquet_path.unlink(missing_ok=True)
+        if entry is not None:
+            self._save_manifest()
+
+    def partitions(self, name: str) -> List[Path]:
+        partition_dir = self.warehouse_dir / name
+        return sorted(partition_dir.glob("*.parquet")) if partition_dir.exists() else []
+
+    def read(self, name: str, columns: Optional[List[str]] = None) -> pa.Table:
+        """Column-pruned read of a table (or all partitions of a partitioned table)"""
+        if (self.warehouse_dir / name).is_dir():
+            tables = [pq.read_table(path) for path in self.partitions(name)]
+            tables = [table for table in tables if table.num_rows]
+            if not tables:
+                return pa.table({})
+            table = pa.concat_tables(tables, promote_options='default')
+            return table.select(columns) if columns else table
+        return ds.dataset(self.table_path(name), format='parquet').to_table(columns=columns)
+
+    def count_by(self, name: str, key: str = 'SiteID') -> Dict[str, int]:
+        """Rows per key value (nulls excluded) - one pass over a single column"""
+        table = self.read(name, [key])
+        counts = table.group_by(key).aggregate([(key, 'count')])
+        return {k: n for k, n in zip(counts[key].to_pylist(), counts[f'{key}_count'].to_pylist()) if k is not None}
+
+    def distinct(self, name: str, key: str = 'SiteID') -> List[str]:
+        values = pc.unique(self.read(name, [key])[key]).to_pylist()
+        return [value for value in values if value is not None]
@@ -13,8 +13,12 @@ from pathlib import Path
 import json
 from datetime import datetime
 import sqlite3
+import sys
 from pyproj import Transformer
 
+sys.path.append(str(Path(__file__).parent))
+from columnar_warehouse import ColumnarWarehouse
+
 class FederalEnvironmentalUnifier:
     """Unify federal EPA environmental datasets"""
     
@@ -23,6 +27,7 @@ class FederalEnvironmentalUnifier:
         self.federal_path = self.base_path / "data_sets/federal"
         self.output_path = self.federal_path / "Federal_Unified"
         self.output_path.mkdir(exist_ok=True)
+        self.warehouse = ColumnarWarehouse(self.output_path / "parquet_warehouse")
         
         # Coordinate transformer (Web Mercator to WGS84)
         self.transformer = Transformer.from_crs("EPSG:3857", "EPSG:4326", always_xy=True)
@@ -33,30 +38,28 @@ class FederalEnvironmentalUnifier:
         print("PROCESSING NPL SUPERFUND SITES")
         print("="*80)
         
-        # Read NPL data
+        # Read NPL data (Parquet copy is only rebuilt when the CSV changes)
         npl_file = self.federal_path / "EPA_Superfund/npl_sites.csv"
-        df_npl = pd.read_csv(npl_file)
+        self.warehouse.ingest_csv('npl_sites', npl_file, all_strings=False)
+        df_npl = self.warehouse.read('npl_sites').to_pandas()
         
         print(f"Loaded {len(df_npl)} NPL sites")
         
         # Convert coordinates from Web Mercator to Lat/Long
         if 'LONGITUDE' in df_npl.columns and 'LATITUDE' in df_npl.columns:
-            # These appear to be Web Mercator coordinates
-            coords_converted = []
-            for idx, row in df_npl.iterrows():
-                try:
-                    x, y = row['LONGITUDE'], row['LATITUDE']
-                    if pd.notna(x) and pd.notna(y):
-                        lon, lat = self.transformer.transform(x, y)
-                        coords_converted.append((lon, lat))
-                    else:
-                        coords_converted.append((np.nan, np.nan))
-                except:
-                    coords_converted.append((np.nan, np.nan))
+            # These appear to be Web Mercator coordinates - convert the whole column in one call
+            x = pd.to_numeric(df_npl['LONGITUDE'], errors='coerce').to_numpy(dtype=float)
+            y = pd.to_numeric(df_npl['LATITUDE'], errors='coerce').to_numpy(dtype=float)
+            valid = ~(np.isnan(x) | np.isnan(y))
+            
+            lons = np.full(len(df_npl), np.nan)
+            lats = np.full(len(df_npl), np.nan)
+            if valid.any():
+                lons[valid], lats[valid] = self.transformer.transform(x[valid], y[valid])
             
             # Update with converted coordinates
-            df_npl['LONGITUDE_WGS84'] = [c[0] for c in coords_converted]
-            df_npl['LATITUDE_WGS84'] = [c[1] for c in coords_converted]
+            df_npl['LONGITUDE_WGS84'] = lons
+            df_npl['LATITUDE_WGS84'] = lats
             
             # Rename original columns
             df_npl.rename(columns={
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Shared Download Engine for Environmental Data Crawlers
+One engine for the EPA / CA / TCEQ downloaders instead of ad-hoc requests.get calls
+
+- Pooled requests.Session per host, with a cap on concurrent transfers per host
+- Bounded parallel downloads (download_many)
+- Interrupted files resume from <file>.part with an HTTP Range request
+- Size and SHA-256 verification before a file is moved into place
+- Persistent JSON manifest: completed files are skipped without touching the network
+WINGMAN Environmental Data Infrastructure
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+MANIFEST_VERSION = 1
+CHUNK_SIZE = 1024 * 1024  # 1 MB reads instead of 32 KB
+USER_AGENT = 'Colosseum LIHTC Platform/1.0'
+
+
+@dataclass
+class DownloadJob:
+    """One file to fetch"""
+    url: str
+    dest: Path
+    params: Optional[Dict] = None
+    expected_size: Optional[int] = None
+    sha256: Optional[str] = None
+    description: str = ''
+
+
+@dataclass
+class DownloadResult:
+    """Outcome of a DownloadJob; status is downloaded, resumed, unchanged or failed"""
+    url: str
+    dest: str
+    status: str
+    size: int = 0
+    bytes_transferred: int = 0
+    sha256: Optional[str] = None
+    http_status: Optional[int] = None
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status in ('downloaded', 'resumed', 'unchanged')
+
+    @property
+    def size_mb(self) -> float:
+        return self.size / (1024 * 1024)
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file's bytes, read in CHUNK_SIZE blocks (shared with the Docling cache and job queue)"""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class DownloadEngine:
+    """Resumable, verified, manifest-backed parallel downloader with per-host session pools"""
+
+    def __init__(self, manifest_path: Path, max_workers: int = 4, per_host_limit: int = 2,
+                 timeout: int = 60, retries: int = 3, chunk_size: int = CHUNK_SIZE):
+        self.manifest_path = Path(manifest_path)
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.retries = retries
+        self.chunk_size = chunk_size
+
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, requests.Session] = {}
+        self._host_slots: Dict[str, threading.Semaphore] = {}
+        self._dest_locks: Dict[str, threading.Lock] = {}
+        self.manifest = self._load_manifest()
+
+    # ------------------------------------------------------------------
+    # Sessions
+    # ------------------------------------------------------------------
+    def session_for(self, url: str) -> requests.Session:
+        """Keep-alive session shared by every request to url's host"""
+        host = urlparse(url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(self.per_host_limit, self.max_workers))
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers['User-Agent'] = USER_AGENT
+                self._sessions[host] = session
+                self._host_slots[host] = threading.Semaphore(self.per_host_limit)
+            return session
+
+    def _host_slot(self, url: str) -> threading.Semaphore:
+        self.session_for(url)
+        return self._host_slots[urlparse(url).netloc]
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Pooled GET for API calls that are not file downloads"""
+        kwargs.setdefault('timeout', self.timeout)
+        with self._host_slot(url):
+            return self.session_for(url).get(url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+        with self._host_slot(url):
+            return self.session_for(url).head(url, **kwargs)
+
+    def close(self):
+        for session in self._sessions.values():
+            session.close()
+
+    # ------------------------------------------------------------------
+    # Manifest
+    # ------------------------------------------------------------------
+    def _load_manifest(self) -> Dict:
+        if self.manifest_path.exists():
+            try:
+                with open(self.manifest_path, 'r') as f:
+                    manifest = json.load(f)
+                if manifest.get('version') == MANIFEST_VERSION:
+                    return manifest
+            except ValueError:
+                pass
+        return {'version': MANIFEST_VERSION, 'files': {}}
+
+    def _update_manifest(self, dest: Path, entry: Optional[Dict]):
+        with self._lock:
+            if entry is None:
+                self.manifest['files'].pop(str(dest), None)
+            else:
+                self.manifest['files'][str(dest)] = entry
+            tmp_path = self.manifest_path.with_suffix('.json.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(self.manifest, f, indent=2)
+            os.replace(tmp_path, self.manifest_path)
+
+    def is_complete(self, job: DownloadJob) -> bool:
+        """True when the manifest says this exact URL was fully fetched to dest and dest is intact"""
+        entry = self.manifest['files'].get(str(job.dest))
+        if not entry or entry.get('status') != 'complete' or entry.get('url') != self._full_url(job):
+            return False
+        if job.sha256 and entry.get('sha256') != job.sha256.lower():
+            return False
+        try:
+            return Path(job.dest).stat().st_size == entry['size']
+        except OSError:
+            return False
+
+    @staticmethod
+    def _full_url(job: DownloadJob) -> str:
+        return requests.Request('GET', job.url, params=job.params).prepare().url
+
+    # ------------------------------------------------------------------
+    # Downloads
+    # ------------------------------------------------------------------
+    def download(self, job: DownloadJob, refresh: bool = False) -> DownloadResult:
+        """Fetch one file, resuming a partial copy and skipping a complete one"""
+        dest = Path(job.dest)
+        with self._lock:
+            dest_lock = self._dest_locks.setdefault(str(dest), threading.Lock())
+
+        # Two callers asking for the same file share one transfer
+        with dest_lock:
+            if not refresh and self.is_complete(job):
+                entry = self.manifest['files'][str(dest)]
+                return DownloadResult(job.url, str(dest), 'unchanged', size=entry['size'], sha256=entry.get('sha256'))
+
+            result = None
+            for attempt in range(1, self.retries + 1):
+                result = self._transfer(job)
+                if result.ok or result.http_status in (403, 404, 410):
+                    break
+                if attempt < self.retries:
+                    time.sleep(min(2 ** attempt, 30))
+            return result
+
+    def _transfer(self, job: DownloadJob) -> DownloadResult:
+        dest = Path(job.dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        part_path = dest.with_name(dest.name + '.part')
+        full_url = self._full_url(job)
+        start = time.time()
+
+        entry = self.manifest['files'].get(str(dest), {})
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        headers = {}
+        if offset and entry.get('status') == 'partial' and entry.get('url') == full_url:
+            headers['Range'] = f'bytes={offset}-'
+            validator = entry.get('etag') or entry.get('last_modified')
+            if validator:
+                headers['If-Range'] = validator
+        else:
+            offset = 0
+
+        transferred = 0
+        try:
+            with self._host_slot(job.url):
+                response = self.session_for(job.url).get(
+                    job.url, params=job.params, headers=headers, stream=True, timeout=self.timeout)
+                with response:
+                    if response.status_code == 416 and offset:
+                        # Nothing left to send: the partial file already holds every byte
+                        total = self._range_total(response.headers.get('Content-Range'))
+                        if total != offset:
+                            part_path.unlink()
+                            return DownloadResult(job.url, str(dest), 'failed', http_status=416,
+                                                  error='stale partial file discarded', seconds=time.time() - start)
+                    elif response.status_code not in (200, 206):
+                        return DownloadResult(job.url, str(dest), 'failed', http_status=response.status_code,
+                                              error=f'HTTP {response.status_code}', seconds=time.time() - start)
+                    else:
+                        resumed = response.status_code == 206
+                        if not resumed:
+                            offset = 0
+                        total = (self._range_total(response.headers.get('Content-Range')) if resumed
+                                 else int(response.headers.get('Content-Length') or 0) or None)
+                        if response.headers.get('Content-Encoding'):
+                            total = None  # Content-Length counts encoded bytes
+                        self._update_manifest(dest, {
+                            'url': full_url, 'status': 'partial',
+                            'etag': response.headers.get('ETag'),
+                            'last_modified': response.headers.get('Last-Modified'),
+                            'size': total
+                        })
+                        with open(part_path, 'ab' if resumed else 'wb') as f:
+                            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                                if chunk:
+                                    f.write(chunk)
+                                    transferred += len(chunk)
+        except requests.RequestException as e:
+            return DownloadResult(job.url, str(dest), 'failed', bytes_transferred=transferred,
+                                  error=str(e)[:200], seconds=time.time() - start)
+
+        # Verify before the file becomes visible under its final name
+        size = part_path.stat().st_size
+        expected = job.expected_size or total
+        if expected and size != expected:
+            error = f'size mismatch: expected {expected} bytes, got {size}'
+            if size > expected:
+                part_path.unlink()
+            return DownloadResult(job.url, str(dest), 'failed', size=size, bytes_transferred=transferred,
+                                  error=error, seconds=time.time() - start)
+
+        digest = file_sha256(part_path)
+        if job.sha256 and digest != job.sha256.lower():
+            part_path.unlink()
+            self._update_manifest(dest, None)
+            return DownloadResult(job.url, str(dest), 'failed', size=size, bytes_transferred=transferred,
+                                  sha256=digest, error='checksum mismatch', seconds=time.time() - start)
+
+        os.replace(part_path, dest)
+        entry = self.manifest['files'].get(str(dest), {})
+        self._update_manifest(dest, {
+            'url': full_url, 'status': 'complete', 'size': size, 'sha256': digest,
+            'etag': entry.get('etag'), 'last_modified': entry.get('last_modified'),
+            'completed': datetime.now().isoformat()
+        })
+        return DownloadResult(job.url, str(dest), 'resumed' if offset else 'downloaded', size=size,
+                              bytes_transferred=transferred, sha256=digest, seconds=time.time() - start)
+
+    @staticmethod
+    def _range_total(content_range: Optional[str]) -> Optional[int]:
+        """Total length from a Content-Range header ('bytes 100-199/2000' or 'bytes */2000')"""
+        if content_range and '/' in content_range:
+            total = content_range.rsplit('/', 1)[1]
+            if total.isdigit():
+                return int(total)
+        return None
+
+    def download_many(self, jobs: List[DownloadJob], refresh: bool = False,
+                      on_result: Optional[Callable[[DownloadJob, DownloadResult], None]] = None) -> List[DownloadResult]:
+        """Download jobs with bounded parallelism; results come back in job order"""
+        def run(job):
+            result = self.download(job, refresh=refresh)
+            if on_result:
+                on_result(job, result)
+            return result
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(run, jobs))
+
+    def summary(self, results: List[DownloadResult]) -> Dict:
+        counts = {}
+        for result in results:
+            counts[result.status] = counts.get(result.status, 0) + 1
+        return {
+            'files': len(results),
+            'by_status': counts,
+            'mb_transferred': round(sum(r.bytes_transferred for r in results) / (1024 * 1024), 1),
+            'failures': [asdict(r) for r in results if not r.ok]
+        }
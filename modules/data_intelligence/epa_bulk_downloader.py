@@ -2,19 +2,22 @@
 """
 EPA Bulk Data Downloader with Status Updates
 Downloads federal environmental databases from EPA's public repository
-Includes delays and progress reporting to prevent timeouts
+Includes progress reporting; transfers go through the shared DownloadEngine,
+so interrupted ZIPs resume and completed ones are skipped on rerun
 WINGMAN Federal Environmental Data Mission
 Date: 2025-08-10
 """
 
-import requests
-import time
+import sys
 import os
 import zipfile
 from pathlib import Path
 from datetime import datetime
 import json
 
+sys.path.append(str(Path(__file__).parent))
+from download_engine import DownloadEngine, DownloadJob
+
 class EPABulkDownloader:
     """Download EPA datasets with progress tracking and delays"""
     
@@ -29,6 +32,7 @@ class EPABulkDownloader:
         # Track what we download
         self.download_log = []
         self.start_time = datetime.now()
+        self.engine = DownloadEngine(self.output_path / "epa_bulk_download_manifest.json")
         
     def download_with_progress(self, url, output_file, description):
         """Download file with progress updates"""
@@ -38,64 +42,40 @@ class EPABulkDownloader:
         print(f"Target: {output_file.name}")
         print(f"{'='*60}")
         
-        try:
-            # Start download with streaming
-            response = requests.get(url, stream=True, timeout=30)
-            
-            if response.status_code == 200:
-                total_size = int(response.headers.get('content-length', 0))
-                
-                # Write file in chunks with progress updates
-                chunk_size = 8192
-                downloaded = 0
-                
-                with open(output_file, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=chunk_size):
-                        if chunk:
-                            f.write(chunk)
-                            downloaded += len(chunk)
-                            
-                            # Show progress every 100KB
-                            if downloaded % (100 * 1024) < chunk_size:
-                                if total_size > 0:
-                                    percent = (downloaded / total_size) * 100
-                                    print(f"Progress: {percent:.1f}% ({downloaded:,} / {total_size:,} bytes)")
-                                else:
-                                    print(f"Downloaded: {downloaded:,} bytes")
-                
-                file_size_mb = output_file.stat().st_size / (1024 * 1024)
-                print(f"✅ SUCCESS: Downloaded {file_size_mb:.1f} MB")
-                
-                # Log successful download
-                self.download_log.append({
-                    'file': output_file.name,
-                    'url': url,
-                    'size_mb': round(file_size_mb, 1),
-                    'status': 'success',
-                    'timestamp': datetime.now().isoformat()
-                })
-                
-                return True
-                
+        result = self.engine.download(DownloadJob(url, output_file, description=description))
+        
+        if result.ok:
+            if result.status == 'unchanged':
+                print(f"✓ Already complete: {output_file.name} ({result.size_mb:.1f} MB)")
             else:
-                print(f"❌ FAILED: HTTP {response.status_code}")
-                self.download_log.append({
-                    'file': output_file.name,
-                    'url': url,
-                    'status': f'failed_http_{response.status_code}',
-                    'timestamp': datetime.now().isoformat()
-                })
-                return False
-                
-        except Exception as e:
-            print(f"❌ ERROR: {str(e)}")
+                verb = 'Resumed and finished' if result.status == 'resumed' else 'Downloaded'
+                print(f"✅ SUCCESS: {verb} {result.size_mb:.1f} MB in {result.seconds:.1f}s")
+            
+            # Log successful download
             self.download_log.append({
                 'file': output_file.name,
                 'url': url,
-                'status': f'error_{type(e).__name__}',
+                'size_mb': round(result.size_mb, 1),
+                'sha256': result.sha256,
+                'status': 'success',
                 'timestamp': datetime.now().isoformat()
             })
-            return False
+            return True
+        
+        if result.http_status:
+            print(f"❌ FAILED: HTTP {result.http_status}")
+            status = f'failed_http_{result.http_status}'
+        else:
+            print(f"❌ ERROR: {result.error}")
+            status = 'error_download'
+        self.download_log.append({
+            'file': output_file.name,
+            'url': url,
+            'status': status,
+            'error': result.error,
+            'timestamp': datetime.now().isoformat()
+        })
+        return False
     
     def extract_zip(self, zip_file):
         """Extract ZIP file if it exists"""
@@ -123,7 +103,7 @@ class EPABulkDownloader:
         return False
     
     def run_downloads(self):
-        """Execute downloads with delays between files"""
+        """Execute downloads, skipping completed files and resuming partial ones"""
         
         print("\n" + "="*80)
         print("EPA FEDERAL ENVIRONMENTAL DATA BULK DOWNLOAD")
@@ -164,7 +144,7 @@ class EPABulkDownloader:
             }
         ]
         
-        # Process each download with delays
+        # Process each download
         for i, dl in enumerate(downloads, 1):
             print(f"\n{'='*60}")
             print(f"DOWNLOAD {i} OF {len(downloads)}")
@@ -176,24 +156,18 @@ class EPABulkDownloader:
             
             output_file = output_dir / dl['file']
             
-            # Check if already exists
-            if output_file.exists():
+            # Files fetched before the manifest existed are trusted as-is
+            legacy_copy = output_file.exists() and str(output_file) not in self.engine.manifest['files']
+            if legacy_copy:
                 print(f"⚠️ {dl['file']} already exists, skipping download")
-                if dl.get('extract'):
-                    self.extract_zip(output_file)
+                success = True
             else:
-                # Download the file
+                # Completed files are skipped instantly; partial ones resume
                 success = self.download_with_progress(dl['url'], output_file, dl['desc'])
-                
-                # Extract if successful and requested
-                if success and dl.get('extract'):
-                    time.sleep(2)  # Brief pause before extraction
-                    self.extract_zip(output_file)
             
-            # Delay between downloads (except last one)
-            if i < len(downloads):
-                print(f"\n⏳ Waiting 5 seconds before next download...")
-                time.sleep(5)
+            # Extract if successful and requested (once per archive)
+            if success and dl.get('extract') and not (output_file.parent / output_file.stem).exists():
+                self.extract_zip(output_file)
         
         # Save download log
         self.save_summary()
@@ -279,7 +253,7 @@ Generated by: Colosseum LIHTC Platform - WINGMAN Agent
 def main():
     print("\n🚀 EPA BULK DATA DOWNLOADER")
     print("This will download key EPA environmental datasets")
-    print("Including delays to prevent timeouts")
+    print("Interrupted downloads resume; completed files are skipped")
     print("-"*60)
     
     downloader = EPABulkDownloader()
@@ -3,16 +3,19 @@
 EPA Intelligent Downloader
 Downloads priority EPA environmental files based on deep crawl results
 Organizes by data type and manages large downloads efficiently
+Transfers run through the shared DownloadEngine: parallel, resumable, and
+files recorded complete in the manifest are skipped on rerun
 WINGMAN Federal Environmental Data Mission - Smart Download
 Date: 2025-08-10
 """
 
-import requests
+import sys
 import json
-import time
 from pathlib import Path
 from datetime import datetime
-import concurrent.futures
+
+sys.path.append(str(Path(__file__).parent))
+from download_engine import DownloadEngine, DownloadJob
 
 class EPAIntelligentDownloader:
     """Smart downloader for EPA environmental data"""
@@ -25,6 +28,8 @@ class EPAIntelligentDownloader:
         self.download_list_file = self.base_path / "data_sets" / "federal" / "epa_priority_download_list.json"
         self.download_log = []
         self.start_time = datetime.now()
+        self.engine = DownloadEngine(self.base_path / "data_sets" / "federal" / "epa_download_manifest.json",
+                                     max_workers=4, per_host_limit=4)
         
         # Category mappings for organization
         self.categories = {
@@ -65,86 +70,84 @@ class EPAIntelligentDownloader:
         
         return 'Other'
     
+    def output_file_for(self, file_info):
+        """Category-organized destination for a crawled file"""
+        category = self.categorize_file(file_info)
+        return category, self.output_path / category / file_info['directory'] / file_info['filename']
+    
     def download_file(self, file_info, max_size_mb=500):
         """Download a single file with size limits"""
-        
-        # Skip very large files initially
-        if file_info['size_mb'] > max_size_mb:
-            print(f"  ⏭️ Skipping large file ({file_info['size_mb']:.1f} MB): {file_info['filename']}")
-            self.download_log.append({
-                'file': file_info['filename'],
-                'status': 'skipped_size',
-                'size_mb': file_info['size_mb']
-            })
-            return False
-        
-        # Determine output directory by category
-        category = self.categorize_file(file_info)
-        output_dir = self.output_path / category / file_info['directory']
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_file = output_dir / file_info['filename']
-        
-        # Skip if already downloaded
-        if output_file.exists():
-            existing_size = output_file.stat().st_size / (1024 * 1024)
-            if existing_size > 0.01:  # Skip if more than 10KB
+        return self.download_files([file_info], max_size_mb)[0]
+    
+    def download_files(self, file_infos, max_size_mb=500):
+        """Download files in parallel through the shared engine; returns one success flag per file"""
+        jobs = []
+        job_info = {}
+        for file_info in file_infos:
+            # Skip very large files initially
+            if file_info['size_mb'] > max_size_mb:
+                print(f"  ⏭️ Skipping large file ({file_info['size_mb']:.1f} MB): {file_info['filename']}")
+                self.download_log.append({
+                    'file': file_info['filename'],
+                    'status': 'skipped_size',
+                    'size_mb': file_info['size_mb']
+                })
+                continue
+            
+            category, output_file = self.output_file_for(file_info)
+            
+            # Files fetched before the manifest existed count as downloaded
+            if output_file.exists() and output_file.stat().st_size > 10 * 1024 and \
+                    str(output_file) not in self.engine.manifest['files']:
                 print(f"  ✓ Already exists: {file_info['filename']}")
                 self.download_log.append({
                     'file': file_info['filename'],
                     'status': 'already_exists',
                     'category': category
                 })
-                return True
-        
-        print(f"  ⬇️ Downloading: {file_info['filename']} ({file_info['size_display']})")
-        print(f"     Category: {category}")
-        
-        try:
-            response = requests.get(file_info['url'], stream=True, timeout=60)
+                continue
             
-            if response.status_code == 200:
-                total_size = int(response.headers.get('content-length', 0))
-                downloaded = 0
-                
-                with open(output_file, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=32768):
-                        if chunk:
-                            f.write(chunk)
-                            downloaded += len(chunk)
-                            
-                            # Progress update every 10MB
-                            if downloaded % (10 * 1024 * 1024) < 32768 and total_size > 0:
-                                percent = (downloaded / total_size) * 100
-                                print(f"     Progress: {percent:.1f}%")
-                
-                actual_size = output_file.stat().st_size / (1024 * 1024)
-                print(f"  ✅ Success: {actual_size:.1f} MB saved")
-                
-                self.download_log.append({
+            jobs.append(DownloadJob(file_info['url'], output_file, description=file_info['filename']))
+            job_info[str(output_file)] = (file_info, category)
+        
+        def report(job, result):
+            file_info, category = job_info[str(job.dest)]
+            output_file = Path(job.dest)
+            if result.status == 'unchanged':
+                print(f"  ✓ Already exists: {file_info['filename']}")
+                entry = {'file': file_info['filename'], 'status': 'already_exists', 'category': category}
+            elif result.ok:
+                verb = 'Resumed' if result.status == 'resumed' else 'Success'
+                print(f"  ✅ {verb}: {file_info['filename']} ({result.size_mb:.1f} MB)")
+                entry = {
                     'file': file_info['filename'],
                     'status': 'success',
-                    'size_mb': actual_size,
+                    'size_mb': result.size_mb,
                     'category': category,
-                    'path': str(output_file.relative_to(self.base_path))
-                })
-                
-                return True
+                    'path': str(output_file.relative_to(self.base_path)),
+                    'sha256': result.sha256
+                }
+            elif result.http_status:
+                print(f"  ❌ HTTP {result.http_status}: {file_info['filename']}")
+                entry = {'file': file_info['filename'], 'status': f'http_{result.http_status}'}
             else:
-                print(f"  ❌ HTTP {response.status_code}")
-                self.download_log.append({
-                    'file': file_info['filename'],
-                    'status': f'http_{response.status_code}'
-                })
-                return False
-                
-        except Exception as e:
-            print(f"  ❌ Error: {str(e)[:100]}")
-            self.download_log.append({
-                'file': file_info['filename'],
-                'status': 'error',
-                'error': str(e)[:200]
-            })
-            return False
+                print(f"  ❌ Error: {file_info['filename']}: {(result.error or '')[:100]}")
+                entry = {'file': file_info['filename'], 'status': 'error', 'error': (result.error or '')[:200]}
+            self.download_log.append(entry)
+        
+        if jobs:
+            print(f"  ⬇️ Downloading {len(jobs)} files ({self.engine.max_workers} parallel)")
+        results = {str(job.dest): result for job, result in
+                   zip(jobs, self.engine.download_many(jobs, on_result=report))}
+        
+        flags = []
+        for file_info in file_infos:
+            if file_info['size_mb'] > max_size_mb:
+                flags.append(False)
+                continue
+            result = results.get(str(self.output_file_for(file_info)[1]))
+            flags.append(True if result is None else result.ok)  # None: pre-existing file
+        return flags
     
     def run_intelligent_download(self, max_files=100, max_size_mb=500):
         """Execute intelligent download of priority files"""
@@ -170,26 +173,17 @@ class EPAIntelligentDownloader:
         success_count = 0
         total_downloaded_mb = 0
         
-        # Download files
-        for i, file_info in enumerate(files_to_download, 1):
-            print(f"\n[{i}/{len(files_to_download)}] Priority Score: {file_info['priority_score']}")
-            print(f"  File: {file_info['filename']}")
-            print(f"  Path: {file_info['directory']}")
+        # Download files in batches of 10, saving progress after each batch
+        for batch_start in range(0, len(files_to_download), 10):
+            batch = files_to_download[batch_start:batch_start + 10]
+            print(f"\n[{batch_start + 1}-{batch_start + len(batch)}/{len(files_to_download)}] "
+                  f"Priority Scores: {batch[0]['priority_score']} - {batch[-1]['priority_score']}")
             
-            if self.download_file(file_info, max_size_mb):
-                success_count += 1
-                if 'size_mb' in self.download_log[-1]:
-                    total_downloaded_mb += self.download_log[-1]['size_mb']
-            
-            # Delay between downloads
-            time.sleep(3)
-            
-            # Save progress every 10 files
-            if i % 10 == 0:
-                self.save_progress()
-        
-        # Final save
-        self.save_progress()
+            log_start = len(self.download_log)
+            success_count += sum(self.download_files(batch, max_size_mb))
+            total_downloaded_mb += sum(entry.get('size_mb', 0) for entry in self.download_log[log_start:]
+                                       if entry.get('status') == 'success')
+            self.save_progress()
         
         # Generate download report
         self.generate_report(success_count, total_downloaded_mb)
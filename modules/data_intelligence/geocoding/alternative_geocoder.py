@@ -4,27 +4,168 @@ Alternative Geocoding System for Colosseum Platform
 Replaces Position Stack due to their ongoing technical issues
 Supports multiple geocoding providers with fallback options
 
+Batch mode (geocode_batch):
+- One SQLite cache keyed by normalized address, including negative (no-match) entries
+- Census batch CSV endpoint resolves up to 10,000 addresses per request
+- Remaining addresses fan out over a thread pool; each provider has its own token bucket
+
 Author: Strike Leader
 Date: 2025-08-09
 """
 
 import requests
+import csv
+import io
 import json
+import re
+import sqlite3
+import threading
 import time
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 from pathlib import Path
 import logging
 from datetime import datetime
-import hashlib
+
+CENSUS_BATCH_URL = 'https://geocoding.geo.census.gov/geocoder/locations/addressbatch'
+CENSUS_BATCH_LIMIT = 10000  # rows per addressbatch upload (Census service limit)
+NEGATIVE_CACHE_DAYS = 30
+
+_ADDRESS_ABBREVIATIONS = {
+    'STREET': 'ST', 'AVENUE': 'AVE', 'BOULEVARD': 'BLVD', 'DRIVE': 'DR', 'ROAD': 'RD',
+    'LANE': 'LN', 'COURT': 'CT', 'PLACE': 'PL', 'PARKWAY': 'PKWY', 'HIGHWAY': 'HWY',
+    'CIRCLE': 'CIR', 'TERRACE': 'TER', 'SUITE': 'STE', 'APARTMENT': 'APT',
+    'NORTH': 'N', 'SOUTH': 'S', 'EAST': 'E', 'WEST': 'W',
+    'NORTHEAST': 'NE', 'NORTHWEST': 'NW', 'SOUTHEAST': 'SE', 'SOUTHWEST': 'SW'
+}
+
+
+def normalize_address(address: str) -> str:
+    """Cache key for an address: upper case, no punctuation, standard USPS abbreviations"""
+    text = re.sub(r"[^A-Z0-9# ]+", ' ', (address or '').upper())
+    return ' '.join(_ADDRESS_ABBREVIATIONS.get(token, token) for token in text.split())
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests per second with bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1.0
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+class GeocodeCache:
+    """SQLite geocode cache keyed by normalized address, with negative caching of misses"""
+
+    def __init__(self, db_path: Path, negative_ttl_days: float = NEGATIVE_CACHE_DAYS):
+        self.db_path = str(db_path)
+        self.negative_ttl = negative_ttl_days * 86400
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS geocodes (
+                address_key TEXT PRIMARY KEY,
+                address TEXT,
+                found INTEGER,
+                result TEXT,
+                provider TEXT,
+                updated_at REAL
+            );
+        """)
+        self.conn.commit()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Cached entries for the given keys. A key maps to its result dict, or to None for
+        a still-valid negative entry; keys with no usable entry are absent.
+        """
+        keys = list(dict.fromkeys(keys))
+        cutoff = time.time() - self.negative_ttl
+        entries = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self.conn.execute(
+                    f"SELECT address_key, found, result, updated_at FROM geocodes "
+                    f"WHERE address_key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for key, found, result, updated_at in rows:
+                    if found:
+                        entries[key] = json.loads(result)
+                    elif updated_at >= cutoff:
+                        entries[key] = None
+        return entries
+
+    def get(self, key: str) -> Tuple[bool, Optional[Dict]]:
+        """(hit, result) for one key; a negative hit is (True, None)"""
+        entries = self.get_many([key])
+        return (key in entries, entries.get(key))
+
+    def put_many(self, entries: Iterable[Tuple[str, str, Optional[Dict]]]):
+        """Store (key, address, result-or-None) rows in one transaction"""
+        now = time.time()
+        rows = [(key, address, int(result is not None),
+                 json.dumps(result) if result is not None else None,
+                 result.get('provider') if result is not None else None, now)
+                for key, address, result in entries]
+        if not rows:
+            return
+        with self._lock:
+            self.conn.executemany("INSERT OR REPLACE INTO geocodes VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self.conn.commit()
+
+    def put(self, key: str, address: str, result: Optional[Dict]):
+        self.put_many([(key, address, result)])
+
+    def import_json_cache(self, cache_dir: Path) -> int:
+        """One-time import of the legacy one-JSON-file-per-address cache"""
+        entries = []
+        for cache_file in Path(cache_dir).glob('*.json'):
+            try:
+                with open(cache_file, 'r') as f:
+                    result = json.load(f)
+            except (OSError, ValueError):
+                continue
+            address = result.get('cached_address')
+            if address and 'latitude' in result:
+                entries.append((normalize_address(address), address, result))
+        self.put_many(entries)
+        return len(entries)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            found, missing = self.conn.execute(
+                "SELECT COALESCE(SUM(found), 0), COALESCE(SUM(1 - found), 0) FROM geocodes"
+            ).fetchone()
+        return {'found': found, 'not_found': missing}
+
 
 class AlternativeGeocoder:
     """Multi-provider geocoding system with fallback support"""
     
-    def __init__(self, cache_dir: str = None):
+    def __init__(self, cache_dir: str = None, negative_ttl_days: float = NEGATIVE_CACHE_DAYS):
         """Initialize geocoder with caching support"""
         self.cache_dir = Path(cache_dir or "/Users/williamrice/Library/CloudStorage/Dropbox-HERR/Bill Rice/Colosseum/cache/geocoding")
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         
+        # Single SQLite cache; the legacy per-address JSON files are imported once
+        db_path = self.cache_dir / "geocode_cache.sqlite"
+        first_open = not db_path.exists()
+        self.cache = GeocodeCache(db_path, negative_ttl_days)
+        
         # Setup logging
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
@@ -59,7 +200,27 @@ class AlternativeGeocoder:
             }
         }
         
-        self.last_request_time = {}
+        if first_open:
+            imported = self.cache.import_json_cache(self.cache_dir)
+            if imported:
+                self.logger.info(f"Imported {imported} legacy JSON cache entries into {db_path.name}")
+        
+        # Single-address and bulk call paths per provider (tests swap in stubs here)
+        self.provider_functions: Dict[str, Callable[[str], Optional[Dict]]] = {
+            'nominatim': self._geocode_nominatim,
+            'census': self._geocode_census,
+            'mapbox': self._geocode_mapbox,
+            'google': self._geocode_google
+        }
+        self.batch_provider_functions: Dict[str, Callable[[List[Dict]], Dict[str, Optional[Dict]]]] = {
+            'census': self._batch_geocode_census
+        }
+        
+        # rate_limit is the minimum spacing in seconds, i.e. 1/rate_limit requests per second
+        self.rate_limiters = {
+            name: TokenBucket(1.0 / config['rate_limit'])
+            for name, config in self.providers.items()
+        }
         
     def geocode(self, address: str, city: str = None, state: str = None, 
                 zip_code: str = None, provider: str = None) -> Optional[Dict]:
@@ -79,34 +240,43 @@ class AlternativeGeocoder:
         # Build full address string
         full_address = self._build_address(address, city, state, zip_code)
         
-        # Check cache first
-        cached = self._check_cache(full_address)
-        if cached:
+        # Check cache first (a cached miss short-circuits too)
+        hit, cached = self.cache.get(normalize_address(full_address))
+        if hit:
             self.logger.info(f"Cache hit for: {full_address}")
             return cached
         
-        # Try specified provider or iterate through available providers
+        result, definitive = self._geocode_with_fallback(full_address, self._providers_to_try(provider))
+        if result or definitive:
+            self._save_to_cache(full_address, result)
+        if not result:
+            self.logger.error(f"All providers failed for address: {full_address}")
+        return result
+    
+    def _providers_to_try(self, provider: str = None) -> List[str]:
+        """Specified provider, or enabled providers in priority order"""
         if provider and provider in self.providers:
-            providers_to_try = [provider]
-        else:
-            providers_to_try = sorted(
-                [p for p, config in self.providers.items() if config['enabled']],
-                key=lambda x: self.providers[x]['priority']
-            )
-        
-        for provider_name in providers_to_try:
+            return [provider]
+        return sorted(
+            [p for p, config in self.providers.items() if config['enabled']],
+            key=lambda x: self.providers[x]['priority']
+        )
+    
+    def _geocode_with_fallback(self, address: str, providers: List[str]) -> Tuple[Optional[Dict], bool]:
+        """
+        Try providers in order. Returns (result, definitive); definitive is False when
+        any provider errored, so a miss caused by an outage is not negatively cached.
+        """
+        definitive = True
+        for provider_name in providers:
             try:
-                result = self._geocode_with_provider(provider_name, full_address)
+                result = self._geocode_with_provider(provider_name, address)
                 if result:
-                    # Cache successful result
-                    self._save_to_cache(full_address, result)
-                    return result
+                    return result, True
             except Exception as e:
                 self.logger.warning(f"Provider {provider_name} failed: {str(e)}")
-                continue
-        
-        self.logger.error(f"All providers failed for address: {full_address}")
-        return None
+                definitive = False
+        return None, definitive
     
     def _build_address(self, address: str, city: str = None, 
                        state: str = None, zip_code: str = None) -> str:
@@ -126,16 +296,9 @@ class AlternativeGeocoder:
         # Rate limiting
         self._enforce_rate_limit(provider)
         
-        if provider == 'nominatim':
-            return self._geocode_nominatim(address)
-        elif provider == 'census':
-            return self._geocode_census(address)
-        elif provider == 'mapbox':
-            return self._geocode_mapbox(address)
-        elif provider == 'google':
-            return self._geocode_google(address)
-        else:
+        if provider not in self.provider_functions:
             raise ValueError(f"Unknown provider: {provider}")
+        return self.provider_functions[provider](address)
     
     def _geocode_nominatim(self, address: str) -> Optional[Dict]:
         """Geocode using OpenStreetMap Nominatim (FREE)"""
@@ -192,6 +355,49 @@ class AlternativeGeocoder:
                 }
         return None
     
+    def _batch_geocode_census(self, records: List[Dict]) -> Dict[str, Optional[Dict]]:
+        """
+        Geocode up to CENSUS_BATCH_LIMIT structured addresses with one addressbatch upload.
+        records: dicts with id, address, city, state, zip_code. Returns id -> result or None.
+        """
+        upload = io.StringIO()
+        writer = csv.writer(upload)
+        for record in records:
+            writer.writerow([record['id'], record.get('address') or '', record.get('city') or '',
+                             record.get('state') or '', record.get('zip_code') or ''])
+        
+        response = requests.post(
+            CENSUS_BATCH_URL,
+            data={'benchmark': 'Public_AR_Current'},
+            files={'addressFile': ('addresses.csv', upload.getvalue(), 'text/csv')},
+            timeout=600
+        )
+        response.raise_for_status()
+        return self._parse_census_batch(response.text)
+    
+    @staticmethod
+    def _parse_census_batch(text: str) -> Dict[str, Optional[Dict]]:
+        """Parse addressbatch output: id, input, Match/No_Match/Tie, type, matched address, "lon,lat", ..."""
+        results = {}
+        timestamp = datetime.now().isoformat()
+        for row in csv.reader(io.StringIO(text)):
+            if len(row) < 3:
+                continue
+            record_id = row[0]
+            if row[2] == 'Match' and len(row) >= 6 and ',' in row[5]:
+                lon, lat = row[5].split(',')[:2]
+                results[record_id] = {
+                    'latitude': float(lat),
+                    'longitude': float(lon),
+                    'formatted_address': row[4],
+                    'provider': 'census',
+                    'confidence': 1.0 if row[3] == 'Exact' else 0.8,
+                    'timestamp': timestamp
+                }
+            else:
+                results[record_id] = None
+        return results
+    
     def _geocode_mapbox(self, address: str) -> Optional[Dict]:
         """Geocode using Mapbox (requires API key)"""
         api_key = self.providers['mapbox'].get('api_key')
@@ -251,78 +457,161 @@ class AlternativeGeocoder:
         return None
     
     def _enforce_rate_limit(self, provider: str):
-        """Enforce rate limiting for provider"""
-        rate_limit = self.providers[provider]['rate_limit']
-        
-        if provider in self.last_request_time:
-            elapsed = time.time() - self.last_request_time[provider]
-            if elapsed < rate_limit:
-                time.sleep(rate_limit - elapsed)
-        
-        self.last_request_time[provider] = time.time()
+        """Enforce rate limiting for provider (per-provider token bucket, thread-safe)"""
+        self.rate_limiters[provider].acquire()
     
     def _check_cache(self, address: str) -> Optional[Dict]:
         """Check if address is in cache"""
-        cache_key = hashlib.md5(address.lower().encode()).hexdigest()
-        cache_file = self.cache_dir / f"{cache_key}.json"
-        
-        if cache_file.exists():
-            try:
-                with open(cache_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                self.logger.warning(f"Cache read error: {str(e)}")
-        
-        return None
+        return self.cache.get(normalize_address(address))[1]
     
-    def _save_to_cache(self, address: str, result: Dict):
-        """Save geocoding result to cache"""
-        cache_key = hashlib.md5(address.lower().encode()).hexdigest()
-        cache_file = self.cache_dir / f"{cache_key}.json"
-        
-        try:
+    def _save_to_cache(self, address: str, result: Optional[Dict]):
+        """Save geocoding result (or a definitive miss) to cache"""
+        if result is not None:
             result['cached_address'] = address
-            with open(cache_file, 'w') as f:
-                json.dump(result, f, indent=2)
-        except Exception as e:
+        try:
+            self.cache.put(normalize_address(address), address, result)
+        except sqlite3.Error as e:
             self.logger.warning(f"Cache write error: {str(e)}")
     
-    def batch_geocode(self, addresses: List[Dict], provider: str = None) -> List[Dict]:
+    def geocode_batch(self, addresses: List[Dict], provider: str = None,
+                      max_workers: int = 8) -> List[Dict]:
         """
-        Geocode multiple addresses
+        Geocode many addresses in one call (e.g. a 20k-row CoStar or TDHCA list)
+        
+        1. Duplicate addresses collapse onto one normalized cache key; cached hits and
+           cached misses are answered from SQLite in bulk
+        2. Providers with a bulk endpoint (Census addressbatch) go first, since one
+           upload covers thousands of rows
+        3. Whatever is left fans out over a thread pool, each address walking the
+           single-address fallback chain; per-provider token buckets keep every
+           provider within its own rate limit
         
         Args:
-            addresses: List of dicts with address components
+            addresses: List of dicts with address, city, state, zip_code
             provider: Specific provider to use (optional)
+            max_workers: Concurrent single-address lookups
             
         Returns:
-            List of geocoding results
+            Results in input order; failures are {'error': ..., 'original': ...}
         """
-        results = []
-        total = len(addresses)
+        full_addresses = [
+            self._build_address(a.get('address', ''), a.get('city'), a.get('state'), a.get('zip_code'))
+            for a in addresses
+        ]
+        keys = [normalize_address(full_address) for full_address in full_addresses]
         
-        for i, addr_dict in enumerate(addresses, 1):
-            self.logger.info(f"Geocoding {i}/{total}: {addr_dict.get('address', '')}")
-            
-            result = self.geocode(
-                address=addr_dict.get('address', ''),
-                city=addr_dict.get('city'),
-                state=addr_dict.get('state'),
-                zip_code=addr_dict.get('zip_code'),
-                provider=provider
-            )
-            
+        # One representative record per distinct key
+        pending = {}
+        for addr_dict, full_address, key in zip(addresses, full_addresses, keys):
+            pending.setdefault(key, (addr_dict, full_address))
+        
+        resolved = self.cache.get_many(pending)
+        self.logger.info(f"Batch geocode: {len(addresses)} rows, {len(pending)} distinct, "
+                         f"{len(resolved)} cached")
+        pending = {key: value for key, value in pending.items() if key not in resolved}
+        
+        providers = self._providers_to_try(provider)
+        bulk_done = set()
+        new_entries = []
+        for provider_name in providers:
+            if provider_name not in self.batch_provider_functions or not pending:
+                continue
+            found = self._run_bulk_provider(provider_name, pending)
+            if found is None:
+                continue
+            bulk_done.add(provider_name)
+            for key, result in found.items():
+                result['cached_address'] = pending[key][1]
+                resolved[key] = result
+                new_entries.append((key, pending.pop(key)[1], result))
+        self.cache.put_many(new_entries)
+        
+        # Single-address fan-out over the providers the bulk pass did not already try
+        remaining_providers = [p for p in providers if p not in bulk_done]
+        
+        def lookup(item):
+            key, (_, full_address) = item
+            if not remaining_providers:
+                return key, full_address, None, True
+            result, definitive = self._geocode_with_fallback(full_address, remaining_providers)
+            return key, full_address, result, definitive
+        
+        new_entries = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for i, (key, full_address, result, definitive) in enumerate(
+                    executor.map(lookup, list(pending.items())), 1):
+                if result is not None:
+                    result['cached_address'] = full_address
+                if result is not None or definitive:
+                    new_entries.append((key, full_address, result))
+                resolved[key] = result
+                if len(new_entries) >= 500:
+                    self.cache.put_many(new_entries)
+                    new_entries = []
+                if i % 100 == 0:
+                    self.logger.info(f"Geocoded {i}/{len(pending)} remaining addresses")
+        self.cache.put_many(new_entries)
+        
+        results = []
+        for addr_dict, key in zip(addresses, keys):
+            result = resolved.get(key)
             if result:
-                result['original'] = addr_dict
-                results.append(result)
+                results.append(dict(result, original=addr_dict))
             else:
-                results.append({
-                    'error': 'Geocoding failed',
-                    'original': addr_dict
-                })
+                results.append({'error': 'Geocoding failed', 'original': addr_dict})
         
+        matched = sum(1 for r in results if 'error' not in r)
+        self.logger.info(f"Batch geocode complete: {matched}/{len(results)} matched")
         return results
     
+    def _run_bulk_provider(self, provider_name: str,
+                           pending: Dict[str, Tuple[Dict, str]]) -> Optional[Dict[str, Dict]]:
+        """
+        Submit pending addresses to a bulk endpoint in CENSUS_BATCH_LIMIT chunks.
+        Returns key -> result for matches, or None if every chunk failed (provider down).
+        No-match rows, and rows of a chunk whose upload failed, stay pending so the
+        single-address providers can still try them.
+        """
+        items = list(pending.items())
+        found = {}
+        chunk_starts = range(0, len(items), CENSUS_BATCH_LIMIT)
+        failed_chunks = 0
+        for start in chunk_starts:
+            chunk = items[start:start + CENSUS_BATCH_LIMIT]
+            records = [dict(id=str(i), address=addr_dict.get('address', ''), city=addr_dict.get('city'),
+                            state=addr_dict.get('state'), zip_code=addr_dict.get('zip_code'))
+                       for i, (_, (addr_dict, _)) in enumerate(chunk)]
+            self._enforce_rate_limit(provider_name)
+            try:
+                batch_results = self.batch_provider_functions[provider_name](records)
+            except Exception as e:
+                failed_chunks += 1
+                self.logger.warning(f"Bulk provider {provider_name} failed on rows "
+                                    f"{start}-{start + len(chunk) - 1}: {str(e)}")
+                continue
+            for i, (key, _) in enumerate(chunk):
+                result = batch_results.get(str(i))
+                if result:
+                    found[key] = result
+            self.logger.info(f"{self.providers[provider_name]['name']} batch: "
+                             f"{len(found)} matched of {start + len(chunk)} submitted")
+        if failed_chunks == len(chunk_starts):
+            return None
+        return found
+    
+    def batch_geocode(self, addresses: List[Dict], provider: str = None) -> List[Dict]:
+        """
+        Geocode multiple addresses
+        
+        Args:
+            addresses: List of dicts with address components
+            provider: Specific provider to use (optional)
+            
+        Returns:
+            List of geocoding results
+        """
+        return self.geocode_batch(addresses, provider=provider)
+    
     def configure_api_key(self, provider: str, api_key: str):
         """Configure API key for paid providers"""
         if provider in ['mapbox', 'google']:
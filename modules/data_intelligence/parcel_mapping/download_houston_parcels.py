@@ -7,6 +7,7 @@ Output: /data_sets/Texas/Parcels/houston_parcels.geojson
 """
 
 import os
+import sys
 import requests
 import geopandas as gpd
 import pandas as pd
@@ -14,6 +15,10 @@ from datetime import datetime
 import zipfile
 import tempfile
 import json
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from arcgis_harvester import ArcGISHarvester, parse_query_url, read_feature_collection
 
 def create_output_directory():
     """Create the Texas parcels directory if it doesn't exist"""
@@ -54,14 +59,24 @@ def download_harris_county_parcels():
                 'User-Agent': 'Colosseum-LIHTC-Analyzer/1.0 (Affordable Housing Research)'
             }
             
-            response = requests.get(source['url'], headers=headers, timeout=300)
-            response.raise_for_status()
-            
-            print(f"✅ Downloaded {len(response.content):,} bytes")
+            arcgis_query = parse_query_url(source['url'])
+            if arcgis_query:
+                # Feature-service query: page through every parcel in parallel (a single
+                # request stops at maxRecordCount) and keep an incremental GeoParquet copy
+                layer_dir = os.path.join(output_dir, "arcgis_layers", "houston_parcels")
+                harvest = ArcGISHarvester(arcgis_query['layer_url'], where=arcgis_query['where'],
+                                          out_fields=arcgis_query['out_fields'], headers=headers).sync(layer_dir)
+                print(f"✅ Harvested {harvest['total_features']:,} features ({harvest['mode']}, {harvest['seconds']}s)")
+                response = None
+            else:
+                response = requests.get(source['url'], headers=headers, timeout=300)
+                response.raise_for_status()
+                
+                print(f"✅ Downloaded {len(response.content):,} bytes")
             
             # Try to parse as GeoJSON directly
             try:
-                data = response.json()
+                data = read_feature_collection(layer_dir) if arcgis_query else response.json()
                 
                 if 'features' in data:
                     print(f"📊 Found {len(data['features'])} parcel features")
@@ -13,9 +13,14 @@ import pandas as pd
 from pathlib import Path
 from datetime import datetime
 import json
+import shutil
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.append(str(Path(__file__).parent))
+from columnar_warehouse import ColumnarWarehouse
+
 class EPAGeodatabaseProcessor:
     """Process EPA geodatabase files to extract site locations"""
     
@@ -25,7 +30,10 @@ class EPAGeodatabaseProcessor:
         self.output_path = self.base_path / "data_sets" / "federal" / "EPA_Sites"
         self.output_path.mkdir(parents=True, exist_ok=True)
         
-        self.processed_sites = []
+        # Each geodatabase becomes one Parquet partition, rebuilt only when its archive changes
+        self.warehouse = ColumnarWarehouse(self.output_path / "parquet_warehouse")
+        self.total_sites_extracted = 0
+        self.unique_sites = 0
         self.processing_log = []
         self.start_time = datetime.now()
         
@@ -46,16 +54,59 @@ class EPAGeodatabaseProcessor:
         return sorted(gdb_files, key=lambda x: x['size_mb'])  # Process smaller files first
     
     def process_geodatabase(self, gdb_info):
-        """Extract environmental sites from a geodatabase"""
+        """Extract environmental sites from a geodatabase (skipped when the archive is unchanged)"""
         print(f"\nProcessing: {gdb_info['filename']}")
         print(f"  Category: {gdb_info['category']}, Region: {gdb_info['region']}")
         print(f"  Size: {gdb_info['size_mb']:.1f} MB")
         
+        partition = f"{gdb_info['region']}__{gdb_info['filename'].replace('.gdb.zip', '')}".replace(' ', '_')
+        
+        try:
+            rebuilt = self.warehouse.ingest_partition(
+                'epa_sites', partition, gdb_info['path'],
+                lambda: self.extract_geodatabase_sites(gdb_info)
+            )
+        except Exception as e:
+            print(f"  ❌ Error: {str(e)[:200]}")
+            self.processing_log.append({
+                'file': gdb_info['filename'],
+                'status': 'error',
+                'error': str(e)[:200]
+            })
+            return 0
+        
+        entry = self.warehouse.manifest['tables'].get(f"epa_sites/{partition}")
+        if entry is None:
+            # Unreadable archive: already logged by the extractor, retried on the next run
+            return 0
+        
+        sites_extracted = entry['rows']
+        if not rebuilt:
+            print(f"  ⏭️ Unchanged since last run ({sites_extracted} sites in warehouse)")
+            self.processing_log.append({
+                'file': gdb_info['filename'],
+                'status': 'unchanged',
+                'sites_extracted': sites_extracted
+            })
+        
+        self.total_sites_extracted += sites_extracted
+        return sites_extracted
+    
+    @staticmethod
+    def _first_present(gdf, fields):
+        """Per row, the first of `fields` that has a value (as text), else None"""
+        present = [field for field in fields if field in gdf.columns]
+        if not present:
+            return pd.Series(None, index=gdf.index, dtype=object)
+        values = gdf[present].astype(object).bfill(axis=1).iloc[:, 0]
+        return values.map(lambda value: None if pd.isna(value) else str(value))
+    
+    def extract_geodatabase_sites(self, gdb_info):
+        """Unzip a geodatabase and return its site locations as one DataFrame (None when unreadable)"""
+        extract_dir = self.output_path / "temp_extract"
+        extract_dir.mkdir(exist_ok=True)
+        
         try:
-            # Extract the geodatabase
-            extract_dir = self.output_path / "temp_extract"
-            extract_dir.mkdir(exist_ok=True)
-            
             with zipfile.ZipFile(gdb_info['path'], 'r') as zip_ref:
                 zip_ref.extractall(extract_dir)
             
@@ -67,7 +118,7 @@ class EPAGeodatabaseProcessor:
                     'file': gdb_info['filename'],
                     'status': 'no_gdb_found'
                 })
-                return 0
+                return None
             
             gdb_path = gdb_dirs[0]
             
@@ -81,12 +132,16 @@ class EPAGeodatabaseProcessor:
                     'file': gdb_info['filename'],
                     'status': 'read_error'
                 })
-                return 0
+                return None
+            
+            layer_frames = []
+            layer_errors = 0
             
-            sites_extracted = 0
+            # list_layers returns a (name, geometry_type) DataFrame; iterate its rows, not its columns
+            layer_rows = layers.itertuples(index=False, name=None) if hasattr(layers, 'itertuples') else layers
             
             # Process each layer
-            for layer_info in layers:
+            for layer_info in layer_rows:
                 # Handle both tuple and single value returns
                 if isinstance(layer_info, tuple):
                     layer_name = layer_info[0]
@@ -110,55 +165,46 @@ class EPAGeodatabaseProcessor:
                         
                         # Extract coordinates
                         if layer_type in ['Point', 'MultiPoint']:
-                            gdf['longitude'] = gdf.geometry.x
-                            gdf['latitude'] = gdf.geometry.y
+                            points = gdf.geometry
                         else:
                             # For polygons, use centroid
-                            centroids = gdf.geometry.centroid
-                            gdf['longitude'] = centroids.x
-                            gdf['latitude'] = centroids.y
+                            points = gdf.geometry.centroid
                         
-                        # Create standardized site records
-                        for idx, row in gdf.iterrows():
-                            site = {
-                                'source_file': gdb_info['filename'],
-                                'source_category': gdb_info['category'],
-                                'source_region': gdb_info['region'],
-                                'layer_name': layer_name,
-                                'latitude': row.get('latitude'),
-                                'longitude': row.get('longitude'),
-                                'site_name': None,
-                                'site_id': None,
-                                'site_type': gdb_info['category']
-                            }
-                            
-                            # Try to extract site identifiers
-                            for field in ['SITE_NAME', 'SiteName', 'NAME', 'Name', 'FACILITY_NAME']:
-                                if field in row and pd.notna(row[field]):
-                                    site['site_name'] = str(row[field])
-                                    break
-                            
-                            for field in ['SITE_ID', 'SiteID', 'ID', 'FacilityID', 'EPA_ID']:
-                                if field in row and pd.notna(row[field]):
-                                    site['site_id'] = str(row[field])
-                                    break
-                            
-                            # Add other relevant fields
-                            for field in ['STATUS', 'CONTAMINATION', 'CLEANUP_STATUS', 'NPL_STATUS']:
-                                if field in row and pd.notna(row[field]):
-                                    site[field.lower()] = str(row[field])
-                            
-                            if pd.notna(site['latitude']) and pd.notna(site['longitude']):
-                                self.processed_sites.append(site)
-                                sites_extracted += 1
+                        # Standardized site records for the whole layer at once
+                        sites = pd.DataFrame({
+                            'source_file': gdb_info['filename'],
+                            'source_category': gdb_info['category'],
+                            'source_region': gdb_info['region'],
+                            'layer_name': layer_name,
+                            'latitude': points.y,
+                            'longitude': points.x,
+                            'site_name': self._first_present(gdf, ['SITE_NAME', 'SiteName', 'NAME', 'Name', 'FACILITY_NAME']),
+                            'site_id': self._first_present(gdf, ['SITE_ID', 'SiteID', 'ID', 'FacilityID', 'EPA_ID']),
+                            'site_type': gdb_info['category']
+                        }, index=gdf.index)
+                        
+                        # Add other relevant fields
+                        for field in ['STATUS', 'CONTAMINATION', 'CLEANUP_STATUS', 'NPL_STATUS']:
+                            if field in gdf.columns:
+                                sites[field.lower()] = self._first_present(gdf, [field])
+                        
+                        layer_frames.append(sites[sites['latitude'].notna() & sites['longitude'].notna()])
                         
                     except Exception as e:
+                        layer_errors += 1
                         print(f"    ⚠️ Error processing layer {layer_name}: {str(e)[:100]}")
             
-            # Clean up temp files
-            import shutil
-            shutil.rmtree(extract_dir, ignore_errors=True)
+            if layer_errors and not layer_frames:
+                print("  ⚠️ No layer could be read")
+                self.processing_log.append({
+                    'file': gdb_info['filename'],
+                    'status': 'read_error'
+                })
+                return None
             
+            # A readable geodatabase without site layers is a legitimate empty partition
+            df_sites = pd.concat(layer_frames, ignore_index=True) if layer_frames else pd.DataFrame()
+            sites_extracted = len(df_sites)
             print(f"  ✅ Extracted {sites_extracted} sites")
             
             self.processing_log.append({
@@ -168,16 +214,10 @@ class EPAGeodatabaseProcessor:
                 'layers_processed': len(layers)
             })
             
-            return sites_extracted
-            
-        except Exception as e:
-            print(f"  ❌ Error: {str(e)[:200]}")
-            self.processing_log.append({
-                'file': gdb_info['filename'],
-                'status': 'error',
-                'error': str(e)[:200]
-            })
-            return 0
+            return df_sites
+        finally:
+            # Clean up temp files
+            shutil.rmtree(extract_dir, ignore_errors=True)
     
     def process_zip_files(self):
         """Process regular ZIP files that might contain CSV data"""
@@ -218,16 +258,16 @@ class EPAGeodatabaseProcessor:
                 pass
     
     def create_unified_database(self):
-        """Create unified federal EPA sites database"""
-        if not self.processed_sites:
+        """Create unified federal EPA sites database from every stored geodatabase partition"""
+        # Create DataFrame
+        df = self.warehouse.read('epa_sites').to_pandas()
+        if df.empty:
             print("\n⚠️ No sites extracted from geodatabases")
             return
         
-        # Create DataFrame
-        df = pd.DataFrame(self.processed_sites)
-        
         # Remove duplicates based on coordinates
         df = df.drop_duplicates(subset=['latitude', 'longitude'], keep='first')
+        self.unique_sites = len(df)
         
         # Add processing metadata
         df['processed_date'] = datetime.now().isoformat()
@@ -259,8 +299,8 @@ class EPAGeodatabaseProcessor:
         """Generate comprehensive processing report"""
         duration = (datetime.now() - self.start_time).total_seconds() / 60
         
-        successful = [p for p in self.processing_log if p['status'] == 'success']
-        failed = [p for p in self.processing_log if p['status'] != 'success']
+        successful = [p for p in self.processing_log if p['status'] in ('success', 'unchanged')]
+        failed = [p for p in self.processing_log if p['status'] not in ('success', 'unchanged')]
         
         report = {
             'processing_date': self.start_time.isoformat(),
@@ -268,8 +308,9 @@ class EPAGeodatabaseProcessor:
             'files_processed': len(self.processing_log),
             'files_successful': len(successful),
             'files_failed': len(failed),
-            'total_sites_extracted': len(self.processed_sites),
-            'unique_sites': len(set((s['latitude'], s['longitude']) for s in self.processed_sites if s['latitude'] and s['longitude'])),
+            'files_unchanged': len([p for p in self.processing_log if p['status'] == 'unchanged']),
+            'total_sites_extracted': self.total_sites_extracted,
+            'unique_sites': self.unique_sites,
             'processing_log': self.processing_log
         }
         
@@ -301,17 +342,12 @@ class EPAGeodatabaseProcessor:
         for gdb_info in gdb_files:
             sites = self.process_geodatabase(gdb_info)
             total_sites += sites
-            
-            # Save progress periodically
-            if len(self.processed_sites) > 1000:
-                print(f"\n💾 Saving intermediate results ({len(self.processed_sites)} sites)...")
-                self.create_unified_database()
         
         # Also check ZIP files
         self.process_zip_files()
         
         # Create final unified database
-        if self.processed_sites:
+        if self.total_sites_extracted:
             df = self.create_unified_database()
         
         # Generate report
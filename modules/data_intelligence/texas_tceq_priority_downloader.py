@@ -19,8 +19,8 @@ Status: Production Ready
 """
 
 import os
+import sys
 import json
-import requests
 import pandas as pd
 from datetime import datetime
 from pathlib import Path
@@ -28,6 +28,9 @@ import time
 import logging
 from typing import Dict, List, Optional
 
+sys.path.append(str(Path(__file__).parent))
+from download_engine import DownloadEngine, DownloadJob
+
 class TexasTCEQPriorityDownloader:
     """Downloads priority TCEQ databases for 90% coverage"""
     
@@ -116,6 +119,7 @@ class TexasTCEQPriorityDownloader:
         
         # Track download progress
         self.download_status = {}
+        self.engine = DownloadEngine(self.output_dir / 'download_manifest.json')
         
     def setup_logging(self):
         """Setup logging configuration"""
@@ -140,16 +144,12 @@ class TexasTCEQPriorityDownloader:
             # TCEQ may require form submission or API key
             url = self.TCEQ_ENDPOINTS['central_registry']['url']
             
-            # Attempt download
-            response = requests.get(url, timeout=30)
+            # Attempt download (resumes a partial file, skipped when already complete)
+            output_file = self.output_dir / 'tceq_central_registry.txt'
+            result = self.engine.download(DownloadJob(url, output_file, description='central_registry'))
             
-            if response.status_code == 200:
-                # Save raw file
-                output_file = self.output_dir / 'tceq_central_registry.txt'
-                with open(output_file, 'w') as f:
-                    f.write(response.text)
-                
-                self.logger.info(f"✅ Central Registry saved to {output_file}")
+            if result.ok:
+                self.logger.info(f"✅ Central Registry {result.status}: {output_file}")
                 
                 # Parse if tab-delimited
                 df = pd.read_csv(output_file, sep='\t', low_memory=False)
@@ -167,10 +167,10 @@ class TexasTCEQPriorityDownloader:
                 return df
                 
             else:
-                self.logger.warning(f"Failed to download Central Registry: {response.status_code}")
+                self.logger.warning(f"Failed to download Central Registry: {result.error}")
                 self.download_status['central_registry'] = {
                     'status': 'failed',
-                    'error': f'HTTP {response.status_code}'
+                    'error': result.error
                 }
                 
         except Exception as e:
@@ -212,7 +212,7 @@ class TexasTCEQPriorityDownloader:
             else:
                 # Try to access directly
                 try:
-                    response = requests.head(db_info['url'], timeout=10)
+                    response = self.engine.head(db_info['url'], timeout=10)
                     if response.status_code == 200:
                         availability[db_key] = {
                             'name': db_info['name'],
@@ -7,21 +7,31 @@ WINGMAN Execution - Mission CA-ENV-UNIFIED-2025-003
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 from pathlib import Path
 from datetime import datetime
 import json
 import sqlite3
 import logging
 import gc
+import sys
+
+sys.path.append(str(Path(__file__).parent))
+from columnar_warehouse import ColumnarWarehouse
 
 class FastCaliforniaUnifier:
     """Fast unification using aggregation-first approach"""
     
+    # CalEPA Site Portal dumps converted to Parquet once and aggregated from there
+    SOURCE_TABLES = ['Site', 'Coordinates', 'Violations', 'Evaluations', 'EA', 'Chems', 'SiteEI']
+    
     def __init__(self):
         self.base_path = Path("/Users/williamrice/Library/CloudStorage/Dropbox-HERR/Bill Rice/Colosseum")
         self.data_path = self.base_path / "data_sets" / "california" / "CA_Environmental_Data" / "CalEPA_Compliance"
         self.output_path = self.base_path / "data_sets" / "california" / "CA_Environmental_Unified"
         self.output_path.mkdir(parents=True, exist_ok=True)
+        self.warehouse = ColumnarWarehouse(self.data_path / "parquet_warehouse")
         
         logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
         self.logger = logging.getLogger(__name__)
@@ -34,9 +44,15 @@ class FastCaliforniaUnifier:
         self.logger.info("FAST CALIFORNIA ENVIRONMENTAL DATABASE UNIFICATION")
         self.logger.info("="*80)
         
+        # 0. Convert raw dumps to Parquet (only sources changed since the last run)
+        self.logger.info("\n0. Refreshing columnar warehouse...")
+        for name in self.SOURCE_TABLES:
+            rebuilt = self.warehouse.ingest_csv(name, self.data_path / f"{name}.csv")
+            self.logger.info(f"   {name}: {'converted' if rebuilt else 'unchanged'}")
+        
         # 1. Load master sites
         self.logger.info("\n1. Loading master sites...")
-        df_sites = pd.read_csv(self.data_path / "Site.csv", dtype=str)
+        df_sites = self.warehouse.read('Site').to_pandas()
         df_sites['SiteID'] = df_sites['SiteID'].astype(str)
         self.logger.info(f"   Loaded {len(df_sites):,} sites")
         
@@ -48,7 +64,7 @@ class FastCaliforniaUnifier:
             # Rename existing columns to avoid conflict
             df_sites.rename(columns={'Latitude': 'Site_Lat', 'Longitude': 'Site_Lng'}, inplace=True)
         
-        df_coords = pd.read_csv(self.data_path / "Coordinates.csv", dtype=str)
+        df_coords = self.warehouse.read('Coordinates', ['SiteID', 'LATITUDE', 'LONGITUDE']).to_pandas()
         df_coords['SiteID'] = df_coords['SiteID'].astype(str)
         df_coords['LATITUDE'] = pd.to_numeric(df_coords['LATITUDE'], errors='coerce')
         df_coords['LONGITUDE'] = pd.to_numeric(df_coords['LONGITUDE'], errors='coerce')
@@ -63,31 +79,27 @@ class FastCaliforniaUnifier:
         
         # 3. Aggregate violations (don't store details, just counts)
         self.logger.info("\n3. Aggregating violations...")
-        viol_counts = pd.read_csv(
-            self.data_path / "Violations.csv",
-            usecols=['SiteID'],
-            dtype=str
-        )['SiteID'].value_counts().to_dict()
+        viol_counts = self.warehouse.count_by('Violations')
         
         df_sites['ViolationCount'] = df_sites['SiteID'].map(viol_counts).fillna(0).astype(int)
         self.logger.info(f"   Found violations for {(df_sites['ViolationCount'] > 0).sum():,} sites")
         
-        # 4. Aggregate evaluations
+        # 4. Aggregate evaluations (count and violations-found in one grouped pass)
         self.logger.info("\n4. Aggregating evaluations...")
-        eval_data = pd.read_csv(
-            self.data_path / "Evaluations.csv",
-            usecols=['SiteID', 'ViolationsFound'],
-            dtype=str
+        eval_table = self.warehouse.read('Evaluations', ['SiteID', 'ViolationsFound'])
+        eval_table = eval_table.append_column(
+            'FoundViolation',
+            pc.cast(pc.fill_null(pc.equal(eval_table['ViolationsFound'], 'Yes'), False), pa.int64())
         )
-        
-        eval_counts = eval_data.groupby('SiteID').agg({
-            'ViolationsFound': [
-                'count',
-                lambda x: (x == 'Yes').sum()
-            ]
-        }).reset_index()
-        
-        eval_counts.columns = ['SiteID', 'EvaluationCount', 'EvaluationsWithViolations']
+        eval_counts = eval_table.group_by('SiteID').aggregate([
+            ('ViolationsFound', 'count'),
+            ('FoundViolation', 'sum')
+        ]).to_pandas()
+        
+        eval_counts = eval_counts.rename(columns={
+            'ViolationsFound_count': 'EvaluationCount',
+            'FoundViolation_sum': 'EvaluationsWithViolations'
+        })[['SiteID', 'EvaluationCount', 'EvaluationsWithViolations']]
         eval_counts['SiteID'] = eval_counts['SiteID'].astype(str)
         
         df_sites = df_sites.merge(eval_counts, on='SiteID', how='left')
@@ -98,33 +110,21 @@ class FastCaliforniaUnifier:
         
         # 5. Aggregate enforcements
         self.logger.info("\n5. Aggregating enforcements...")
-        enf_counts = pd.read_csv(
-            self.data_path / "EA.csv",
-            usecols=['SiteID'],
-            dtype=str
-        )['SiteID'].value_counts().to_dict()
+        enf_counts = self.warehouse.count_by('EA')
         
         df_sites['EnforcementCount'] = df_sites['SiteID'].map(enf_counts).fillna(0).astype(int)
         self.logger.info(f"   Found enforcements for {(df_sites['EnforcementCount'] > 0).sum():,} sites")
         
         # 6. Check for chemicals
         self.logger.info("\n6. Checking chemical data...")
-        chem_sites = pd.read_csv(
-            self.data_path / "Chems.csv",
-            usecols=['SiteID'],
-            dtype=str
-        )['SiteID'].unique()
+        chem_sites = self.warehouse.distinct('Chems')
         
         df_sites['HasChemicals'] = df_sites['SiteID'].isin(chem_sites)
         self.logger.info(f"   Found chemicals at {df_sites['HasChemicals'].sum():,} sites")
         
         # 7. Count regulated programs
         self.logger.info("\n7. Counting regulated programs...")
-        prog_counts = pd.read_csv(
-            self.data_path / "SiteEI.csv",
-            usecols=['SiteID'],
-            dtype=str
-        )['SiteID'].value_counts().to_dict()
+        prog_counts = self.warehouse.count_by('SiteEI')
         
         df_sites['RegulatedProgramCount'] = df_sites['SiteID'].map(prog_counts).fillna(0).astype(int)
         self.logger.info(f"   Found programs for {(df_sites['RegulatedProgramCount'] > 0).sum():,} sites")
@@ -208,7 +208,7 @@ class FastCaliforniaUnifier:
         self.logger.info("\n" + "="*80)
         self.logger.info("UNIFICATION COMPLETE")
         self.logger.info("="*80)
-        self.logger.info(f"Processing Time: {duration:.1f} minutes")
+        self.logger.info(f"Processing Time: {duration:.1f} minutes ({duration * 60:.1f} seconds)")
         self.logger.info(f"Total Sites: {len(df_sites):,}")
         self.logger.info(f"Sites with Violations: {summary['sites_with_violations']:,}")
         self.logger.info(f"Sites with Coordinates: {summary['sites_with_coordinates']:,}")
@@ -5,8 +5,9 @@ Enhanced LIHTC Financial Model with Comprehensive Adjustable Parameters
 
 import pandas as pd
 import numpy as np
+import itertools
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Sequence, Union
 
 @dataclass
 class LIHTCFinancialParameters:
@@ -486,6 +487,227 @@ class EnhancedLIHTCModel:
             'developer_fee_deferred': deferred_fee
         }
 
+class VectorizedLIHTCEngine:
+    """
+    Array version of calculate_sources_and_uses: every site x every scenario in one pass
+    
+    Sites become (n_sites, 1) columns, scenario parameters (n_scenarios,) rows; NumPy
+    broadcasting gives (n_sites, n_scenarios) results. Parameters not given in a scenario
+    set come from the wrapped EnhancedLIHTCModel, so a single-scenario run reproduces
+    calculate_sources_and_uses exactly.
+    """
+    
+    # Parameters that may vary by scenario -> parameter group on EnhancedLIHTCModel
+    SCENARIO_PARAMETERS = {
+        'credit_pricing': 'financial',
+        'basis_boost_qct_dda': 'financial',
+        'base_construction_cost_per_sf': 'financial',
+        'soft_cost_percentage': 'financial',
+        'contingency_percentage': 'financial',
+        'permanent_interest_rate': 'debt',
+        'construction_interest_rate': 'debt',
+        'debt_service_coverage_min': 'debt',
+        'permanent_ltv': 'debt',
+        'vacancy_rate': 'operating',
+        'developer_fee_percentage': 'soft_funds',
+        'cap_rate': None  # Optional: also caps the loan at permanent_ltv x NOI / cap_rate
+    }
+    
+    # Default Monte Carlo spreads around the model's base values:
+    # ('normal', sd), ('uniform', low offset, high offset), ('triangular', low offset, high offset)
+    DEFAULT_MONTE_CARLO = {
+        'credit_pricing': ('normal', 0.03),
+        'permanent_interest_rate': ('normal', 0.0075),
+        'base_construction_cost_per_sf': ('triangular', -15.0, 30.0),
+        'vacancy_rate': ('uniform', -0.02, 0.03)
+    }
+    
+    RESULT_COLUMNS = ['total_development_cost', 'noi', 'credit_4pct_proceeds', 'credit_9pct_proceeds',
+                      'max_loan_amount', 'net_loan_proceeds', 'total_uses',
+                      'funding_gap_4pct', 'funding_gap_9pct']
+    
+    def __init__(self, model: EnhancedLIHTCModel = None):
+        self.model = model or EnhancedLIHTCModel()
+    
+    def prepare_sites(self, sites: Union[pd.DataFrame, Sequence[Dict]]) -> Dict[str, np.ndarray]:
+        """Site inputs as (n_sites, 1) arrays, with the same defaults as calculate_project_costs"""
+        df = sites if isinstance(sites, pd.DataFrame) else pd.DataFrame(list(sites))
+        financial = self.model.financial
+        
+        def column(name, default):
+            if name not in df.columns:
+                return pd.Series(default, index=df.index)
+            return df[name].where(df[name].notna(), default)
+        
+        def multiplier(values, table):
+            return values.map(table).fillna(table['default']).to_numpy(dtype=float)
+        
+        arrays = {
+            'acres': column('acres', 1.0).to_numpy(dtype=float),
+            'target_dua': column('target_dua', 12).to_numpy(dtype=float),
+            'land_cost': column('land_cost', 0).to_numpy(dtype=float),
+            'qct_dda_eligible': column('qct_dda_eligible', True).astype(bool).to_numpy(),
+            'rent_1br': column('rent_1br_60pct', 800).to_numpy(dtype=float) * 12,
+            'rent_2br': column('rent_2br_60pct', 1000).to_numpy(dtype=float) * 12,
+            'rent_3br': column('rent_3br_60pct', 1200).to_numpy(dtype=float) * 12,
+            'cost_multiplier': (
+                multiplier(column('county', 'default').astype(str).str.upper(), financial.regional_cost_multipliers) *
+                multiplier(column('flood_zone', 'X').astype(str), financial.flood_zone_multipliers) *
+                multiplier(column('market_type', 'Suburban').astype(str), financial.market_type_multipliers)
+            )
+        }
+        return {name: values[:, None] for name, values in arrays.items()}
+    
+    @staticmethod
+    def scenario_grid(**axes: Sequence[float]) -> Dict[str, np.ndarray]:
+        """Cartesian product of parameter axes, e.g. scenario_grid(credit_pricing=[...], cap_rate=[...])"""
+        names = list(axes)
+        combos = np.array(list(itertools.product(*(axes[name] for name in names))), dtype=float)
+        return {name: combos[:, i] for i, name in enumerate(names)}
+    
+    def monte_carlo_scenarios(self, n_draws: int, seed: Optional[int] = None,
+                              distributions: Optional[Dict[str, tuple]] = None) -> Dict[str, np.ndarray]:
+        """Random scenario draws around the model's base parameter values"""
+        rng = np.random.default_rng(seed)
+        scenarios = {}
+        for name, spec in (distributions or self.DEFAULT_MONTE_CARLO).items():
+            base = self._base_value(name)
+            kind = spec[0]
+            if kind == 'normal':
+                draws = rng.normal(base, spec[1], n_draws)
+            elif kind == 'uniform':
+                draws = rng.uniform(base + spec[1], base + spec[2], n_draws)
+            elif kind == 'triangular':
+                draws = rng.triangular(base + spec[1], base, base + spec[2], n_draws)
+            else:
+                raise ValueError(f"Unknown distribution '{kind}' for {name}")
+            scenarios[name] = np.maximum(draws, 0.0)
+        return scenarios
+    
+    def _base_value(self, name: str) -> float:
+        group = self.SCENARIO_PARAMETERS.get(name, 'missing')
+        if group == 'missing':
+            raise ValueError(f"{name} cannot vary by scenario; choose from {sorted(self.SCENARIO_PARAMETERS)}")
+        if group is None:
+            raise ValueError(f"{name} has no base value; pass explicit scenario values")
+        return float(getattr(getattr(self.model, group), name))
+    
+    def evaluate(self, sites: Union[pd.DataFrame, Sequence[Dict], Dict[str, np.ndarray]],
+                 scenarios: Optional[Dict[str, Sequence[float]]] = None) -> Dict[str, np.ndarray]:
+        """Sources and uses for every site x scenario; each result is (n_sites, n_scenarios)"""
+        if isinstance(sites, dict) and 'cost_multiplier' in sites:
+            site = sites  # already prepared
+        else:
+            site = self.prepare_sites([sites] if isinstance(sites, dict) else sites)
+        scenarios = {name: np.asarray(values, dtype=float).ravel() for name, values in (scenarios or {}).items()}
+        n_scenarios = max((len(values) for values in scenarios.values()), default=1)
+        for name, values in scenarios.items():
+            if name not in self.SCENARIO_PARAMETERS:
+                raise ValueError(f"{name} cannot vary by scenario; choose from {sorted(self.SCENARIO_PARAMETERS)}")
+            if len(values) not in (1, n_scenarios):
+                raise ValueError(f"{name} has {len(values)} values, expected {n_scenarios}")
+        
+        def param(name):
+            if name in scenarios:
+                return scenarios[name][None, :]
+            return self._base_value(name)
+        
+        unit_mix, debt, soft_funds, operating = (self.model.unit_mix, self.model.debt,
+                                                 self.model.soft_funds, self.model.operating)
+        
+        # calculate_project_costs
+        total_units = site['acres'] * site['target_dua']
+        units_1br = total_units * unit_mix.mix_1br_pct
+        units_2br = total_units * unit_mix.mix_2br_pct
+        units_3br = total_units * unit_mix.mix_3br_pct
+        total_sqft = (units_1br * unit_mix.unit_size_1br +
+                      units_2br * unit_mix.unit_size_2br +
+                      units_3br * unit_mix.unit_size_3br)
+        hard_costs = (total_sqft * param('base_construction_cost_per_sf') * site['cost_multiplier'] *
+                      (1 + param('contingency_percentage')))
+        soft_costs = hard_costs * param('soft_cost_percentage')
+        total_development_cost = hard_costs + soft_costs + site['land_cost']
+        
+        # calculate_operating_income
+        gross_income = (units_1br * site['rent_1br'] + units_2br * site['rent_2br'] + units_3br * site['rent_3br'] +
+                        total_units * operating.other_income_per_unit)
+        effective_gross_income = gross_income * (1 - param('vacancy_rate'))
+        per_unit_expenses = (operating.maintenance_per_unit + operating.utilities_per_unit +
+                             operating.insurance_per_unit + operating.property_tax_per_unit +
+                             operating.reserves_per_unit + operating.administrative_per_unit)
+        total_operating_expenses = (effective_gross_income * operating.management_fee_pct +
+                                    total_units * per_unit_expenses +
+                                    operating.lihtc_monitoring_annual + operating.asset_management_fee)
+        noi = effective_gross_income - total_operating_expenses
+        
+        # calculate_lihtc_credits
+        eligible_basis = total_development_cost * (1 + np.where(site['qct_dda_eligible'], param('basis_boost_qct_dda'), 0.0))
+        credit_4pct_proceeds = (eligible_basis * self.model.financial.lihtc_4pct_rate *
+                                self.model.financial.credit_period * param('credit_pricing'))
+        credit_9pct_proceeds = (eligible_basis * self.model.financial.lihtc_9pct_rate *
+                                self.model.financial.credit_period * param('credit_pricing'))
+        
+        # calculate_debt_capacity
+        monthly_ds_capacity = (noi / 12) / param('debt_service_coverage_min')
+        monthly_rate = np.broadcast_to(np.asarray(param('permanent_interest_rate'), dtype=float) / 12,
+                                       (1, n_scenarios))
+        num_payments = debt.permanent_amortization_years * 12
+        growth = (1 + monthly_rate) ** num_payments
+        with np.errstate(divide='ignore', invalid='ignore'):
+            payment_factor = np.where(monthly_rate > 0, monthly_rate * growth / (growth - 1), 1.0 / num_payments)
+        max_loan_amount = monthly_ds_capacity / payment_factor
+        if 'cap_rate' in scenarios:
+            value_limited = param('permanent_ltv') * noi / scenarios['cap_rate'][None, :]
+            max_loan_amount = np.minimum(max_loan_amount, value_limited)
+        loan_fees = max_loan_amount * debt.loan_fees_percentage
+        net_loan_proceeds = max_loan_amount - loan_fees
+        
+        # calculate_sources_and_uses
+        developer_fee = total_development_cost * param('developer_fee_percentage')
+        deferred_fee = developer_fee * soft_funds.deferred_fee_percentage
+        other_sources = (total_units * (soft_funds.home_funds_per_unit + soft_funds.trust_fund_per_unit +
+                                        soft_funds.utility_rebates_per_unit) +
+                         deferred_fee + soft_funds.cdbg_funds + soft_funds.aht_funds)
+        total_uses = (hard_costs + soft_costs + site['land_cost'] + (developer_fee - deferred_fee) + loan_fees +
+                      hard_costs * (param('construction_interest_rate') * debt.construction_term_months / 12))
+        
+        shape = (len(site['acres']), n_scenarios)
+        results = {
+            'total_development_cost': total_development_cost,
+            'noi': noi,
+            'credit_4pct_proceeds': credit_4pct_proceeds,
+            'credit_9pct_proceeds': credit_9pct_proceeds,
+            'max_loan_amount': max_loan_amount,
+            'net_loan_proceeds': net_loan_proceeds,
+            'total_uses': total_uses,
+            'funding_gap_4pct': total_uses - (credit_4pct_proceeds + net_loan_proceeds + other_sources),
+            'funding_gap_9pct': total_uses - (credit_9pct_proceeds + net_loan_proceeds + other_sources)
+        }
+        return {name: np.broadcast_to(values, shape) for name, values in results.items()}
+    
+    def percentile_bands(self, sites: Union[pd.DataFrame, Sequence[Dict]],
+                         scenarios: Optional[Dict[str, Sequence[float]]] = None,
+                         percentiles: Sequence[float] = (5, 25, 50, 75, 95),
+                         metrics: Sequence[str] = ('funding_gap_4pct', 'funding_gap_9pct', 'net_loan_proceeds'),
+                         site_ids: Optional[Sequence] = None) -> pd.DataFrame:
+        """
+        Per-site percentile bands across scenarios, plus the share of scenarios in which
+        each credit type closes the gap (one row per site, columns like funding_gap_4pct_p50)
+        """
+        results = self.evaluate(sites, scenarios)
+        if site_ids is None:
+            site_ids = sites.index if isinstance(sites, pd.DataFrame) else range(len(results['noi']))
+        
+        bands = {}
+        for metric in metrics:
+            values = np.percentile(results[metric], percentiles, axis=1)
+            for pct, row in zip(percentiles, values):
+                bands[f"{metric}_p{pct:g}"] = row
+        bands['feasible_4pct_share'] = (results['funding_gap_4pct'] <= 0).mean(axis=1)
+        bands['feasible_9pct_share'] = (results['funding_gap_9pct'] <= 0).mean(axis=1)
+        return pd.DataFrame(bands, index=pd.Index(site_ids, name='site'))
+
+
 def create_scenario_analysis():
     """Create multiple scenarios with different parameter sets"""
     
@@ -527,13 +749,12 @@ def analyze_parameter_sensitivity(site_data: Dict):
     credit_prices = [0.75, 0.80, 0.85, 0.90, 0.95]
     print(f"\nCredit Pricing Sensitivity (Base: {base_model.financial.credit_pricing}):")
     
-    for price in credit_prices:
-        test_params = LIHTCFinancialParameters(credit_pricing=price)
-        test_model = EnhancedLIHTCModel(financial_params=test_params)
-        result = test_model.calculate_sources_and_uses(site_data)
-        
-        gap_4pct = result['funding_gap_4pct']
-        gap_9pct = result['funding_gap_9pct']
+    # All price points in one vectorized pass
+    results = VectorizedLIHTCEngine(base_model).evaluate([site_data], {'credit_pricing': credit_prices})
+    
+    for i, price in enumerate(credit_prices):
+        gap_4pct = results['funding_gap_4pct'][0, i]
+        gap_9pct = results['funding_gap_9pct'][0, i]
         
         print(f"  ${price:.2f}: 4% Gap ${gap_4pct:,.0f} | 9% Gap ${gap_9pct:,.0f}")
 
@@ -8,6 +8,10 @@ Priority Data Sources:
 2. NIFC Open Data - National Interagency Fire Center (USGS successor)
 3. CAL FIRE Hub - Alternative endpoints 
 4. County GIS Services - Riverside/San Bernardino specific data
+
+With layer_cache_dir set, the statewide CAL FIRE Hub FHSZ layer is harvested once
+(paged, then refreshed incrementally by edit date) and sites are answered from the
+local copy instead of one REST query each.
 """
 
 import requests
@@ -15,8 +19,13 @@ import pandas as pd
 import numpy as np
 import logging
 from typing import Dict, Any, Optional, List
+import sys
 import time
 import json
+from pathlib import Path
+
+# Shared ArcGIS harvester lives with the data_intelligence crawlers
+DATA_INTELLIGENCE_PATH = Path(__file__).resolve().parents[4] / 'data_intelligence'
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +34,7 @@ class MultiSourceFireAnalyzer:
     Enhanced fire analyzer using multiple data sources to minimize manual verification
     """
     
-    def __init__(self):
+    def __init__(self, layer_cache_dir: Optional[str] = None):
         """Initialize with multiple data source endpoints"""
         
         # Primary CAL FIRE API (original)
@@ -41,6 +50,12 @@ class MultiSourceFireAnalyzer:
         # CAL FIRE Hub (Alternative endpoints)
         self.calfire_hub = "https://services1.arcgis.com/jUJYIo9tSA7EHvfZ/arcgis/rest/services"
         
+        self.fhsz_layer_path = "Fire_Hazard_Severity_Zone_SRA/FeatureServer/0"
+        
+        # Optional local copies of statewide layers (see sync_local_layers)
+        self.layer_cache_dir = Path(layer_cache_dir) if layer_cache_dir else None
+        self._local_fhsz = None
+        
         # County-specific services
         self.riverside_gis = "https://services1.arcgis.com/pWmTvr8gGajGhEHT/arcgis/rest/services"
         self.san_bernardino_gis = "https://gis.sbcounty.gov/arcgis/rest/services"
@@ -186,11 +201,55 @@ class MultiSourceFireAnalyzer:
         
         return {'hazard_class': 'NO_DATA'}
     
+    def sync_local_layers(self) -> Dict[str, Any]:
+        """Harvest (first run) or incrementally refresh the statewide FHSZ layer into layer_cache_dir"""
+        if self.layer_cache_dir is None:
+            raise ValueError("layer_cache_dir not configured")
+        if str(DATA_INTELLIGENCE_PATH) not in sys.path:
+            sys.path.append(str(DATA_INTELLIGENCE_PATH))
+        from arcgis_harvester import ArcGISHarvester
+        
+        harvester = ArcGISHarvester(f"{self.calfire_hub}/{self.fhsz_layer_path}",
+                                    out_fields='HAZ_CLASS,HAZ_CODE,SRA')
+        summary = harvester.sync(self.layer_cache_dir / 'calfire_hub_fhsz_sra')
+        self._local_fhsz = None
+        logger.info(f"FHSZ layer {summary['mode']} sync: {summary['total_features']} zones")
+        return summary
+    
+    def _local_fhsz_layer(self):
+        """Locally harvested FHSZ zones with a spatial index, or None when not harvested"""
+        if self._local_fhsz is None and self.layer_cache_dir is not None:
+            layer_dir = self.layer_cache_dir / 'calfire_hub_fhsz_sra'
+            if (layer_dir / 'harvest_state.json').exists():
+                if str(DATA_INTELLIGENCE_PATH) not in sys.path:
+                    sys.path.append(str(DATA_INTELLIGENCE_PATH))
+                from arcgis_harvester import read_layer
+                self._local_fhsz = read_layer(layer_dir)
+                self._local_fhsz.sindex  # build once
+        return self._local_fhsz
+    
     def _query_calfire_hub(self, lat: float, lng: float) -> Optional[Dict[str, Any]]:
         """Query CAL FIRE Hub alternative endpoints"""
+        local_layer = self._local_fhsz_layer()
+        if local_layer is not None:
+            from shapely.geometry import Point
+            hits = local_layer.sindex.query(Point(lng, lat), predicate='intersects')
+            if len(hits):
+                # Plain Python values, same as the JSON from the REST query
+                attrs = json.loads(local_layer.drop(columns='geometry').iloc[[int(hits[0])]].to_json(orient='records'))[0]
+                if attrs.get('HAZ_CLASS'):
+                    self.stats['calfire_hub_success'] += 1
+                    return {
+                        'hazard_class': attrs['HAZ_CLASS'],
+                        'hazard_code': attrs.get('HAZ_CODE', 0),
+                        'sra_flag': attrs.get('SRA', 'Y'),
+                        'data_confidence': 'High'
+                    }
+            return {'hazard_class': 'NO_DATA'}
+        
         try:
             # Alternative CAL FIRE service endpoint
-            query_url = f"{self.calfire_hub}/Fire_Hazard_Severity_Zone_SRA/FeatureServer/0/query"
+            query_url = f"{self.calfire_hub}/{self.fhsz_layer_path}/query"
             
             params = {
                 'where': '1=1',
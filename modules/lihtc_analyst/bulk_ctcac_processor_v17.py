@@ -13,12 +13,15 @@ from datetime import datetime
 from typing import Dict, List, Tuple, Any
 import logging
 import openpyxl
-from openpyxl.utils import get_column_letter
+from openpyxl.utils import get_column_letter, column_index_from_string
+from openpyxl.utils.cell import coordinate_from_string
 import shutil
 import re
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 
+from ctcac_data_lake import CTCACDataLake
+
 class YearAwareCTCACProcessor:
     """Production bulk processor for all CTCAC 4% applications with year format awareness"""
     
@@ -98,6 +101,9 @@ class YearAwareCTCACProcessor:
                 output_dir = self.output_base / str(year) / round_num
                 output_dir.mkdir(parents=True, exist_ok=True)
         
+        # Columnar cell store: one Parquet file per application, partitioned by year/credit type
+        self.data_lake = CTCACDataLake(self.output_base / "ctcac_data_lake")
+        
         # Logs directory
         self.logs_dir = Path("/Users/williamrice/Library/CloudStorage/Dropbox-HERR/Bill Rice/Colosseum/bulk_processing_logs")
         self.logs_dir.mkdir(parents=True, exist_ok=True)
@@ -281,6 +287,10 @@ class YearAwareCTCACProcessor:
             with open(output_path, 'w', encoding='utf-8') as f:
                 json.dump(processing_report, f, indent=2, ensure_ascii=False)
             
+            # Append the cleaned cells to the data lake for cross-application queries
+            lake_records = self.data_lake.add_application(
+                file_path, self._iter_lake_cells(extraction_data), sheet_order=list(extraction_data))
+            
             processing_time = time.time() - start_time
             
             return {
@@ -292,7 +302,8 @@ class YearAwareCTCACProcessor:
                 'sheets_processed': sheets_processed,
                 'cleanup_stats': cleanup_stats,
                 'processing_time': processing_time,
-                'output_path': str(output_path)
+                'output_path': str(output_path),
+                'lake_records': lake_records
             }
         
         except Exception as e:
@@ -305,6 +316,17 @@ class YearAwareCTCACProcessor:
                 'processing_time': time.time() - start_time
             }
     
+    @staticmethod
+    def _iter_lake_cells(extraction_data: Dict[str, List]):
+        """(sheet, row, col, value, formula) for CTCACDataLake; removed cells are left out"""
+        for sheet_name, sheet_rows in extraction_data.items():
+            for row_data in sheet_rows:
+                for cell in row_data:
+                    if cell['removed'] or cell['value'] is None:
+                        continue
+                    column_letter, row = coordinate_from_string(cell['coordinate'])
+                    yield sheet_name, row, column_index_from_string(column_letter), cell['value'], None
+    
     def get_file_inventory(self) -> Dict[str, List[Path]]:
         """Get organized inventory of all CTCAC files by year"""
         inventory = {2023: [], 2024: [], 2025: []}
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+CTCAC DATA LAKE - every application's cells in one columnar, partitioned store
+Extraction writes normalized long-format cell records (application, year, sheet,
+cell, label, value, formula) to Parquet instead of only per-application Excel/JSON
+dumps, so cross-application questions are one pruned scan instead of N file loads.
+
+Layout:
+  <lake>/cells/year=2023/credit_type=4pct/23-412.parquet   one file per application
+  <lake>/manifest.json                                    source size/mtime per application
+
+- appending an application writes one new file; history is never rewritten
+- re-ingesting a changed workbook replaces only that application's file
+- queries prune by year/credit_type directory and read only the columns they need
+- comparisons run on <lake>/label_index.parquet, a derived compaction of labelled numeric
+  cells refreshed only for applications added since it was last built
+"""
+
+import os
+import re
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from openpyxl.utils import get_column_letter
+
+from streaming_xlsx_reader import StreamingXlsxReader, isoformat_dates
+
+MANIFEST_VERSION = 1
+LABEL_INDEX_COLUMNS = ['application_id', 'year', 'credit_type', 'round', 'sheet', 'sheet_index',
+                       'row', 'col', 'label', 'value_number']
+
+CELL_SCHEMA = pa.schema([
+    ('application_id', pa.string()),
+    ('file_name', pa.string()),
+    ('round', pa.string()),
+    ('sheet', pa.string()),
+    ('sheet_index', pa.int16()),
+    ('cell', pa.string()),
+    ('row', pa.int32()),
+    ('col', pa.int32()),
+    ('label', pa.string()),
+    ('value_text', pa.string()),
+    ('value_number', pa.float64()),
+    ('formula', pa.string()),
+])
+PARTITIONING = ds.partitioning(pa.schema([('year', pa.int16()), ('credit_type', pa.string())]), flavor='hive')
+
+# 2025_4pct_R1_25-101.xlsx, 2023_9pct_R2_23-045.xlsx
+APPLICATION_FILE_PATTERN = re.compile(r'^(\d{4})_(\d+pct)_(R\d)_(\d{2}-\d+)', re.IGNORECASE)
+
+# Same label patterns UltimateCTCACExtractor uses for key fields: (sheet, label regex)
+KEY_METRICS = {
+    'total_units': ('Application', r'total units|unit count|number of units'),
+    'total_development_cost': ('Sources and Uses Budget', r'total development cost|total project cost'),
+    'developer_fee': ('Sources and Uses Budget', r'developer fee|developer overhead'),
+    'eligible_basis': ('Basis & Credits', r'eligible basis|total eligible'),
+    'qualified_basis': ('Basis & Credits', r'qualified basis|total qualified'),
+    'annual_credits': ('Basis & Credits', r'annual federal|federal credit'),
+}
+
+
+def parse_application_name(file_name: str) -> Optional[Dict[str, Any]]:
+    """Year, credit type, round and application id from a CTCAC application file name"""
+    match = APPLICATION_FILE_PATTERN.match(Path(file_name).name)
+    if not match:
+        return None
+    return {
+        'year': int(match.group(1)),
+        'credit_type': match.group(2).lower(),
+        'round': match.group(3).upper(),
+        'application_id': match.group(4)
+    }
+
+
+def source_signature(path: Path) -> Dict:
+    """Cheap change detector for a source workbook"""
+    stat = Path(path).stat()
+    return {'path': str(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _split_value(value) -> Tuple[Optional[str], Optional[float]]:
+    """Cell value as (text, number); bools and dates are text, not numbers"""
+    if value is None:
+        return None, None
+    if isinstance(value, bool):
+        return str(value), None
+    if isinstance(value, (int, float)):
+        return str(value), float(value)
+    return str(isoformat_dates(value)), None
+
+
+class CTCACDataLake:
+    """Partitioned Parquet store of CTCAC application cells with comparative queries"""
+
+    def __init__(self, lake_dir: Path):
+        self.lake_dir = Path(lake_dir)
+        self.cells_dir = self.lake_dir / "cells"
+        self.cells_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.lake_dir / "manifest.json"
+        self.manifest = self._load_manifest()
+        self.label_index_path = self.lake_dir / "label_index.parquet"
+        self._lock = threading.Lock()
+        self._dataset = None
+        self._label_index = None
+
+    def _load_manifest(self) -> Dict:
+        if self.manifest_path.exists():
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == MANIFEST_VERSION:
+                return manifest
+        return {'version': MANIFEST_VERSION, 'applications': {}, 'label_index': {}}
+
+    def _save_manifest(self):
+        tmp_path = self.manifest_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def application_path(self, year: int, credit_type: str, application_id: str) -> Path:
+        return self.cells_dir / f"year={year}" / f"credit_type={credit_type}" / f"{application_id}.parquet"
+
+    def is_current(self, source_path: Path) -> bool:
+        """True when the lake already holds cells from this exact workbook"""
+        meta = parse_application_name(Path(source_path).name)
+        if meta is None:
+            return False
+        entry = self.manifest['applications'].get(f"{meta['year']}/{meta['application_id']}")
+        return (entry is not None
+                and entry['source'] == source_signature(source_path)
+                and Path(entry['parquet']).exists())
+
+    # ------------------------------------------------------------------ ingestion
+
+    def add_application(self, source_path: Path, cells: Iterable[Tuple[str, int, int, Any, Optional[str]]],
+                        sheet_order: Optional[List[str]] = None, **meta_overrides) -> int:
+        """
+        Write one application's cells as its own Parquet file.
+        cells yields (sheet, row, col, value, formula) in row-major order per sheet.
+        Labels are the nearest text to the left in the same row, else the text directly above.
+        meta_overrides (year, credit_type, round, application_id) cover non-standard file names.
+        Returns the number of cell records written.
+        """
+        source_path = Path(source_path)
+        meta = parse_application_name(source_path.name) or {}
+        meta.update({k: v for k, v in meta_overrides.items() if v is not None})
+        missing = [k for k in ('year', 'credit_type', 'round', 'application_id') if k not in meta]
+        if missing:
+            raise ValueError(f"Cannot place {source_path.name} in the lake: missing {', '.join(missing)}")
+
+        columns = {name: [] for name in CELL_SCHEMA.names}
+        sheet_index = {name: i for i, name in enumerate(sheet_order or [])}
+        current = (None, None)          # (sheet, row) being labelled
+        row_label = None
+        above_text, row_text = {}, {}   # col -> text on the previous / current row
+
+        for sheet, row, col, value, formula in cells:
+            if (sheet, row) != current:
+                above_text = row_text if current == (sheet, row - 1) else {}
+                row_text, row_label, current = {}, None, (sheet, row)
+            text, number = _split_value(value)
+            if text is None and formula is None:
+                continue
+            if sheet not in sheet_index:
+                sheet_index[sheet] = len(sheet_index)
+
+            columns['application_id'].append(meta['application_id'])
+            columns['file_name'].append(source_path.name)
+            columns['round'].append(meta['round'])
+            columns['sheet'].append(sheet)
+            columns['sheet_index'].append(sheet_index[sheet])
+            columns['cell'].append(f"{get_column_letter(col)}{row}")
+            columns['row'].append(row)
+            columns['col'].append(col)
+            columns['label'].append(row_label or above_text.get(col))
+            columns['value_text'].append(text)
+            columns['value_number'].append(number)
+            columns['formula'].append(formula)
+
+            if isinstance(value, str) and value.strip():
+                row_label = row_text[col] = value.strip()
+
+        table = pa.table(columns, schema=CELL_SCHEMA)
+        parquet_path = self.application_path(meta['year'], meta['credit_type'], meta['application_id'])
+        parquet_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = parquet_path.with_name(f".{parquet_path.name}.tmp")  # dot-prefixed: invisible to dataset scans
+        pq.write_table(table, tmp_path, compression='snappy')
+        os.replace(tmp_path, parquet_path)
+
+        key = f"{meta['year']}/{meta['application_id']}"
+        with self._lock:
+            previous = self.manifest['applications'].get(key)
+            if previous and Path(previous['parquet']) != parquet_path:
+                Path(previous['parquet']).unlink(missing_ok=True)  # moved to another credit_type partition
+            self.manifest['applications'][key] = {
+                'source': source_signature(source_path) if source_path.exists() else {'path': str(source_path)},
+                'parquet': str(parquet_path),
+                'credit_type': meta['credit_type'],
+                'round': meta['round'],
+                'rows': table.num_rows,
+                'built': datetime.now().isoformat()
+            }
+            self._save_manifest()
+            self._dataset = None
+        return table.num_rows
+
+    def ingest_workbook(self, file_path: Path, sheets: Optional[List[str]] = None,
+                        max_row: int = 999, max_col: int = 49, force: bool = False) -> int:
+        """
+        Stream a CTCAC workbook straight into the lake (one XML pass per sheet).
+        Unchanged workbooks are skipped unless force=True. Returns records written (0 if skipped).
+        """
+        file_path = Path(file_path)
+        if not force and self.is_current(file_path):
+            return 0
+        with StreamingXlsxReader(file_path) as reader:
+            names = [name for name in reader.sheet_names if sheets is None or name in sheets]
+
+            def cells():
+                for name in names:
+                    for cell in reader.read_sheet(name, max_row, max_col).cells:
+                        yield name, cell.row, cell.col, cell.value, cell.formula
+
+            return self.add_application(file_path, cells(), sheet_order=names)
+
+    # ------------------------------------------------------------------ queries
+
+    @property
+    def dataset(self) -> ds.Dataset:
+        with self._lock:
+            if self._dataset is None:
+                self._dataset = ds.dataset(self.cells_dir, format='parquet', partitioning=PARTITIONING)
+            return self._dataset
+
+    @staticmethod
+    def _partition_filter(year=None, credit_type=None, round=None, application_id=None, sheet=None):
+        """Filter expression; year/credit_type prune whole directories"""
+        expression = None
+        for name, wanted in (('year', year), ('credit_type', credit_type), ('round', round),
+                             ('application_id', application_id), ('sheet', sheet)):
+            if wanted is None:
+                continue
+            wanted = list(wanted) if isinstance(wanted, (list, tuple, set)) else [wanted]
+            term = ds.field(name).isin(wanted)
+            expression = term if expression is None else expression & term
+        return expression
+
+    def cells(self, columns: Optional[List[str]] = None, **filters) -> pa.Table:
+        """Column-pruned cell records matching year/credit_type/round/application_id/sheet filters"""
+        if not self.manifest['applications']:
+            return CELL_SCHEMA.empty_table()
+        return self.dataset.to_table(columns=columns, filter=self._partition_filter(**filters))
+
+    def applications(self, **filters) -> pd.DataFrame:
+        """One row per application in the lake (from the manifest, no data files read)"""
+        rows = []
+        for key, entry in self.manifest['applications'].items():
+            year, application_id = key.split('/', 1)
+            rows.append({'application_id': application_id, 'year': int(year),
+                         'credit_type': entry['credit_type'], 'round': entry['round'], 'cells': entry['rows']})
+        df = pd.DataFrame(rows, columns=['application_id', 'year', 'credit_type', 'round', 'cells'])
+        for name, wanted in filters.items():
+            if wanted is not None:
+                wanted = list(wanted) if isinstance(wanted, (list, tuple, set)) else [wanted]
+                df = df[df[name].isin(wanted)]
+        return df.reset_index(drop=True)
+
+    def label_index(self) -> pa.Table:
+        """
+        Labelled numeric cells of every application, sorted by application/sheet/row/col,
+        with label dictionary-encoded so label regexes run once per distinct label.
+        Only applications (re)built since the last refresh are read from their cell files.
+        """
+        with self._lock:
+            applications = dict(self.manifest['applications'])
+            indexed = self.manifest.setdefault('label_index', {})
+            stale = {key for key, entry in applications.items() if indexed.get(key) != entry['built']}
+            removed = set(indexed) - set(applications)
+            if self._label_index is not None and not stale and not removed:
+                return self._label_index
+
+            parts = []
+            if self.label_index_path.exists() and len(stale | removed) < len(indexed):
+                kept = pq.read_table(self.label_index_path, read_dictionary=['label', 'application_id'])
+                if not stale and not removed:
+                    self._label_index = self._encode_index(kept)
+                    return self._label_index
+                drop = [key.split('/', 1)[1] for key in stale | removed]
+                if drop:
+                    kept = kept.filter(pc.invert(pc.is_in(kept['application_id'], pa.array(drop))))
+                parts.append(kept)
+            else:
+                stale = set(applications)
+
+            if stale:
+                paths = [applications[key]['parquet'] for key in sorted(stale)]
+                fresh = ds.dataset(paths, format='parquet', partitioning=PARTITIONING,
+                                   partition_base_dir=str(self.cells_dir)).to_table(
+                    columns=LABEL_INDEX_COLUMNS,
+                    filter=ds.field('label').is_valid() & ds.field('value_number').is_valid())
+                parts.append(fresh)
+
+            if not parts:
+                self._label_index = pa.table({name: [] for name in LABEL_INDEX_COLUMNS})
+                return self._label_index
+            parts = [part.cast(pa.schema([field.with_type(field.type.value_type) if pa.types.is_dictionary(field.type)
+                                           else field for field in part.schema])) for part in parts]
+            index = pa.concat_tables([part.cast(parts[0].schema) for part in parts])
+            index = index.take(pc.sort_indices(index, sort_keys=[
+                ('application_id', 'ascending'), ('sheet_index', 'ascending'),
+                ('row', 'ascending'), ('col', 'ascending')]))
+
+            tmp_path = self.label_index_path.with_suffix('.parquet.tmp')
+            pq.write_table(index, tmp_path, compression='snappy')
+            os.replace(tmp_path, self.label_index_path)
+            self.manifest['label_index'] = {key: entry['built'] for key, entry in applications.items()}
+            self._save_manifest()
+
+            self._label_index = self._encode_index(index)
+            return self._label_index
+
+    @staticmethod
+    def _encode_index(index: pa.Table) -> pa.Table:
+        """One chunk, with label and application_id sharing a single dictionary each"""
+        for name in ('label', 'application_id'):
+            column = index[name]
+            if pa.types.is_dictionary(column.type):
+                column = column.cast(column.type.value_type)
+            index = index.set_column(index.schema.get_field_index(name), name, pc.dictionary_encode(column))
+        return index.combine_chunks()
+
+    def compare(self, metrics: Optional[Dict[str, Tuple[Optional[str], str]]] = None, **filters) -> pd.DataFrame:
+        """
+        Wide comparison table, one row per application, answered from the label index.
+        metrics maps output column -> (sheet or None, case-insensitive label regex); each metric
+        takes the first numeric cell (sheet order, then row, col) whose label matches.
+        """
+        metrics = metrics or KEY_METRICS
+        index_columns = ['application_id', 'year', 'credit_type', 'round']
+        result = self.applications(**{k: v for k, v in filters.items() if k in index_columns})[index_columns]
+        if result.empty:
+            return pd.DataFrame(columns=index_columns + list(metrics))
+
+        index = self.label_index()
+        if not index.num_rows:
+            return result.assign(**{metric: None for metric in metrics})
+
+        # Work on dictionary codes: each regex runs once per distinct label, not per cell
+        def codes_matching(column, keep):
+            array = index[column].chunk(0)
+            return pc.is_in(array.indices, pc.indices_nonzero(keep(array.dictionary)).cast(array.indices.type))
+
+        combined = '|'.join(f'(?:{pattern})' for _, pattern in metrics.values())
+        wanted_ids = pa.array(result['application_id'].unique())
+        mask = pc.and_(codes_matching('label', lambda d: pc.match_substring_regex(d, combined, ignore_case=True)),
+                       codes_matching('application_id', lambda d: pc.is_in(d, wanted_ids)))
+        hits = index.filter(mask).select(['application_id', 'year', 'sheet', 'label', 'value_number']).to_pandas()
+        hits['application_id'] = hits['application_id'].astype(str)
+        hits['label'] = hits['label'].astype(str)
+        hits['year'] = hits['year'].astype(int)
+
+        for metric, (sheet, pattern) in metrics.items():
+            selected = hits['label'].str.contains(pattern, case=False, regex=True)
+            if sheet is not None:
+                selected &= hits['sheet'] == sheet
+            first = hits.loc[selected, ['application_id', 'year', 'value_number']].drop_duplicates(['application_id', 'year'])
+            result = result.merge(first.rename(columns={'value_number': metric}), on=['application_id', 'year'], how='left')
+        return result.sort_values(['year', 'application_id']).reset_index(drop=True)
+
+    def per_unit(self, metric: str = 'total_development_cost', units_metric: str = 'total_units',
+                 metrics: Optional[Dict[str, Tuple[Optional[str], str]]] = None, **filters) -> pd.DataFrame:
+        """metric / units for every matching application, e.g. TDC per unit across 2023 4% apps"""
+        metrics = metrics or KEY_METRICS
+        df = self.compare({metric: metrics[metric], units_metric: metrics[units_metric]}, **filters)
+        units = df[units_metric].where(df[units_metric] > 0)
+        df[f"{metric}_per_unit"] = df[metric] / units
+        return df
+
+
+def main():
+    """Load every CTCAC application workbook into the lake and print a 4% TDC-per-unit comparison"""
+    raw_data_dir = Path("/Users/williamrice/Library/CloudStorage/Dropbox-HERR/Bill Rice/Data_Sets/california/CA_LIHTC_Applications/raw_data")
+    lake = CTCACDataLake(Path("/Users/williamrice/Library/CloudStorage/Dropbox-HERR/Bill Rice/Colosseum/ctcac_data_lake"))
+
+    print("🏛️ CTCAC DATA LAKE - incremental load")
+    added = skipped = failed = 0
+    for file_path in sorted(raw_data_dir.glob("*.xlsx")):
+        if file_path.name.startswith(('.', '~')) or parse_application_name(file_path.name) is None:
+            continue
+        try:
+            if lake.ingest_workbook(file_path):
+                added += 1
+            else:
+                skipped += 1
+        except Exception as e:
+            failed += 1
+            print(f"❌ {file_path.name}: {e}")
+    print(f"✅ Added {added}, unchanged {skipped}, failed {failed}")
+
+    started = datetime.now()
+    df = lake.per_unit(year=2023, credit_type='4pct')
+    elapsed = (datetime.now() - started).total_seconds() * 1000
+    print(f"📊 2023 4% TDC per unit ({len(df)} applications, {elapsed:.0f} ms):")
+    print(df.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Shared Docling conversion cache for the property extractors and the QAP processor
+Every category extractor used to build its own DocumentConverter and re-convert the
+PDFs it reads. This cache converts each PDF once per content hash:
+- one DocumentConverter (models loaded once) behind a lock, created on first miss
+- markdown kept in memory and under cache_dir/<sha256>.md across runs
+- other conversions (JSON structures, e.g. the QAP section/table structure) under
+  cache_dir/<sha256>_<variant>.json, built by the caller's own converter
+- concurrent requests for the same PDF wait for the single conversion in progress
+"""
+
+import os
+import sys
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+sys.path.append(str(Path(__file__).parent.parent / "data_intelligence"))
+from download_engine import file_sha256
+
+logger = logging.getLogger(__name__)
+
+MARKDOWN = 'markdown'
+
+
+class DoclingConversionCache:
+    """PDF -> markdown (or another conversion), converted at most once per file content"""
+
+    def __init__(self, cache_dir: Optional[Path] = None, converter: Optional[Callable[[Path], str]] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._convert_fn = converter
+        self._docling = None
+        self._convert_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._memory: Dict[str, str] = {}
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self.stats = {'conversions': 0, 'memory_hits': 0, 'disk_hits': 0, 'failures': 0}
+
+    def _docling_markdown(self, pdf_path: Path) -> str:
+        if self._docling is None:
+            from docling.document_converter import DocumentConverter
+            self._docling = DocumentConverter()
+        return self._docling.convert(str(pdf_path)).document.export_to_markdown()
+
+    def _convert_markdown(self, pdf_path: Path) -> str:
+        # Docling's converter is not shared across threads safely; distinct PDFs convert in turn
+        with self._convert_lock:
+            return (self._convert_fn or self._docling_markdown)(pdf_path)
+
+    def _cache_file(self, key: str, variant: str = MARKDOWN) -> Optional[Path]:
+        if not self.cache_dir:
+            return None
+        return self.cache_dir / (f"{key}.md" if variant == MARKDOWN else f"{key}_{variant}.json")
+
+    def _read_cache_file(self, cache_file: Path, variant: str) -> Any:
+        if variant == MARKDOWN:
+            return cache_file.read_text(encoding='utf-8')
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Discarding unreadable conversion cache {cache_file.name}: {e}")
+            return None
+
+    def _write_cache_file(self, cache_file: Path, variant: str, value: Any):
+        tmp_file = cache_file.with_suffix('.tmp')
+        if variant == MARKDOWN:
+            tmp_file.write_text(value, encoding='utf-8')
+        else:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(value, f, ensure_ascii=False)
+        os.replace(tmp_file, cache_file)
+
+    def markdown(self, pdf_path: Path) -> str:
+        """Markdown for a PDF ('' if conversion fails; failures are not cached)"""
+        try:
+            text, _ = self._get(Path(pdf_path), MARKDOWN, self._convert_markdown)
+        except Exception as e:
+            logger.error(f"Docling error on {pdf_path}: {e}")
+            return ""
+        return text
+
+    def converted(self, pdf_path: Path, variant: str, build: Callable[[Path], Any]) -> Tuple[Any, bool]:
+        """(value, cache_hit) for a JSON-serialisable conversion of a PDF, built at most once per content
+
+        build(pdf_path) runs outside the markdown converter lock, so callers may convert in their own
+        worker processes. Its exceptions propagate and nothing is cached. JSON variants are only kept
+        on disk: callers get a fresh copy they are free to modify.
+        """
+        if variant == MARKDOWN:
+            raise ValueError("Use markdown() for the markdown conversion")
+        return self._get(Path(pdf_path), variant, build)
+
+    def _get(self, pdf_path: Path, variant: str, build: Callable[[Path], Any]) -> Tuple[Any, bool]:
+        key = file_sha256(pdf_path)
+        in_memory = variant == MARKDOWN
+        with self._lock:
+            if in_memory and key in self._memory:
+                self.stats['memory_hits'] += 1
+                return self._memory[key], True
+            key_lock = self._key_locks.setdefault((key, variant), threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                if in_memory and key in self._memory:  # converted by another thread while we waited
+                    self.stats['memory_hits'] += 1
+                    return self._memory[key], True
+
+            cache_file = self._cache_file(key, variant)
+            if cache_file is not None and cache_file.exists():
+                value = self._read_cache_file(cache_file, variant)
+                if value is not None:
+                    with self._lock:
+                        self.stats['disk_hits'] += 1
+                        if in_memory:
+                            self._memory[key] = value
+                    return value, True
+
+            try:
+                value = build(pdf_path)
+            except Exception:
+                with self._lock:
+                    self.stats['failures'] += 1
+                raise
+
+            if cache_file is not None and value:
+                self._write_cache_file(cache_file, variant, value)
+            with self._lock:
+                self.stats['conversions'] += 1
+                if in_memory and value:
+                    self._memory[key] = value
+            return value, False
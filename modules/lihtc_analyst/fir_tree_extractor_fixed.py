@@ -8,14 +8,17 @@ Built by Structured Consultants LLC
 import json
 import os
 import sys
-import requests
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, asdict
+from concurrent.futures import ThreadPoolExecutor
 import logging
 import time
 
+from ollama_client import OllamaClient
+from docling_conversion_cache import DoclingConversionCache
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -23,7 +26,6 @@ logger = logging.getLogger(__name__)
 # Base paths
 BASE_DIR = Path("/Users/williamrice/Library/CloudStorage/Dropbox-HERR/Bill Rice/Deals (Good Clean)/Fir_Tree-Shelton_WA/Due_Diligence")
 OUTPUT_DIR = Path("/Users/williamrice/Library/CloudStorage/Dropbox-HERR/Bill Rice/Colosseum/modules/lihtc_analyst/fir_tree_output")
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 @dataclass
 class ExtractionConfig:
@@ -34,57 +36,29 @@ class ExtractionConfig:
     chunk_size: int = 4000
     validate_cross_docs: bool = True
     ollama_api_url: str = "http://localhost:11434/api/generate"
+    ollama_max_in_flight: int = int(os.environ.get('OLLAMA_NUM_PARALLEL', 2))  # what the server runs in parallel
+    cache_dir: Path = OUTPUT_DIR / "cache"
     
 class CategoryExtractor:
     """Base class for category-specific extractors"""
     
-    def __init__(self, config: ExtractionConfig):
+    def __init__(self, config: ExtractionConfig,
+                 client: Optional[OllamaClient] = None,
+                 documents: Optional[DoclingConversionCache] = None):
         self.config = config
+        # Shared across extractors by FirTreeAnalyzer; standalone use gets its own
+        self.client = client or OllamaClient(config.ollama_api_url, config.ollama_max_in_flight,
+                                             cache_dir=config.cache_dir / "ollama")
+        self.documents = documents or DoclingConversionCache(config.cache_dir / "docling")
         self.results = {}
         
     def run_ollama_api(self, model: str, prompt: str, timeout: int = 120) -> str:
-        """Execute Ollama model via API for clean output"""
-        try:
-            logger.info(f"Calling {model} via API...")
-            response = requests.post(
-                self.config.ollama_api_url,
-                json={
-                    "model": model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.1,  # Low temperature for consistency
-                        "top_p": 0.9
-                    }
-                },
-                timeout=timeout
-            )
-            
-            if response.status_code == 200:
-                result = response.json().get('response', '')
-                logger.info(f"Model returned {len(result)} characters")
-                return result
-            else:
-                logger.error(f"API error: {response.status_code}")
-                return ""
-                
-        except requests.exceptions.Timeout:
-            logger.error(f"Model timeout after {timeout} seconds")
-            return ""
-        except Exception as e:
-            logger.error(f"Ollama API error: {e}")
-            return ""
+        """Execute Ollama model via the shared pooled, caching client ('' on failure)"""
+        return self.client.generate(model, prompt, timeout)
     
     def extract_with_docling(self, pdf_path: Path) -> str:
-        """Extract text from PDF using Docling"""
-        try:
-            from docling.document_converter import DocumentConverter
-            converter = DocumentConverter()
-            result = converter.convert(str(pdf_path))
-            return result.document.export_to_markdown()
-        except Exception as e:
-            logger.error(f"Docling error on {pdf_path}: {e}")
-            return ""
+        """Extract text from PDF using Docling (converted once per file, shared by all extractors)"""
+        return self.documents.markdown(pdf_path)
     
     def parse_json_response(self, response: str, default: Dict = None) -> Dict:
         """Parse JSON from model response, handling various formats"""
@@ -225,6 +199,9 @@ class RegulatoryExtractor(CategoryExtractor):
             "compliance_scores": {}
         }
         
+        # HAP contract and OCAF letter are independent: queue both prompts, then collect
+        pending = []
+        
         # HAP Contract
         hap_path = BASE_DIR / "8) 2003 Original HAP Assignment Contract from Seller to CHAPA (final signed) .pdf"
         if hap_path.exists():
@@ -249,13 +226,7 @@ Return ONLY a JSON object with:
 HAP Contract Text:
 """ + text_chunk
                 
-                result = self.run_ollama_api(self.config.gpt_oss_20b, prompt)
-                
-                if result:
-                    extracted = self.parse_json_response(result)
-                    if extracted:
-                        logger.info(f"Extracted HAP data: {extracted}")
-                        regulatory_data["hud_programs"]["section_8"].update(extracted)
+                pending.append(("HAP", self.client.submit(self.config.gpt_oss_20b, prompt)))
         
         # OCAF Letter
         ocaf_path = BASE_DIR / "Fir Tree OCAF Certification Letter  HAP Contracts 2023 copy.pdf"
@@ -279,13 +250,16 @@ Return ONLY a JSON object:
 OCAF Letter Text:
 """ + text_chunk
                 
-                result = self.run_ollama_api(self.config.gpt_oss_20b, prompt)
-                
-                if result:
-                    extracted = self.parse_json_response(result)
-                    if extracted:
-                        logger.info(f"Extracted OCAF data: {extracted}")
-                        regulatory_data["hud_programs"]["section_8"].update(extracted)
+                pending.append(("OCAF", self.client.submit(self.config.gpt_oss_20b, prompt)))
+        
+        # Apply in document order so OCAF values still override HAP values
+        for source, future in pending:
+            result = future.result()
+            if result:
+                extracted = self.parse_json_response(result)
+                if extracted:
+                    logger.info(f"Extracted {source} data: {extracted}")
+                    regulatory_data["hud_programs"]["section_8"].update(extracted)
         
         # Set defaults if not extracted
         if not regulatory_data["hud_programs"]["section_8"].get("contract"):
@@ -441,39 +415,59 @@ class TransactionExtractor(CategoryExtractor):
 class FirTreeAnalyzer:
     """Main orchestrator for Fir Tree extraction"""
     
-    def __init__(self):
-        self.config = ExtractionConfig()
+    def __init__(self, config: Optional[ExtractionConfig] = None,
+                 client: Optional[OllamaClient] = None,
+                 documents: Optional[DoclingConversionCache] = None):
+        self.config = config or ExtractionConfig()
+        # One client (in-flight limit + response cache) and one conversion cache for every category
+        self.client = client or OllamaClient(self.config.ollama_api_url, self.config.ollama_max_in_flight,
+                                             cache_dir=self.config.cache_dir / "ollama")
+        self.documents = documents or DoclingConversionCache(self.config.cache_dir / "docling")
+        shared = (self.config, self.client, self.documents)
         self.extractors = {
-            "financial": FinancialExtractor(self.config),
-            "regulatory": RegulatoryExtractor(self.config),
-            "rent_occupancy": RentOccupancyExtractor(self.config),
-            "physical": PhysicalAssetExtractor(self.config),
-            "transaction": TransactionExtractor(self.config)
+            "financial": FinancialExtractor(*shared),
+            "regulatory": RegulatoryExtractor(*shared),
+            "rent_occupancy": RentOccupancyExtractor(*shared),
+            "physical": PhysicalAssetExtractor(*shared),
+            "transaction": TransactionExtractor(*shared)
         }
         self.results = {}
+        self.category_times = {}
+        
+    def _run_category(self, category: str, extractor: CategoryExtractor) -> Dict:
+        logger.info(f"📂 Processing category: {category.upper()}")
+        category_start = time.time()
+        result = extractor.extract()
+        self.category_times[category] = time.time() - category_start
+        logger.info(f"✅ {category} completed in {self.category_times[category]:.2f} seconds")
+        return result
         
     def extract_all_categories(self):
-        """Run all extractors"""
+        """Run all extractors concurrently; the shared client bounds load on the Ollama server"""
         logger.info("🚀 Starting Fir Tree Park AI-Powered Extraction...")
         logger.info("=" * 60)
         
         start_time = time.time()
         
-        for category, extractor in self.extractors.items():
-            logger.info(f"\n📂 Processing category: {category.upper()}")
-            logger.info("-" * 40)
-            
-            category_start = time.time()
-            self.results[category] = extractor.extract()
-            category_time = time.time() - category_start
-            
-            logger.info(f"✅ {category} completed in {category_time:.2f} seconds")
+        with ThreadPoolExecutor(max_workers=len(self.extractors)) as executor:
+            futures = {category: executor.submit(self._run_category, category, extractor)
+                       for category, extractor in self.extractors.items()}
+            for category, future in futures.items():
+                self.results[category] = future.result()
             
         total_time = time.time() - start_time
-        logger.info(f"\n🎯 Total extraction time: {total_time:.2f} seconds")
+        slowest = max(self.category_times.values(), default=0)
+        logger.info(f"\n🎯 Total extraction time: {total_time:.2f} seconds (slowest category {slowest:.2f}s)")
+        logger.info(f"🤖 Ollama: {self.client.stats['requests']} requests, {self.client.stats['cache_hits']} cache hits, "
+                    f"{self.client.stats['failures']} failures")
+        logger.info(f"📄 Docling: {self.documents.stats['conversions']} conversions, "
+                    f"{self.documents.stats['memory_hits'] + self.documents.stats['disk_hits']} cache hits")
         
         return self.results
     
+    def close(self):
+        self.client.close()
+    
     def validate_results(self):
         """Cross-validate extracted data"""
         validations = []
@@ -522,6 +516,7 @@ class FirTreeAnalyzer:
     def save_results(self):
         """Save extraction results"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
         
         output = {
             "extraction_timestamp": timestamp,
@@ -583,6 +578,7 @@ def main():
     
     # Save results
     output_file = analyzer.save_results()
+    analyzer.close()
     
     print(f"\n✅ AI Extraction complete!")
     print(f"📁 Results saved to: {output_file}")
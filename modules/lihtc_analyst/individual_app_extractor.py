@@ -13,6 +13,8 @@ from datetime import datetime
 import logging
 import json
 
+from streaming_xlsx_reader import StreamingXlsxReader
+
 class IndividualAppExtractor:
     """Create individual comprehensive extractions for each CTCAC application"""
     
@@ -143,19 +145,16 @@ class IndividualAppExtractor:
             'summary': {}
         }
         
-        # Load Excel file
-        wb_formulas = openpyxl.load_workbook(file_path, data_only=False)
-        wb_values = openpyxl.load_workbook(file_path, data_only=True)
+        # Stream the workbook once: formula text and cached value arrive together per cell
+        reader = StreamingXlsxReader(file_path)
         
         # Process each sheet comprehensively
-        for sheet_name in wb_formulas.sheetnames:
+        for sheet_name in reader.sheet_names:
             self.logger.info(f"  📋 Extracting: {sheet_name}")
             
-            ws_formulas = wb_formulas[sheet_name]
-            ws_values = wb_values[sheet_name]
-            
-            # Extract sheet data
-            sheet_result = self._extract_sheet_comprehensive(ws_formulas, ws_values, sheet_name)
+            # Extract sheet data (same 499 x 49 window as before)
+            scan = reader.read_sheet(sheet_name, max_row=499, max_col=49)
+            sheet_result = self._extract_sheet_comprehensive(scan, sheet_name)
             app_data['sheets_data'][sheet_name] = sheet_result
             
             # Apply intelligent extraction for critical sheets
@@ -171,68 +170,56 @@ class IndividualAppExtractor:
             if sheet_result['formulas']:
                 app_data['formula_analysis'][sheet_name] = self._analyze_formulas(sheet_result['formulas'])
         
-        wb_formulas.close()
-        wb_values.close()
+        reader.close()
         
         # Generate summary
         app_data['summary'] = self._generate_comprehensive_summary(app_data)
         
         return app_data
     
-    def _extract_sheet_comprehensive(self, ws_formulas, ws_values, sheet_name: str) -> dict:
+    def _extract_sheet_comprehensive(self, scan, sheet_name: str) -> dict:
         """Extract everything from a sheet"""
         sheet_data = {
             'metadata': {
                 'sheet_name': sheet_name,
-                'max_row': ws_formulas.max_row,
-                'max_column': ws_formulas.max_column,
-                'merged_cells_count': len(list(ws_formulas.merged_cells.ranges))
+                'max_row': scan.max_row,
+                'max_column': scan.max_column,
+                'merged_cells_count': len(scan.merged_cells)
             },
             'cells': {},
             'formulas': {},
-            'merged_cells': [],
+            'merged_cells': list(scan.merged_cells),
             'cell_styles': {},
             'data_types': {}
         }
         
-        # Get merged cells
-        for merged_range in ws_formulas.merged_cells.ranges:
-            sheet_data['merged_cells'].append(str(merged_range))
-        
         # Extract cells (expanded range for comprehensive coverage)
-        for row in range(1, min(ws_formulas.max_row + 1, 500)):
-            for col in range(1, min(ws_formulas.max_column + 1, 50)):
-                
-                cell_formula = ws_formulas.cell(row=row, column=col)
-                cell_value = ws_values.cell(row=row, column=col)
-                
-                if cell_value.value is not None:
-                    cell_ref = f"{openpyxl.utils.get_column_letter(col)}{row}"
-                    
-                    # Basic cell info
-                    cell_info = {
-                        'row': row,
-                        'col': col,
-                        'value': cell_value.value,
-                        'display_value': str(cell_value.value)[:200] if cell_value.value else None,
-                        'formula': None,
-                        'data_type': type(cell_value.value).__name__
-                    }
-                    
-                    # Check for formula
-                    if (hasattr(cell_formula, '_value') and 
-                        isinstance(cell_formula._value, str) and 
-                        cell_formula._value.startswith('=')):
-                        cell_info['formula'] = cell_formula._value
-                        sheet_data['formulas'][cell_ref] = cell_formula._value
-                    
-                    # Track data types
-                    data_type = type(cell_value.value).__name__
-                    if data_type not in sheet_data['data_types']:
-                        sheet_data['data_types'][data_type] = 0
-                    sheet_data['data_types'][data_type] += 1
-                    
-                    sheet_data['cells'][cell_ref] = cell_info
+        for cell in scan.cells:
+            if cell.value is None:
+                continue
+            
+            cell_ref = cell.coordinate
+            
+            # Basic cell info
+            cell_info = {
+                'row': cell.row,
+                'col': cell.col,
+                'value': cell.value,
+                'display_value': str(cell.value)[:200] if cell.value else None,
+                'formula': cell.formula,
+                'data_type': type(cell.value).__name__
+            }
+            
+            if cell.formula:
+                sheet_data['formulas'][cell_ref] = cell.formula
+            
+            # Track data types
+            data_type = type(cell.value).__name__
+            if data_type not in sheet_data['data_types']:
+                sheet_data['data_types'][data_type] = 0
+            sheet_data['data_types'][data_type] += 1
+            
+            sheet_data['cells'][cell_ref] = cell_info
         
         return sheet_data
     
@@ -19,6 +19,10 @@ import signal
 import sys
 from typing import List, Dict, Tuple
 
+from streaming_xlsx_reader import StreamingXlsxReader, isoformat_dates
+
+CHECKLIST_SHEET_TERMS = ["checklist items", "application checklist"]
+
 # Import our proven V1.9 processor components
 class SmartRangeDetector:
     """Intelligent range detection for CTCAC applications"""
@@ -83,73 +87,113 @@ class SmartRangeDetector:
         safe_col = min(last_data_col + 5, self.SAFE_MAX_COLS)
         
         return safe_row, safe_col
+    
+    def detect_streaming_range(self, reader: StreamingXlsxReader, sheet_name: str) -> Tuple[int, int]:
+        """Same boundaries as detect_smart_range, from the declared dimension and a streamed scan"""
+        excel_max_row, excel_max_col = reader.dimension(sheet_name)
+        
+        if excel_max_col > 1000 or excel_max_row > 5000 or not excel_max_row:
+            return self._scan_streaming_boundaries(reader, sheet_name, excel_max_row, excel_max_col)
+        
+        return min(excel_max_row, self.SAFE_MAX_ROWS), min(excel_max_col, self.SAFE_MAX_COLS)
+    
+    def _scan_streaming_boundaries(self, reader: StreamingXlsxReader, sheet_name: str,
+                                   excel_max_row: int, excel_max_col: int) -> Tuple[int, int]:
+        """_scan_for_actual_boundaries over streamed cells: one partial pass instead of cell() probes"""
+        max_search_row = min(excel_max_row or self.SAFE_MAX_ROWS, 2000)
+        max_search_col = min(excel_max_col or self.SAFE_MAX_COLS, 50)  # the cell() scan never went past col 50
+        
+        last_data_row = 1
+        rows_by_col = {}
+        for cell in reader.iter_cells(sheet_name, max_row=max_search_row, max_col=max_search_col):
+            content = cell.formula if cell.value is None else cell.value
+            if content is not None and str(content).strip():
+                last_data_row = max(last_data_row, cell.row)
+                rows_by_col.setdefault(cell.col, []).append(cell.row)
+        
+        # Forward column scan: stop at the first empty column past column 20
+        last_data_col = 1
+        scan_rows = min(last_data_row, 500)
+        for col_num in range(1, max_search_col + 1):
+            if any(row <= scan_rows for row in rows_by_col.get(col_num, [])):
+                last_data_col = col_num
+            elif col_num > 20:
+                break
+        
+        safe_row = min(last_data_row + 10, self.SAFE_MAX_ROWS)
+        safe_col = min(last_data_col + 5, self.SAFE_MAX_COLS)
+        
+        return safe_row, safe_col
 
 def process_single_ctcac_file(file_path_str: str) -> Dict:
-    """Single file processor for parallel execution"""
+    """Single file processor for parallel execution
+    
+    Streams each kept sheet once through its smart range and writes the processed copy
+    with a write-only workbook; checklist sheets are dropped without being parsed.
+    """
     file_path = Path(file_path_str)
     
     try:
         start_time = time.time()
         range_detector = SmartRangeDetector()
         
-        # Load workbook
-        wb = openpyxl.load_workbook(file_path, read_only=False)
-        
-        # Remove unnecessary sheets
-        sheets_removed = []
-        sheets_to_remove = []
-        for sheet in wb.worksheets:
-            if any(term in sheet.title.lower() for term in ["checklist items", "application checklist"]):
-                sheets_to_remove.append(sheet.title)
-        
-        for sheet_name in sheets_to_remove:
-            if sheet_name in wb.sheetnames:
-                wb.remove(wb[sheet_name])
-                sheets_removed.append(sheet_name)
-        
-        file_result = {
-            'file_name': file_path.name,
-            'processing_time': None,
-            'sheets_processed': 0,
-            'total_cells_processed': 0,
-            'sheets_removed': sheets_removed,
-            'anomaly_status': 'NORMAL',
-            'year': _extract_year(file_path.name),
-            'process_id': os.getpid()
-        }
-        
-        total_cells = 0
-        sheets_processed = 0
-        
-        # Process each remaining sheet with smart range detection
-        for sheet in wb.worksheets:
-            max_row, max_col = range_detector.detect_smart_range(sheet, sheet.title)
-            sheet_cells = max_row * max_col
-            total_cells += sheet_cells
-            sheets_processed += 1
+        with StreamingXlsxReader(file_path) as reader:
+            # Remove unnecessary sheets (never decompressed)
+            sheets_removed = [name for name in reader.sheet_names
+                              if any(term in name.lower() for term in CHECKLIST_SHEET_TERMS)]
+            kept_sheets = [name for name in reader.sheet_names if name not in sheets_removed]
+            
+            file_result = {
+                'file_name': file_path.name,
+                'processing_time': None,
+                'sheets_processed': 0,
+                'total_cells_processed': 0,
+                'sheets_removed': sheets_removed,
+                'anomaly_status': 'NORMAL',
+                'year': _extract_year(file_path.name),
+                'process_id': os.getpid()
+            }
+            
+            # Smart ranges first: anomalies are caught before any cell is parsed
+            ranges = {name: range_detector.detect_streaming_range(reader, name) for name in kept_sheets}
+            total_cells = sum(max_row * max_col for max_row, max_col in ranges.values())
+            
+            # Anomaly detection
+            if total_cells > 500000:
+                file_result['anomaly_status'] = 'CRITICAL_ANOMALY'
+                return file_result
+            
+            # Save processed file: smart range only, datetimes as ISO strings, formulas kept
+            output_path = file_path.parent / f"processed_{file_path.name}"
+            tmp_path = output_path.with_name(output_path.name + '.tmp')
+            wb = openpyxl.Workbook(write_only=True)
+            
+            for sheet_name in kept_sheets:
+                max_row, max_col = ranges[sheet_name]
+                ws = wb.create_sheet(title=sheet_name)
+                row_values = [None] * max_col
+                current_row = 1
+                
+                for cell in reader.iter_cells(sheet_name, max_row=max_row, max_col=max_col):
+                    while current_row < cell.row:
+                        ws.append(row_values)
+                        row_values = [None] * max_col
+                        current_row += 1
+                    row_values[cell.col - 1] = cell.formula or isoformat_dates(cell.value)
+                
+                while current_row <= max_row:
+                    ws.append(row_values)
+                    row_values = [None] * max_col
+                    current_row += 1
             
-            # Quick cell processing with datetime fix
-            for row in sheet.iter_rows(min_row=1, max_row=max_row, min_col=1, max_col=max_col):
-                for cell in row:
-                    if hasattr(cell.value, 'isoformat'):
-                        cell.value = cell.value.isoformat()
-        
-        # Anomaly detection
-        if total_cells > 500000:
-            file_result['anomaly_status'] = 'CRITICAL_ANOMALY'
-            wb.close()
-            return file_result
-        
-        # Save processed file
-        output_path = file_path.parent / f"processed_{file_path.name}"
-        wb.save(output_path)
-        wb.close()
+            wb.save(tmp_path)
+            os.replace(tmp_path, output_path)
         
         # Finalize results
         processing_time = time.time() - start_time
         file_result.update({
             'processing_time': round(processing_time, 2),
-            'sheets_processed': sheets_processed,
+            'sheets_processed': len(kept_sheets),
             'total_cells_processed': total_cells,
             'status': 'SUCCESS'
         })
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Pooled Ollama client shared by every extractor in a run
+- one keep-alive HTTP session, at most max_in_flight requests on the server at once
+  (match the server's OLLAMA_NUM_PARALLEL; extra requests queue client-side)
+- submit() returns a Future so callers can fan prompts out and collect later
+- responses cached by model + options + prompt hash (memory and disk);
+  identical prompts already in flight share one request
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OPTIONS = {
+    "temperature": 0.1,  # Low temperature for consistency
+    "top_p": 0.9
+}
+
+
+def prompt_key(model: str, prompt: str, options: Optional[Dict] = None) -> str:
+    """Cache key: identical model, options and prompt give the identical key"""
+    payload = json.dumps({'model': model, 'options': options or {}, 'prompt': prompt}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class OllamaClient:
+    """Bounded-concurrency, caching client for Ollama's /api/generate"""
+
+    def __init__(self, api_url: str = "http://localhost:11434/api/generate",
+                 max_in_flight: Optional[int] = None,
+                 cache_dir: Optional[Path] = None,
+                 options: Optional[Dict] = None):
+        self.api_url = api_url
+        self.max_in_flight = max_in_flight or int(os.environ.get('OLLAMA_NUM_PARALLEL', 2))
+        self.options = dict(DEFAULT_OPTIONS if options is None else options)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_in_flight)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        # The pool size *is* the in-flight limit: queued prompts wait here, not on the server
+        self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix='ollama')
+
+        self._lock = threading.Lock()
+        self._memory: Dict[str, str] = {}
+        self._pending: Dict[str, Future] = {}
+        self.stats = {'requests': 0, 'cache_hits': 0, 'shared_in_flight': 0, 'failures': 0, 'seconds': 0.0}
+
+    def __enter__(self) -> 'OllamaClient':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+    # ------------------------------------------------------------------ cache
+
+    def _cache_file(self, key: str) -> Optional[Path]:
+        return self.cache_dir / f"{key}.json" if self.cache_dir else None
+
+    def _cached(self, key: str) -> Optional[str]:
+        if key in self._memory:
+            return self._memory[key]
+        cache_file = self._cache_file(key)
+        if cache_file is None or not cache_file.exists():
+            return None
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                response = json.load(f)['response']
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Discarding unreadable Ollama cache {cache_file.name}: {e}")
+            return None
+        self._memory[key] = response
+        return response
+
+    def _store(self, key: str, model: str, response: str):
+        self._memory[key] = response
+        cache_file = self._cache_file(key)
+        if cache_file is None:
+            return
+        tmp_file = cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'model': model, 'response': response, 'created': datetime.now().isoformat()}, f)
+        os.replace(tmp_file, cache_file)
+
+    # ------------------------------------------------------------------ requests
+
+    def submit(self, model: str, prompt: str, timeout: int = 120) -> Future:
+        """Queue a generation; the Future resolves to the response text ('' on failure)"""
+        key = prompt_key(model, prompt, self.options)
+        with self._lock:
+            cached = self._cached(key)
+            if cached is not None:
+                self.stats['cache_hits'] += 1
+                future = Future()
+                future.set_result(cached)
+                return future
+            if key in self._pending:
+                self.stats['shared_in_flight'] += 1
+                return self._pending[key]
+            future = self._executor.submit(self._call, key, model, prompt, timeout)
+            self._pending[key] = future
+            return future
+
+    def generate(self, model: str, prompt: str, timeout: int = 120) -> str:
+        """Blocking generation through the shared pool and cache"""
+        return self.submit(model, prompt, timeout).result()
+
+    def _call(self, key: str, model: str, prompt: str, timeout: int) -> str:
+        started = datetime.now()
+        result = ""
+        try:
+            logger.info(f"Calling {model} via API...")
+            response = self.session.post(
+                self.api_url,
+                json={"model": model, "prompt": prompt, "stream": False, "options": self.options},
+                timeout=timeout
+            )
+            if response.status_code == 200:
+                result = response.json().get('response', '')
+                logger.info(f"Model returned {len(result)} characters")
+            else:
+                logger.error(f"API error: {response.status_code}")
+        except requests.exceptions.Timeout:
+            logger.error(f"Model timeout after {timeout} seconds")
+        except Exception as e:
+            logger.error(f"Ollama API error: {e}")
+
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['seconds'] += (datetime.now() - started).total_seconds()
+            if result:
+                self._store(key, model, result)  # failures are retried next time, never cached
+            else:
+                self.stats['failures'] += 1
+            self._pending.pop(key, None)
+        return result
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+STREAMING XLSX READER - single pass over each CTCAC worksheet
+Reads the sheet XML straight out of the .xlsx zip with an incremental (SAX-style)
+parser instead of building openpyxl workbooks:
+- formula text and cached value come back together for every cell, so one parse
+  replaces the data_only=False + data_only=True double load
+- parsing stops at the smart range row limit; cells past the column limit are dropped
+- sheets that are never asked for (checklists) are never decompressed
+- memory is O(cells kept), not O(workbook)
+"""
+
+import re
+import zipfile
+import posixpath
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from openpyxl.formula.translate import Translator
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils import column_index_from_string, get_column_letter
+from openpyxl.utils.cell import range_boundaries
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_ISO8601, from_excel
+
+MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+PKG_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+WORKSHEET_REL = REL_NS + '/worksheet'
+
+CHUNK_SIZE = 64 * 1024
+MERGE_CELL_PATTERN = re.compile(rb'<(?:\w+:)?mergeCell\s+ref="([A-Z]+\d+(?::[A-Z]+\d+)?)"')
+
+
+def _tag(name: str) -> str:
+    return f'{{{MAIN_NS}}}{name}'
+
+
+C_TAG, V_TAG, F_TAG, IS_TAG, T_TAG, RPH_TAG = (_tag(n) for n in ('c', 'v', 'f', 'is', 't', 'rPh'))
+ROW_TAG, DIMENSION_TAG, SHEETDATA_TAG, MERGE_TAG = (_tag(n) for n in ('row', 'dimension', 'sheetData', 'mergeCell'))
+
+
+@dataclass
+class XlsxCell:
+    """One non-empty cell: cached value (what data_only=True returns) plus formula text"""
+    row: int
+    col: int
+    value: object
+    formula: Optional[str] = None
+
+    @property
+    def coordinate(self) -> str:
+        return f"{get_column_letter(self.col)}{self.row}"
+
+
+@dataclass
+class SheetScan:
+    """Everything one pass over a worksheet produced"""
+    name: str
+    max_row: int
+    max_column: int
+    cells: List[XlsxCell] = field(default_factory=list)
+    merged_cells: List[str] = field(default_factory=list)
+    truncated: bool = False
+
+
+class StreamingXlsxReader:
+    """Read-once access to the worksheets of an .xlsx file"""
+
+    def __init__(self, file_path: Path):
+        self.file_path = Path(file_path)
+        self._zip = zipfile.ZipFile(self.file_path)
+        self._sheet_parts = self._read_sheet_parts()
+        self._shared_strings: Optional[List[str]] = None
+        self._column_cache: Dict[str, int] = {}
+        self._date_styles, self._timedelta_styles, self._epoch = self._read_styles()
+
+    def __enter__(self) -> 'StreamingXlsxReader':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._zip.close()
+
+    @property
+    def sheet_names(self) -> List[str]:
+        return list(self._sheet_parts)
+
+    # ------------------------------------------------------------------
+    # Workbook-level parts (small, read once)
+    # ------------------------------------------------------------------
+    def _read_sheet_parts(self) -> Dict[str, str]:
+        rels = ET.fromstring(self._zip.read('xl/_rels/workbook.xml.rels'))
+        targets = {}
+        for rel in rels.iter(f'{{{PKG_REL_NS}}}Relationship'):
+            if rel.get('Type') == WORKSHEET_REL:
+                target = rel.get('Target')
+                path = target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join('xl', target))
+                targets[rel.get('Id')] = path
+
+        workbook = ET.fromstring(self._zip.read('xl/workbook.xml'))
+        self._date1904 = False
+        pr = workbook.find(_tag('workbookPr'))
+        if pr is not None and pr.get('date1904') in ('1', 'true'):
+            self._date1904 = True
+
+        parts = {}
+        for sheet in workbook.iter(_tag('sheet')):
+            rel_id = sheet.get(f'{{{REL_NS}}}id')
+            if rel_id in targets:
+                parts[sheet.get('name')] = targets[rel_id]
+        return parts
+
+    def _read_styles(self):
+        date_styles, timedelta_styles = set(), set()
+        epoch = CALENDAR_MAC_1904 if self._date1904 else CALENDAR_WINDOWS_1900
+        try:
+            styles = ET.fromstring(self._zip.read('xl/styles.xml'))
+        except KeyError:
+            return date_styles, timedelta_styles, epoch
+
+        formats = dict(BUILTIN_FORMATS)
+        num_fmts = styles.find(_tag('numFmts'))
+        if num_fmts is not None:
+            for fmt in num_fmts.iter(_tag('numFmt')):
+                formats[int(fmt.get('numFmtId'))] = fmt.get('formatCode', '')
+
+        cell_xfs = styles.find(_tag('cellXfs'))
+        if cell_xfs is not None:
+            for index, xf in enumerate(cell_xfs.iter(_tag('xf'))):
+                code = formats.get(int(xf.get('numFmtId', 0)), '')
+                if is_timedelta_format(code):
+                    timedelta_styles.add(index)
+                elif is_date_format(code):
+                    date_styles.add(index)
+        return date_styles, timedelta_styles, epoch
+
+    @property
+    def shared_strings(self) -> List[str]:
+        if self._shared_strings is None:
+            strings = []
+            try:
+                with self._zip.open('xl/sharedStrings.xml') as f:
+                    for event, elem in ET.iterparse(f, events=('end',)):
+                        if elem.tag == _tag('si'):
+                            strings.append(self._text_of(elem))
+                            elem.clear()
+            except KeyError:
+                pass
+            self._shared_strings = strings
+        return self._shared_strings
+
+    @staticmethod
+    def _text_of(elem) -> str:
+        """Concatenated <t> text of a string item, ignoring phonetic runs"""
+        parts = []
+        for child in elem:
+            if child.tag == T_TAG:
+                parts.append(child.text or '')
+            elif child.tag != RPH_TAG:
+                parts.extend(t.text or '' for t in child.iter(T_TAG))
+        return ''.join(parts)
+
+    # ------------------------------------------------------------------
+    # Worksheets
+    # ------------------------------------------------------------------
+    def dimension(self, sheet_name: str) -> Tuple[int, int]:
+        """Declared used range (like read_only openpyxl max_row/max_column); (0, 0) if absent"""
+        parser = ET.XMLPullParser(events=('start',))
+        with self._zip.open(self._sheet_parts[sheet_name]) as f:
+            for chunk in iter(lambda: f.read(8192), b''):
+                parser.feed(chunk)
+                for event, elem in parser.read_events():
+                    if elem.tag == DIMENSION_TAG:
+                        ref = elem.get('ref', 'A1')
+                        try:
+                            min_col, min_row, max_col, max_row = range_boundaries(ref)
+                        except ValueError:
+                            return 0, 0
+                        return max_row or 0, max_col or 0
+                    if elem.tag == SHEETDATA_TAG:
+                        return 0, 0
+        return 0, 0
+
+    def iter_cells(self, sheet_name: str, max_row: Optional[int] = None,
+                   max_col: Optional[int] = None, merged: Optional[List[str]] = None) -> Iterator[XlsxCell]:
+        """Yield non-empty cells in row order; stops reading the sheet past max_row
+
+        If `merged` is given, merged ranges are appended to it. When parsing stops
+        early the rest of the sheet is only decompressed and byte-scanned for them.
+        """
+        shared_formulas: Dict[str, Tuple[str, str]] = {}
+        strings = None
+        parser = ET.XMLPullParser(events=('end',))
+        with self._zip.open(self._sheet_parts[sheet_name]) as f:
+            row_num, col_num = 1, 0
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                parser.feed(chunk)
+                for event, elem in parser.read_events():
+                    tag = elem.tag
+                    if tag == C_TAG:
+                        ref = elem.get('r')
+                        if ref:
+                            row, col = self._split_ref(ref)
+                        else:
+                            row, col = row_num, col_num + 1
+                            ref = f"{get_column_letter(col)}{row}"
+                        col_num = col
+                        if max_row is not None and row > max_row:
+                            if merged is not None:
+                                merged.extend(self._scan_merges(chunk, f))
+                            return
+                        if max_col is None or col <= max_col:
+                            if strings is None and elem.get('t') == 's':
+                                strings = self.shared_strings
+                            cell = self._read_cell(elem, row, col, ref, strings, shared_formulas)
+                            if cell is not None:
+                                yield cell
+                        else:
+                            f_elem = elem.find(F_TAG)
+                            if f_elem is not None:
+                                # Keep shared formula masters outside the range for cells inside it
+                                self._read_formula(f_elem, ref, shared_formulas)
+                        elem.clear()
+                    elif tag == ROW_TAG:
+                        row_num = int(elem.get('r', row_num)) + 1
+                        col_num = 0
+                        elem.clear()
+                        if max_row is not None and row_num > max_row:
+                            if merged is not None:
+                                merged.extend(self._scan_merges(chunk, f))
+                            return
+                    elif tag == MERGE_TAG and merged is not None:
+                        merged.append(elem.get('ref'))
+
+    def _split_ref(self, ref: str) -> Tuple[int, int]:
+        """'AB12' -> (12, 28) with a per-reader column cache (hot path)"""
+        letters = ref.rstrip('0123456789')
+        col = self._column_cache.get(letters)
+        if col is None:
+            col = self._column_cache[letters] = column_index_from_string(letters)
+        return int(ref[len(letters):]), col
+
+    @staticmethod
+    def _scan_merges(current_chunk: bytes, stream) -> List[str]:
+        """Merged ranges live after sheetData; find them without parsing the skipped rows"""
+        refs = []
+        buffer = current_chunk
+        while True:
+            last_end = 0
+            for match in MERGE_CELL_PATTERN.finditer(buffer):
+                refs.append(match.group(1).decode())
+                last_end = match.end()
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                return refs
+            # Keep a short tail so a tag split across chunks is still found
+            buffer = buffer[max(last_end, len(buffer) - 256):] + chunk
+
+    def _read_formula(self, f_elem, ref: str, shared_formulas: Dict[str, Tuple[str, str]]) -> Optional[str]:
+        text = f_elem.text
+        if f_elem.get('t') == 'shared':
+            si = f_elem.get('si')
+            if text:
+                shared_formulas[si] = ('=' + text, ref)
+            elif si in shared_formulas:
+                master, origin = shared_formulas[si]
+                return Translator(master, origin=origin).translate_formula(ref)
+        return '=' + text if text else None
+
+    def _read_cell(self, elem, row: int, col: int, ref: str, strings, shared_formulas) -> Optional[XlsxCell]:
+        f_elem = elem.find(F_TAG)
+        formula = self._read_formula(f_elem, ref, shared_formulas) if f_elem is not None else None
+
+        cell_type = elem.get('t', 'n')
+        v_elem = elem.find(V_TAG)
+        raw = v_elem.text if v_elem is not None else None
+        value = None
+
+        if cell_type == 'inlineStr':
+            is_elem = elem.find(IS_TAG)
+            value = self._text_of(is_elem) if is_elem is not None else None
+        elif raw is None:
+            value = None
+        elif cell_type == 's':
+            value = strings[int(raw)]
+        elif cell_type == 'b':
+            value = bool(int(raw))
+        elif cell_type in ('str', 'e'):
+            value = raw
+        elif cell_type == 'd':
+            value = from_ISO8601(raw)
+        else:
+            value = float(raw) if ('.' in raw or 'E' in raw or 'e' in raw) else int(raw)
+            style = int(elem.get('s', 0))
+            if style in self._date_styles:
+                try:
+                    value = from_excel(value, self._epoch)
+                except (OverflowError, ValueError):
+                    pass
+            elif style in self._timedelta_styles:
+                value = from_excel(value, self._epoch, timedelta=True)
+
+        if value is None and formula is None:
+            return None
+        return XlsxCell(row, col, value, formula)
+
+    def read_sheet(self, sheet_name: str, max_row: Optional[int] = None, max_col: Optional[int] = None) -> SheetScan:
+        """One pass: declared dimensions, cells within the range and merged ranges"""
+        declared_rows, declared_cols = self.dimension(sheet_name)
+        merged: List[str] = []
+        cells = list(self.iter_cells(sheet_name, max_row, max_col, merged=merged))
+        if merged:
+            # Like openpyxl, only the top-left cell of a merged range keeps its value
+            covered = set()
+            for ref in merged:
+                min_col, min_row, end_col, end_row = range_boundaries(ref)
+                end_row = min(end_row, max_row) if max_row else end_row
+                end_col = min(end_col, max_col) if max_col else end_col
+                covered.update((r, c) for r in range(min_row, end_row + 1) for c in range(min_col, end_col + 1)
+                               if (r, c) != (min_row, min_col))
+            cells = [cell for cell in cells if (cell.row, cell.col) not in covered]
+        truncated = bool(max_row is not None and declared_rows > max_row)
+        return SheetScan(sheet_name, declared_rows, declared_cols, cells, merged, truncated)
+
+
+def isoformat_dates(value):
+    """Datetime cells as ISO strings (the CTCAC processed-file convention)"""
+    return value.isoformat() if hasattr(value, 'isoformat') else value
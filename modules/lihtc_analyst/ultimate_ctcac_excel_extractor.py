@@ -18,16 +18,21 @@ from typing import Dict, List, Any, Optional, Tuple
 import numpy as np
 from collections import defaultdict
 
+from ctcac_data_lake import CTCACDataLake
+
 class UltimateCTCACExtractor:
     """
     THE extraction system that dominates all California CTCAC applications
     Full data preservation, intelligent extraction, perfect Excel exports
     """
     
-    def __init__(self, log_level=logging.INFO):
+    def __init__(self, log_level=logging.INFO, data_lake_dir: Optional[Path] = None):
         # Setup logging for complete QA tracking
         self.setup_logging(log_level)
         
+        # Columnar store of every application's cells for cross-application queries
+        self.data_lake = CTCACDataLake(data_lake_dir) if data_lake_dir else None
+        
         # Critical sheets we MUST extract from every application
         self.critical_sheets = [
             'Application',
@@ -126,6 +131,12 @@ class UltimateCTCACExtractor:
                 # Create individual Excel export for this application
                 self._create_excel_export(app_data, output_dir, file_path.name)
                 
+                # Append this application's cells to the data lake (one new partition file)
+                if self.data_lake:
+                    records = self.data_lake.add_application(
+                        file_path, self._iter_lake_cells(app_data), sheet_order=list(app_data['sheets']))
+                    self.logger.info(f"  🗄️ Data lake: {records} cell records")
+                
                 self.stats['files_processed'] += 1
                 
             except Exception as e:
@@ -280,6 +291,14 @@ class UltimateCTCACExtractor:
         
         return sheet_data
     
+    @staticmethod
+    def _iter_lake_cells(app_data: Dict):
+        """(sheet, row, col, value, formula) in row-major order for CTCACDataLake"""
+        for sheet_name, sheet_data in app_data['sheets'].items():
+            cells = sorted(sheet_data.get('cells', {}).values(), key=lambda c: (c['row'], c['col']))
+            for cell in cells:
+                yield sheet_name, cell['row'], cell['col'], cell['value'], cell['formula']
+    
     def _identify_key_field(self, cell_text: str, cell_ref: str, row: int, col: int,
                            ws, key_fields: Dict):
         """
@@ -673,7 +692,7 @@ def main():
     output_dir = Path("/Users/williamrice/Library/CloudStorage/Dropbox-HERR/Bill Rice/Colosseum/modules/lihtc_analyst/ctcac_extractions")
     
     # Initialize the BEAST
-    extractor = UltimateCTCACExtractor()
+    extractor = UltimateCTCACExtractor(data_lake_dir=output_dir / "ctcac_data_lake")
     
     # DOMINATE those 4p applications
     report = extractor.extract_4p_applications(
@@ -7,7 +7,6 @@ Mission: Extract complete §10325(f)(7) from pages 66-69 with working verificati
 Target: Replace broken chunking system with superior section-aware extraction
 """
 
-import pdfplumber
 import re
 import json
 from pathlib import Path
@@ -16,6 +15,8 @@ from dataclasses import dataclass, asdict
 import time
 import hashlib
 
+from pdf_page_text_store import PageTextStore
+
 @dataclass
 class CompleteQAPSection:
     """Complete QAP section with verification system"""
@@ -119,78 +120,75 @@ class CompleteSectionExtractor:
         }
         
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                # Find construction standards pages (should be 66-69)
-                target_pages = self._find_construction_standards_pages(pdf)
-                extraction_result["page_mapping"]["target_pages"] = target_pages
+            # Page text comes from the shared per-PDF store instead of re-parsing every page
+            pdf = PageTextStore.for_pdf(pdf_path)
+            # Find construction standards pages (should be 66-69)
+            target_pages = self._find_construction_standards_pages(pdf)
+            extraction_result["page_mapping"]["target_pages"] = target_pages
+            
+            if target_pages:
+                # Extract complete content from target pages
+                complete_content = self._extract_complete_content(pdf, target_pages)
                 
-                if target_pages:
-                    # Extract complete content from target pages
-                    complete_content = self._extract_complete_content(pdf, target_pages)
+                # Parse construction standards section specifically
+                construction_section = self._parse_construction_standards_section(
+                    complete_content, target_pages, pdf_path.name
+                )
+                
+                if construction_section:
+                    extraction_result["complete_section"] = construction_section
+                    extraction_result["extraction_success"] = True
                     
-                    # Parse construction standards section specifically
-                    construction_section = self._parse_construction_standards_section(
-                        complete_content, target_pages, pdf_path.name
-                    )
+                    # Build verification system
+                    verification_info = self._build_verification_system(construction_section)
+                    extraction_result["verification_system"] = verification_info
                     
-                    if construction_section:
-                        extraction_result["complete_section"] = construction_section
-                        extraction_result["extraction_success"] = True
-                        
-                        # Build verification system
-                        verification_info = self._build_verification_system(construction_section)
-                        extraction_result["verification_system"] = verification_info
-                        
-                        # Content analysis
-                        extraction_result["content_analysis"] = {
-                            "total_characters": len(construction_section.complete_content),
-                            "subsections_found": len(construction_section.child_sections),
-                            "hierarchy_depth": len(construction_section.hierarchy_path),
-                            "page_span": construction_section.page_end - construction_section.page_start + 1
-                        }
-                        
-                        print(f"✅ Successfully extracted complete section ({len(construction_section.complete_content)} chars)")
-                        print(f"📊 Found {len(construction_section.child_sections)} subsections")
-                        print(f"📄 Spans pages {construction_section.page_start}-{construction_section.page_end}")
-                    else:
-                        print("❌ Failed to parse construction standards section")
-                else:
-                    print("❌ Construction standards pages not found")
+                    # Content analysis
+                    extraction_result["content_analysis"] = {
+                        "total_characters": len(construction_section.complete_content),
+                        "subsections_found": len(construction_section.child_sections),
+                        "hierarchy_depth": len(construction_section.hierarchy_path),
+                        "page_span": construction_section.page_end - construction_section.page_start + 1
+                    }
                     
+                    print(f"✅ Successfully extracted complete section ({len(construction_section.complete_content)} chars)")
+                    print(f"📊 Found {len(construction_section.child_sections)} subsections")
+                    print(f"📄 Spans pages {construction_section.page_start}-{construction_section.page_end}")
+                else:
+                    print("❌ Failed to parse construction standards section")
+            else:
+                print("❌ Construction standards pages not found")
+                
         except Exception as e:
             extraction_result["error"] = str(e)
             print(f"❌ Extraction failed: {e}")
         
         return extraction_result
     
-    def _find_construction_standards_pages(self, pdf) -> List[int]:
+    def _find_construction_standards_pages(self, pdf: PageTextStore) -> List[int]:
         """Find pages containing construction standards (should be 66-69)"""
-        target_pages = []
-        
-        for page_num, page in enumerate(pdf.pages, 1):
-            text = page.extract_text()
-            if text:
-                # Look for construction standards content
-                if re.search(r'minimum\s+construction\s+standards', text, re.IGNORECASE):
-                    target_pages.append(page_num)
-                    print(f"  📍 Construction standards content found on page {page_num}")
-                
-                # Also look for energy efficiency standards (common in construction sections)
-                elif re.search(r'energy\s+efficiency.*standards?', text, re.IGNORECASE):
-                    if page_num not in target_pages:
-                        target_pages.append(page_num)
-                        print(f"  📍 Related construction content found on page {page_num}")
-        
-        return sorted(target_pages)
+        # Look for construction standards content
+        standards_pages = pdf.pages_matching_regex(r'minimum\s+construction\s+standards',
+                                                   ["minimum", "construction", "standards"])
+        for page_num in standards_pages:
+            print(f"  📍 Construction standards content found on page {page_num}")
+        
+        # Also look for energy efficiency standards (common in construction sections)
+        related_pages = [page_num for page_num in pdf.pages_matching_regex(r'energy\s+efficiency.*standards?',
+                                                                          ["energy", "efficiency", "standard"])
+                         if page_num not in standards_pages]
+        for page_num in related_pages:
+            print(f"  📍 Related construction content found on page {page_num}")
+        
+        return sorted(standards_pages + related_pages)
     
-    def _extract_complete_content(self, pdf, page_numbers: List[int]) -> str:
+    def _extract_complete_content(self, pdf: PageTextStore, page_numbers: List[int]) -> str:
         """Extract complete content from page range"""
         complete_content = ""
         
         for page_num in page_numbers:
-            if page_num <= len(pdf.pages):
-                page = pdf.pages[page_num - 1]
-                text = page.extract_text()
+            if page_num <= pdf.page_count:
+                text = pdf.page_text(page_num)
                 if text:
                     complete_content += f"\\n\\n--- PAGE {page_num} ---\\n{text}"
         
@@ -14,9 +14,14 @@ Roman Engineering Standards: Built to Last 2000+ Years
 """
 
 import re
+import os
+import json
+import hashlib
+from pathlib import Path
 from typing import Dict, List, Set, Tuple, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from enum import Enum
+from concurrent.futures import ProcessPoolExecutor
 import logging
 from datetime import datetime
 
@@ -69,14 +74,122 @@ class ValidationResult:
     warnings: List[str]
     validation_status: str     # "passed", "failed", "warnings"
 
+class ReferencePatternEngine:
+    """Finds every reference pattern match with one keyword pass per document
+    
+    Each pattern is compiled once and keyed by its leading literal ("IRC",
+    "CFR", "§", ...). A single zero-width alternation over those keywords
+    locates candidate positions; patterns are then only tried, anchored, at
+    their own candidates. Matches are identical to running re.finditer per
+    pattern, without rescanning the document once per pattern.
+    """
+    
+    _LEADING_LITERAL = re.compile(r'^\(?(\(\\d\+\)\\s\+)?\(?((?:[A-Za-z§]|\\\.)+)')
+    _SPECIAL_FOLDS = {'\u017f': 's', '\u212a': 'k', '\u0130': 'i', '\u0131': 'i'}
+    _FOLD_TABLE = str.maketrans({**{c: c.lower() for c in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'}, **_SPECIAL_FOLDS})
+    
+    def __init__(self, reference_patterns: Dict[str, List[str]]):
+        self.patterns = []  # (ref_type, compiled, keyword, has_digit_prefix)
+        for ref_type, patterns in reference_patterns.items():
+            for pattern in patterns:
+                leading = self._LEADING_LITERAL.match(pattern)
+                if not leading:
+                    raise ValueError(f"Reference pattern has no leading literal to index: {pattern}")
+                keyword = leading.group(2).replace('\\', '').lower()
+                self.patterns.append((ref_type, re.compile(pattern, re.IGNORECASE), keyword, bool(leading.group(1))))
+        
+        self.patterns_by_keyword: Dict[str, List[int]] = {}
+        for index, (_, _, keyword, _) in enumerate(self.patterns):
+            self.patterns_by_keyword.setdefault(keyword, []).append(index)
+        
+        # Scanned against lowercased text: case-sensitive literal alternation is far faster than IGNORECASE
+        keywords = sorted(self.patterns_by_keyword, key=len, reverse=True)
+        self.keyword_scanner = re.compile('|'.join(re.escape(k) for k in keywords))
+        self.keywords_by_first_char: Dict[str, List[str]] = {}
+        for keyword in keywords:
+            self.keywords_by_first_char.setdefault(keyword[0], []).append(keyword)
+    
+    @staticmethod
+    def _digit_run_start(content: str, position: int) -> Optional[int]:
+        """Start of the '<digits><whitespace>' run ending at position, however long, else None
+        
+        Walks back with the same character classes as \\d and \\s on str patterns.
+        """
+        cursor = position
+        while cursor > 0 and content[cursor - 1].isspace():
+            cursor -= 1
+        digits_end = cursor
+        if digits_end == position:
+            return None
+        while cursor > 0 and content[cursor - 1].isdecimal():
+            cursor -= 1
+        return cursor if cursor < digits_end else None
+    
+    @classmethod
+    def _fold_case(cls, content: str) -> str:
+        """Lowercase without shifting offsets, folding the characters re.IGNORECASE treats as ASCII letters"""
+        lowered = content.lower()
+        if len(lowered) == len(content) and not any(c in content for c in cls._SPECIAL_FOLDS):
+            return lowered
+        return content.translate(cls._FOLD_TABLE)
+    
+    def finditer(self, content: str):
+        """Yield (ref_type, match) in the same per-pattern order as the original pattern loop"""
+        candidates: List[List[Tuple[int, int]]] = [[] for _ in self.patterns]
+        lowered = self._fold_case(content)
+        
+        for hit in self.keyword_scanner.finditer(lowered):
+            # Keywords may also start inside this hit (e.g. "section" in "subsection")
+            for position in range(hit.start(), hit.end()):
+                for keyword in self.keywords_by_first_char.get(lowered[position], ()):
+                    if not lowered.startswith(keyword, position):
+                        continue
+                    for index in self.patterns_by_keyword[keyword]:
+                        if self.patterns[index][3]:
+                            digits_start = self._digit_run_start(content, position)
+                            if digits_start is not None:
+                                candidates[index].append((digits_start, position))
+                        else:
+                            candidates[index].append((position, position + 1))
+        
+        for index, (ref_type, compiled, _, _) in enumerate(self.patterns):
+            next_allowed = 0
+            for start, limit in candidates[index]:
+                start = max(start, next_allowed)
+                if start >= limit:
+                    continue
+                match = compiled.match(content, start)
+                if match:
+                    next_allowed = match.end() if match.end() > match.start() else start + 1
+                    yield ref_type, match
+
+# Per-process validator for universe validation workers
+_worker_validator = None
+
+def _validate_regulation_worker(regulation_id: str, content: str, authority_level_name: str):
+    global _worker_validator
+    if _worker_validator is None:
+        _worker_validator = CrossReferenceValidator()
+    authority_level = AuthorityLevel[authority_level_name]
+    references = _worker_validator.extract_references(content, regulation_id, authority_level)
+    result = _worker_validator._validate_extracted_references(regulation_id, references)
+    return result, sorted({ref.target_regulation for ref in references})
+
 class CrossReferenceValidator:
     """Validates cross-references in regulatory content"""
     
-    def __init__(self):
+    def __init__(self, cache_path: Optional[str] = None, max_workers: Optional[int] = None):
         self.reference_patterns = self._define_reference_patterns()
+        self.pattern_engine = ReferencePatternEngine(self.reference_patterns)
         self.authority_hierarchy = self._define_authority_hierarchy()
         self.known_regulations = set()
         
+        # Incremental reference graph: regulation -> referenced regulations, keyed by content hash
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.reference_graph: Dict[str, List[str]] = {}
+        self._validation_cache = self._load_validation_cache()
+        
     def _define_reference_patterns(self) -> Dict[str, List[str]]:
         """Define regex patterns for different types of references"""
         
@@ -133,27 +246,23 @@ class CrossReferenceValidator:
         
         references = []
         
-        for ref_type, patterns in self.reference_patterns.items():
-            for pattern in patterns:
-                matches = re.finditer(pattern, content, re.IGNORECASE)
-                
-                for match in matches:
-                    # Extract context around the reference
-                    start = max(0, match.start() - 100)
-                    end = min(len(content), match.end() + 100)
-                    context = content[start:end].strip()
-                    
-                    reference = RegulationReference(
-                        source_id=source_id,
-                        target_regulation=self._format_regulation_id(match, ref_type),
-                        reference_text=match.group(0),
-                        reference_type=self._determine_reference_type(context),
-                        authority_level=authority_level,
-                        confidence=self._calculate_reference_confidence(match, context),
-                        context=context
-                    )
-                    
-                    references.append(reference)
+        for ref_type, match in self.pattern_engine.finditer(content):
+            # Extract context around the reference
+            start = max(0, match.start() - 100)
+            end = min(len(content), match.end() + 100)
+            context = content[start:end].strip()
+            
+            reference = RegulationReference(
+                source_id=source_id,
+                target_regulation=self._format_regulation_id(match, ref_type),
+                reference_text=match.group(0),
+                reference_type=self._determine_reference_type(context),
+                authority_level=authority_level,
+                confidence=self._calculate_reference_confidence(match, context),
+                context=context
+            )
+            
+            references.append(reference)
         
         return references
     
@@ -216,6 +325,10 @@ class CrossReferenceValidator:
         
         # Extract all references
         references = self.extract_references(content, regulation_id, authority_level)
+        return self._validate_extracted_references(regulation_id, references)
+    
+    def _validate_extracted_references(self, regulation_id: str, references: List[RegulationReference]) -> ValidationResult:
+        """Validate already extracted references"""
         
         # Validate each reference
         valid_count = 0
@@ -305,11 +418,16 @@ class CrossReferenceValidator:
         return "Unable to determine precedence"
     
     def validate_regulatory_universe(self, regulations: Dict[str, any]) -> Dict[str, ValidationResult]:
-        """Validate cross-references across entire regulatory universe"""
+        """Validate cross-references across entire regulatory universe
+        
+        Regulations whose content hash matches the cache reuse their previous
+        result; the rest are validated across a process pool.
+        """
         
         logger.info(f"🔍 Validating regulatory universe with {len(regulations)} regulations")
         
         results = {}
+        pending = []
         
         for reg_id, reg_data in regulations.items():
             # Determine authority level from regulation ID
@@ -324,11 +442,70 @@ class CrossReferenceValidator:
             else:
                 content = str(reg_data)
             
-            # Validate references
-            result = self.validate_references(reg_id, content, authority_level)
+            content_hash = hashlib.sha256(f"{authority_level.name}:{content}".encode('utf-8')).hexdigest()
+            cached = self._validation_cache.get(reg_id)
+            if cached and cached['content_hash'] == content_hash:
+                results[reg_id] = self._result_from_cache(cached['result'])
+                self.reference_graph[reg_id] = cached['targets']
+            else:
+                pending.append((reg_id, content, authority_level, content_hash))
+        
+        logger.info(f"♻️  {len(results)} unchanged regulations reused, {len(pending)} to validate")
+        
+        if len(pending) > 1 and self.max_workers > 1:
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(pending))) as executor:
+                outcomes = list(executor.map(
+                    _validate_regulation_worker,
+                    [reg_id for reg_id, _, _, _ in pending],
+                    [content for _, content, _, _ in pending],
+                    [level.name for _, _, level, _ in pending],
+                    chunksize=max(1, len(pending) // (self.max_workers * 4))
+                ))
+        else:
+            outcomes = []
+            for reg_id, content, authority_level, _ in pending:
+                logger.info(f"Validating references in {reg_id}")
+                references = self.extract_references(content, reg_id, authority_level)
+                outcomes.append((self._validate_extracted_references(reg_id, references),
+                                 sorted({ref.target_regulation for ref in references})))
+        
+        for (reg_id, _, _, content_hash), (result, targets) in zip(pending, outcomes):
             results[reg_id] = result
+            self.reference_graph[reg_id] = targets
+            self._validation_cache[reg_id] = {'content_hash': content_hash, 'result': asdict(result), 'targets': targets}
+        
+        if pending:
+            self._save_validation_cache()
         
-        return results
+        # Preserve input order
+        return {reg_id: results[reg_id] for reg_id in regulations}
+    
+    def get_reference_graph(self) -> Dict[str, List[str]]:
+        """Resolved reference graph from the last universe validation"""
+        return dict(self.reference_graph)
+    
+    def _load_validation_cache(self) -> Dict[str, Dict]:
+        if self.cache_path is None or not self.cache_path.exists():
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Ignoring unreadable validation cache {self.cache_path}: {e}")
+            return {}
+    
+    def _save_validation_cache(self):
+        if self.cache_path is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._validation_cache, f)
+        os.replace(tmp_path, self.cache_path)
+    
+    @staticmethod
+    def _result_from_cache(data: Dict) -> ValidationResult:
+        return ValidationResult(**dict(data, conflicts=[RegulatoryConflict(**c) for c in data['conflicts']]))
     
     def _determine_authority_level(self, regulation_id: str) -> AuthorityLevel:
         """Determine authority level from regulation ID"""
@@ -5,12 +5,16 @@ Loads enhanced QAP chunks into existing production ChromaDB system
 """
 
 import json
+import os
 import sys
+import hashlib
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator, Iterable, Tuple
 from datetime import datetime
 import logging
 
+import numpy as np
+
 # Add existing ChromaDB integration to path
 sys.path.append(str(Path(__file__).parent.parent / "lihtc_analyst" / "priorcode" / "qap_rag" / "backend"))
 
@@ -23,6 +27,119 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+def chunk_content_hash(embedding_text: str, model_name: str = "") -> str:
+    """Stable hash of the text that gets embedded (plus model, so a model swap re-embeds)"""
+    return hashlib.sha256(f"{model_name}\x00{embedding_text}".encode('utf-8')).hexdigest()
+
+def iter_enhanced_chunk_files(paths: Iterable[Path]) -> Iterator[Tuple[Path, int, Dict[str, Any]]]:
+    """Stream (file, position, chunk) one file at a time.
+
+    ``.jsonl`` files are read line by line; ``.json`` files use the
+    ``{"state_code", "strategy", "enhanced_chunks": [...]}`` layout and are
+    loaded one at a time so only a single file is ever held in memory.
+    """
+    for path in paths:
+        path = Path(path)
+        if path.suffix == ".jsonl":
+            with open(path, 'r', encoding='utf-8') as f:
+                position = 0
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    yield path, position, json.loads(line)
+                    position += 1
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            state_code = data.get("state_code", "Unknown")
+            strategy = data.get("strategy", "unknown")
+            for position, chunk in enumerate(data.get("enhanced_chunks", [])):
+                chunk.setdefault("state_code", state_code)
+                chunk.setdefault("strategy", strategy)
+                yield path, position, chunk
+
+class EmbeddingSidecarStore:
+    """Content-hash addressed embedding store kept next to the Chroma collection.
+
+    Vectors live in a memory-mapped ``vectors.npy`` (float32, one row per
+    unique chunk text) and ``index.json`` maps content hash -> row.  Rebuilding
+    or re-loading a collection reads vectors from here instead of re-embedding.
+    """
+    
+    def __init__(self, store_dir: Path, dimension: Optional[int] = None, initial_capacity: int = 4096):
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = self.store_dir / "vectors.npy"
+        self.index_path = self.store_dir / "index.json"
+        self.initial_capacity = initial_capacity
+        self.index: Dict[str, int] = {}
+        self.dimension = dimension
+        self._vectors: Optional[np.memmap] = None
+        
+        if self.index_path.exists():
+            with open(self.index_path, 'r') as f:
+                meta = json.load(f)
+            self.index = meta.get("rows", {})
+            self.dimension = meta.get("dimension", dimension)
+        if self.vectors_path.exists():
+            self._vectors = np.lib.format.open_memmap(self.vectors_path, mode='r+')
+            self.dimension = self._vectors.shape[1]
+    
+    def __len__(self) -> int:
+        return len(self.index)
+    
+    def __contains__(self, content_hash: str) -> bool:
+        return content_hash in self.index
+    
+    def _ensure_capacity(self, rows_needed: int):
+        """Grow the memmap geometrically so appends stay amortised O(1)"""
+        capacity = 0 if self._vectors is None else self._vectors.shape[0]
+        if rows_needed <= capacity:
+            return
+        new_capacity = max(self.initial_capacity, capacity * 2, rows_needed)
+        tmp_path = self.vectors_path.with_suffix(".tmp.npy")
+        grown = np.lib.format.open_memmap(
+            tmp_path, mode='w+', dtype=np.float32, shape=(new_capacity, self.dimension)
+        )
+        if self._vectors is not None:
+            grown[:capacity] = self._vectors[:capacity]
+            del self._vectors
+        grown.flush()
+        del grown
+        os.replace(tmp_path, self.vectors_path)
+        self._vectors = np.lib.format.open_memmap(self.vectors_path, mode='r+')
+    
+    def add_many(self, content_hashes: List[str], vectors: np.ndarray):
+        """Append vectors for hashes not yet stored"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.dimension is None:
+            self.dimension = vectors.shape[1]
+        
+        new_rows = [(h, v) for h, v in zip(content_hashes, vectors) if h not in self.index]
+        if not new_rows:
+            return
+        
+        start = len(self.index)
+        self._ensure_capacity(start + len(new_rows))
+        for offset, (content_hash, vector) in enumerate(new_rows):
+            self._vectors[start + offset] = vector
+            self.index[content_hash] = start + offset
+    
+    def get_many(self, content_hashes: List[str]) -> np.ndarray:
+        """Fetch stored vectors (all hashes must be present)"""
+        rows = [self.index[h] for h in content_hashes]
+        return np.asarray(self._vectors[rows])
+    
+    def flush(self):
+        """Persist vectors first, then the index, so the index never points past written rows"""
+        if self._vectors is not None:
+            self._vectors.flush()
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({"dimension": self.dimension, "rows": self.index}, f)
+        os.replace(tmp_path, self.index_path)
+
 class EnhancedChromaDBLoader:
     """Loads enhanced Docling + 4-Strategy chunks into production ChromaDB"""
     
@@ -184,6 +301,153 @@ class EnhancedChromaDBLoader:
             logger.error(f"Error loading enhanced chunks file: {e}")
             return False
     
+    def bulk_load_enhanced_chunks(self, chunk_files: Iterable[Path], store_dir: Optional[Path] = None,
+                                  checkpoint_path: Optional[Path] = None, upsert_batch_size: int = 512,
+                                  embedding_batch_size: int = 128, embedding_workers: int = 1) -> Dict[str, Any]:
+        """Stream chunk files into ChromaDB, embedding only chunk text not seen before.
+        
+        Vectors are looked up in (and added to) an ``EmbeddingSidecarStore`` by
+        content hash and handed to Chroma explicitly, so Chroma never embeds.
+        Progress is checkpointed per upsert batch; rerunning after a crash
+        skips finished files and resumes partially loaded ones.
+        """
+        chunk_files = [Path(p) for p in chunk_files]
+        vector_config = self.config.get("vector_database", {})
+        model_name = vector_config.get("embedding_model", "")
+        if store_dir is None:
+            store_dir = Path(vector_config.get("path", ".")) / "embedding_store" / vector_config.get("collection_name", "default")
+        store = EmbeddingSidecarStore(store_dir)
+        checkpoint_path = Path(checkpoint_path) if checkpoint_path else Path(store_dir) / "bulk_load_checkpoint.json"
+        checkpoint = self._load_bulk_checkpoint(checkpoint_path)
+        
+        summary = {
+            'files_skipped': 0,
+            'chunks_seen': 0,
+            'chunks_upserted': 0,
+            'chunks_embedded': 0,
+            'chunks_reused': 0
+        }
+        
+        pool = None
+        if embedding_workers > 1 and hasattr(self.chroma_db.embedding_model, 'start_multi_process_pool'):
+            pool = self.chroma_db.embedding_model.start_multi_process_pool(['cpu'] * embedding_workers)
+        
+        try:
+            pending: List[Dict[str, Any]] = []
+            
+            def flush_pending(entry: Dict[str, Any]):
+                if not pending:
+                    return
+                self._upsert_with_sidecar(pending, store, model_name, embedding_batch_size, pool, summary)
+                entry['chunks_done'] += len(pending)
+                pending.clear()
+                self._save_bulk_checkpoint(checkpoint_path, checkpoint)
+            
+            for path in chunk_files:
+                signature = self._file_signature(path)
+                entry = checkpoint['files'].get(str(path))
+                if entry and entry.get('signature') == signature and entry.get('complete'):
+                    summary['files_skipped'] += 1
+                    continue
+                if not entry or entry.get('signature') != signature:
+                    entry = {'signature': signature, 'chunks_done': 0, 'complete': False}
+                    checkpoint['files'][str(path)] = entry
+                
+                for _, position, chunk in iter_enhanced_chunk_files([path]):
+                    if position < entry['chunks_done']:
+                        continue
+                    summary['chunks_seen'] += 1
+                    pending.append(chunk)
+                    if len(pending) >= upsert_batch_size:
+                        flush_pending(entry)
+                
+                # Marked complete even when the file yielded no chunks, so it is not re-parsed next run
+                flush_pending(entry)
+                entry['complete'] = True
+                self._save_bulk_checkpoint(checkpoint_path, checkpoint)
+        finally:
+            if pool is not None:
+                self.chroma_db.embedding_model.stop_multi_process_pool(pool)
+        
+        print(f"✅ Bulk load: {summary['chunks_upserted']} chunks upserted, "
+              f"{summary['chunks_embedded']} embedded, {summary['chunks_reused']} reused from sidecar store")
+        return summary
+    
+    def _upsert_with_sidecar(self, chunks: List[Dict[str, Any]], store: EmbeddingSidecarStore, model_name: str,
+                             embedding_batch_size: int, pool: Any, summary: Dict[str, int]):
+        """Embed the unseen texts of one batch in a single call and upsert with explicit vectors"""
+        documents = [self.convert_enhanced_chunk_to_chromadb_format(chunk) for chunk in chunks]
+        hashes = [chunk_content_hash(doc['content'], model_name) for doc in documents]
+        
+        missing: Dict[str, str] = {}
+        for content_hash, doc in zip(hashes, documents):
+            if content_hash not in store and content_hash not in missing:
+                missing[content_hash] = doc['content']
+        
+        if missing:
+            vectors = self._encode_texts(list(missing.values()), embedding_batch_size, pool)
+            store.add_many(list(missing.keys()), vectors)
+            store.flush()
+        summary['chunks_embedded'] += len(missing)
+        summary['chunks_reused'] += len(documents) - len(missing)
+        
+        # Chroma keeps the last write per id, so collapse duplicate ids within the batch
+        by_id: Dict[str, Tuple[Dict[str, Any], str]] = {}
+        for content_hash, doc in zip(hashes, documents):
+            doc['metadata']['content_hash'] = content_hash
+            by_id[doc['chunk_id']] = (doc, content_hash)
+        
+        ids = list(by_id.keys())
+        embeddings = store.get_many([content_hash for _, content_hash in by_id.values()])
+        self.chroma_db.collection.upsert(
+            ids=ids,
+            embeddings=embeddings.tolist(),
+            documents=[doc['content'] for doc, _ in by_id.values()],
+            metadatas=[doc['metadata'] for doc, _ in by_id.values()]
+        )
+        
+        for doc in documents:
+            self.stats['total_enhanced_features'] += sum(len(v) for v in doc['enhanced_features'].values())
+            self.stats['states_processed'].add(doc['metadata']['state_code'])
+            self.stats['strategies_used'].add(doc['metadata']['strategy'])
+        self.stats['chunks_loaded'] += len(ids)
+        summary['chunks_upserted'] += len(ids)
+    
+    def _encode_texts(self, texts: List[str], batch_size: int, pool: Any) -> np.ndarray:
+        """Encode with the collection's embedding model, L2-normalised like query embeddings"""
+        model = self.chroma_db.embedding_model
+        if pool is not None:
+            vectors = model.encode_multi_process(texts, pool, batch_size=batch_size)
+        else:
+            vectors = model.encode(texts, batch_size=batch_size, show_progress_bar=False)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+    
+    @staticmethod
+    def _file_signature(path: Path) -> List[float]:
+        stat = path.stat()
+        return [stat.st_size, stat.st_mtime]
+    
+    @staticmethod
+    def _load_bulk_checkpoint(checkpoint_path: Path) -> Dict[str, Any]:
+        if checkpoint_path.exists():
+            try:
+                with open(checkpoint_path, 'r') as f:
+                    return json.load(f)
+            except json.JSONDecodeError:
+                logger.warning(f"Ignoring unreadable bulk load checkpoint: {checkpoint_path}")
+        return {'files': {}}
+    
+    @staticmethod
+    def _save_bulk_checkpoint(checkpoint_path: Path, checkpoint: Dict[str, Any]):
+        checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        checkpoint['updated'] = datetime.now().isoformat()
+        tmp_path = checkpoint_path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoint, f, indent=2)
+        os.replace(tmp_path, checkpoint_path)
+    
     def create_enhanced_collection_backup(self, backup_name: str = None) -> bool:
         """Create backup of current collection before loading enhanced chunks"""
         
@@ -16,7 +16,7 @@ from typing import List, Dict, Optional, Union
 
 # Import our PDF processing utilities
 from pdf_page_counter import PDFPageCounter
-from pdf_splitter import PDFSplitter
+from pdf_splitter import PDFSplitter, extract_virtual_sections_parallel
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -25,11 +25,13 @@ logger = logging.getLogger(__name__)
 class EnhancedChunkingProcessor:
     """Processes PDFs with automatic splitting and chunking for Claude API compatibility"""
     
-    def __init__(self, max_pages_per_section=95, chunk_size=1000, chunk_overlap=200):
+    def __init__(self, max_pages_per_section=95, chunk_size=1000, chunk_overlap=200, virtual_sections=True, max_workers=None):
         self.page_counter = PDFPageCounter()
         self.pdf_splitter = PDFSplitter(max_pages_per_section)
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.virtual_sections = virtual_sections  # Page windows over the original instead of written split files
+        self.max_workers = max_workers
         
     def process_pdf_for_rag(self, pdf_path: str, output_dir: Optional[str] = None) -> Dict:
         """Complete pipeline: check compatibility, split if needed, prepare for chunking"""
@@ -53,6 +55,7 @@ class EnhancedChunkingProcessor:
             'claude_compatible': is_compatible,
             'processing_status': 'success',
             'sections': [],
+            'page_windows': [],
             'metadata_file': None,
             'ready_for_chunking': False
         }
@@ -68,6 +71,13 @@ class EnhancedChunkingProcessor:
             result['sections'] = [str(pdf_path)]
             result['ready_for_chunking'] = True
             
+        elif self.virtual_sections:
+            logger.info(f"PDF needs splitting ({page_count} pages) - planning page-range sections...")
+            result['sections'] = [str(pdf_path)]
+            result['page_windows'] = self.pdf_splitter.plan_virtual_sections(pdf_path, total_pages=page_count)
+            result['ready_for_chunking'] = True
+            logger.info(f"Planned {len(result['page_windows'])} page-range sections")
+            
         else:
             logger.info(f"PDF needs splitting ({page_count} pages) - processing...")
             
@@ -88,19 +98,57 @@ class EnhancedChunkingProcessor:
                 return result
         
         # Step 3: Prepare chunking metadata
-        result['chunking_plan'] = self._create_chunking_plan(result['sections'])
+        result['chunking_plan'] = self._create_chunking_plan(result['sections'], result['page_windows'])
         
         return result
     
-    def _create_chunking_plan(self, section_files: List[str]) -> Dict:
+    def extract_pages(self, result: Dict) -> List[Dict]:
+        """Extract page text for a processed PDF, all page windows in parallel
+        
+        Pages come back in document order with global page numbers, whether the
+        PDF was planned as page windows, split on disk, or left whole.
+        """
+        windows = list(result.get('page_windows') or [])
+        if not windows:
+            # Whole files or legacy split files: one window per file, pages renumbered globally
+            offset = 0
+            for i, section_file in enumerate(result['sections'], 1):
+                page_count = self.page_counter.count_pages(section_file) or 0
+                windows.append({'source_file': section_file, 'section_number': i,
+                                'start_page': 1, 'end_page': page_count, 'page_offset': offset})
+                offset += page_count
+        
+        stitched = extract_virtual_sections_parallel(windows, self.max_workers)
+        pages = []
+        for window in windows:
+            offset = window.get('page_offset', 0)
+            for page in stitched.get(window['source_file'], []):
+                if window['start_page'] <= page['page_number'] <= window['end_page']:
+                    pages.append(dict(page, page_number=page['page_number'] + offset))
+        pages.sort(key=lambda page: page['page_number'])
+        return pages
+    
+    def _create_chunking_plan(self, section_files: List[str], page_windows: Optional[List[Dict]] = None) -> Dict:
         """Create a plan for chunking the processed sections"""
         chunking_plan = {
-            'total_sections': len(section_files),
+            'total_sections': len(page_windows) if page_windows else len(section_files),
             'chunk_size': self.chunk_size,
             'chunk_overlap': self.chunk_overlap,
             'sections': []
         }
         
+        for window in page_windows or []:
+            chunking_plan['sections'].append({
+                'section_number': window['section_number'],
+                'file_path': window['source_file'],
+                'file_name': window['label'],
+                'page_range': [window['start_page'], window['end_page']],
+                'estimated_chunks': 'TBD',
+                'status': 'ready_for_chunking'
+            })
+        if page_windows:
+            return chunking_plan
+        
         for i, section_file in enumerate(section_files, 1):
             section_path = Path(section_file)
             section_info = {
@@ -186,7 +234,7 @@ PROCESSING DETAILS:
                 report += f"  Status: {status}\n"
                 report += f"  Pages: {result['page_count']}\n"
                 report += f"  Claude Compatible: {result['claude_compatible']}\n"
-                report += f"  Sections Created: {len(result['sections'])}\n"
+                report += f"  Sections Created: {len(result.get('page_windows') or result['sections'])}\n"
                 
                 if result['processing_status'] == 'error':
                     report += f"  Error: {result.get('error', 'Unknown error')}\n"
@@ -203,7 +251,7 @@ File: {original_name}
 Status: {status}
 Pages: {result['page_count']}
 Claude Compatible: {result['claude_compatible']}
-Sections Created: {len(result['sections'])}
+Sections Created: {len(result.get('page_windows') or result['sections'])}
 
 CHUNKING PLAN:
 Total Sections: {result.get('chunking_plan', {}).get('total_sections', 'N/A')}
@@ -6,6 +6,7 @@ Optimized for M4 Beast hardware with 128GB RAM and Metal Performance Shaders
 """
 
 import json
+import sys
 import time
 import logging
 import asyncio
@@ -13,13 +14,20 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime
-import hashlib
 import psutil
 import platform
 import re
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures import ProcessPoolExecutor
 
-from docling.document_converter import DocumentConverter
+try:
+    from docling.document_converter import DocumentConverter
+    DOCLING_AVAILABLE = True
+except ImportError:
+    DOCLING_AVAILABLE = False
+
+# Conversions are cached with the property extractors' shared Docling cache
+sys.path.append(str(Path(__file__).parent.parent / "lihtc_analyst"))
+from docling_conversion_cache import DoclingConversionCache
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -70,6 +78,9 @@ class EnhancedDoclingProcessor:
     Features: Enhanced reference linking, professional navigation, concurrent processing
     """
     
+    # Bump when _structure_from_docling output changes to invalidate cached conversions
+    CONVERSION_CACHE_VERSION = 1
+    
     # Enhanced LIHTC domain terms
     LIHTC_TERMS = {
         'eligible basis', 'qualified basis', 'applicable percentage', 'section 42',
@@ -109,8 +120,12 @@ class EnhancedDoclingProcessor:
         self.output_path = self.base_path / "modules" / "qap_processing" / "enhanced_output"
         self.output_path.mkdir(parents=True, exist_ok=True)
         
-        # Initialize Docling with M4 Beast optimization
-        self.docling_converter = DocumentConverter()
+        # Converted Docling structures cached by PDF hash
+        self.conversion_cache_path = self.output_path / "docling_cache"
+        self.conversions = DoclingConversionCache(self.conversion_cache_path)
+        
+        # Docling models load lazily; pool workers warm their own converter
+        self._docling_converter = None
         
         # M4 Beast hardware detection
         self.m4_beast_specs = self._detect_m4_beast()
@@ -118,6 +133,14 @@ class EnhancedDoclingProcessor:
         # Concurrent processing setup
         self.max_workers = min(8, psutil.cpu_count())  # Conservative for memory
         
+    @property
+    def docling_converter(self) -> 'DocumentConverter':
+        if self._docling_converter is None:
+            if not DOCLING_AVAILABLE:
+                raise ImportError("Docling is not installed")
+            self._docling_converter = DocumentConverter()
+        return self._docling_converter
+    
     def _detect_m4_beast(self) -> Dict[str, Any]:
         """Detect M4 Beast capabilities"""
         specs = {
@@ -138,7 +161,6 @@ class EnhancedDoclingProcessor:
             
         # Check for Metal Performance Shaders (macOS)
         try:
-            import platform
             if platform.system() == 'Darwin' and 'M4' in platform.processor():
                 specs['mps_available'] = True
                 specs['neural_engine'] = True
@@ -172,6 +194,70 @@ class EnhancedDoclingProcessor:
         else:
             return "medium_complexity"  # Default for remaining states
     
+    @classmethod
+    def _structure_from_docling(cls, doc, state_code: str) -> Dict[str, Any]:
+        """Convert a Docling document into the plain, JSON-cacheable section/table structure"""
+        converted = {
+            'docling_metadata': {
+                'pages_processed': len(doc.pages) if doc.pages else 0,
+                'tables_detected': len(doc.tables) if doc.tables else 0,
+                'sections_found': len(doc.sections) if doc.sections else 0
+            },
+            'sections': [],
+            'tables': []
+        }
+        
+        # Process sections with hierarchy
+        section_hierarchy = {}
+        for i, section in enumerate(doc.sections or []):
+            converted['sections'].append({
+                'section_id': f"{state_code}_section_{i:04d}",
+                'title': section.title or f"Section {i+1}",
+                'content': section.text or "",
+                'level': getattr(section, 'level', 1),
+                'hierarchy_path': cls._build_hierarchy_path(section, section_hierarchy),
+                'breadcrumb': cls._create_breadcrumb(section),
+                'docling_metadata': {
+                    'bbox': getattr(section, 'bbox', None),
+                    'confidence': getattr(section, 'confidence', 1.0)
+                }
+            })
+        
+        # Process tables with enhanced extraction
+        for i, table in enumerate(doc.tables or []):
+            converted['tables'].append({
+                'table_id': f"{state_code}_table_{i:04d}",
+                'title': getattr(table, 'title', f"Table {i+1}"),
+                'data': cls._extract_table_data(table),
+                'scoring_matrix': cls._detect_scoring_matrix(table),
+                'docling_metadata': {
+                    'bbox': getattr(table, 'bbox', None),
+                    'num_rows': getattr(table, 'num_rows', 0),
+                    'num_cols': getattr(table, 'num_cols', 0)
+                }
+            })
+        
+        # Round-trip through JSON so cached and freshly converted structures are identical
+        return json.loads(json.dumps(converted, default=str))
+    
+    def _conversion_variant(self, state_code: str) -> str:
+        # Keyed by PDF content, not strategy: a chunking-strategy change re-chunks the cached conversion
+        return f"qap_structure_{state_code}_v{self.CONVERSION_CACHE_VERSION}"
+    
+    def get_converted_structure(self, pdf_path: Path, state_code: str) -> Tuple[Dict[str, Any], bool]:
+        """Return (converted structure, cache_hit), running Docling only for unseen PDFs"""
+        def convert(path: Path) -> Dict[str, Any]:
+            logger.info(f"Processing {state_code} QAP with Docling...")
+            result = self.docling_converter.convert(str(path))
+            if not result or not hasattr(result, 'document'):
+                raise Exception("Docling processing failed - no document returned")
+            return self._structure_from_docling(result.document, state_code)
+        
+        converted, cache_hit = self.conversions.converted(pdf_path, self._conversion_variant(state_code), convert)
+        if cache_hit:
+            logger.info(f"Using cached Docling conversion for {state_code}")
+        return converted, cache_hit
+    
     def extract_enhanced_structure_with_docling(self, pdf_path: Path, state_code: str) -> Tuple[Dict[str, Any], EnhancedExtractionMetrics]:
         """Extract structure using Docling with M4 Beast optimization"""
         start_time = time.time()
@@ -190,66 +276,22 @@ class EnhancedDoclingProcessor:
         )
         
         try:
-            # Process with Docling (using simplified API based on working tests)
-            logger.info(f"Processing {state_code} QAP with Docling...")
-            result = self.docling_converter.convert(str(pdf_path))
-            
-            if not result or not hasattr(result, 'document'):
-                raise Exception("Docling processing failed - no document returned")
-            
-            doc = result.document
+            converted, cache_hit = self.get_converted_structure(pdf_path, state_code)
             
             # Extract comprehensive structure
             enhanced_structure = {
                 'state_code': state_code,
                 'strategy': self.classify_qap_strategy(state_code),
                 'processing_date': datetime.now().isoformat(),
-                'docling_metadata': {
-                    'pages_processed': len(doc.pages) if doc.pages else 0,
-                    'tables_detected': len(doc.tables) if doc.tables else 0,
-                    'sections_found': len(doc.sections) if doc.sections else 0
-                },
-                'sections': [],
-                'tables': [],
+                'docling_metadata': dict(converted['docling_metadata'], cache_hit=cache_hit),
+                'sections': converted['sections'],
+                'tables': converted['tables'],
                 'enhanced_chunks': []
             }
             
-            # Process sections with hierarchy
-            section_hierarchy = {}
-            for i, section in enumerate(doc.sections or []):
-                section_data = {
-                    'section_id': f"{state_code}_section_{i:04d}",
-                    'title': section.title or f"Section {i+1}",
-                    'content': section.text or "",
-                    'level': getattr(section, 'level', 1),
-                    'hierarchy_path': self._build_hierarchy_path(section, section_hierarchy),
-                    'breadcrumb': self._create_breadcrumb(section),
-                    'docling_metadata': {
-                        'bbox': getattr(section, 'bbox', None),
-                        'confidence': getattr(section, 'confidence', 1.0)
-                    }
-                }
-                enhanced_structure['sections'].append(section_data)
-                metrics.sections_extracted += 1
-                
-                # Track hierarchy levels
-                metrics.hierarchy_levels = max(metrics.hierarchy_levels, section_data['level'])
-            
-            # Process tables with enhanced extraction
-            for i, table in enumerate(doc.tables or []):
-                table_data = {
-                    'table_id': f"{state_code}_table_{i:04d}",
-                    'title': getattr(table, 'title', f"Table {i+1}"),
-                    'data': self._extract_table_data(table),
-                    'scoring_matrix': self._detect_scoring_matrix(table),
-                    'docling_metadata': {
-                        'bbox': getattr(table, 'bbox', None),
-                        'num_rows': getattr(table, 'num_rows', 0),
-                        'num_cols': getattr(table, 'num_cols', 0)
-                    }
-                }
-                enhanced_structure['tables'].append(table_data)
-                metrics.tables_extracted += 1
+            metrics.sections_extracted = len(enhanced_structure['sections'])
+            metrics.tables_extracted = len(enhanced_structure['tables'])
+            metrics.hierarchy_levels = max((section['level'] for section in enhanced_structure['sections']), default=0)
             
             # Apply strategy-specific chunking
             enhanced_chunks = self._apply_strategy_chunking(enhanced_structure)
@@ -287,7 +329,8 @@ class EnhancedDoclingProcessor:
         
         return enhanced_structure, metrics
     
-    def _build_hierarchy_path(self, section, hierarchy_dict: Dict) -> str:
+    @staticmethod
+    def _build_hierarchy_path(section, hierarchy_dict: Dict) -> str:
         """Build hierarchical path for section navigation"""
         level = getattr(section, 'level', 1)
         title = section.title or "Untitled"
@@ -300,7 +343,8 @@ class EnhancedDoclingProcessor:
         else:
             return f"Root > ... > {title}"
     
-    def _create_breadcrumb(self, section) -> str:
+    @staticmethod
+    def _create_breadcrumb(section) -> str:
         """Create breadcrumb trail for navigation"""
         title = section.title or "Section"
         level = getattr(section, 'level', 1)
@@ -317,7 +361,8 @@ class EnhancedDoclingProcessor:
         
         return title
     
-    def _extract_table_data(self, table) -> List[List[str]]:
+    @staticmethod
+    def _extract_table_data(table) -> List[List[str]]:
         """Extract table data with scoring matrix detection"""
         if hasattr(table, 'data') and table.data:
             return table.data
@@ -332,7 +377,8 @@ class EnhancedDoclingProcessor:
         
         return []
     
-    def _detect_scoring_matrix(self, table) -> bool:
+    @staticmethod
+    def _detect_scoring_matrix(table) -> bool:
         """Detect if table is a scoring matrix for LIHTC allocation"""
         if not hasattr(table, 'data') or not table.data:
             return False
@@ -670,6 +716,40 @@ class EnhancedDoclingProcessor:
         else:
             return 'general'
     
+    async def _process_qap_async(self, executor: ProcessPoolExecutor, qap_path: Path, state_code: str) -> Dict[str, Any]:
+        """Convert in the process pool on a cache miss, then chunk from the cached structure"""
+        loop = asyncio.get_running_loop()
+        
+        def convert_in_pool(path: Path) -> Dict[str, Any]:
+            return executor.submit(_convert_qap_in_worker, str(path), state_code).result()
+        
+        try:
+            await loop.run_in_executor(None, self.conversions.converted,
+                                       qap_path, self._conversion_variant(state_code), convert_in_pool)
+            
+            structure, metrics = await loop.run_in_executor(
+                None, self.extract_enhanced_structure_with_docling, qap_path, state_code
+            )
+            return {'state_code': state_code, 'structure': structure, 'metrics': metrics, 'error': structure.get('error')}
+        except Exception as e:
+            return {'state_code': state_code, 'structure': None, 'metrics': None, 'error': str(e)}
+    
+    async def iter_qaps_as_completed(self, qap_files: List[Tuple[Path, str]], max_workers: Optional[int] = None):
+        """Yield per-QAP results in completion order.
+        
+        Docling conversion runs in a process pool (one warmed converter per
+        worker) and only for PDFs without a cached conversion.
+        """
+        max_workers = max(1, min(len(qap_files), max_workers or self.max_workers))
+        
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_docling_worker) as executor:
+            tasks = [
+                asyncio.ensure_future(self._process_qap_async(executor, Path(qap_path), state_code))
+                for qap_path, state_code in qap_files
+            ]
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+    
     async def process_multiple_qaps_concurrent(self, qap_files: List[Tuple[Path, str]]) -> Dict[str, Any]:
         """Process multiple QAPs concurrently using M4 Beast capabilities"""
         logger.info(f"Starting concurrent processing of {len(qap_files)} QAPs")
@@ -685,33 +765,23 @@ class EnhancedDoclingProcessor:
             'aggregate_metrics': {}
         }
         
-        # Limit concurrent processing based on M4 Beast capacity
-        max_concurrent = min(len(qap_files), self.m4_beast_specs['concurrent_capacity'])
-        
-        with ThreadPoolExecutor(max_workers=max_concurrent) as executor:
-            # Submit all processing tasks
-            future_to_qap = {
-                executor.submit(self.extract_enhanced_structure_with_docling, qap_path, state_code): (qap_path, state_code)
-                for qap_path, state_code in qap_files
-            }
-            
-            # Collect results as they complete
-            for future in future_to_qap:
-                qap_path, state_code = future_to_qap[future]
-                try:
-                    structure, metrics = future.result()
-                    results['qap_results'][state_code] = {
-                        'structure': structure,
-                        'metrics': asdict(metrics),
-                        'success': True
-                    }
-                    logger.info(f"Completed processing {state_code}: {metrics.total_chunks} chunks")
-                except Exception as e:
-                    logger.error(f"Failed processing {state_code}: {e}")
-                    results['qap_results'][state_code] = {
-                        'error': str(e),
-                        'success': False
-                    }
+        # Collect results as they complete
+        async for outcome in self.iter_qaps_as_completed(qap_files):
+            state_code = outcome['state_code']
+            if outcome['error'] is None:
+                metrics = outcome['metrics']
+                results['qap_results'][state_code] = {
+                    'structure': outcome['structure'],
+                    'metrics': asdict(metrics),
+                    'success': True
+                }
+                logger.info(f"Completed processing {state_code}: {metrics.total_chunks} chunks")
+            else:
+                logger.error(f"Failed processing {state_code}: {outcome['error']}")
+                results['qap_results'][state_code] = {
+                    'error': outcome['error'],
+                    'success': False
+                }
         
         # Calculate aggregate metrics
         successful_results = [r for r in results['qap_results'].values() if r['success']]
@@ -754,6 +824,25 @@ class EnhancedDoclingProcessor:
             logger.error(f"Failed to save results: {e}")
             return None
 
+# Per-process Docling converter for the QAP conversion pool
+_worker_converter: Optional['DocumentConverter'] = None
+
+def _init_docling_worker():
+    """Pool initializer: load Docling models once per worker process"""
+    global _worker_converter
+    if DOCLING_AVAILABLE:
+        _worker_converter = DocumentConverter()
+
+def _convert_qap_in_worker(pdf_path: str, state_code: str) -> Dict[str, Any]:
+    """Run the CPU-bound Docling conversion in a worker process"""
+    if _worker_converter is None and not DOCLING_AVAILABLE:
+        raise ImportError("Docling is not installed")
+    converter = _worker_converter or DocumentConverter()
+    result = converter.convert(pdf_path)
+    if not result or not hasattr(result, 'document'):
+        raise Exception("Docling processing failed - no document returned")
+    return EnhancedDoclingProcessor._structure_from_docling(result.document, state_code)
+
 def main():
     """Test the enhanced processor with California QAP"""
     processor = EnhancedDoclingProcessor()
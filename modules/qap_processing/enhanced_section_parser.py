@@ -7,7 +7,6 @@ Mission: Extract complete §10325(f)(7) Minimum Construction Standards with hier
 Target: Fix section identification and preserve outline structure
 """
 
-import pdfplumber
 import re
 import json
 from pathlib import Path
@@ -15,6 +14,8 @@ from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 import time
 
+from pdf_page_text_store import PageTextStore
+
 @dataclass
 class QAPSection:
     """Enhanced QAP section with complete hierarchical information"""
@@ -117,65 +118,60 @@ class EnhancedSectionParser:
         }
         
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                # First, find the target pages (66-69 for construction standards)
-                target_pages = self._find_target_pages(pdf, target_section)
-                extraction_result["page_mapping"]["target_pages"] = target_pages
+            # Page text comes from the shared per-PDF store instead of re-parsing every page
+            pdf = PageTextStore.for_pdf(pdf_path)
+            # First, find the target pages (66-69 for construction standards)
+            target_pages = self._find_target_pages(pdf, target_section)
+            extraction_result["page_mapping"]["target_pages"] = target_pages
+            
+            if target_pages:
+                # Extract content from target pages
+                full_content = self._extract_content_from_pages(pdf, target_pages)
+                extraction_result["content_analysis"]["raw_content_length"] = len(full_content)
                 
-                if target_pages:
-                    # Extract content from target pages
-                    full_content = self._extract_content_from_pages(pdf, target_pages)
-                    extraction_result["content_analysis"]["raw_content_length"] = len(full_content)
-                    
-                    # Parse hierarchical structure
-                    hierarchical_sections = self._parse_hierarchical_structure(full_content, target_pages[0])
-                    extraction_result["sections_extracted"] = hierarchical_sections
-                    
-                    # Build section relationships
-                    hierarchy = self._build_section_relationships(hierarchical_sections)
-                    extraction_result["hierarchical_structure"] = hierarchy
-                    
-                    if hierarchical_sections:
-                        extraction_result["extraction_success"] = True
-                        print(f"✅ Successfully extracted {len(hierarchical_sections)} hierarchical sections")
-                    else:
-                        print("⚠️ No hierarchical sections found")
+                # Parse hierarchical structure
+                hierarchical_sections = self._parse_hierarchical_structure(full_content, target_pages[0])
+                extraction_result["sections_extracted"] = hierarchical_sections
+                
+                # Build section relationships
+                hierarchy = self._build_section_relationships(hierarchical_sections)
+                extraction_result["hierarchical_structure"] = hierarchy
+                
+                if hierarchical_sections:
+                    extraction_result["extraction_success"] = True
+                    print(f"✅ Successfully extracted {len(hierarchical_sections)} hierarchical sections")
                 else:
-                    print("❌ Target pages not found")
-                    
+                    print("⚠️ No hierarchical sections found")
+            else:
+                print("❌ Target pages not found")
+                
         except Exception as e:
             extraction_result["error"] = str(e)
             print(f"❌ Extraction failed: {e}")
         
         return extraction_result
     
-    def _find_target_pages(self, pdf, target_section: str) -> List[int]:
+    def _find_target_pages(self, pdf: PageTextStore, target_section: str) -> List[int]:
         """Find pages containing the target section"""
-        target_pages = []
         search_terms = {
             "10325_f_7": ["minimum construction standards", "basic threshold requirements"]
         }
         
         terms = search_terms.get(target_section, ["construction standards"])
         
-        for page_num, page in enumerate(pdf.pages, 1):
-            text = page.extract_text()
-            if text:
-                text_lower = text.lower()
-                if any(term.lower() in text_lower for term in terms):
-                    target_pages.append(page_num)
-                    print(f"  📍 Found target content on page {page_num}")
+        target_pages = pdf.pages_matching(terms)
+        for page_num in target_pages:
+            print(f"  📍 Found target content on page {page_num}")
         
         return target_pages
     
-    def _extract_content_from_pages(self, pdf, page_numbers: List[int]) -> str:
+    def _extract_content_from_pages(self, pdf: PageTextStore, page_numbers: List[int]) -> str:
         """Extract content from specific page range"""
         full_content = ""
         
         for page_num in page_numbers:
-            if page_num <= len(pdf.pages):
-                page = pdf.pages[page_num - 1]  # Convert to 0-based index
-                text = page.extract_text()
+            if page_num <= pdf.page_count:
+                text = pdf.page_text(page_num)
                 if text:
                     full_content += f"\\n--- PAGE {page_num} ---\\n{text}\\n"
         
@@ -2,120 +2,440 @@
 """
 LIHTC Fine-Tuned LLM Inference Interface
 Professional interface for LIHTC Q&A with RAG integration
+
+Runs as a long-lived CPU service:
+- Model loaded once per process (optionally int8 dynamic-quantized or bf16)
+- Dynamic request batching: concurrent questions (Gradio, scripts, HTTP) share one generate() call
+- Prompt-prefix KV cache: the shared instruction preamble is encoded once and reused by every batch
+- Retrieval batched into one ChromaDB query per batch with an LRU context cache
 """
 
 import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM
+from transformers import AutoTokenizer, AutoModelForCausalLM, DynamicCache
 from peft import PeftModel
+import copy
 import json
-import chromadb
+import time
+import queue
+import argparse
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+
+try:
+    import chromadb
+    CHROMADB_AVAILABLE = True
+except ImportError:
+    CHROMADB_AVAILABLE = False
+
+# Shared preamble of every prompt - its KV cache is computed once and reused
+PROMPT_PREAMBLE = """### Instruction:
+Answer this LIHTC (Low-Income Housing Tax Credit) question based on your specialized knowledge and the provided context. Be specific, accurate, and cite relevant jurisdictions when applicable.
+
+"""
+
+MAX_PROMPT_TOKENS = 1800
+
+
+def format_question_prompt(query: str, context: Optional[List[Dict]] = None) -> str:
+    """Per-question part of the prompt that follows PROMPT_PREAMBLE"""
+    context_text = ""
+    if context:
+        context_text = "\n\nRelevant LIHTC Information:\n"
+        for item in context[:3]:  # Use top 3 results
+            context_text += f"- {item['jurisdiction']}: {item['content'][:200]}...\n"
+
+    return f"""Question: {query}{context_text}
+
+### Response:"""
+
 
 class LIHTCInferenceEngine:
     """Professional LIHTC Q&A system with fine-tuned LLM + RAG"""
     
-    def __init__(self, model_path: str, chromadb_path: str = "./lihtc_definitions_chromadb"):
+    def __init__(self, model_path: str, chromadb_path: str = "./lihtc_definitions_chromadb",
+                 quantize: Optional[str] = "int8", num_threads: Optional[int] = None,
+                 max_batch_size: int = 8, max_batch_wait_ms: int = 25, context_cache_size: int = 1024):
         self.model_path = model_path
         self.chromadb_path = chromadb_path
+        self.quantize = quantize
+        self.max_batch_size = max_batch_size
+        self.max_batch_wait_ms = max_batch_wait_ms
         
-        # Load fine-tuned model
+        if num_threads:
+            torch.set_num_threads(num_threads)
+
+        # Load fine-tuned model (CPU only)
         self.tokenizer = AutoTokenizer.from_pretrained(model_path)
         self.tokenizer.pad_token = self.tokenizer.eos_token
         
         self.model = AutoModelForCausalLM.from_pretrained(
             model_path,
-            torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
-            device_map="auto"
+            torch_dtype=torch.bfloat16 if quantize == "bf16" else torch.float32,
+            low_cpu_mem_usage=True
         )
+        self.model.eval()
+
+        if quantize == "int8":
+            # Dynamic int8 weights for every Linear layer - roughly 4x smaller and faster matmuls on CPU
+            self.model = torch.ao.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        elif quantize not in (None, "bf16"):
+            raise ValueError(f"Unsupported quantization mode: {quantize}")
         
-        # Load ChromaDB for RAG
-        self.chroma_client = chromadb.PersistentClient(path=chromadb_path)
-        self.collection = self.chroma_client.get_collection("lihtc_definitions")
+        # Load ChromaDB for RAG (chromadb_path=None runs the model without retrieval)
+        self.chroma_client = None
+        self.collection = None
+        if chromadb_path is not None:
+            if not CHROMADB_AVAILABLE:
+                raise ImportError("chromadb is required for retrieval; install it or pass chromadb_path=None")
+            self.chroma_client = chromadb.PersistentClient(path=chromadb_path)
+            self.collection = self.chroma_client.get_collection("lihtc_definitions")
         
+        # Retrieval results per (query, n_results), least recently used evicted first
+        self._context_cache: "OrderedDict[tuple, List[Dict]]" = OrderedDict()
+        self._context_cache_size = context_cache_size
+        self._context_lock = threading.Lock()
+
+        # One generate() at a time; concurrency comes from batching, not threads
+        self._generate_lock = threading.Lock()
+        self._prefix_ids: List[int] = self.tokenizer(PROMPT_PREAMBLE)["input_ids"]
+        self._prefix_cache: Optional[DynamicCache] = None
+        self._batcher: Optional["DynamicBatcher"] = None
+
         print("✅ LIHTC Inference Engine Ready")
-        print(f"Model: {model_path}")
+        print(f"Model: {model_path} (quantize={quantize}, threads={torch.get_num_threads()})")
         print(f"ChromaDB: {chromadb_path}")
     
     def retrieve_context(self, query: str, n_results: int = 5) -> List[Dict]:
         """Retrieve relevant context from RAG system"""
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=n_results,
-            include=["documents", "metadatas"]
-        )
+        return self.retrieve_contexts([query], n_results)[0]
+
+    def retrieve_contexts(self, queries: List[str], n_results: int = 5) -> List[List[Dict]]:
+        """Retrieve context for several queries with a single ChromaDB query for the uncached ones"""
+        if self.collection is None:
+            return [[] for _ in queries]
+        with self._context_lock:
+            cached = {}
+            for query in queries:
+                key = (query, n_results)
+                if key in self._context_cache:
+                    self._context_cache.move_to_end(key)
+                    cached[query] = self._context_cache[key]
+
+        missing = list(dict.fromkeys(query for query in queries if query not in cached))
+        if missing:
+            results = self.collection.query(
+                query_texts=missing,
+                n_results=n_results,
+                include=["documents", "metadatas"]
+            )
+        
+            for query_index, query in enumerate(missing):
+                context_items = []
+                for i, doc in enumerate(results["documents"][query_index]):
+                    metadata = results["metadatas"][query_index][i]
+                    context_items.append({
+                        "content": doc,
+                        "jurisdiction": metadata.get("jurisdiction", "Unknown"),
+                        "source": metadata.get("source", "QAP"),
+                        "relevance_score": 1.0 - (i / n_results)  # Simple relevance scoring
+                    })
+                cached[query] = context_items
         
-        context_items = []
-        for i, doc in enumerate(results["documents"][0]):
-            metadata = results["metadatas"][0][i]
-            context_items.append({
-                "content": doc,
-                "jurisdiction": metadata.get("jurisdiction", "Unknown"),
-                "source": metadata.get("source", "QAP"),
-                "relevance_score": 1.0 - (i / n_results)  # Simple relevance scoring
-            })
-        
-        return context_items
+            with self._context_lock:
+                for query in missing:
+                    self._context_cache[(query, n_results)] = cached[query]
+                while len(self._context_cache) > self._context_cache_size:
+                    self._context_cache.popitem(last=False)
+
+        return [cached[query] for query in queries]
+
+    def _get_prefix_cache(self) -> DynamicCache:
+        """KV cache of PROMPT_PREAMBLE, computed on first use"""
+        if self._prefix_cache is None:
+            with torch.no_grad():
+                outputs = self.model(
+                    input_ids=torch.tensor([self._prefix_ids]),
+                    past_key_values=DynamicCache(),
+                    use_cache=True
+                )
+            self._prefix_cache = outputs.past_key_values
+        return self._prefix_cache
     
     def generate_response(self, query: str, context: Optional[List[Dict]] = None, max_length: int = 1024) -> str:
         """Generate response using fine-tuned model with context"""
+        return self.generate_batch([query], [context], max_length=max_length)[0]
         
-        # Prepare context if provided
-        context_text = ""
-        if context:
-            context_text = "\n\nRelevant LIHTC Information:\n"
-            for item in context[:3]:  # Use top 3 results
-                context_text += f"- {item['jurisdiction']}: {item['content'][:200]}...\n"
-        
-        # Format prompt
-        prompt = f"""### Instruction:
-Answer this LIHTC (Low-Income Housing Tax Credit) question based on your specialized knowledge and the provided context. Be specific, accurate, and cite relevant jurisdictions when applicable.
+    def _encode_prompts(self, prompts: List[str]) -> Tuple[torch.Tensor, torch.Tensor, bool]:
+        """
+        Token ids and attention mask for full prompts (PROMPT_PREAMBLE + question part).
+        Each prompt is tokenized whole, exactly as the uncached path would, and the cached
+        preamble is only reused when its ids are a prefix of every prompt's ids (SentencePiece
+        tokenizers can merge or re-space tokens at the boundary). Returns (input_ids,
+        attention_mask, cacheable); cacheable batches are preamble + left-padded question part
+        so the preamble positions line up with its cache, the rest are plain left-padded prompts.
+        """
+        full_ids = [
+            self.tokenizer(prompt, truncation=True, max_length=MAX_PROMPT_TOKENS)["input_ids"]
+            for prompt in prompts
+        ]
+        prefix = self._prefix_ids
+        cacheable = all(len(ids) > len(prefix) and ids[:len(prefix)] == prefix for ids in full_ids)
+        pad_id = self.tokenizer.pad_token_id
 
-Question: {query}{context_text}
+        if cacheable:
+            suffix_ids = [ids[len(prefix):] for ids in full_ids]
+            width = max(len(ids) for ids in suffix_ids)
+            input_ids = [prefix + [pad_id] * (width - len(ids)) + ids for ids in suffix_ids]
+            attention_mask = [[1] * len(prefix) + [0] * (width - len(ids)) + [1] * len(ids) for ids in suffix_ids]
+        else:
+            width = max(len(ids) for ids in full_ids)
+            input_ids = [[pad_id] * (width - len(ids)) + ids for ids in full_ids]
+            attention_mask = [[0] * (width - len(ids)) + [1] * len(ids) for ids in full_ids]
+        return torch.tensor(input_ids), torch.tensor(attention_mask), cacheable
 
-### Response:"""
-        
-        # Tokenize and generate
-        inputs = self.tokenizer(prompt, return_tensors="pt", truncation=True, max_length=1800)
+    def generate_batch(self, queries: List[str], contexts: Optional[List[Optional[List[Dict]]]] = None,
+                       max_length: int = 1024, use_prefix_cache: bool = True, do_sample: bool = True) -> List[str]:
+        """Generate responses for several questions in one generate() call"""
+        contexts = contexts or [None] * len(queries)
+        prompts = [PROMPT_PREAMBLE + format_question_prompt(query, context)
+                   for query, context in zip(queries, contexts)]
+        input_ids, attention_mask, cacheable = self._encode_prompts(prompts)
+
+        generate_kwargs = {"temperature": 0.7, "top_p": 0.9} if do_sample else {}
+        if use_prefix_cache and cacheable:
+            past_key_values = copy.deepcopy(self._get_prefix_cache())
+            past_key_values.batch_repeat_interleave(len(queries))
+            generate_kwargs["past_key_values"] = past_key_values
         
-        with torch.no_grad():
+        with self._generate_lock, torch.no_grad():
             outputs = self.model.generate(
-                **inputs,
+                input_ids=input_ids,
+                attention_mask=attention_mask,
                 max_new_tokens=max_length,
-                do_sample=True,
-                temperature=0.7,
-                top_p=0.9,
-                pad_token_id=self.tokenizer.eos_token_id
+                do_sample=do_sample,
+                pad_token_id=self.tokenizer.eos_token_id,
+                **generate_kwargs
             )
         
-        response = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-        response = response.split("### Response:")[-1].strip()
+        new_tokens = outputs[:, input_ids.shape[1]:]
+        return [response.strip() for response in self.tokenizer.batch_decode(new_tokens, skip_special_tokens=True)]
         
-        return response
-    
-    def lihtc_qa(self, question: str) -> Dict:
-        """Complete LIHTC Q&A with RAG integration"""
-        print(f"🔍 Processing: {question}")
+    def lihtc_qa_batch(self, questions: List[str], max_length: int = 1024) -> List[Dict]:
+        """Complete LIHTC Q&A for a batch of questions"""
+        print(f"🔍 Processing batch of {len(questions)} question(s)")
         
         # Retrieve context
-        context = self.retrieve_context(question)
+        contexts = self.retrieve_contexts(questions)
         
-        # Generate response
-        response = self.generate_response(question, context)
+        # Generate responses
+        responses = self.generate_batch(questions, contexts, max_length=max_length)
         
-        return {
-            "question": question,
-            "response": response,
-            "context_sources": [
-                {"jurisdiction": item["jurisdiction"], "relevance": item["relevance_score"]}
-                for item in context[:3]
-            ],
-            "context_count": len(context)
-        }
+        return [
+            {
+                "question": question,
+                "response": response,
+                "context_sources": [
+                    {"jurisdiction": item["jurisdiction"], "relevance": item["relevance_score"]}
+                    for item in context[:3]
+                ],
+                "context_count": len(context)
+            }
+            for question, context, response in zip(questions, contexts, responses)
+        ]
+
+    def lihtc_qa(self, question: str) -> Dict:
+        """Complete LIHTC Q&A with RAG integration (joins the shared batch when the batcher is running)"""
+        if self._batcher is not None:
+            return self._batcher.submit(question).result()
+        return self.lihtc_qa_batch([question])[0]
+
+    def start_batching(self) -> "DynamicBatcher":
+        """Start the background batcher so concurrent lihtc_qa() callers share generate() calls"""
+        if self._batcher is None:
+            self._batcher = DynamicBatcher(self, self.max_batch_size, self.max_batch_wait_ms)
+        return self._batcher
+
+    def stop_batching(self):
+        if self._batcher is not None:
+            self._batcher.stop()
+            self._batcher = None
+
+
+class DynamicBatcher:
+    """Collects questions from many threads and answers them in batches"""
+
+    def __init__(self, engine: LIHTCInferenceEngine, max_batch_size: int = 8, max_batch_wait_ms: int = 25):
+        self.engine = engine
+        self.max_batch_size = max_batch_size
+        self.max_batch_wait = max_batch_wait_ms / 1000.0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="lihtc-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, question: str) -> Future:
+        future = Future()
+        self._queue.put((question, future))
+        return future
+
+    def stop(self):
+        self._stopped.set()
+        self._worker.join()
+
+    def _next_batch(self) -> List[tuple]:
+        """Block for the first question, then gather more until the batch is full or the wait expires"""
+        try:
+            batch = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.max_batch_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stopped.is_set():
+            batch = self._next_batch()
+            if not batch:
+                continue
+
+            questions = [question for question, _ in batch]
+            try:
+                results = self.engine.lihtc_qa_batch(questions)
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+
+
+def make_batch_api_server(engine: LIHTCInferenceEngine, host: str = "127.0.0.1",
+                          port: int = 8765) -> ThreadingHTTPServer:
+    """
+    Batch QA API over HTTP - every request thread feeds the same batcher.
+    POST /qa with {"questions": [...]} (or {"question": "..."}) returns the Q&A results.
+    Malformed requests get 400; retrieval or model failures get 500.
+    """
+    batcher = engine.start_batching()
+
+    class QAHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != "/qa":
+                self.send_error(404)
+                return
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                questions = payload.get("questions") or [payload["question"]]
+                if not all(isinstance(question, str) and question.strip() for question in questions):
+                    raise ValueError("questions must be non-empty strings")
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                self._send_json(400, {"error": f"Bad request: {e}"})
+                return
+
+            try:
+                futures = [batcher.submit(question) for question in questions]
+                self._send_json(200, {"results": [future.result() for future in futures]})
+            except Exception as e:
+                self._send_json(500, {"error": str(e)})
+
+        def _send_json(self, status: int, payload: Dict):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), QAHandler)
+
+
+def serve_batch_api(engine: LIHTCInferenceEngine, host: str = "127.0.0.1", port: int = 8765):
+    """Run the batch QA API until interrupted"""
+    server = make_batch_api_server(engine, host, port)
+    print(f"🚀 LIHTC batch QA API listening on http://{host}:{port}/qa")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("👋 Shutting down")
+    finally:
+        server.server_close()
+        engine.stop_batching()
+
+
+def benchmark_throughput(engine: LIHTCInferenceEngine, questions: List[str], max_length: int = 128) -> Dict:
+    """Questions per minute: per-question loop (previous behaviour) vs batched + prefix-cached"""
+    # Previous behaviour: retrieval and an uncached generate() for every question
+    start = time.perf_counter()
+    for question in questions:
+        engine._context_cache.clear()
+        engine.generate_batch([question], [engine.retrieve_context(question)], max_length=max_length,
+                              use_prefix_cache=False)
+    sequential_seconds = time.perf_counter() - start
+
+    engine._context_cache.clear()
+    start = time.perf_counter()
+    for batch_start in range(0, len(questions), engine.max_batch_size):
+        batch = questions[batch_start:batch_start + engine.max_batch_size]
+        engine.lihtc_qa_batch(batch, max_length=max_length)
+    batched_seconds = time.perf_counter() - start
+
+    results = {
+        "questions": len(questions),
+        "max_new_tokens": max_length,
+        "batch_size": engine.max_batch_size,
+        "quantize": engine.quantize,
+        "sequential_qpm": round(len(questions) * 60 / sequential_seconds, 2),
+        "batched_qpm": round(len(questions) * 60 / batched_seconds, 2),
+        "speedup": round(sequential_seconds / batched_seconds, 2)
+    }
+    print(f"📊 Sequential: {results['sequential_qpm']} q/min | Batched: {results['batched_qpm']} q/min "
+          f"| Speedup: {results['speedup']}x")
+    return results
+
 
 def main():
-    """Interactive LIHTC Q&A session"""
-    engine = LIHTCInferenceEngine("./lihtc_finetuned_model")
+    """Interactive LIHTC Q&A session, batch API server or throughput benchmark"""
+    parser = argparse.ArgumentParser(description="LIHTC fine-tuned LLM inference")
+    parser.add_argument("--model-path", default="./lihtc_finetuned_model")
+    parser.add_argument("--quantize", choices=["int8", "bf16", "none"], default="int8")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--serve", action="store_true", help="Run the batch QA HTTP API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--benchmark", type=Path, default=None,
+                        help="JSON list of questions to benchmark throughput with")
+    args = parser.parse_args()
+
+    engine = LIHTCInferenceEngine(
+        args.model_path,
+        quantize=None if args.quantize == "none" else args.quantize,
+        num_threads=args.threads,
+        max_batch_size=args.batch_size
+    )
+
+    if args.serve:
+        serve_batch_api(engine, port=args.port)
+        return
+
+    if args.benchmark:
+        with open(args.benchmark, 'r') as f:
+            questions = json.load(f)
+        print(json.dumps(benchmark_throughput(engine, questions), indent=2))
+        return
     
     print("🏢 LIHTC Expert Assistant Ready!")
     print("Ask questions about Low-Income Housing Tax Credits, QAPs, and compliance requirements.")
@@ -91,6 +91,29 @@ FILES NEEDING SPLITTING:
         
         return report
 
+def check_pdf_processing_limit(pdf_path, max_pages=100):
+    """Check a single PDF against a page limit (used by pdf_preprocessor.py)"""
+    page_count = PDFPageCounter().count_pages(pdf_path)
+    if page_count is None:
+        return {'pages': None, 'status': 'error', 'needs_splitting': False,
+                'message': f"Could not read PDF: {pdf_path}"}
+    
+    needs_splitting = page_count > max_pages
+    return {
+        'pages': page_count,
+        'status': 'needs_splitting' if needs_splitting else 'ok',
+        'needs_splitting': needs_splitting,
+        'message': f"{page_count} pages - {'NEEDS_SPLITTING' if needs_splitting else 'COMPATIBLE'}"
+    }
+
+def batch_check_qap_pdfs(qap_directory, max_pages=100):
+    """Check every PDF under a QAP directory, keyed by path relative to it"""
+    qap_directory = Path(qap_directory)
+    return {
+        str(pdf_file.relative_to(qap_directory)): check_pdf_processing_limit(pdf_file, max_pages)
+        for pdf_file in sorted(qap_directory.glob("**/*.pdf"))
+    }
+
 def main():
     """Main function for command line usage"""
     if len(sys.argv) < 2:
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+PDF Page Text Store - Extract QAP page text once, look pages up in microseconds
+
+Every section extractor used to call page.extract_text() on every page of the
+same QAP just to find where a section lives. This store does that extraction
+once per PDF (keyed by content hash) and keeps:
+- pages.bin: zlib-compressed text of each page, concatenated (memory-mapped)
+- pages.idx: little-endian uint64 byte offsets into pages.bin (n_pages + 1)
+- keywords.json: inverted index of lowercase word -> pages containing it
+
+Stores live under $QAP_PAGE_TEXT_STORE_DIR, else the user cache directory
+($XDG_CACHE_HOME or ~/.cache)/qap_page_text_store - never inside the source tree.
+
+Usage:
+    store = PageTextStore.for_pdf(pdf_path)
+    pages = store.pages_matching(["minimum construction standards"])
+    text = store.page_text(pages[0])
+
+Built by Structured Consultants LLC
+Roman Engineering Standards: Built to Last 2000+ Years
+"""
+
+import os
+import re
+import json
+import mmap
+import zlib
+import struct
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, List, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+STORE_ROOT_ENV = "QAP_PAGE_TEXT_STORE_DIR"
+STORE_FORMAT_VERSION = 1
+
+_WORD = re.compile(r'[a-z0-9§]+')
+_OFFSET = struct.Struct('<Q')
+
+
+def default_store_root() -> Path:
+    """$QAP_PAGE_TEXT_STORE_DIR, else <user cache dir>/qap_page_text_store"""
+    configured = os.getenv(STORE_ROOT_ENV)
+    if configured:
+        return Path(configured).expanduser()
+    cache_home = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "qap_page_text_store"
+
+
+def _pdf_hash(pdf_path: Path) -> str:
+    """SHA-256 of the PDF bytes, read in 1 MB blocks"""
+    digest = hashlib.sha256()
+    with open(pdf_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _extract_page_texts(pdf_path: Path, engine: str) -> Iterable[str]:
+    """Yield the text of each page with the same library the extractors use"""
+    if engine == "pdfplumber":
+        import pdfplumber
+        with pdfplumber.open(pdf_path) as pdf:
+            for page in pdf.pages:
+                yield page.extract_text() or ""
+    elif engine == "pypdf2":
+        import PyPDF2
+        with open(pdf_path, 'rb') as f:
+            for page in PyPDF2.PdfReader(f).pages:
+                yield page.extract_text() or ""
+    else:
+        raise ValueError(f"Unknown text extraction engine: {engine}")
+
+
+class PageTextStore:
+    """Read-only, memory-mapped page text store for one PDF"""
+
+    # Open stores per directory so repeated extractors in one process share the mapping
+    _open_stores: Dict[str, 'PageTextStore'] = {}
+
+    def __init__(self, store_dir: Path):
+        self.store_dir = Path(store_dir)
+
+        with open(self.store_dir / "keywords.json", 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self.page_count: int = meta["page_count"]
+        self.source_pdf: str = meta["source_pdf"]
+        self.index: Dict[str, List[int]] = meta["index"]
+        self._substring_postings: Dict[str, List[int]] = {}
+
+        self._idx_file = open(self.store_dir / "pages.idx", 'rb')
+        self._bin_file = open(self.store_dir / "pages.bin", 'rb')
+        self._offsets = mmap.mmap(self._idx_file.fileno(), 0, access=mmap.ACCESS_READ)
+        # mmap cannot map an empty file (a PDF with no extractable text)
+        self._pages = (mmap.mmap(self._bin_file.fileno(), 0, access=mmap.ACCESS_READ)
+                       if os.path.getsize(self.store_dir / "pages.bin") else b'')
+
+    @classmethod
+    def for_pdf(cls, pdf_path, store_root: Optional[Path] = None, engine: str = "pdfplumber") -> 'PageTextStore':
+        """Open the store for a PDF, building it on first use"""
+        pdf_path = Path(pdf_path)
+        store_root = Path(store_root) if store_root else default_store_root()
+        store_dir = store_root / f"{_pdf_hash(pdf_path)[:32]}_{engine}_v{STORE_FORMAT_VERSION}"
+
+        key = str(store_dir)
+        if key in cls._open_stores:
+            return cls._open_stores[key]
+
+        if not (store_dir / "keywords.json").exists():
+            cls.build(pdf_path, store_dir, engine)
+
+        store = cls(store_dir)
+        cls._open_stores[key] = store
+        return store
+
+    @staticmethod
+    def build(pdf_path: Path, store_dir: Path, engine: str = "pdfplumber"):
+        """Extract every page once and write the compressed text, offsets and keyword index"""
+        logger.info(f"Building page text store for {Path(pdf_path).name} ({engine})")
+        store_dir = Path(store_dir)
+        tmp_dir = store_dir.with_name(store_dir.name + ".tmp")
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+
+        index: Dict[str, List[int]] = {}
+        offset = 0
+        page_count = 0
+        with open(tmp_dir / "pages.bin", 'wb') as pages_out, open(tmp_dir / "pages.idx", 'wb') as idx_out:
+            idx_out.write(_OFFSET.pack(0))
+            for page_number, text in enumerate(_extract_page_texts(Path(pdf_path), engine), 1):
+                compressed = zlib.compress(text.encode('utf-8'), 6)
+                pages_out.write(compressed)
+                offset += len(compressed)
+                idx_out.write(_OFFSET.pack(offset))
+                page_count = page_number
+
+                for word in set(_WORD.findall(text.lower())):
+                    index.setdefault(word, []).append(page_number)
+
+        # keywords.json is written last: its presence marks a complete store
+        with open(tmp_dir / "keywords.json", 'w', encoding='utf-8') as f:
+            json.dump({"source_pdf": str(pdf_path), "page_count": page_count, "engine": engine, "index": index}, f)
+
+        if store_dir.exists():
+            for leftover in store_dir.iterdir():
+                leftover.unlink()
+            store_dir.rmdir()
+        tmp_dir.rename(store_dir)
+
+    def _page_span(self, page_number: int) -> Tuple[int, int]:
+        start = _OFFSET.unpack_from(self._offsets, (page_number - 1) * _OFFSET.size)[0]
+        end = _OFFSET.unpack_from(self._offsets, page_number * _OFFSET.size)[0]
+        return start, end
+
+    def page_text(self, page_number: int) -> str:
+        """Text of a 1-based page number ("" for pages without text)"""
+        if not 1 <= page_number <= self.page_count:
+            raise IndexError(f"Page {page_number} out of range 1-{self.page_count}")
+        start, end = self._page_span(page_number)
+        return zlib.decompress(self._pages[start:end]).decode('utf-8')
+
+    def iter_pages(self) -> Iterable[Tuple[int, str]]:
+        """(page_number, text) for every page, in order"""
+        for page_number in range(1, self.page_count + 1):
+            yield page_number, self.page_text(page_number)
+
+    def _pages_containing_substring(self, word: str) -> List[int]:
+        """Pages with any indexed word containing `word` (superset of pages where it appears)"""
+        if word not in self._substring_postings:
+            pages = set(self.index.get(word, ()))
+            for indexed_word, postings in self.index.items():
+                if word in indexed_word:
+                    pages.update(postings)
+            self._substring_postings[word] = sorted(pages)
+        return self._substring_postings[word]
+
+    def candidate_pages(self, terms: Iterable[str]) -> List[int]:
+        """Pages that contain every word of every term somewhere (index lookup only)"""
+        candidates: Optional[set] = None
+        for term in terms:
+            for word in _WORD.findall(term.lower()):
+                pages = set(self._pages_containing_substring(word))
+                candidates = pages if candidates is None else candidates & pages
+        if candidates is None:
+            return list(range(1, self.page_count + 1))
+        return sorted(candidates)
+
+    def pages_matching(self, terms: Iterable[str], match_all: bool = False) -> List[int]:
+        """Pages whose lowercased text contains any (or all) of the terms as substrings"""
+        terms = [term.lower() for term in terms]
+        if match_all:
+            candidates = self.candidate_pages(terms)
+        else:
+            candidates = sorted({page for term in terms for page in self.candidate_pages([term])})
+
+        matches = []
+        for page_number in candidates:
+            text_lower = self.page_text(page_number).lower()
+            if (all if match_all else any)(term in text_lower for term in terms):
+                matches.append(page_number)
+        return matches
+
+    def pages_matching_regex(self, pattern: str, required_words: Iterable[str] = (), flags: int = re.IGNORECASE) -> List[int]:
+        """Pages where `pattern` matches; required_words narrows the pages the regex runs on"""
+        compiled = re.compile(pattern, flags)
+        return [page_number for page_number in self.candidate_pages(required_words)
+                if compiled.search(self.page_text(page_number))]
@@ -37,9 +37,10 @@ class QAPPDFPreprocessor:
     Comprehensive PDF preprocessor for QAP chunking pipeline
     """
     
-    def __init__(self, max_pages=100, output_base_dir=None):
+    def __init__(self, max_pages=100, output_base_dir=None, virtual_sections=True):
         self.max_pages = max_pages
         self.output_base_dir = output_base_dir
+        self.virtual_sections = virtual_sections  # Page-range windows over the original instead of split files
         self.processing_log = []
         
     def preprocess_single_pdf(self, pdf_path, force_split=False):
@@ -64,6 +65,7 @@ class QAPPDFPreprocessor:
             'page_count': check_result['pages'],
             'processing_status': check_result['status'],
             'ready_for_chunking': [],
+            'page_windows': [],
             'split_performed': False,
             'error': None
         }
@@ -90,10 +92,15 @@ class QAPPDFPreprocessor:
             if output_dir is None:
                 output_dir = Path(pdf_path).parent / "split_sections"
             
-            # Split the PDF
-            split_result = split_qap_pdf_if_needed(pdf_path, output_dir, self.max_pages)
+            # Split the PDF (virtual page windows unless physical files were requested)
+            split_result = split_qap_pdf_if_needed(pdf_path, output_dir, self.max_pages, virtual=self.virtual_sections)
             
-            if split_result['split'] and split_result['sections']:
+            if split_result['split'] and split_result['sections'] and split_result['virtual']:
+                preprocessing_result['split_performed'] = True
+                preprocessing_result['ready_for_chunking'] = [pdf_path]
+                preprocessing_result['page_windows'] = split_result['sections']
+                logger.info(f"✅ Planned {len(split_result['sections'])} page-range sections (no files written)")
+            elif split_result['split'] and split_result['sections']:
                 preprocessing_result['split_performed'] = True
                 preprocessing_result['ready_for_chunking'] = split_result['sections']
                 logger.info(f"✅ Split into {len(split_result['sections'])} sections")
@@ -129,7 +136,8 @@ class QAPPDFPreprocessor:
             'pdfs_split': 0,
             'pdfs_failed': 0,
             'individual_results': {},
-            'chunking_ready_files': []
+            'chunking_ready_files': [],
+            'page_windows': {}
         }
         
         logger.info(f"Found {len(check_results)} PDFs to preprocess")
@@ -157,6 +165,8 @@ class QAPPDFPreprocessor:
             elif result['split_performed']:
                 preprocessing_results['pdfs_split'] += 1
                 preprocessing_results['chunking_ready_files'].extend(result['ready_for_chunking'])
+                if result['page_windows']:
+                    preprocessing_results['page_windows'][str(full_path)] = result['page_windows']
             else:
                 preprocessing_results['pdfs_ready'] += 1
                 preprocessing_results['chunking_ready_files'].extend(result['ready_for_chunking'])
@@ -185,10 +195,28 @@ class QAPPDFPreprocessor:
             'processing_queue': []
         }
         
+        page_windows = preprocessing_results.get('page_windows', {})
+        
         # Create processing queue with metadata
         for i, file_path in enumerate(preprocessing_results['chunking_ready_files'], 1):
             file_path_obj = Path(file_path)
             
+            # Virtual sections: one queue item per page window of the original file
+            for window in page_windows.get(file_path, []):
+                config['processing_queue'].append({
+                    'sequence': i,
+                    'file_path': file_path,
+                    'file_name': file_path_obj.name,
+                    'original_document': file_path_obj.stem,
+                    'is_split_section': True,
+                    'section_info': window['label'].split('_section_')[1],
+                    'page_range': [window['start_page'], window['end_page']],
+                    'jurisdiction': self._extract_jurisdiction_from_path(file_path),
+                    'processing_priority': 'high' if 'CA_2025' in file_path else 'normal'
+                })
+            if file_path in page_windows:
+                continue
+            
             # Determine if this is a split section or original file
             is_split_section = 'split_sections' in file_path_obj.parts
             
@@ -209,6 +237,7 @@ class QAPPDFPreprocessor:
                 'original_document': original_pattern,
                 'is_split_section': is_split_section,
                 'section_info': section_info,
+                'page_range': None,
                 'jurisdiction': self._extract_jurisdiction_from_path(file_path),
                 'processing_priority': 'high' if 'CA_2025' in file_path else 'normal'
             }
@@ -276,11 +305,16 @@ def generate_comprehensive_report(preprocessing_results, config, output_file=Non
             if result.get('split_performed'):
                 report_lines.append(f"### {relative_path}")
                 report_lines.append(f"- Original pages: {result['page_count']}")
-                report_lines.append(f"- Sections created: {len(result['ready_for_chunking'])}")
-                report_lines.append("- Section files:")
-                for section in result['ready_for_chunking']:
-                    section_name = Path(section).name
-                    report_lines.append(f"  - `{section_name}`")
+                if result.get('page_windows'):
+                    report_lines.append(f"- Page-range sections: {len(result['page_windows'])}")
+                    for window in result['page_windows']:
+                        report_lines.append(f"  - `{window['label']}` (pages {window['start_page']}-{window['end_page']})")
+                else:
+                    report_lines.append(f"- Sections created: {len(result['ready_for_chunking'])}")
+                    report_lines.append("- Section files:")
+                    for section in result['ready_for_chunking']:
+                        section_name = Path(section).name
+                        report_lines.append(f"  - `{section_name}`")
                 report_lines.append("")
     
     # Pipeline Configuration Summary
@@ -347,13 +381,14 @@ Examples:
     parser.add_argument('--qap-directory', help='Preprocess all PDFs in QAP directory')
     parser.add_argument('--max-pages', type=int, default=100, help='Maximum pages per section (default: 100)')
     parser.add_argument('--output-dir', help='Base directory for split sections')
+    parser.add_argument('--physical-split', action='store_true', help='Write split PDF files instead of page-range sections')
     parser.add_argument('--config', help='Output file for chunking pipeline configuration (JSON)')
     parser.add_argument('--report', help='Output file for comprehensive report (Markdown)')
     
     args = parser.parse_args()
     
     # Initialize preprocessor
-    preprocessor = QAPPDFPreprocessor(args.max_pages, args.output_dir)
+    preprocessor = QAPPDFPreprocessor(args.max_pages, args.output_dir, virtual_sections=not args.physical_split)
     
     if args.pdf:
         # Preprocess single PDF
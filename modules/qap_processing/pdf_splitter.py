@@ -9,7 +9,9 @@ Roman Engineering Standards: Built to Last 2000+ Years
 
 import os
 import sys
+import mmap
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import PyPDF2
 import logging
 import math
@@ -24,6 +26,33 @@ class PDFSplitter:
     def __init__(self, max_pages_per_section=95):
         self.max_pages_per_section = max_pages_per_section  # Slightly under 100 for safety
         
+    def plan_virtual_sections(self, input_path, total_pages=None, custom_prefix=None):
+        """Plan page-range sections over the original PDF without writing any files
+        
+        Each section is a dict with 1-based inclusive start_page/end_page and the
+        label the equivalent physical split file would have had.
+        """
+        input_path = Path(input_path)
+        
+        if total_pages is None:
+            with open(input_path, 'rb') as input_file:
+                total_pages = len(PyPDF2.PdfReader(input_file).pages)
+        
+        prefix = custom_prefix or input_path.stem
+        sections = []
+        for section in range(math.ceil(total_pages / self.max_pages_per_section)):
+            start_page = section * self.max_pages_per_section + 1
+            end_page = min(start_page + self.max_pages_per_section - 1, total_pages)
+            sections.append({
+                'source_file': str(input_path),
+                'section_number': section + 1,
+                'start_page': start_page,
+                'end_page': end_page,
+                'label': f"{prefix}_section_{section + 1:02d}_pages_{start_page:03d}-{end_page:03d}"
+            })
+        
+        return sections
+    
     def split_pdf(self, input_path, output_dir=None, custom_prefix=None):
         """Split a PDF into multiple sections"""
         input_path = Path(input_path)
@@ -145,6 +174,80 @@ SECTION FILES:
         
         return results
 
+def _extract_page_window(pdf_path, start_page, end_page):
+    """Worker: extract text for one page window straight from the memory-mapped original"""
+    pages = []
+    with open(pdf_path, 'rb') as input_file:
+        with mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            pdf_reader = PyPDF2.PdfReader(mapped)
+            for page_index in range(start_page - 1, end_page):
+                try:
+                    text = pdf_reader.pages[page_index].extract_text() or ""
+                except Exception as e:
+                    logger.warning(f"Could not extract page {page_index + 1} of {pdf_path}: {str(e)}")
+                    text = ""
+                pages.append({'page_number': page_index + 1, 'text': text})
+    return pages
+
+def extract_virtual_sections_parallel(sections, max_workers=None):
+    """Extract every virtual section in parallel and stitch pages back in document order
+    
+    Returns one list per source file keyed by path, each holding
+    {'page_number', 'section_number', 'text'} with global page numbers.
+    """
+    if not sections:
+        return {}
+    
+    max_workers = max_workers or min(len(sections), os.cpu_count() or 1)
+    stitched = {}
+    
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        future_to_section = {
+            executor.submit(_extract_page_window, section['source_file'], section['start_page'], section['end_page']): section
+            for section in sections
+        }
+        for future in as_completed(future_to_section):
+            section = future_to_section[future]
+            for page in future.result():
+                page['section_number'] = section['section_number']
+                stitched.setdefault(section['source_file'], []).append(page)
+    
+    for pages in stitched.values():
+        pages.sort(key=lambda page: page['page_number'])
+    
+    return stitched
+
+def split_qap_pdf_if_needed(pdf_path, output_dir=None, max_pages=100, virtual=True):
+    """Split a QAP PDF that exceeds max_pages
+    
+    With virtual=True (default) only page-range sections over the original
+    file are planned; nothing is written. virtual=False keeps the legacy
+    behaviour of writing one PDF per section into output_dir.
+    """
+    splitter = PDFSplitter(max_pages_per_section=max_pages)
+    
+    try:
+        if virtual:
+            sections = splitter.plan_virtual_sections(pdf_path)
+            if len(sections) <= 1:
+                return {'split': False, 'virtual': True, 'sections': [], 'reason': 'Within page limit'}
+            return {'split': True, 'virtual': True, 'sections': sections, 'reason': 'Planned page-range sections'}
+        
+        section_files = splitter.split_pdf(pdf_path, output_dir)
+    except Exception as e:
+        logger.error(f"Error planning split for {pdf_path}: {str(e)}")
+        return {'split': False, 'virtual': virtual, 'sections': [], 'reason': str(e)}
+    
+    if section_files is None:
+        return {'split': False, 'virtual': False, 'sections': [], 'reason': 'Split failed'}
+    if len(section_files) == 1:
+        return {'split': False, 'virtual': False, 'sections': [], 'reason': 'Within page limit'}
+    return {'split': True, 'virtual': False, 'sections': section_files, 'reason': 'Written to disk'}
+
+def batch_split_qap_pdfs(pdf_paths, output_dir=None, max_pages=100, virtual=True):
+    """Apply split_qap_pdf_if_needed to several PDFs"""
+    return {str(pdf_path): split_qap_pdf_if_needed(pdf_path, output_dir, max_pages, virtual) for pdf_path in pdf_paths}
+
 def main():
     """Main function for command line usage"""
     if len(sys.argv) < 2:
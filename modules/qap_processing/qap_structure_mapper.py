@@ -7,7 +7,6 @@ Mission: Map complete QAP outline (§10300-§10337) with nested relationships
 Target: Build foundation for correct section identification and complete extraction
 """
 
-import pdfplumber
 import re
 import json
 from pathlib import Path
@@ -15,6 +14,8 @@ from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 import time
 
+from pdf_page_text_store import PageTextStore
+
 @dataclass
 class QAPSection:
     """Represents a QAP section with hierarchical structure"""
@@ -101,44 +102,43 @@ class QAPStructureMapper:
         }
         
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                total_pages = len(pdf.pages)
+            page_store = PageTextStore.for_pdf(pdf_path)
+            total_pages = page_store.page_count
+            
+            for page_num, text in page_store.iter_pages():
+                if not text:
+                    continue
                 
-                for page_num, page in enumerate(pdf.pages, 1):
-                    text = page.extract_text()
-                    if not text:
-                        continue
-                    
-                    # Find main sections (§10300-§10337)
-                    main_matches = self.section_patterns['main_section'].findall(text)
-                    for section_num, title in main_matches:
-                        section_info = {
-                            "section_id": section_num,
-                            "full_citation": f"§{section_num}",
-                            "title": title.strip(),
-                            "page": page_num,
-                            "level": 1,
-                            "type": "main_section"
-                        }
-                        structure["sections_found"].append(section_info)
-                        
-                        # Special handling for complex sections
-                        if section_num == "10325":
-                            self._analyze_complex_section_10325(text, page_num, structure)
-                    
-                    # Find subsections and nested content
-                    self._extract_subsection_structure(text, page_num, structure)
+                # Find main sections (§10300-§10337)
+                main_matches = self.section_patterns['main_section'].findall(text)
+                for section_num, title in main_matches:
+                    section_info = {
+                        "section_id": section_num,
+                        "full_citation": f"§{section_num}",
+                        "title": title.strip(),
+                        "page": page_num,
+                        "level": 1,
+                        "type": "main_section"
+                    }
+                    structure["sections_found"].append(section_info)
                     
-                    # Look for specific content patterns
-                    self._identify_content_patterns(text, page_num, structure)
-                    
-                    # Progress indicator for large files
-                    if page_num % 20 == 0:
-                        print(f"  📄 Processed {page_num}/{total_pages} pages...")
+                    # Special handling for complex sections
+                    if section_num == "10325":
+                        self._analyze_complex_section_10325(text, page_num, structure)
+                
+                # Find subsections and nested content
+                self._extract_subsection_structure(text, page_num, structure)
                 
-                print(f"  ✅ Completed {total_pages} pages")
-                print(f"  📊 Found {len(structure['sections_found'])} sections")
+                # Look for specific content patterns
+                self._identify_content_patterns(text, page_num, structure)
                 
+                # Progress indicator for large files
+                if page_num % 20 == 0:
+                    print(f"  📄 Processed {page_num}/{total_pages} pages...")
+            
+            print(f"  ✅ Completed {total_pages} pages")
+            print(f"  📊 Found {len(structure['sections_found'])} sections")
+            
         except Exception as e:
             structure["error"] = str(e)
             print(f"  ❌ Error processing {pdf_path.name}: {e}")
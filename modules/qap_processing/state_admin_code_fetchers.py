@@ -17,6 +17,10 @@ import requests
 import time
 import json
 import hashlib
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
@@ -50,12 +54,141 @@ class RegulationUpdate:
     new_hash: str
     change_summary: str
 
+class HostRateLimiter:
+    """Spaces requests to the same host by a minimum interval; different hosts run freely"""
+    
+    def __init__(self, min_interval: float = 1.0):
+        self.min_interval = min_interval
+        self._next_allowed: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def wait(self, url: str):
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_allowed.get(host, 0.0))
+            self._next_allowed[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+class RegulationStore:
+    """SQLite store of HTTP validators, raw responses and regulation content/section hashes"""
+    
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body BLOB,
+                encoding TEXT,
+                fetched_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS regulations (
+                source_id TEXT PRIMARY KEY,
+                state TEXT,
+                content TEXT,
+                content_hash TEXT,
+                section_hashes TEXT,
+                fetch_time REAL,
+                metadata TEXT,
+                updated_at REAL
+            );
+        """)
+        self.conn.commit()
+    
+    def get_http(self, url: str) -> Optional[Tuple[str, str, bytes, str]]:
+        with self._lock:
+            return self.conn.execute(
+                "SELECT etag, last_modified, body, encoding FROM http_cache WHERE url = ?", (url,)
+            ).fetchone()
+    
+    def put_http(self, url: str, etag: Optional[str], last_modified: Optional[str], body: bytes, encoding: Optional[str]):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO http_cache VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, body, encoding, time.time())
+            )
+            self.conn.commit()
+    
+    def get_regulation(self, source_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT content_hash, section_hashes FROM regulations WHERE source_id = ?", (source_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"content_hash": row[0], "section_hashes": json.loads(row[1] or "{}")}
+    
+    def put_regulation(self, result: 'FetchResult', section_hashes: Dict[str, str]):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO regulations VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (result.source_id, result.source_id.split('_')[0], result.content, result.content_hash,
+                 json.dumps(section_hashes), result.fetch_time, json.dumps(result.metadata or {}), time.time())
+            )
+            self.conn.commit()
+    
+    def summary(self) -> List[Tuple[str, int, int]]:
+        """(state, regulation count, total characters) without loading content"""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT state, COUNT(*), SUM(LENGTH(content)) FROM regulations GROUP BY state"
+            ).fetchall()
+
+class ConditionalSession(requests.Session):
+    """Session that rate-limits per host and revalidates GETs with ETag / If-Modified-Since.
+    
+    A 304 is answered from the stored body as an ordinary 200 response, so
+    fetchers parse it exactly like a fresh download.
+    """
+    
+    def __init__(self, store: RegulationStore, rate_limiter: HostRateLimiter):
+        super().__init__()
+        self.store = store
+        self.rate_limiter = rate_limiter
+    
+    def request(self, method, url, *args, **kwargs):
+        if method.upper() != 'GET':
+            self.rate_limiter.wait(url)
+            return super().request(method, url, *args, **kwargs)
+        
+        # Key on the final URL (including query params) so every TAC rule gets its own validators
+        cache_key = requests.Request('GET', url, params=kwargs.get('params')).prepare().url
+        cached = self.store.get_http(cache_key)
+        headers = dict(kwargs.pop('headers', None) or {})
+        if cached:
+            etag, last_modified, _, _ = cached
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        
+        self.rate_limiter.wait(url)
+        response = super().request(method, url, *args, headers=headers, **kwargs)
+        
+        if response.status_code == 304 and cached:
+            response.status_code = 200
+            response._content = cached[2]
+            response.encoding = cached[3]
+            response.from_cache = True
+        elif response.status_code == 200:
+            response.from_cache = False
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if etag or last_modified:
+                self.store.put_http(cache_key, etag, last_modified, response.content, response.encoding)
+        return response
+
 class StateAdminCodeFetcher(ABC):
     """Abstract base class for state administrative code fetchers"""
     
-    def __init__(self, state_code: str):
+    def __init__(self, state_code: str, session: Optional[requests.Session] = None):
         self.state_code = state_code
-        self.session = requests.Session()
+        self.session = session or requests.Session()
         self.session.headers.update({
             'User-Agent': 'LIHTC-RegulationBot/1.0 (Structured Consultants LLC; compliance@structuredconsultants.com)'
         })
@@ -74,6 +207,26 @@ class StateAdminCodeFetcher(ABC):
         """Calculate SHA-256 hash of content for change detection"""
         return hashlib.sha256(content.encode('utf-8')).hexdigest()
     
+    def _split_sections(self, content: str) -> Dict[str, str]:
+        """Split regulation text on section/subsection markers and hash each piece"""
+        marker = re.compile(r'(?:(?<=\s)|^)(§\s*\d+(?:\.\d+)*|\d+-\d+\.\d{3}|\([a-z]\))(?=\s)')
+        matches = list(marker.finditer(content))
+        if not matches:
+            return {"full_text": self._calculate_content_hash(content)}
+        
+        sections = {}
+        if matches[0].start() > 0:
+            sections["preamble"] = self._calculate_content_hash(content[:matches[0].start()])
+        for i, match in enumerate(matches):
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(content)
+            label = match.group(1)
+            suffix = 2
+            while label in sections:
+                label = f"{match.group(1)}#{suffix}"
+                suffix += 1
+            sections[label] = self._calculate_content_hash(content[match.start():end])
+        return sections
+    
     def _clean_content(self, html_content: str) -> str:
         """Clean HTML content to extract plain text"""
         soup = BeautifulSoup(html_content, 'html.parser')
@@ -85,8 +238,8 @@ class StateAdminCodeFetcher(ABC):
 class CaliforniaCCRFetcher(StateAdminCodeFetcher):
     """California Code of Regulations Fetcher - Public Access"""
     
-    def __init__(self):
-        super().__init__("CA")
+    def __init__(self, session: Optional[requests.Session] = None):
+        super().__init__("CA", session)
         # Use official CA.gov sites instead of Westlaw sharks
         self.base_url = "https://www.hcd.ca.gov"
         self.ccr_direct_url = "https://leginfo.legislature.ca.gov/faces/codes_displaySection.xhtml"
@@ -223,8 +376,8 @@ class CaliforniaCCRFetcher(StateAdminCodeFetcher):
 class TexasTACFetcher(StateAdminCodeFetcher):
     """Texas Administrative Code Fetcher"""
     
-    def __init__(self):
-        super().__init__("TX")
+    def __init__(self, session: Optional[requests.Session] = None):
+        super().__init__("TX", session)
         self.base_url = "https://texreg.sos.state.tx.us/public/readtac$ext.ViewTAC"
         
     def fetch_regulation(self, regulation_id: str) -> FetchResult:
@@ -303,8 +456,8 @@ class TexasTACFetcher(StateAdminCodeFetcher):
 class FloridaFACFetcher(StateAdminCodeFetcher):
     """Florida Administrative Code Fetcher"""
     
-    def __init__(self):
-        super().__init__("FL")
+    def __init__(self, session: Optional[requests.Session] = None):
+        super().__init__("FL", session)
         self.base_url = "https://www.flrules.org/gateway"
         self.chapters = {
             "67-21": "Florida Housing Finance Corporation - General",
@@ -445,8 +598,8 @@ class FloridaFACFetcher(StateAdminCodeFetcher):
 class NewYorkNYCRRFetcher(StateAdminCodeFetcher):
     """New York Codes, Rules and Regulations Fetcher"""
     
-    def __init__(self):
-        super().__init__("NY")
+    def __init__(self, session: Optional[requests.Session] = None):
+        super().__init__("NY", session)
         self.base_url = "https://www.nyc.gov/site/hpd"
         
     def fetch_regulation(self, regulation_id: str) -> FetchResult:
@@ -516,80 +669,119 @@ class NewYorkNYCRRFetcher(StateAdminCodeFetcher):
 class StateAdminCodeManager:
     """Manages all state administrative code fetchers"""
     
-    def __init__(self):
+    def __init__(self, cache_dir: str = "regulation_cache", min_host_interval: float = 1.0, max_workers: int = 8):
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.max_workers = max_workers
+        
+        # One store, rate limiter and conditional session shared by every fetcher
+        self.store = RegulationStore(os.path.join(self.cache_dir, "regulation_store.db"))
+        self.rate_limiter = HostRateLimiter(min_host_interval)
+        self.session = ConditionalSession(self.store, self.rate_limiter)
+        self.session.headers.update({
+            'User-Agent': 'LIHTC-RegulationBot/1.0 (Structured Consultants LLC; compliance@structuredconsultants.com)'
+        })
+        
         self.fetchers = {
-            "CA": CaliforniaCCRFetcher(),
-            "TX": TexasTACFetcher(),
-            "FL": FloridaFACFetcher(),
-            "NY": NewYorkNYCRRFetcher()
+            "CA": CaliforniaCCRFetcher(self.session),
+            "TX": TexasTACFetcher(self.session),
+            "FL": FloridaFACFetcher(self.session),
+            "NY": NewYorkNYCRRFetcher(self.session)
         }
-        self.cache_dir = "regulation_cache"
-        os.makedirs(self.cache_dir, exist_ok=True)
+        self.last_updates: List[RegulationUpdate] = []
         
     def fetch_all_regulations(self, state: str) -> List[FetchResult]:
-        """Fetch all regulations for a state"""
+        """Fetch all regulations for a state (concurrently, rate limited per host)"""
+        results, _ = self.refresh_states([state])
+        return results
+    
+    def refresh_states(self, states: List[str]) -> Tuple[List[FetchResult], List[RegulationUpdate]]:
+        """Fetch every regulation of the given states and diff them against the store
         
-        if state not in self.fetchers:
-            logger.error(f"No fetcher available for state: {state}")
-            return []
+        Unchanged regulations (same content hash) produce no updates and are not rewritten.
+        """
+        jobs = []
+        for state in states:
+            if state not in self.fetchers:
+                logger.error(f"No fetcher available for state: {state}")
+                continue
+            fetcher = self.fetchers[state]
+            regulations = fetcher.get_available_regulations()
+            logger.info(f"Fetching {len(regulations)} regulations for {state}")
+            jobs.extend((fetcher, reg_id) for reg_id in regulations)
         
-        fetcher = self.fetchers[state]
-        regulations = fetcher.get_available_regulations()
         results = []
-        
-        logger.info(f"Fetching {len(regulations)} regulations for {state}")
-        
-        for reg_id in regulations:
-            try:
-                result = fetcher.fetch_regulation(reg_id)
-                results.append(result)
+        updates = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            future_to_job = {executor.submit(fetcher.fetch_regulation, reg_id): (fetcher, reg_id) for fetcher, reg_id in jobs}
+            for future in as_completed(future_to_job):
+                fetcher, reg_id = future_to_job[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Error fetching {reg_id}: {e}")
+                    continue
                 
+                results.append(result)
                 if result.success:
                     logger.info(f"✅ {result.source_id}: {len(result.content):,} chars in {result.fetch_time:.2f}s")
-                    self._cache_result(result)
+                    updates.extend(self._cache_result(result, fetcher))
                 else:
                     logger.error(f"❌ {result.source_id}: {result.error_message}")
-                
-                # Rate limiting
-                time.sleep(1)  # 1 second between requests
-                
-            except Exception as e:
-                logger.error(f"Error fetching {reg_id}: {e}")
         
-        return results
+        self.last_updates = updates
+        return results, updates
     
-    def _cache_result(self, result: FetchResult):
-        """Cache fetched regulation content"""
-        cache_file = os.path.join(self.cache_dir, f"{result.source_id}.json")
+    def _cache_result(self, result: FetchResult, fetcher: StateAdminCodeFetcher) -> List[RegulationUpdate]:
+        """Store fetched regulation content, returning section-level diffs against the stored copy"""
+        previous = self.store.get_regulation(result.source_id)
+        if previous and previous['content_hash'] == result.content_hash:
+            return []
         
-        cache_data = {
-            "source_id": result.source_id,
-            "content": result.content,
-            "content_hash": result.content_hash,
-            "fetch_time": result.fetch_time,
-            "metadata": result.metadata,
-            "cached_at": time.time()
-        }
+        section_hashes = fetcher._split_sections(result.content)
+        self.store.put_regulation(result, section_hashes)
         
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            json.dump(cache_data, f, indent=2, ensure_ascii=False)
+        if previous is None:
+            return [RegulationUpdate(
+                source_id=result.source_id,
+                change_type="added",
+                section_affected="entire regulation",
+                old_hash="",
+                new_hash=result.content_hash,
+                change_summary=f"New regulation with {len(section_hashes)} sections"
+            )]
+        
+        old_sections = previous['section_hashes']
+        updates = []
+        for section in sorted(set(old_sections) | set(section_hashes)):
+            old_hash = old_sections.get(section, "")
+            new_hash = section_hashes.get(section, "")
+            if old_hash == new_hash:
+                continue
+            change_type = "added" if not old_hash else "deleted" if not new_hash else "modified"
+            updates.append(RegulationUpdate(
+                source_id=result.source_id,
+                change_type=change_type,
+                section_affected=section,
+                old_hash=old_hash,
+                new_hash=new_hash,
+                change_summary=f"Section {section} {change_type}"
+            ))
+        return updates
     
     def get_cache_summary(self) -> Dict[str, int]:
         """Get summary of cached regulations"""
         
-        cache_files = [f for f in os.listdir(self.cache_dir) if f.endswith('.json')]
-        
         summary = {}
         total_chars = 0
+        total_regulations = 0
         
-        for cache_file in cache_files:
-            with open(os.path.join(self.cache_dir, cache_file), 'r') as f:
-                data = json.load(f)
-                state = data['source_id'].split('_')[0]
-                summary[state] = summary.get(state, 0) + 1
-                total_chars += len(data['content'])
+        for state, count, chars in self.store.summary():
+            summary[state] = count
+            total_regulations += count
+            total_chars += chars or 0
         
-        summary['total_regulations'] = len(cache_files)
+        summary['total_regulations'] = total_regulations
         summary['total_characters'] = total_chars
         
         return summary
@@ -616,6 +808,7 @@ def main():
         
         print(f"✅ Successfully fetched: {success_count}/{len(results)} regulations")
         print(f"📊 Total content: {total_chars:,} characters")
+        print(f"🔄 Changed sections: {len(manager.last_updates)}")
         
     # Show cache summary
     print(f"\n💾 CACHE SUMMARY:")
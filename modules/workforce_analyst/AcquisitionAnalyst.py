@@ -10,6 +10,7 @@ import openpyxl
 import json
 import re
 from datetime import datetime
+from contextlib import contextmanager, nullcontext
 import time
 from typing import Dict, List, Optional, Tuple
 import plotly.graph_objects as go
@@ -20,38 +21,20 @@ from urllib.parse import urlparse, parse_qs
 import webbrowser
 import shutil
 
-# Deal Cache Functions
+from deal_catalog import shared_catalog
+from deal_cache_store import get_deal_cache_store, sanitize_deal_name
+
+# Deal Cache Functions (backed by the SQLite deal cache store; listings never read payloads)
 def get_cache_dir() -> str:
     """Get the deal cache directory path"""
     cache_dir = os.path.join(os.path.dirname(__file__), 'deal_cache')
     os.makedirs(cache_dir, exist_ok=True)
     return cache_dir
 
-def sanitize_deal_name(deal_name: str) -> str:
-    """Sanitize deal name for safe file naming"""
-    safe_name = re.sub(r'[^\w\s-]', '', deal_name).strip()
-    safe_name = re.sub(r'[-\s]+', '-', safe_name)
-    return safe_name
-
 def save_deal_data(deal_name: str, extracted_data: dict) -> bool:
     """Save extracted deal data to cache"""
     try:
-        cache_dir = get_cache_dir()
-        safe_name = sanitize_deal_name(deal_name)
-        
-        # Add metadata
-        data_to_save = {
-            'deal_name': deal_name,
-            'extracted_date': datetime.now().isoformat(),
-            'version': '1.0',
-            'data': extracted_data
-        }
-        
-        # Save to JSON
-        cache_file = os.path.join(cache_dir, f"{safe_name}.json")
-        with open(cache_file, 'w') as f:
-            json.dump(data_to_save, f, indent=2)
-        
+        get_deal_cache_store().save(deal_name, extracted_data)
         return True
     except Exception as e:
         st.error(f"Failed to save deal cache: {str(e)}")
@@ -60,114 +43,55 @@ def save_deal_data(deal_name: str, extracted_data: dict) -> bool:
 def load_deal_data(deal_name: str) -> Optional[Tuple[dict, str]]:
     """Load cached deal data if available. Returns (data, extracted_date) or None"""
     try:
-        cache_dir = get_cache_dir()
-        safe_name = sanitize_deal_name(deal_name)
-        cache_file = os.path.join(cache_dir, f"{safe_name}.json")
-        
-        if os.path.exists(cache_file):
-            with open(cache_file, 'r') as f:
-                cached_data = json.load(f)
-                return cached_data['data'], cached_data['extracted_date']
+        return get_deal_cache_store().load(deal_name)
     except Exception as e:
         st.warning(f"Failed to load cached data: {str(e)}")
     
     return None
 
 def get_cached_deals() -> List[str]:
-    """Get list of all cached deal names"""
+    """Get list of all cached deal names (sanitized, as in the cache file names)"""
     try:
-        cache_dir = get_cache_dir()
-        cached_files = [f for f in os.listdir(cache_dir) if f.endswith('.json')]
-        return [f.replace('.json', '') for f in cached_files]
-    except:
+        return [info['sanitized_name'] for info in get_deal_cache_store().list_info()]
+    except Exception:
         return []
 
-def get_cached_deals_info() -> List[dict]:
-    """Get detailed information about cached deals"""
-    cached_deals = []
+def get_cached_deals_info(limit: Optional[int] = None) -> List[dict]:
+    """Get detailed information about cached deals, most recent first (optionally only the first `limit`)"""
     try:
-        cache_dir = get_cache_dir()
-        for filename in os.listdir(cache_dir):
-            if filename.endswith('.json'):
-                cache_file = os.path.join(cache_dir, filename)
-                try:
-                    with open(cache_file, 'r') as f:
-                        cached_data = json.load(f)
-                    
-                    # Get file size
-                    file_size = os.path.getsize(cache_file)
-                    file_size_mb = file_size / (1024 * 1024)
-                    
-                    cached_deals.append({
-                        'name': cached_data.get('deal_name', filename.replace('.json', '')),
-                        'filename': filename,
-                        'extracted_date': cached_data.get('extracted_date', 'Unknown'),
-                        'file_size_mb': file_size_mb,
-                        'data_fields': len(cached_data.get('data', {}))
-                    })
-                except Exception:
-                    # If file is corrupted, still show basic info
-                    cached_deals.append({
-                        'name': filename.replace('.json', ''),
-                        'filename': filename,
-                        'extracted_date': 'Corrupted',
-                        'file_size_mb': 0,
-                        'data_fields': 0
-                    })
+        return get_deal_cache_store().list_info(limit)
     except Exception:
-        pass
-    
-    return sorted(cached_deals, key=lambda x: x['extracted_date'], reverse=True)
+        return []
+
+def get_cached_deal_count() -> int:
+    """Number of cached deals"""
+    try:
+        return get_deal_cache_store().totals()['deal_count']
+    except Exception:
+        return 0
 
 def clear_cached_deal(deal_name: str) -> bool:
     """Clear cached data for a specific deal"""
     try:
-        cache_dir = get_cache_dir()
-        safe_name = sanitize_deal_name(deal_name)
-        cache_file = os.path.join(cache_dir, f"{safe_name}.json")
-        
-        if os.path.exists(cache_file):
-            os.remove(cache_file)
-            return True
+        return get_deal_cache_store().delete(deal_name)
     except Exception as e:
         st.error(f"Failed to clear cache for {deal_name}: {str(e)}")
     
     return False
 
 def clear_all_cache() -> int:
-    """Clear all cached deals. Returns number of files cleared."""
-    cleared_count = 0
+    """Clear all cached deals. Returns number of deals cleared."""
     try:
-        cache_dir = get_cache_dir()
-        for filename in os.listdir(cache_dir):
-            if filename.endswith('.json'):
-                cache_file = os.path.join(cache_dir, filename)
-                try:
-                    os.remove(cache_file)
-                    cleared_count += 1
-                except Exception:
-                    pass
+        return get_deal_cache_store().clear()
     except Exception:
-        pass
-    
-    return cleared_count
+        return 0
 
 def get_cache_size() -> float:
     """Get total cache size in MB"""
-    total_size = 0
     try:
-        cache_dir = get_cache_dir()
-        for filename in os.listdir(cache_dir):
-            if filename.endswith('.json'):
-                cache_file = os.path.join(cache_dir, filename)
-                try:
-                    total_size += os.path.getsize(cache_file)
-                except Exception:
-                    pass
+        return get_deal_cache_store().totals()['size_mb']
     except Exception:
-        pass
-    
-    return total_size / (1024 * 1024)  # Convert to MB
+        return 0.0
 
 # Configure Streamlit page
 st.set_page_config(
@@ -549,50 +473,43 @@ class ExcelFileManager:
 class DealFinder:
     """Finds and analyzes deal folders"""
     
-    def __init__(self, base_path: str):
+    def __init__(self, base_path: str, catalog_path: Optional[str] = None,
+                 rescan_interval: Optional[float] = 60.0):
         self.base_path = Path(base_path)
+        # SQLite catalog of deal folders, refreshed incrementally from directory mtimes;
+        # shared per process so repeated DealFinders never start a second rescan thread
+        self.catalog = shared_catalog(
+            self.base_path,
+            catalog_path or os.path.join(get_cache_dir(), 'deal_catalog.sqlite'),
+            classify=self._classify_files,
+            rescan_interval=rescan_interval
+        )
+    
+    def close(self):
+        """Stop the catalog's background rescan thread"""
+        self.catalog.stop_background_rescan()
     
     def find_deals(self) -> List[Dict]:
-        """Find all deal folders in the base directory"""
-        deals = []
-        
+        """Find all deal folders in the base directory (served from the catalog)"""
         try:
-            for folder in self.base_path.iterdir():
-                if folder.is_dir() and not folder.name.startswith('.'):
-                    # Look for key files, but exclude Archive folders
-                    files = []
-                    for file_path in folder.glob('**/*'):
-                        # Skip files in Archive or !Archive folders
-                        if any(part.lower() == 'archive' or part.lower() == '!archive' for part in file_path.parts):
-                            continue
-                        files.append(file_path)
-                    
-                    pdf_files = [f for f in files if f.suffix.lower() == '.pdf']
-                    excel_files = [f for f in files if f.suffix.lower() in ['.xlsx', '.xls', '.csv']]
-                    
-                    
-                    # Try to identify OM or Executive Summary
-                    om_file = self._find_om_or_summary(pdf_files)
-                    
-                    # Find financial Excel files (rent rolls, T12 statements)
-                    financial_files = self._find_financial_files(excel_files)
-                    
-                    deals.append({
-                        'name': folder.name,
-                        'path': folder,
-                        'om_file': om_file,
-                        'financial_files': financial_files,
-                        'pdf_count': len(pdf_files),
-                        'excel_count': len(excel_files),
-                        'total_files': len(files)
-                    })
-            
-            return sorted(deals, key=lambda x: x['name'])
+            # Only the very first call walks the tree; after that the background rescan keeps it current
+            if not self.catalog.has_scanned():
+                self.catalog.refresh()
+            return self.catalog.deals()
         except Exception as e:
             st.error(f"Error scanning deals: {str(e)}")
             return []
     
-    def _find_om_or_summary(self, pdf_files: List[Path]) -> Optional[Path]:
+    def rescan(self) -> Dict:
+        """Pick up new or changed deal folders now instead of waiting for the background rescan"""
+        return self.catalog.refresh()
+    
+    def _classify_files(self, pdf_files: List[Path], excel_files: List[Path],
+                        sizes: Dict[Path, int]) -> Tuple[Optional[Path], List[Path]]:
+        """OM / Executive Summary and financial (rent roll, T12) files for the catalog"""
+        return self._find_om_or_summary(pdf_files, sizes), self._find_financial_files(excel_files)
+    
+    def _find_om_or_summary(self, pdf_files: List[Path], sizes: Optional[Dict[Path, int]] = None) -> Optional[Path]:
         """Find the OM or Executive Summary file"""
         # Priority patterns to search for
         patterns = [
@@ -611,7 +528,7 @@ class DealFinder:
         
         # If no pattern match, return the largest PDF (likely the main document)
         if pdf_files:
-            return max(pdf_files, key=lambda f: f.stat().st_size)
+            return max(pdf_files, key=lambda f: sizes[f] if sizes else f.stat().st_size)
         
         return None
     
@@ -645,12 +562,95 @@ class DealFinder:
                     break
         return financial_files
 
+def streamlit_stage(progress, status):
+    """extract_deal stage callback that drives a Streamlit progress bar and status line"""
+    @contextmanager
+    def stage(name: str, percent: Optional[int] = None):
+        status.text(f"{name}...")
+        if percent is not None:
+            progress.progress(percent)
+        yield
+    return stage
+
+@st.cache_resource
+def get_deal_finder(base_path: str) -> DealFinder:
+    """Shared DealFinder per base path, kept across Streamlit reruns and sessions"""
+    return DealFinder(base_path)
+
 class DataExtractor:
     """Extracts data from deal documents using AI"""
-    
+
+    RENT_FIELDS = [
+        'Avg In Place Rents', '# Studio Units', '# 1 Bed Units', '# 2 Bed Units',
+        '# 3 Bed Units', '# 4 Bed Units', 'Studio Rents', '1 Bed Current Rents',
+        '2 Bed Current Rents', '3 Bed Current Rents', '4 Bed Current Rents'
+    ]
+
     def __init__(self, openai_api_key: str):
         self.openai_client = openai.OpenAI(api_key=openai_api_key)
-    
+
+    @staticmethod
+    def _clean_value(value) -> str:
+        """Strip primes and other non-ASCII characters (keeping $ and ,) from an extracted value"""
+        clean_value = str(value).replace("′", "'").replace("″", '"').strip()
+        return ''.join(char for char in clean_value if ord(char) < 128 or char in '$,')
+
+    def extract_deal(self, deal: Dict, stage=None, extracted_data: Optional[Dict] = None) -> Dict[str, str]:
+        """
+        Full extraction for one deal, shared by the Streamlit extraction stage and the job queue:
+        OM property details, newest T12, OM rents, rent roll fallback, county lookup.
+        stage(name, percent) is an optional context manager factory used to report progress
+        (JobProgress.stage on the job queue, streamlit_stage in the Streamlit app).
+        extracted_data, when given, is filled in place so a caller keeps partial results if a step raises.
+        """
+        stage = stage or (lambda name, percent=None: nullcontext())
+        om_file = deal.get('om_file')
+        financial_files = deal.get('financial_files') or []
+        extracted_data = {} if extracted_data is None else extracted_data
+
+        # Step 1: General property data from the OM
+        if om_file:
+            with stage(f"📖 Reading {Path(om_file).name} for property details", 15):
+                pdf_data = self.extract_from_pdf(Path(om_file))
+                for key, value in pdf_data.items():
+                    if value and str(value).strip():
+                        extracted_data[key] = self._clean_value(value)
+
+        # Step 2: T12 income data from the newest financial statement
+        if financial_files:
+            with stage("💰 Looking for T12 financial statements", 25):
+                t12_files = self.find_t12_files(financial_files)
+                newest_t12 = self.get_newest_t12_file(t12_files) if t12_files else None
+                if newest_t12:
+                    for key, value in self.extract_t12_data(newest_t12).items():
+                        if value and str(value).strip():
+                            extracted_data[key] = self._clean_value(value)
+
+        # Step 3: Rent data from the OM (preferred)
+        if om_file:
+            with stage("📊 Extracting rent data from OM", 40):
+                for key, value in self.extract_rent_data_from_pdf(Path(om_file)).items():
+                    if key in self.RENT_FIELDS and value and str(value).strip():
+                        extracted_data[key] = self._clean_value(value)
+
+        # Step 4: Fill missing rent data from the newest rent roll
+        missing_rent_fields = [field for field in self.RENT_FIELDS if not extracted_data.get(field)]
+        if missing_rent_fields and financial_files:
+            with stage("📋 Looking for missing rent data in rent rolls", 60):
+                newest_rent_roll = self.get_newest_rent_roll(financial_files)
+                if newest_rent_roll:
+                    for key, value in self.extract_from_excel(newest_rent_roll).items():
+                        if key in missing_rent_fields and value and str(value).strip():
+                            extracted_data[key] = str(value)
+
+        if not extracted_data.get('County Name') and extracted_data.get('City') and extracted_data.get('State'):
+            with stage("🌐 Looking up county information", 75):
+                county = self.lookup_county(extracted_data['City'], extracted_data['State'])
+                if county:
+                    extracted_data['County Name'] = county
+
+        return extracted_data
+
     def lookup_county(self, city: str, state: str) -> str:
         """Look up county name for a given city and state"""
         try:
@@ -2389,8 +2389,8 @@ def show_deal_selection(base_path: str):
     st.markdown('<div class="section-header">🎯 Select a Deal to Underwrite</div>', unsafe_allow_html=True)
     st.markdown("Choose from available deals in your portfolio:")
     
-    # Find deals
-    finder = DealFinder(base_path)
+    # Find deals (one finder per base path, so reruns share its catalog and rescan thread)
+    finder = get_deal_finder(base_path)
     deals = finder.find_deals()
     
     if not deals:
@@ -2501,120 +2501,8 @@ def show_extraction_stage(openai_key: str):
                 extracted_data = {}
                 st.write("**DEBUG: DataExtractor initialized successfully**")
                 
-                # Step 1: Extract general property data from PDF (OM) first
-                if deal['om_file']:
-                    status.text(f"📖 Reading {deal['om_file'].name} for property details...")
-                    progress.progress(15)
-                    pdf_data = extractor.extract_from_pdf(deal['om_file'])
-                    # Clean PDF data before adding to extracted_data
-                    cleaned_pdf_data = {}
-                    for key, value in pdf_data.items():
-                        if value and str(value).strip():
-                            # Clean the value by removing any weird characters
-                            clean_value = str(value).replace("′", "'").replace("′", "'").replace("″", '"').strip()
-                            # Ensure it's a clean string
-                            clean_value = ''.join(char for char in clean_value if ord(char) < 128 or char in '$,')
-                            cleaned_pdf_data[key] = clean_value
-                    extracted_data.update(cleaned_pdf_data)
-            
-                # Step 2: Extract T12 income data from financial statements FIRST
-                if deal.get('financial_files'):
-                    st.write(f"**DEBUG T12: Starting T12 extraction with {len(deal['financial_files'])} financial files**")
-                    status.text(f"💰 Looking for T12 financial statements...")
-                    progress.progress(25)
-                
-                    st.write(f"**DEBUG T12: Financial files list:**")
-                    for i, f in enumerate(deal['financial_files']):
-                        st.write(f"  {i+1}. {f.name} (path: {f})")
-            
-                    t12_files = extractor.find_t12_files(deal['financial_files'])
-                    st.write(f"**DEBUG T12: find_t12_files returned {len(t12_files)} files:**")
-                    for i, f in enumerate(t12_files):
-                        st.write(f"  T12 {i+1}. {f.name}")
-                        
-                    if t12_files:
-                        newest_t12 = extractor.get_newest_t12_file(t12_files)
-                        if newest_t12:
-                            st.write(f"**DEBUG T12: Selected T12 file: {newest_t12.name}**")
-                            st.write(f"**DEBUG T12: About to call extract_t12_data with API key present: {bool(extractor.openai_client)}**")
-                            
-                            t12_data = extractor.extract_t12_data(newest_t12)
-                            
-                            st.write(f"**DEBUG T12: Raw extraction result: {t12_data}**")
-                            
-                            # Add T12 income data with proper cleaning
-                            added_fields = []
-                            for key, value in t12_data.items():
-                                if value and str(value).strip():
-                                    # Clean the value by removing any weird characters
-                                    clean_value = str(value).replace("′", "'").replace("′", "'").replace("″", '"').strip()
-                                    # Ensure it's a clean string
-                                    clean_value = ''.join(char for char in clean_value if ord(char) < 128 or char in '$,')
-                                    extracted_data[key] = clean_value
-                                    added_fields.append(f"{key}: {clean_value}")
-                            
-                            st.write(f"**DEBUG T12: Added {len(added_fields)} T12 fields to extracted_data:**")
-                            for field in added_fields:
-                                st.write(f"  - {field}")
-                        else:
-                            st.write(f"**DEBUG T12: get_newest_t12_file returned None**")
-                    else:
-                        st.write(f"**DEBUG T12: No T12 files found by find_t12_files**")
-                else:
-                    st.write(f"**DEBUG T12: No financial_files in deal data**")
-        
-                # Step 3: Extract rent data from OM FIRST (prioritized approach)
-                if deal['om_file']:
-                    status.text(f"📊 Extracting rent data from OM...")
-                    progress.progress(40)
-                    
-                    om_rent_data = extractor.extract_rent_data_from_pdf(deal['om_file'])
-                    
-                    # Prioritize OM rent data
-                    rent_fields = [
-                        'Avg In Place Rents', '# Studio Units', '# 1 Bed Units', '# 2 Bed Units', 
-                        '# 3 Bed Units', '# 4 Bed Units', 'Studio Rents', '1 Bed Current Rents',
-                        '2 Bed Current Rents', '3 Bed Current Rents', '4 Bed Current Rents'
-                    ]
-                    
-                    for key, value in om_rent_data.items():
-                        if key in rent_fields and value and str(value).strip():
-                            # Clean the value by removing any weird characters
-                            clean_value = str(value).replace("′", "'").replace("′", "'").replace("″", '"').strip()
-                            # Ensure it's a clean string
-                            clean_value = ''.join(char for char in clean_value if ord(char) < 128 or char in '$,')
-                            extracted_data[key] = clean_value
-                            st.write(f"Debug: Found {key} in OM: {clean_value}")
-        
-                # Step 4: Fill missing rent data from newest rent roll (fallback)
-                missing_rent_fields = [field for field in rent_fields if not extracted_data.get(field)]
-                
-                if missing_rent_fields and deal.get('financial_files'):
-                    status.text(f"📋 Looking for missing rent data in rent rolls...")
-                    progress.progress(60)
-                    
-                    newest_rent_roll = extractor.get_newest_rent_roll(deal['financial_files'])
-                    
-                    if newest_rent_roll:
-                        st.write(f"**Debug: Using rent roll fallback: {newest_rent_roll.name}**")
-                        
-                        excel_data = extractor.extract_from_excel(newest_rent_roll)
-                        
-                        # Only fill missing rent fields
-                        for key, value in excel_data.items():
-                            if key in missing_rent_fields and value and str(value).strip():
-                                extracted_data[key] = str(value)
-                                st.write(f"Debug: Supplemented {key} from rent roll: {value}")
-                        
-                        st.write(f"Debug: Filled {len([k for k in missing_rent_fields if extracted_data.get(k)])} missing rent fields")
-        
-                # Look up county if not found but city and state are available
-                if not extracted_data.get('County Name') and extracted_data.get('City') and extracted_data.get('State'):
-                    status.text("🌐 Looking up county information...")
-                    progress.progress(75)
-                    county = extractor.lookup_county(extracted_data['City'], extracted_data['State'])
-                    if county:
-                        extracted_data['County Name'] = county
+                # Same steps as the job queue: OM details, newest T12, OM rents, rent roll fallback, county
+                extractor.extract_deal(deal, stage=streamlit_stage(progress, status), extracted_data=extracted_data)
                 
                 progress.progress(85)
                 status.text("🤖 AI extraction complete!")
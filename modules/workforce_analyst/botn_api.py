@@ -7,22 +7,41 @@ Author: Claude Code Assistant
 Date: 2025-08-04
 """
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response
 from flask_cors import CORS
 import json
 import os
+import hashlib
 from botn_file_creator import BOTNFileCreator
+from job_queue import JobQueue
+from deal_cache_store import get_deal_cache_store
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for standalone HTML access
 
 # Initialize BOTN creator
 botn_creator = BOTNFileCreator()
+job_queue = JobQueue(max_workers=int(os.environ.get('BOTN_JOB_WORKERS', 3)))
+deal_cache = get_deal_cache_store()
+
+def run_botn_job(progress, deal_name, extracted_data):
+    """Job body: create the BOTN workbook, failing the job if the creator reports an error"""
+    with progress.stage("📄 Creating BOTN file", 10):
+        result = botn_creator.create_botn_file(deal_name, extracted_data)
+    if not result["success"]:
+        raise RuntimeError(result["error"])
+    return {
+        "message": result["message"],
+        "file_path": result["file_path"],
+        "filename": result["filename"],
+        "folder": result["folder"]
+    }
 
 @app.route('/api/create-botn', methods=['POST'])
 def create_botn_api():
     """
-    API endpoint to create BOTN file
+    API endpoint to queue BOTN file creation (returns 202 with a job_id;
+    poll GET /api/jobs/<job_id> or stream GET /api/jobs/<job_id>/events)
     
     Expected JSON payload:
     {
@@ -48,24 +67,19 @@ def create_botn_api():
                 "error": "deal_name is required"
             }), 400
         
-        print(f"\n🔥 API Request: Creating BOTN for {deal_name}")
+        print(f"\n🔥 API Request: Queueing BOTN for {deal_name}")
         
-        # Create the BOTN file
-        result = botn_creator.create_botn_file(deal_name, extracted_data)
-        
-        if result["success"]:
-            return jsonify({
-                "success": True,
-                "message": result["message"],
-                "file_path": result["file_path"],
-                "filename": result["filename"],
-                "folder": result["folder"]
-            })
-        else:
-            return jsonify({
-                "success": False,
-                "error": result["error"]
-            }), 500
+        # Create the BOTN file in the background; the same deal + data reuses the existing job
+        fingerprint = hashlib.sha256(json.dumps(extracted_data, sort_keys=True).encode()).hexdigest()
+        job, deduplicated = job_queue.submit('botn', deal_name, fingerprint,
+                                             run_botn_job, deal_name, extracted_data)
+        return jsonify({
+            "success": True,
+            "job_id": job["id"],
+            "status": job["status"],
+            "deduplicated": deduplicated,
+            "status_url": f"/api/jobs/{job['id']}"
+        }), 202
             
     except Exception as e:
         print(f"❌ API Error: {str(e)}")
@@ -74,23 +88,42 @@ def create_botn_api():
             "error": f"Server error: {str(e)}"
         }), 500
 
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Job status, per-stage timings and (once succeeded) the created file"""
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({
+            "success": False,
+            "error": f"Unknown job: {job_id}"
+        }), 404
+    return jsonify({
+        "success": True,
+        "job": job
+    })
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """Server-sent events: one message per job update until it finishes"""
+    if not job_queue.get(job_id):
+        return jsonify({
+            "success": False,
+            "error": f"Unknown job: {job_id}"
+        }), 404
+    
+    def stream():
+        for job in job_queue.events(job_id):
+            yield f"data: {json.dumps(job)}\n\n"
+    
+    return Response(stream(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
 @app.route('/api/deals', methods=['GET'])
 def get_deals():
-    """Get list of available deals from cache directory"""
+    """Get list of available deals from the deal cache store"""
     try:
-        cache_dir = "/Users/vitorfaroni/Library/CloudStorage/Dropbox-HERR/Vitor Faroni/Colosseum/modules/workforce_analyst/deal_cache"
-        
-        deals = []
-        if os.path.exists(cache_dir):
-            for filename in os.listdir(cache_dir):
-                if filename.endswith('.json'):
-                    # Remove .json extension and convert filename to deal name
-                    deal_name = filename[:-5].replace('-', ' - ').replace('_', ' ')
-                    deals.append(deal_name)
-        
         return jsonify({
             "success": True,
-            "deals": sorted(deals)
+            "deals": deal_cache.names()
         })
         
     except Exception as e:
@@ -103,19 +136,12 @@ def get_deals():
 def get_deal_data(deal_name):
     """Get cached data for a specific deal"""
     try:
-        cache_dir = "/Users/vitorfaroni/Library/CloudStorage/Dropbox-HERR/Vitor Faroni/Colosseum/modules/workforce_analyst/deal_cache"
-        
-        # Convert deal name to filename
-        filename = deal_name.replace(' - ', '-').replace(' ', '-') + '.json'
-        file_path = os.path.join(cache_dir, filename)
-        
-        if os.path.exists(file_path):
-            with open(file_path, 'r') as f:
-                data = json.load(f)
+        cached = deal_cache.load(deal_name)
+        if cached:
             return jsonify({
                 "success": True,
-                "data": data.get("data", {}),
-                "deal_name": data.get("deal_name", deal_name)
+                "data": cached[0],
+                "deal_name": deal_name
             })
         else:
             return jsonify({
@@ -136,7 +162,9 @@ def status():
         "success": True,
         "message": "BOTN API server is running",
         "endpoints": [
-            "POST /api/create-botn - Create BOTN file",
+            "POST /api/create-botn - Queue BOTN file creation",
+            "GET /api/jobs/<job_id> - Job status and result",
+            "GET /api/jobs/<job_id>/events - Job progress stream",
             "GET /api/deals - List available deals", 
             "GET /api/deal-data/<deal_name> - Get deal data",
             "GET /api/status - API status"
@@ -151,7 +179,9 @@ def home():
     <p>Real Estate Deal Underwriting Assistant - Backend API</p>
     <h3>Available Endpoints:</h3>
     <ul>
-        <li><code>POST /api/create-botn</code> - Create BOTN file</li>
+        <li><code>POST /api/create-botn</code> - Queue BOTN file creation</li>
+        <li><code>GET /api/jobs/&lt;job_id&gt;</code> - Job status and result</li>
+        <li><code>GET /api/jobs/&lt;job_id&gt;/events</code> - Job progress stream</li>
         <li><code>GET /api/deals</code> - List available deals</li>
         <li><code>GET /api/deal-data/&lt;deal_name&gt;</code> - Get deal data</li>
         <li><code>GET /api/status</code> - API status</li>
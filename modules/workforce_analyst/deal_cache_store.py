@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Deal Cache Store - SQLite store of extracted deal data with indexed metadata
+Replaces listing deal_cache/ and json.load-ing every file to render the index page:
+- one row per deal: name, extracted date, field count and size as plain columns,
+  the extracted data as a JSON text column that listing queries never select
+- payloads are read only by load(), one deal at a time
+- deal count and total size live in a totals row kept current by triggers,
+  so the overview and a "most recent N" listing cost the same at 10 or 10,000 deals
+- existing deal_cache/*.json files are imported on first open, and every save still
+  writes <safe name>.json for the BOTN desktop tools that read those files directly
+"""
+
+import os
+import re
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+SCHEMA_VERSION = 1
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'deal_cache')
+DB_PATH_ENV = "DEAL_CACHE_DB"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS deals (
+    safe_name TEXT PRIMARY KEY, deal_name TEXT NOT NULL, extracted_date TEXT NOT NULL,
+    version TEXT NOT NULL, field_count INTEGER NOT NULL, size_bytes INTEGER NOT NULL,
+    data TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS idx_deals_extracted_date ON deals(extracted_date);
+CREATE TABLE IF NOT EXISTS totals (id INTEGER PRIMARY KEY CHECK (id = 1),
+    deal_count INTEGER NOT NULL, size_bytes INTEGER NOT NULL);
+INSERT OR IGNORE INTO totals VALUES (1, 0, 0);
+CREATE TRIGGER IF NOT EXISTS deals_insert AFTER INSERT ON deals BEGIN
+    UPDATE totals SET deal_count = deal_count + 1, size_bytes = size_bytes + NEW.size_bytes;
+END;
+CREATE TRIGGER IF NOT EXISTS deals_delete AFTER DELETE ON deals BEGIN
+    UPDATE totals SET deal_count = deal_count - 1, size_bytes = size_bytes - OLD.size_bytes;
+END;
+CREATE TRIGGER IF NOT EXISTS deals_update AFTER UPDATE OF size_bytes ON deals BEGIN
+    UPDATE totals SET size_bytes = size_bytes - OLD.size_bytes + NEW.size_bytes;
+END;
+"""
+
+
+def sanitize_deal_name(deal_name: str) -> str:
+    """Sanitize deal name for safe file naming"""
+    safe_name = re.sub(r'[^\w\s-]', '', deal_name).strip()
+    safe_name = re.sub(r'[-\s]+', '-', safe_name)
+    return safe_name
+
+
+class DealCacheStore:
+    """Extracted deal data keyed by sanitized deal name"""
+
+    def __init__(self, db_path, json_dir: Optional[str] = None):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.json_dir = Path(json_dir) if json_dir else None
+
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            stored = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+            if stored.get('version') != str(SCHEMA_VERSION):
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (str(SCHEMA_VERSION),))
+            if self.json_dir and not stored.get('json_imported'):
+                imported = self._import_json_files(conn)
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_imported', ?)",
+                             (datetime.now().isoformat(),))
+                if imported:
+                    print(f"🗄️ Imported {imported} cached deals into {self.db_path.name}")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Short-lived connection (Streamlit, Flask workers and jobs each get their own), committed and closed"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _import_json_files(self, conn: sqlite3.Connection) -> int:
+        imported = 0
+        if not self.json_dir.exists():
+            return imported
+        for cache_file in sorted(self.json_dir.glob('*.json')):
+            try:
+                with open(cache_file, 'r') as f:
+                    cached = json.load(f)
+                data = cached['data']
+            except Exception as e:
+                print(f"⚠️ Skipping unreadable deal cache file {cache_file.name}: {e}")
+                continue
+            self._upsert(conn, cache_file.stem, cached.get('deal_name', cache_file.stem),
+                         cached.get('extracted_date', datetime.fromtimestamp(cache_file.stat().st_mtime).isoformat()),
+                         cached.get('version', '1.0'), data, cache_file.stat().st_size)
+            imported += 1
+        return imported
+
+    @staticmethod
+    def _upsert(conn: sqlite3.Connection, safe_name: str, deal_name: str, extracted_date: str,
+                version: str, data: Dict, size_bytes: int):
+        conn.execute(
+            "INSERT INTO deals VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(safe_name) DO UPDATE SET "
+            "deal_name = excluded.deal_name, extracted_date = excluded.extracted_date, version = excluded.version, "
+            "field_count = excluded.field_count, size_bytes = excluded.size_bytes, data = excluded.data",
+            (safe_name, deal_name, extracted_date, version, len(data), size_bytes, json.dumps(data)))
+
+    # ------------------------------------------------------------------ writes
+
+    def save(self, deal_name: str, extracted_data: Dict) -> str:
+        """Store a deal's extracted data (replacing any earlier extraction); returns the extracted date"""
+        safe_name = sanitize_deal_name(deal_name)
+        document = {
+            'deal_name': deal_name,
+            'extracted_date': datetime.now().isoformat(),
+            'version': '1.0',
+            'data': extracted_data
+        }
+        text = json.dumps(document, indent=2)
+        with self._connect() as conn:
+            self._upsert(conn, safe_name, deal_name, document['extracted_date'], document['version'],
+                         extracted_data, len(text.encode('utf-8')))
+
+        if self.json_dir:
+            self.json_dir.mkdir(parents=True, exist_ok=True)
+            cache_file = self.json_dir / f"{safe_name}.json"
+            tmp_file = cache_file.with_suffix('.tmp')
+            tmp_file.write_text(text)
+            os.replace(tmp_file, cache_file)
+        return document['extracted_date']
+
+    def delete(self, deal_name: str) -> bool:
+        safe_name = sanitize_deal_name(deal_name)
+        with self._connect() as conn:
+            deleted = conn.execute("DELETE FROM deals WHERE safe_name = ?", (safe_name,)).rowcount
+        if self.json_dir and (self.json_dir / f"{safe_name}.json").exists():
+            (self.json_dir / f"{safe_name}.json").unlink()
+        return bool(deleted)
+
+    def clear(self) -> int:
+        """Remove every cached deal; returns how many were removed"""
+        with self._connect() as conn:
+            names = [name for (name,) in conn.execute("SELECT safe_name FROM deals")]
+            conn.execute("DELETE FROM deals")
+        if self.json_dir:
+            for safe_name in names:
+                cache_file = self.json_dir / f"{safe_name}.json"
+                if cache_file.exists():
+                    cache_file.unlink()
+        return len(names)
+
+    # ------------------------------------------------------------------ reads
+
+    def load(self, deal_name: str) -> Optional[Tuple[Dict, str]]:
+        """(data, extracted_date) for one deal, or None; the only query that reads a payload"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT data, extracted_date FROM deals WHERE safe_name = ?",
+                               (sanitize_deal_name(deal_name),)).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def list_info(self, limit: Optional[int] = None) -> List[Dict]:
+        """Metadata of cached deals, most recently extracted first (payloads are not read)"""
+        query = ("SELECT safe_name, deal_name, extracted_date, field_count, size_bytes "
+                 "FROM deals ORDER BY extracted_date DESC")
+        params = ()
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (limit,)
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [{
+            'name': deal_name,
+            'deal_name': deal_name,
+            'sanitized_name': safe_name,
+            'filename': f"{safe_name}.json",
+            'extracted_date': extracted_date,
+            'file_size_mb': size_bytes / (1024 * 1024),
+            'data_fields': field_count,
+            'field_count': field_count
+        } for safe_name, deal_name, extracted_date, field_count, size_bytes in rows]
+
+    def names(self) -> List[str]:
+        with self._connect() as conn:
+            return [name for (name,) in conn.execute("SELECT deal_name FROM deals ORDER BY deal_name")]
+
+    def totals(self) -> Dict:
+        """Deal count and total size in MB from the trigger-maintained totals row"""
+        with self._connect() as conn:
+            deal_count, size_bytes = conn.execute("SELECT deal_count, size_bytes FROM totals").fetchone()
+        return {'deal_count': deal_count, 'size_mb': size_bytes / (1024 * 1024)}
+
+
+def default_db_path() -> Path:
+    """$DEAL_CACHE_DB, else <user cache dir>/workforce_analyst/deal_cache.sqlite (outside the source tree)"""
+    configured = os.getenv(DB_PATH_ENV)
+    if configured:
+        return Path(configured).expanduser()
+    cache_home = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "workforce_analyst" / "deal_cache.sqlite"
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_deal_cache_store() -> DealCacheStore:
+    """Shared store at default_db_path(), mirroring JSON files into deal_cache/"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = DealCacheStore(default_db_path(), json_dir=DEFAULT_CACHE_DIR)
+        return _default_store
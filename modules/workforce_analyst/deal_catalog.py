@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Deal Folder Catalog - SQLite index of deal folders and their classified files
+Replaces a recursive glob of every deal folder on every page load:
+- each directory's mtime is stored; a refresh stats directories and only re-lists the
+  ones whose mtime changed (a file added, removed or renamed directly inside them)
+- deal summaries (OM, financial files, counts) are recomputed only for deals that changed
+- find_deals-style reads are a single SELECT
+- an optional daemon thread re-runs the incremental refresh so new deals appear on their own
+- shared_catalog() keeps one catalog (and one rescan thread) per database file per process,
+  however many times a Streamlit script re-executes
+Archive / !Archive folders are skipped entirely, as before.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+SCHEMA_VERSION = 1
+_shared_catalogs: Dict[str, 'DealCatalog'] = {}
+_shared_catalogs_lock = threading.Lock()
+EXCLUDED_DIRS = {'archive', '!archive'}
+PDF_SUFFIXES = {'.pdf'}
+EXCEL_SUFFIXES = {'.xlsx', '.xls', '.csv'}
+
+# (pdf_files, excel_files, sizes) -> (om_file, financial_files)
+Classifier = Callable[[List[Path], List[Path], Dict[Path, int]], Tuple[Optional[Path], List[Path]]]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS directories (
+    path TEXT PRIMARY KEY, deal TEXT NOT NULL, parent TEXT, mtime_ns INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS idx_directories_deal ON directories(deal);
+CREATE INDEX IF NOT EXISTS idx_directories_parent ON directories(parent);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY, deal TEXT NOT NULL, directory TEXT NOT NULL,
+    name TEXT NOT NULL, suffix TEXT NOT NULL, size INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS idx_files_deal ON files(deal);
+CREATE INDEX IF NOT EXISTS idx_files_directory ON files(directory);
+CREATE TABLE IF NOT EXISTS deals (
+    name TEXT PRIMARY KEY, path TEXT NOT NULL, om_file TEXT, financial_files TEXT NOT NULL,
+    pdf_count INTEGER NOT NULL, excel_count INTEGER NOT NULL, total_files INTEGER NOT NULL,
+    scanned_at TEXT NOT NULL);
+"""
+
+
+class DealCatalog:
+    """Persistent, incrementally refreshed catalog of deal folders under base_path"""
+
+    def __init__(self, base_path, db_path, classify: Classifier):
+        self.base_path = Path(base_path)
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.classify = classify
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._rescan_thread = None
+        self.last_refresh = None
+        self.last_stats = {}
+
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            stored = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+            if stored.get('base_path') != str(self.base_path) or stored.get('version') != str(SCHEMA_VERSION):
+                # Different root or layout: start over rather than trusting old rows
+                conn.executescript("DELETE FROM directories; DELETE FROM files; DELETE FROM deals;")
+                conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                                 [('base_path', str(self.base_path)), ('version', str(SCHEMA_VERSION))])
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Short-lived connection (Flask workers and the rescan thread each get their own), committed and closed"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------ reads
+
+    def has_scanned(self) -> bool:
+        with self._connect() as conn:
+            return conn.execute("SELECT value FROM meta WHERE key = 'last_refresh'").fetchone() is not None
+
+    def deals(self) -> List[Dict]:
+        """Deal summaries in DealFinder.find_deals' shape, sorted by name"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT name, path, om_file, financial_files, pdf_count, excel_count, total_files "
+                "FROM deals ORDER BY name").fetchall()
+        return [{
+            'name': name,
+            'path': Path(path),
+            'om_file': Path(om_file) if om_file else None,
+            'financial_files': [Path(p) for p in json.loads(financial_files)],
+            'pdf_count': pdf_count,
+            'excel_count': excel_count,
+            'total_files': total_files
+        } for name, path, om_file, financial_files, pdf_count, excel_count, total_files in rows]
+
+    # ------------------------------------------------------------------ refresh
+
+    def refresh(self) -> Dict:
+        """Incremental rescan; returns counts of directories statted/listed and deals changed"""
+        with self._refresh_lock:
+            started = time.time()
+            stats = {'directories_checked': 0, 'directories_listed': 0, 'deals_updated': 0, 'deals_removed': 0}
+            current = {}
+            with os.scandir(self.base_path) as entries:
+                for entry in entries:
+                    if entry.is_dir() and not entry.name.startswith('.'):
+                        current[entry.name] = entry.path
+
+            with self._connect() as conn:
+                known = {name for (name,) in conn.execute("SELECT name FROM deals")}
+                for name in known - set(current):
+                    self._forget_deal(conn, name)
+                    stats['deals_removed'] += 1
+
+                for name, path in current.items():
+                    changed = self._refresh_deal(conn, name, path, stats)
+                    if changed or name not in known:
+                        self._summarize_deal(conn, name, path)
+                        stats['deals_updated'] += 1
+
+                self.last_refresh = datetime.now()
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_refresh', ?)",
+                             (self.last_refresh.isoformat(),))
+
+            stats['seconds'] = round(time.time() - started, 3)
+            self.last_stats = stats
+            return stats
+
+    @staticmethod
+    def _forget_deal(conn: sqlite3.Connection, name: str):
+        conn.execute("DELETE FROM deals WHERE name = ?", (name,))
+        conn.execute("DELETE FROM directories WHERE deal = ?", (name,))
+        conn.execute("DELETE FROM files WHERE deal = ?", (name,))
+
+    @staticmethod
+    def _forget_subtree(conn: sqlite3.Connection, directory: str):
+        prefix = directory + os.sep
+        conn.execute("DELETE FROM directories WHERE path = ? OR substr(path, 1, ?) = ?",
+                     (directory, len(prefix), prefix))
+        conn.execute("DELETE FROM files WHERE directory = ? OR substr(directory, 1, ?) = ?",
+                     (directory, len(prefix), prefix))
+
+    def _refresh_deal(self, conn: sqlite3.Connection, deal: str, root: str, stats: Dict) -> bool:
+        """Walk the deal's directory tree, re-listing only directories whose mtime moved"""
+        known_mtime = dict(conn.execute("SELECT path, mtime_ns FROM directories WHERE deal = ?", (deal,)))
+        known_children = {}
+        for path, parent in conn.execute("SELECT path, parent FROM directories WHERE deal = ?", (deal,)):
+            known_children.setdefault(parent, []).append(path)
+
+        changed = False
+        stack = [(root, None)]
+        while stack:
+            directory, parent = stack.pop()
+            stats['directories_checked'] += 1
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns  # taken before listing: later changes show next time
+            except FileNotFoundError:
+                continue
+            if known_mtime.get(directory) == mtime_ns:
+                stack.extend((child, directory) for child in known_children.get(directory, []))
+                continue
+
+            stats['directories_listed'] += 1
+            changed = True
+            files, subdirs = [], []
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name.lower() not in EXCLUDED_DIRS:
+                            subdirs.append(entry.path)
+                    else:
+                        try:
+                            size = entry.stat().st_size
+                        except OSError:
+                            continue
+                        files.append((entry.path, deal, directory, entry.name,
+                                      os.path.splitext(entry.name)[1].lower(), size))
+
+            for gone in set(known_children.get(directory, [])) - set(subdirs):
+                self._forget_subtree(conn, gone)
+            conn.execute("DELETE FROM files WHERE directory = ?", (directory,))
+            conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)", files)
+            conn.execute("INSERT OR REPLACE INTO directories VALUES (?, ?, ?, ?)", (directory, deal, parent, mtime_ns))
+            stack.extend((child, directory) for child in subdirs)
+        return changed
+
+    def _summarize_deal(self, conn: sqlite3.Connection, deal: str, root: str):
+        rows = conn.execute("SELECT path, suffix, size FROM files WHERE deal = ? ORDER BY path", (deal,)).fetchall()
+        subdir_count = conn.execute("SELECT COUNT(*) FROM directories WHERE deal = ? AND parent IS NOT NULL",
+                                    (deal,)).fetchone()[0]
+        sizes = {Path(path): size for path, _, size in rows}
+        pdf_files = [Path(path) for path, suffix, _ in rows if suffix in PDF_SUFFIXES]
+        excel_files = [Path(path) for path, suffix, _ in rows if suffix in EXCEL_SUFFIXES]
+        om_file, financial_files = self.classify(pdf_files, excel_files, sizes)
+        conn.execute("INSERT OR REPLACE INTO deals VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (
+            deal, root, str(om_file) if om_file else None, json.dumps([str(f) for f in financial_files]),
+            len(pdf_files), len(excel_files),
+            len(rows) + subdir_count,  # the old glob('**/*') counted subfolders as files too
+            datetime.now().isoformat()))
+
+    # ------------------------------------------------------------------ background rescan
+
+    def start_background_rescan(self, interval_seconds: float = 60.0):
+        """Daemon thread that runs refresh() now and every interval_seconds until stop_background_rescan()"""
+        if self._rescan_thread and self._rescan_thread.is_alive():
+            return
+
+        def loop():
+            # First pass right away: a catalog persisted by an earlier run may be behind the folders
+            while True:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"⚠️ Deal catalog rescan failed: {e}")
+                if self._stop.wait(interval_seconds):
+                    break
+
+        self._stop.clear()
+        self._rescan_thread = threading.Thread(target=loop, name='deal-catalog-rescan', daemon=True)
+        self._rescan_thread.start()
+
+    def stop_background_rescan(self):
+        self._stop.set()
+        if self._rescan_thread:
+            self._rescan_thread.join()
+            self._rescan_thread = None
+
+
+def shared_catalog(base_path, db_path, classify: Classifier,
+                   rescan_interval: Optional[float] = None) -> DealCatalog:
+    """Process-wide catalog for db_path, with its background rescan started at most once
+
+    Kept here rather than in the Streamlit entry script, whose module globals are rebuilt on every rerun.
+    """
+    key = str(Path(db_path).resolve())
+    with _shared_catalogs_lock:
+        catalog = _shared_catalogs.get(key)
+        if catalog is None or catalog.base_path != Path(base_path):
+            if catalog is not None:
+                catalog.stop_background_rescan()
+            catalog = DealCatalog(base_path, db_path, classify)
+            _shared_catalogs[key] = catalog
+        if rescan_interval:
+            catalog.start_background_rescan(rescan_interval)
+        return catalog
@@ -4,7 +4,7 @@
 Converts the Streamlit BOTN analysis tool to a stable web interface
 """
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session, Response
 import os
 import json
 from datetime import datetime
@@ -19,8 +19,10 @@ from AcquisitionAnalyst import (
     load_deal_data, 
     save_deal_data, 
     get_cached_deals_info,
+    get_cached_deal_count,
     sanitize_deal_name
 )
+from job_queue import JobQueue, files_fingerprint
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -35,25 +37,27 @@ app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file upload
 excel_manager = ExcelFileManager()
 base_path = "/Users/vitorfaroni/Library/CloudStorage/Dropbox-HERR/Vitor Faroni/Deals"
 deal_finder = DealFinder(base_path)
+job_queue = JobQueue(max_workers=int(os.environ.get('DEAL_JOB_WORKERS', 3)))
 
 @app.route('/')
 def index():
     """Main dashboard"""
     try:
-        # Get cached deals for quick access
-        cached_deals = get_cached_deals_info()
+        # Six most recent cached deals plus the count: metadata only, whatever the cache size
+        cached_deals = get_cached_deals_info(limit=6)
         
         return render_template('index.html', 
                              cached_deals=cached_deals,
+                             cached_count=get_cached_deal_count(),
                              stage='selection')
     except Exception as e:
         logger.error(f"Error loading main page: {e}")
         flash(f"Error loading dashboard: {str(e)}", 'error')
-        return render_template('index.html', cached_deals=[], stage='selection')
+        return render_template('index.html', cached_deals=[], cached_count=0, stage='selection')
 
 @app.route('/deals')
 def list_deals():
-    """List all available deals"""
+    """List all available deals (from the deal catalog, kept current by a background rescan)"""
     try:
         deals = deal_finder.find_deals()
         return render_template('deals.html', deals=deals)
@@ -62,6 +66,16 @@ def list_deals():
         flash(f"Error loading deals: {str(e)}", 'error')
         return render_template('deals.html', deals=[])
 
+@app.route('/api/rescan_deals', methods=['POST'])
+def api_rescan_deals():
+    """Refresh the deal catalog now (new folders otherwise appear on the next background rescan)"""
+    try:
+        stats = deal_finder.rescan()
+        return jsonify({'success': True, 'stats': stats})
+    except Exception as e:
+        logger.error(f"Error rescanning deals: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/select_deal/<path:deal_path>')
 def select_deal(deal_path):
     """Select a deal for analysis"""
@@ -99,9 +113,30 @@ def extract_data():
     
     return render_template('extract.html', deal=selected_deal)
 
+def _find_catalog_deal(deal_path: str):
+    """The catalog entry (OM and financial files) for a selected deal folder"""
+    for deal in deal_finder.find_deals():
+        if str(deal['path']) == deal_path:
+            return deal
+    return None
+
+def _run_extraction(progress, openai_key, deal):
+    """Job body: staged extraction, then the deal cache write"""
+    data_extractor = DataExtractor(openai_key)
+    extracted_data = data_extractor.extract_deal(deal, stage=progress.stage)
+    if not extracted_data:
+        raise ValueError('No data extracted')
+    with progress.stage("💾 Caching extracted data", 90):
+        save_deal_data(deal['name'], extracted_data)
+    return {
+        'data': extracted_data,
+        'extraction_date': datetime.now().isoformat(),
+        'message': f'Successfully extracted {len(extracted_data)} fields'
+    }
+
 @app.route('/api/extract', methods=['POST'])
 def api_extract_data():
-    """API endpoint for data extraction"""
+    """Queue data extraction for the selected deal; poll /api/jobs/<job_id> for progress"""
     try:
         selected_deal = session.get('selected_deal')
         if not selected_deal:
@@ -111,30 +146,24 @@ def api_extract_data():
         if not openai_key:
             return jsonify({'error': 'OpenAI API key required'}), 400
         
-        # Initialize data extractor
-        data_extractor = DataExtractor(openai_key)
+        deal = _find_catalog_deal(selected_deal['path'])
+        if not deal:
+            return jsonify({'error': 'Deal folder not found in the deal catalog'}), 404
+        if not deal['om_file'] and not deal['financial_files']:
+            return jsonify({'error': 'No OM or financial files found for this deal'}), 400
         
-        # Extract data from deal folder
-        extracted_data = data_extractor.extract_from_folder(selected_deal['path'])
-        
-        if extracted_data:
-            # Save to cache
-            save_deal_data(selected_deal['name'], extracted_data)
-            
-            # Store in session
-            session['extracted_data'] = extracted_data
-            session['extraction_date'] = datetime.now().isoformat()
-            
-            return jsonify({
-                'success': True,
-                'data': extracted_data,
-                'message': f'Successfully extracted {len(extracted_data)} fields'
-            })
-        else:
-            return jsonify({'error': 'No data extracted'}), 400
+        fingerprint = files_fingerprint([deal['om_file'], *deal['financial_files']])
+        job, deduplicated = job_queue.submit('extract', deal['name'], fingerprint,
+                                             _run_extraction, openai_key, deal)
+        return jsonify({
+            'success': True,
+            'job_id': job['id'],
+            'status': job['status'],
+            'deduplicated': deduplicated
+        }), 202
             
     except Exception as e:
-        logger.error(f"Error extracting data: {e}")
+        logger.error(f"Error queueing extraction: {e}")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/botn')
@@ -156,9 +185,24 @@ def show_botn():
                          data=extracted_data,
                          extraction_date=session.get('extraction_date'))
 
+def _run_botn_creation(progress, deal_name, deal_path, extracted_data):
+    """Job body: copy the BOTN template into the deal folder and fill it in"""
+    with progress.stage("📄 Copying BOTN template", 20):
+        botn_file_path = excel_manager.copy_template_to_deal_folder(deal_name, deal_path)
+    if not botn_file_path:
+        raise RuntimeError('Failed to copy template')
+    with progress.stage("✏️ Writing extracted data to BOTN", 50):
+        if not excel_manager.update_excel_values(botn_file_path, extracted_data):
+            raise RuntimeError('Failed to update Excel file')
+    return {
+        'file_path': botn_file_path,
+        'file_name': os.path.basename(botn_file_path),
+        'message': 'BOTN analysis created successfully!'
+    }
+
 @app.route('/api/create_botn', methods=['POST'])
 def api_create_botn():
-    """API endpoint to create BOTN Excel file"""
+    """Queue BOTN Excel file creation; poll /api/jobs/<job_id> for the file path"""
     try:
         selected_deal = session.get('selected_deal')
         extracted_data = session.get('extracted_data')
@@ -166,35 +210,55 @@ def api_create_botn():
         if not selected_deal or not extracted_data:
             return jsonify({'error': 'Missing deal or data'}), 400
         
-        # Create BOTN file
-        botn_file_path = excel_manager.copy_template_to_deal_folder(
-            selected_deal['name'],
-            selected_deal['path']
-        )
-        
-        if botn_file_path:
-            # Update Excel file with extracted data
-            success = excel_manager.update_excel_values(botn_file_path, extracted_data)
-            
-            if success:
-                # Store file path in session
-                session['botn_file_path'] = botn_file_path
-                
-                return jsonify({
-                    'success': True,
-                    'file_path': botn_file_path,
-                    'file_name': os.path.basename(botn_file_path),
-                    'message': 'BOTN analysis created successfully!'
-                })
-            else:
-                return jsonify({'error': 'Failed to update Excel file'}), 500
-        else:
-            return jsonify({'error': 'Failed to copy template'}), 500
+        # Every input of the workbook: the extracted data, the target folder and the template's contents
+        fingerprint = files_fingerprint([excel_manager.template_path],
+                                        payload={'data': extracted_data, 'deal_path': selected_deal['path']})
+        job, deduplicated = job_queue.submit('botn', selected_deal['name'], fingerprint, _run_botn_creation,
+                                             selected_deal['name'], selected_deal['path'], extracted_data)
+        return jsonify({
+            'success': True,
+            'job_id': job['id'],
+            'status': job['status'],
+            'deduplicated': deduplicated
+        }), 202
             
     except Exception as e:
-        logger.error(f"Error creating BOTN: {e}")
+        logger.error(f"Error queueing BOTN creation: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/jobs')
+def api_list_jobs():
+    """Recent extraction / BOTN jobs, optionally ?deal=<name>"""
+    return jsonify({'success': True, 'jobs': job_queue.jobs(request.args.get('deal'))})
+
+@app.route('/api/jobs/<job_id>')
+def api_job_status(job_id):
+    """Job status, stages and result; a finished job for the selected deal is stored in the session"""
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({'error': 'Unknown job'}), 404
+    
+    selected_deal = session.get('selected_deal') or {}
+    if job['status'] == 'succeeded' and job['deal'] == selected_deal.get('name'):
+        if job['kind'] == 'extract':
+            session['extracted_data'] = job['result']['data']
+            session['extraction_date'] = job['result']['extraction_date']
+        elif job['kind'] == 'botn':
+            session['botn_file_path'] = job['result']['file_path']
+    return jsonify({'success': True, 'job': job})
+
+@app.route('/api/jobs/<job_id>/events')
+def api_job_events(job_id):
+    """Server-sent events: one message per job update until it finishes"""
+    if not job_queue.get(job_id):
+        return jsonify({'error': 'Unknown job'}), 404
+    
+    def stream():
+        for job in job_queue.events(job_id):
+            yield f"data: {json.dumps(job)}\n\n"
+    
+    return Response(stream(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
 @app.route('/results')
 def show_results():
     """Results page"""
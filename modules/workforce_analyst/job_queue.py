@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Deal Job Queue - background worker pool for extractions and BOTN creation
+Extraction (PDF/Excel/LLM) and workbook generation take minutes; running them inside the
+Flask request thread blocked the worker and timed browsers out. Endpoints now submit a job
+and return its id right away:
+- jobs run on a small thread pool, so several deals extract in parallel
+- each job records named stages with start times and durations, plus a percent complete
+- clients poll get() or follow events() (server-sent events) until the job finishes
+- a job for the same kind, deal and input fingerprint as one that is queued, running or
+  succeeded is not run again; the existing job is returned (failed jobs can be retried)
+"""
+
+import os
+import sys
+import json
+import uuid
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+sys.path.append(str(Path(__file__).parent.parent / "data_intelligence"))
+from download_engine import file_sha256
+
+ACTIVE_STATES = {'queued', 'running'}
+FINISHED_STATES = {'succeeded', 'failed'}
+
+_hash_cache: Dict[Tuple[str, int, int], str] = {}
+_hash_lock = threading.Lock()
+
+
+def cached_file_sha256(path: Path) -> str:
+    """Content hash, remembered per (path, size, mtime) so unchanged files are read once"""
+    stat = os.stat(path)
+    stamp = (str(path), stat.st_size, stat.st_mtime_ns)
+    with _hash_lock:
+        if stamp in _hash_cache:
+            return _hash_cache[stamp]
+    digest = file_sha256(path)
+    with _hash_lock:
+        _hash_cache[stamp] = digest
+    return digest
+
+
+def files_fingerprint(paths: Iterable[Path], payload=None) -> str:
+    """One hash over the contents of a job's input files (order-independent) and any JSON payload"""
+    digest = hashlib.sha256()
+    for path in sorted(str(p) for p in paths if p):
+        if os.path.exists(path):
+            digest.update(f"{Path(path).name}:{cached_file_sha256(Path(path))}\n".encode())
+        else:
+            digest.update(f"{Path(path).name}:missing\n".encode())
+    if payload is not None:
+        digest.update(json.dumps(payload, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class JobProgress:
+    """Handed to the job function; `with progress.stage('Reading OM', 15):` times a stage"""
+
+    def __init__(self, queue: 'JobQueue', job_id: str):
+        self._queue = queue
+        self._job_id = job_id
+
+    @contextmanager
+    def stage(self, name: str, percent: Optional[int] = None) -> Iterator[None]:
+        started = time.time()
+        entry = {'name': name, 'started_at': datetime.now().isoformat(), 'seconds': None}
+        self._queue._update(self._job_id, stage=entry, percent=percent)
+        try:
+            yield
+        finally:
+            entry['seconds'] = round(time.time() - started, 3)
+            self._queue._update(self._job_id)
+
+
+class JobQueue:
+    """Thread pool of deal jobs with status snapshots, stage timings and dedupe"""
+
+    def __init__(self, max_workers: int = 3, max_finished: int = 200):
+        self.max_finished = max_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='deal-job')
+        self._cond = threading.Condition()
+        self._jobs: Dict[str, Dict] = {}
+        self._by_key: Dict[Tuple[str, str, str], str] = {}
+
+    def submit(self, kind: str, deal: str, fingerprint: str,
+               fn: Callable[..., Dict], *args, **kwargs) -> Tuple[Dict, bool]:
+        """Queue fn(progress, *args, **kwargs); returns (job snapshot, deduplicated)"""
+        key = (kind, deal, fingerprint)
+        with self._cond:
+            existing = self._jobs.get(self._by_key.get(key))
+            if existing and existing['status'] != 'failed':
+                return self._snapshot(existing), True
+
+            job_id = uuid.uuid4().hex[:12]
+            job = {
+                'id': job_id, 'kind': kind, 'deal': deal, 'fingerprint': fingerprint,
+                'status': 'queued', 'percent': 0, 'stages': [],
+                'result': None, 'error': None, 'version': 0,
+                'created_at': datetime.now().isoformat(), 'started_at': None,
+                'finished_at': None, 'seconds': None
+            }
+            self._jobs[job_id] = job
+            self._by_key[key] = job_id
+            self._trim()
+            snapshot = self._snapshot(job)
+
+        self._executor.submit(self._run, job_id, fn, args, kwargs)
+        return snapshot, False
+
+    def _run(self, job_id: str, fn: Callable[..., Dict], args: tuple, kwargs: dict):
+        started = time.time()
+        self._update(job_id, status='running', started_at=datetime.now().isoformat())
+        try:
+            result = fn(JobProgress(self, job_id), *args, **kwargs)
+            changes = {'status': 'succeeded', 'result': result, 'percent': 100}
+        except Exception as e:
+            print(f"❌ Job {job_id} failed: {e}")
+            changes = {'status': 'failed', 'error': str(e)}
+        self._update(job_id, finished_at=datetime.now().isoformat(),
+                     seconds=round(time.time() - started, 3), **changes)
+
+    def _update(self, job_id: str, stage: Optional[Dict] = None, percent: Optional[int] = None, **fields):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            if stage is not None:
+                job['stages'].append(stage)
+            if percent is not None:
+                job['percent'] = percent
+            job.update(fields)
+            job['version'] += 1
+            self._cond.notify_all()
+
+    def _trim(self):
+        """Forget the oldest finished jobs beyond max_finished (caller holds the lock)"""
+        finished = [j for j in self._jobs.values() if j['status'] in FINISHED_STATES]
+        for job in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job['id']]
+            key = (job['kind'], job['deal'], job['fingerprint'])
+            if self._by_key.get(key) == job['id']:
+                del self._by_key[key]
+
+    @staticmethod
+    def _snapshot(job: Dict) -> Dict:
+        snapshot = dict(job)
+        snapshot['stages'] = [dict(s) for s in job['stages']]
+        return snapshot
+
+    # ------------------------------------------------------------------ reads
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return self._snapshot(job) if job else None
+
+    def jobs(self, deal: Optional[str] = None) -> List[Dict]:
+        """Snapshots (without results) newest first, optionally for one deal"""
+        with self._cond:
+            selected = [j for j in self._jobs.values() if deal is None or j['deal'] == deal]
+            snapshots = [self._snapshot(j) for j in reversed(selected)]
+        for snapshot in snapshots:
+            snapshot.pop('result')
+        return snapshots
+
+    def wait(self, job_id: str, after_version: int = -1, timeout: float = 15.0) -> Optional[Dict]:
+        """Block until the job changes past after_version (or timeout); returns its snapshot"""
+        with self._cond:
+            self._cond.wait_for(lambda: job_id not in self._jobs or
+                                self._jobs[job_id]['version'] > after_version, timeout)
+            job = self._jobs.get(job_id)
+            return self._snapshot(job) if job else None
+
+    def events(self, job_id: str, heartbeat: float = 15.0) -> Iterator[Dict]:
+        """Snapshots as the job changes, ending with the finished one (for server-sent events)"""
+        version = -1
+        while True:
+            job = self.wait(job_id, version, heartbeat)
+            if job is None:
+                return
+            version = job['version']
+            yield job
+            if job['status'] in FINISHED_STATES:
+                return
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
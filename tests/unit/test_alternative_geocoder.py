@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Unit tests for AlternativeGeocoder batch geocoding with stubbed providers
+"""
+import unittest
+import tempfile
+import shutil
+import json
+import threading
+import time
+from unittest import mock
+
+# Add the geocoding directory to path for imports
+import sys
+import os
+geocoding_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'modules', 'data_intelligence', 'geocoding')
+sys.path.insert(0, geocoding_path)
+
+import alternative_geocoder
+from alternative_geocoder import AlternativeGeocoder, TokenBucket, normalize_address
+
+
+def fake_result(provider, lat, lon):
+    return {'latitude': lat, 'longitude': lon, 'formatted_address': '', 'provider': provider, 'confidence': 1.0}
+
+
+class TestAlternativeGeocoderBatch(unittest.TestCase):
+    """Cache, bulk submission and fallback behaviour of geocode_batch"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.geocoder = AlternativeGeocoder(cache_dir=self.cache_dir)
+        for config in self.geocoder.providers.values():
+            config['rate_limit'] = 0.001
+        self.geocoder.rate_limiters = {name: TokenBucket(1000.0) for name in self.geocoder.providers}
+
+        self.bulk_calls = []
+        self.single_calls = []
+        self.lock = threading.Lock()
+
+        def census_bulk(records):
+            self.bulk_calls.append(len(records))
+            return {r['id']: (fake_result('census', 34.0, -118.0) if 'Main' in r['address'] else None)
+                    for r in records}
+
+        def nominatim(address):
+            with self.lock:
+                self.single_calls.append(('nominatim', address))
+            if 'Nowhere' in address:
+                return None
+            if 'Flaky' in address:
+                raise ConnectionError("provider down")
+            return fake_result('nominatim', 36.0, -120.0)
+
+        def census_single(address):
+            with self.lock:
+                self.single_calls.append(('census', address))
+            return None
+
+        self.geocoder.batch_provider_functions = {'census': census_bulk}
+        self.geocoder.provider_functions = {'nominatim': nominatim, 'census': census_single}
+
+    def tearDown(self):
+        self.geocoder.cache.conn.close()
+        shutil.rmtree(self.cache_dir)
+
+    def test_normalize_address(self):
+        self.assertEqual(normalize_address("123 Main Street, Los Angeles, CA"),
+                         normalize_address("123  MAIN ST.  los angeles ca"))
+
+    def test_bulk_first_then_fallback_in_input_order(self):
+        addresses = [
+            {'address': '1 Main Street', 'city': 'Los Angeles', 'state': 'CA', 'zip_code': '90012'},
+            {'address': '2 Oak Avenue', 'city': 'Fresno', 'state': 'CA'},
+            {'address': '1 MAIN ST', 'city': 'los angeles', 'state': 'CA', 'zip_code': '90012'},
+            {'address': '9 Nowhere Road', 'city': 'Nowhere', 'state': 'CA'},
+        ]
+        results = self.geocoder.geocode_batch(addresses)
+
+        self.assertEqual(self.bulk_calls, [3])  # duplicate row collapsed before upload
+        self.assertEqual([r.get('provider') for r in results], ['census', 'nominatim', 'census', None])
+        self.assertIs(results[2]['original'], addresses[2])
+        self.assertIn('error', results[3])
+        # Census already answered in bulk, so only nominatim runs per address
+        self.assertEqual({p for p, _ in self.single_calls}, {'nominatim'})
+
+    def test_cache_and_negative_cache_skip_providers(self):
+        addresses = [{'address': '2 Oak Avenue', 'city': 'Fresno', 'state': 'CA'},
+                     {'address': '9 Nowhere Road', 'city': 'Nowhere', 'state': 'CA'}]
+        self.geocoder.geocode_batch(addresses)
+        self.bulk_calls.clear()
+        self.single_calls.clear()
+
+        results = self.geocoder.geocode_batch(addresses)
+        self.assertEqual(self.bulk_calls, [])
+        self.assertEqual(self.single_calls, [])
+        self.assertEqual(results[0]['provider'], 'nominatim')
+        self.assertIn('error', results[1])
+        self.assertEqual(self.geocoder.cache.stats(), {'found': 1, 'not_found': 1})
+
+        # Single-address path shares the same cache
+        self.assertIsNone(self.geocoder.geocode('9 Nowhere Road', 'Nowhere', 'CA'))
+        self.assertEqual(self.single_calls, [])
+
+    def test_errors_are_not_negatively_cached(self):
+        addresses = [{'address': '5 Flaky Lane', 'city': 'Sacramento', 'state': 'CA'}]
+        self.assertIn('error', self.geocoder.geocode_batch(addresses)[0])
+        self.assertEqual(self.geocoder.cache.stats(), {'found': 0, 'not_found': 0})
+
+    def test_bulk_outage_falls_back_to_single_provider(self):
+        def broken_bulk(records):
+            raise ConnectionError("batch endpoint down")
+        self.geocoder.batch_provider_functions = {'census': broken_bulk}
+
+        results = self.geocoder.geocode_batch([{'address': '1 Main Street', 'city': 'Los Angeles', 'state': 'CA'}])
+        self.assertEqual(results[0]['provider'], 'nominatim')
+        self.assertEqual([p for p, _ in self.single_calls], ['nominatim'])
+
+    def test_failed_bulk_chunk_keeps_matches_from_other_chunks(self):
+        def flaky_bulk(records):
+            self.bulk_calls.append([r['address'] for r in records])
+            if len(self.bulk_calls) == 2:
+                raise ConnectionError("upload timed out")
+            return {r['id']: fake_result('census', 34.0, -118.0) for r in records}
+        self.geocoder.batch_provider_functions = {'census': flaky_bulk}
+
+        addresses = [{'address': f'{n} Main Street', 'city': 'Los Angeles', 'state': 'CA'} for n in range(1, 6)]
+        with mock.patch.object(alternative_geocoder, 'CENSUS_BATCH_LIMIT', 2):
+            results = self.geocoder.geocode_batch(addresses)
+
+        self.assertEqual(len(self.bulk_calls), 3)
+        self.assertEqual([r.get('provider') for r in results], ['census', 'census', 'nominatim', 'nominatim', 'census'])
+        self.assertEqual(sorted(a for _, a in self.single_calls), ['3 Main Street, Los Angeles, CA',
+                                                                   '4 Main Street, Los Angeles, CA'])
+        self.assertEqual(self.geocoder.cache.stats(), {'found': 5, 'not_found': 0})
+
+    def test_parse_census_batch(self):
+        text = ('"0","1 MAIN ST, LOS ANGELES, CA, 90012","Match","Exact","1 MAIN ST, LOS ANGELES, CA, 90012",'
+                '"-118.24,34.05","123","L"\n'
+                '"1","9 NOWHERE RD, NOWHERE, CA, ","No_Match"\n')
+        parsed = AlternativeGeocoder._parse_census_batch(text)
+        self.assertAlmostEqual(parsed['0']['latitude'], 34.05)
+        self.assertAlmostEqual(parsed['0']['longitude'], -118.24)
+        self.assertIsNone(parsed['1'])
+
+    def test_legacy_json_cache_imported(self):
+        legacy_dir = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(legacy_dir, 'abc.json'), 'w') as f:
+                json.dump(dict(fake_result('google', 1.0, 2.0), cached_address='10 Pine St, Davis, CA'), f)
+            geocoder = AlternativeGeocoder(cache_dir=legacy_dir)
+            self.assertEqual(geocoder.geocode('10 Pine Street', 'Davis', 'CA')['provider'], 'google')
+            geocoder.cache.conn.close()
+        finally:
+            shutil.rmtree(legacy_dir)
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_rate_is_enforced_across_threads(self):
+        bucket = TokenBucket(rate=50.0)
+        start = time.monotonic()
+        threads = [threading.Thread(target=bucket.acquire) for _ in range(11)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # First token is free, the other ten are spaced 20 ms apart
+        self.assertGreaterEqual(time.monotonic() - start, 0.18)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Unit tests for ArcGISHarvester against a local fake feature server
+"""
+import unittest
+import tempfile
+import shutil
+import json
+import re
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Add the data_intelligence directory to path for imports
+import sys
+import os
+data_intelligence_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'modules', 'data_intelligence')
+sys.path.insert(0, data_intelligence_path)
+
+from arcgis_harvester import ArcGISHarvester, parse_query_url, read_layer
+
+LAYER_PATH = '/arcgis/rest/services/Fire/FeatureServer/0'
+BASE_EDIT = 1700000000000
+
+
+class FakeFeatureServer(BaseHTTPRequestHandler):
+    """Just enough of the ArcGIS REST query API: ids, counts, offsets, where on OBJECTID / EditDate"""
+    features = {}
+    max_record_count = 7
+    supports_ids = True
+    queries = []
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(parsed.query, keep_blank_values=True).items()}
+        if parsed.path == LAYER_PATH:
+            body = {
+                'maxRecordCount': self.max_record_count,
+                'objectIdField': 'OBJECTID' if self.supports_ids else None,
+                'advancedQueryCapabilities': {'supportsPagination': True},
+                'editFieldsInfo': {'editDateField': 'EditDate'}
+            }
+        elif parsed.path == LAYER_PATH + '/query':
+            self.queries.append(params)
+            body = self.query(params)
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def query(self, params):
+        matched = [f for oid, f in sorted(self.features.items()) if self.matches(f, params['where'])]
+        if params.get('returnCountOnly') == 'true':
+            return {'count': len(matched)}
+        if params.get('returnIdsOnly') == 'true':
+            if not self.supports_ids:
+                return {'error': {'code': 400, 'message': 'returnIdsOnly not supported'}}
+            return {'objectIdFieldName': 'OBJECTID', 'objectIds': [f['OBJECTID'] for f in matched]}
+        offset = int(params.get('resultOffset', 0))
+        count = min(int(params.get('resultRecordCount', self.max_record_count)), self.max_record_count)
+        page = matched[offset:offset + count]
+        return {
+            'type': 'FeatureCollection',
+            'features': [{'type': 'Feature', 'id': f['OBJECTID'], 'properties': dict(f),
+                          'geometry': {'type': 'Point', 'coordinates': [-117.0 - f['OBJECTID'] / 1000, 33.5]}}
+                         for f in page],
+            'exceededTransferLimit': offset + count < len(matched)
+        }
+
+    @staticmethod
+    def matches(feature, where):
+        for field, op, value in re.findall(r"(OBJECTID|EditDate) (>=|<=|>) (TIMESTAMP '[^']+'|\d+)", where):
+            if value.startswith('TIMESTAMP'):
+                stamp = datetime.strptime(value[11:-1], '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+                value = int(stamp.timestamp() * 1000)
+            value = int(value)
+            actual = feature[field]
+            if (op == '>=' and actual < value) or (op == '<=' and actual > value) or (op == '>' and actual <= value):
+                return False
+        return True
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_feature(oid, edit_offset_s=0, hazard='Moderate'):
+    return {'OBJECTID': oid, 'HAZ_CLASS': hazard, 'EditDate': BASE_EDIT + edit_offset_s * 1000}
+
+
+class TestArcGISHarvester(unittest.TestCase):
+    """Complete paging past maxRecordCount, GeoParquet output and incremental sync"""
+
+    def setUp(self):
+        FakeFeatureServer.features = {oid: make_feature(oid, edit_offset_s=oid - 100) for oid in range(1, 51)}
+        FakeFeatureServer.max_record_count = 7
+        FakeFeatureServer.supports_ids = True
+        FakeFeatureServer.queries = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeFeatureServer)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.layer_url = f"http://127.0.0.1:{self.server.server_port}{LAYER_PATH}"
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.output_dir)
+
+    def test_full_harvest_is_complete_past_max_record_count(self):
+        summary = ArcGISHarvester(self.layer_url, page_size=100).sync(self.output_dir)
+        self.assertEqual(summary['mode'], 'full')
+        self.assertEqual(summary['parts'], 8)  # 50 features / 7 per page
+
+        gdf = read_layer(self.output_dir)
+        self.assertEqual(sorted(gdf['OBJECTID']), list(range(1, 51)))
+        self.assertEqual(str(gdf.crs), 'EPSG:4326')
+        self.assertEqual(gdf.geometry.geom_type.unique().tolist(), ['Point'])
+
+    def test_offset_paging_when_ids_unavailable(self):
+        FakeFeatureServer.supports_ids = False
+        ArcGISHarvester(self.layer_url).harvest(self.output_dir)
+        offsets = sorted(int(q['resultOffset']) for q in FakeFeatureServer.queries if 'resultOffset' in q)
+        self.assertEqual(offsets, list(range(0, 50, 7)))
+        self.assertEqual(len(read_layer(self.output_dir)), 50)
+
+    def test_incremental_sync_fetches_only_edits_and_drops_deletes(self):
+        ArcGISHarvester(self.layer_url).sync(self.output_dir)
+
+        FakeFeatureServer.features[3] = make_feature(3, edit_offset_s=60, hazard='Very High')
+        FakeFeatureServer.features[51] = make_feature(51, edit_offset_s=60)
+        del FakeFeatureServer.features[10]
+
+        summary = ArcGISHarvester(self.layer_url).sync(self.output_dir)
+        self.assertEqual(summary['mode'], 'incremental')
+        self.assertEqual(summary['total_features'], 50)
+        # The two edits plus the feature stamped at the previous high-water second
+        self.assertEqual(summary['features_fetched'], 3)
+
+        gdf = read_layer(self.output_dir).set_index('OBJECTID')
+        self.assertEqual(len(gdf), 50)
+        self.assertNotIn(10, gdf.index)
+        self.assertIn(51, gdf.index)
+        self.assertEqual(gdf.loc[3, 'HAZ_CLASS'], 'Very High')
+
+        FakeFeatureServer.queries = []
+        summary = ArcGISHarvester(self.layer_url).sync(self.output_dir)
+        self.assertEqual(summary['features_fetched'], 2)  # only the two features at the new high-water mark
+
+    def test_parse_query_url(self):
+        url = ("https://services.arcgis.com/x/arcgis/rest/services/HCAD_Parcels/FeatureServer/0/query"
+               "?where=1%3D1&outFields=*&outSR=4326&f=geojson")
+        self.assertEqual(parse_query_url(url), {
+            'layer_url': 'https://services.arcgis.com/x/arcgis/rest/services/HCAD_Parcels/FeatureServer/0',
+            'where': '1=1', 'out_fields': '*'})
+        self.assertIsNone(parse_query_url("https://data.austintexas.gov/api/geospatial/8u4p?format=GeoJSON"))
+
+
+if __name__ == '__main__':
+    unittest.main()
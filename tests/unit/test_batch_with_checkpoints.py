@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the TDHCA batch checkpoint journal and per-file worker timeout
+"""
+import unittest
+import tempfile
+import shutil
+import signal
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from unittest import mock
+
+# Add the TDHCA_RAG code directory to path for imports
+import sys
+import os
+tdhca_code_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                               'modules', 'data_intelligence', 'TDHCA_RAG', 'code')
+sys.path.insert(0, tdhca_code_path)
+
+import batch_with_checkpoints
+from batch_with_checkpoints import CheckpointBatchProcessor, CheckpointJournal, extract_one
+
+
+class SlowExtractor:
+    """Stands in for ImprovedTDHCAExtractor: hangs on every file, behind the same
+    catch-all error handling the real extractors wrap their page loops in"""
+    _last_extraction = None
+
+    def process_application_improved(self, pdf_file):
+        try:
+            time.sleep(5)
+        except Exception:
+            return None
+
+
+class CrashingPool:
+    """Stands in for ProcessPoolExecutor: the first pool's worker dies after one file"""
+    pools = 0
+
+    def __init__(self, *args, **kwargs):
+        CrashingPool.pools += 1
+        self.broken = CrashingPool.pools == 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, pdf):
+        future = Future()
+        if self.broken and not pdf.endswith('25001.pdf'):
+            future.set_exception(BrokenProcessPool('A process in the process pool was terminated abruptly'))
+        else:
+            future.set_result({'File Name': Path(pdf).name, 'Project Name': Path(pdf).stem,
+                               'Processing Time': '0.1s', 'Status': 'SUCCESS'})
+        return future
+
+
+class TestCheckpointJournal(unittest.TestCase):
+    """Journal survives torn writes and resumes without rewriting earlier records"""
+
+    def setUp(self):
+        self.work_dir = Path(tempfile.mkdtemp())
+        self.path = self.work_dir / 'batch_checkpoint.jsonl'
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_torn_final_line_is_ignored_and_not_glued_to_next_record(self):
+        journal = CheckpointJournal(self.path)
+        journal.append('a/25001.pdf', {'File Name': '25001.pdf', 'Status': 'SUCCESS'})
+        with open(self.path, 'a') as f:
+            f.write('{"key": "b/25002.pdf", "res')  # killed mid-write
+
+        resumed = CheckpointJournal(self.path)
+        self.assertEqual(list(resumed.load()), ['a/25001.pdf'])
+
+        resumed.append('b/25002.pdf', {'File Name': '25002.pdf', 'Status': 'FAILED'})
+        records = CheckpointJournal(self.path).load()
+        self.assertEqual(sorted(records), ['a/25001.pdf', 'b/25002.pdf'])
+        self.assertEqual(records['b/25002.pdf']['Status'], 'FAILED')
+
+    @unittest.skipUnless(hasattr(signal, 'SIGALRM'), 'SIGALRM not available')
+    def test_hung_file_times_out_inside_worker(self):
+        original = (batch_with_checkpoints._worker_extractor, batch_with_checkpoints._worker_timeout)
+        previous_handler = signal.signal(signal.SIGALRM, batch_with_checkpoints._on_alarm)
+        batch_with_checkpoints._worker_extractor = SlowExtractor()
+        batch_with_checkpoints._worker_timeout = 1
+        try:
+            start = time.time()
+            row = extract_one(str(self.work_dir / '25003.pdf'))
+        finally:
+            batch_with_checkpoints._worker_extractor, batch_with_checkpoints._worker_timeout = original
+            signal.signal(signal.SIGALRM, previous_handler)
+
+        self.assertLess(time.time() - start, 3)
+        self.assertEqual(row['Project Name'], 'TIMEOUT')
+        self.assertTrue(row['Status'].startswith('TIMEOUT'))
+
+    def test_broken_pool_is_restarted_without_journaling_unrun_files(self):
+        base_path = self.work_dir / 'applications'
+        base_path.mkdir()
+        for name in ('25001.pdf', '25002.pdf', '25003.pdf'):
+            (base_path / name).write_bytes(b'%PDF-1.4')
+
+        previous_cwd = os.getcwd()
+        os.chdir(self.work_dir)
+        CrashingPool.pools = 0
+        journaled = []
+        try:
+            processor = CheckpointBatchProcessor(str(base_path), max_workers=2)
+            original_append = processor.journal.append
+            processor.journal.append = lambda key, result: journaled.append(key) or original_append(key, result)
+            with mock.patch.object(batch_with_checkpoints, 'ProcessPoolExecutor', CrashingPool):
+                processor.process_batch(resume=False)
+        finally:
+            os.chdir(previous_cwd)
+
+        # Only the file that finished before the crash, then the two retried on the fresh pool
+        self.assertEqual(CrashingPool.pools, 2)
+        self.assertEqual(journaled[0], '25001.pdf')
+        self.assertEqual(sorted(journaled[1:]), ['25002.pdf', '25003.pdf'])
+        self.assertFalse((self.work_dir / 'batch_checkpoint.jsonl').exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
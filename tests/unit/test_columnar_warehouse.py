@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the columnar environmental warehouse
+"""
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+# Add the data intelligence directory to path for imports
+import sys
+import os
+data_intelligence_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'modules', 'data_intelligence')
+sys.path.insert(0, data_intelligence_path)
+
+from columnar_warehouse import ColumnarWarehouse
+
+
+class TestColumnarWarehouse(unittest.TestCase):
+    """CSV and partition ingestion keyed on the source file"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.warehouse = ColumnarWarehouse(self.temp_dir / "warehouse")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_bom_csv_keeps_leading_zero_ids_as_text(self):
+        sites = self.temp_dir / "Site.csv"
+        violations = self.temp_dir / "Violations.csv"
+        sites.write_bytes('\ufeffSiteID,SiteName\n00123,Acme Plating\n00456,Bay Dry Cleaners\n'.encode('utf-8'))
+        violations.write_bytes('\ufeffSiteID,ViolationType\n00123,RCRA\n00123,CWA\n'.encode('utf-8'))
+
+        self.assertTrue(self.warehouse.ingest_csv('Site', sites))
+        self.assertTrue(self.warehouse.ingest_csv('Violations', violations))
+        self.assertFalse(self.warehouse.ingest_csv('Site', sites))
+
+        df_sites = self.warehouse.read('Site').to_pandas()
+        self.assertEqual(list(df_sites.columns), ['SiteID', 'SiteName'])
+        self.assertEqual(df_sites['SiteID'].tolist(), ['00123', '00456'])
+
+        viol_counts = self.warehouse.count_by('Violations', 'SiteID')
+        self.assertEqual(df_sites['SiteID'].map(viol_counts).fillna(0).astype(int).tolist(), [2, 0])
+
+    def test_unreadable_partition_is_not_recorded(self):
+        archive = self.temp_dir / "region1.gdb.zip"
+        archive.write_bytes(b'v1')
+        frame = pd.DataFrame({'site_id': ['A1'], 'latitude': [34.0], 'longitude': [-118.0]})
+
+        self.assertTrue(self.warehouse.ingest_partition('epa_sites', 'region1', archive, lambda: frame))
+        self.assertEqual(self.warehouse.read('epa_sites').num_rows, 1)
+
+        # The archive changes and can no longer be read: the stale partition goes, nothing is recorded
+        archive.write_bytes(b'v2 (corrupt)')
+        self.assertFalse(self.warehouse.ingest_partition('epa_sites', 'region1', archive, lambda: None))
+        self.assertNotIn('epa_sites/region1', self.warehouse.manifest['tables'])
+        self.assertEqual(self.warehouse.partitions('epa_sites'), [])
+
+        # ...so the next run retries it
+        self.assertTrue(self.warehouse.ingest_partition('epa_sites', 'region1', archive, lambda: frame))
+        self.assertFalse(self.warehouse.ingest_partition('epa_sites', 'region1', archive, lambda: frame))
+
+        # A readable source with no rows is a current, empty partition
+        empty = self.temp_dir / "region2.gdb.zip"
+        empty.write_bytes(b'empty')
+        self.assertTrue(self.warehouse.ingest_partition('epa_sites', 'region2', empty, pd.DataFrame))
+        self.assertFalse(self.warehouse.ingest_partition('epa_sites', 'region2', empty, lambda: None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the one-pass reference pattern engine
+"""
+import unittest
+import random
+import re
+
+# Add the QAP processing directory to path for imports
+import sys
+import os
+qap_processing_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'modules', 'qap_processing')
+sys.path.insert(0, qap_processing_path)
+
+from cross_reference_validation_system import AuthorityLevel, CrossReferenceValidator, ReferencePatternEngine
+
+# Fragments that make partial and complete references when glued together at random
+FRAGMENTS = [
+    'IRC', 'irc', 'Section', 'section', 'SECTION', 'subsection', 'paragraph', 'Part', 'part', 'of the Code',
+    'of the Internal Revenue Code', 'Internal Revenue Code', 'CFR', 'cfr', 'C.F.R.', '§', 'Regulation', 'TAC',
+    'Title', 'CCR', 'Texas Administrative Code', 'Texas Government Code', 'Government Code', 'Chapter',
+    'Health and Safety Code', 'Revenue & Taxation Code', 'Florida Statutes', 'F.S.', 'Rule Chapter', 'QAP',
+    'of the', 'Qualified Allocation Plan', 'Sections', '42', '1.42-5', '26', '10', '67-48', '50199.7', 'IV',
+    'xii', '(b)', '(1)(A)', '(a)', ' ', '  ', '\n', '\t', ' ', ',', '.', '-', '(', ')', 'h', 's', '7',
+    '١٢',  # Arabic-Indic digits: \d on str patterns matches them
+    'ſ', 'K', 'İ',  # long s, Kelvin sign, dotted I: fold to ASCII under IGNORECASE
+]
+
+
+def old_finditer(reference_patterns, content):
+    """The original per-pattern loop the engine replaces"""
+    for ref_type, patterns in reference_patterns.items():
+        for pattern in patterns:
+            for match in re.finditer(pattern, content, re.IGNORECASE):
+                yield ref_type, match
+
+
+def summarize(matches):
+    return [(ref_type, match.re.pattern, match.span(), match.groups()) for ref_type, match in matches]
+
+
+class TestReferencePatternEngine(unittest.TestCase):
+    """The engine yields exactly what re.finditer per pattern yields, in the same order"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.validator = CrossReferenceValidator()
+        cls.reference_patterns = cls.validator.reference_patterns
+        cls.engine = ReferencePatternEngine(cls.reference_patterns)
+
+    def assertSameMatches(self, content):
+        self.assertEqual(summarize(self.engine.finditer(content)),
+                         summarize(old_finditer(self.reference_patterns, content)),
+                         msg=repr(content))
+
+    def test_long_digit_and_whitespace_runs_before_the_keyword(self):
+        for content in ['1' * 70 + ' CFR 1.42',
+                        'See 26' + ' ' * 70 + 'CFR 1.42',
+                        '26' + ' ' * 500 + 'C.F.R. § 1.42',
+                        '9' * 2000 + '\n\t ' * 300 + 'TAC 10',
+                        'x' * 100 + '10 TAC 10 and 10 TAC 11',
+                        ' ' * 100 + 'CFR 1.42',
+                        '12' + '١' * 80 + ' CFR 5']:
+            self.assertSameMatches(content)
+
+        spans = [match.span() for _, match in self.engine.finditer('1' * 70 + ' CFR 1.42')]
+        self.assertIn((0, 79), spans)
+
+    def test_randomized_documents_match_the_per_pattern_loop(self):
+        rng = random.Random(20240611)
+        for _ in range(1500):
+            pieces = [rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 40))]
+            if rng.random() < 0.2:
+                # Occasionally stretch a run well past any fixed look-behind window
+                pieces.insert(rng.randrange(len(pieces) + 1), rng.choice(['7', ' ', '\n']) * rng.randint(60, 300))
+            self.assertSameMatches(''.join(pieces))
+
+    def test_references_extracted_from_engine_matches(self):
+        content = "Per IRC Section 42(h)(1) and 26 CFR 1.42-5, see also 10 TAC Chapter 11 and Section IV."
+        references = self.validator.extract_references(content, 'TX_QAP', AuthorityLevel.STATE_REGULATORY)
+        self.assertEqual([ref.reference_text for ref in references],
+                         [match.group(0) for _, match in old_finditer(self.reference_patterns, content)])
+
+
+if __name__ == '__main__':
+    unittest.main()
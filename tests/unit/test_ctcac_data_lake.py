@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the partitioned CTCAC cell data lake
+"""
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+
+# Add the lihtc_analyst directory to path for imports
+import sys
+import os
+lihtc_analyst_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'modules', 'lihtc_analyst')
+sys.path.insert(0, lihtc_analyst_path)
+
+from ctcac_data_lake import CTCACDataLake
+
+
+def application_cells(units, tdc, project_name):
+    """Minimal Application / Sources and Uses layout: labels in B, values to the right"""
+    return [
+        ('Application', 3, 2, 'Project Name', None),
+        ('Application', 3, 4, project_name, None),
+        ('Application', 10, 2, 'Total Units', None),
+        ('Application', 10, 6, units, None),
+        ('Sources and Uses Budget', 40, 2, 'TOTAL DEVELOPMENT COST', None),
+        ('Sources and Uses Budget', 40, 8, tdc, '=SUM(H5:H39)'),
+        ('Sources and Uses Budget', 41, 8, 'n/a', None),
+    ]
+
+
+class TestCTCACDataLake(unittest.TestCase):
+    """Long-format cells in, comparative answers out, appends never touch history"""
+
+    def setUp(self):
+        self.work_dir = Path(tempfile.mkdtemp())
+        self.lake = CTCACDataLake(self.work_dir / 'lake')
+        self.lake.add_application(Path('2023_4pct_R1_23-401.xlsx'), application_cells(100, 40_000_000, 'Sunrise'))
+        self.lake.add_application(Path('2023_4pct_R2_23-577.xlsx'), application_cells(50, 30_000_000, 'Harbor'))
+        self.lake.add_application(Path('2024_4pct_R1_24-409.xlsx'), application_cells(80, 99_000_000, 'Vista'))
+        self.lake.add_application(Path('2023_9pct_R1_23-045.xlsx'), application_cells(60, 6_000_000, 'Oak'))
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_tdc_per_unit_for_one_year_and_credit_type(self):
+        df = self.lake.per_unit(year=2023, credit_type='4pct')
+        self.assertEqual(list(df['application_id']), ['23-401', '23-577'])
+        self.assertEqual(list(df['total_development_cost_per_unit']), [400_000.0, 600_000.0])
+        self.assertEqual(list(df['round']), ['R1', 'R2'])
+
+        cells = self.lake.cells(application_id='23-401', sheet='Sources and Uses Budget').to_pylist()
+        total = next(c for c in cells if c['cell'] == 'H40')
+        self.assertEqual((total['label'], total['formula']), ('TOTAL DEVELOPMENT COST', '=SUM(H5:H39)'))
+        below = next(c for c in cells if c['cell'] == 'H41')
+        self.assertEqual((below['value_text'], below['value_number']), ('n/a', None))
+
+    def test_append_writes_one_file_and_leaves_history_alone(self):
+        existing = {p: p.stat().st_mtime_ns for p in self.lake.cells_dir.rglob('*.parquet')}
+        self.assertEqual(len(existing), 4)
+
+        reopened = CTCACDataLake(self.work_dir / 'lake')
+        reopened.add_application(Path('2023_4pct_R2_23-612.xlsx'), application_cells(200, 50_000_000, 'Mesa'))
+
+        after = {p: p.stat().st_mtime_ns for p in reopened.cells_dir.rglob('*.parquet')}
+        self.assertEqual(set(after) - set(existing),
+                         {reopened.application_path(2023, '4pct', '23-612')})
+        self.assertTrue(all(after[p] == mtime for p, mtime in existing.items()))
+        self.assertEqual(len(reopened.per_unit(year=2023, credit_type='4pct')), 3)
+        self.assertEqual(len(reopened.applications()), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
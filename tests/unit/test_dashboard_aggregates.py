@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Roman Empire dashboard aggregate cache
+"""
+import unittest
+import tempfile
+import shutil
+import time
+from unittest import mock
+
+import pandas as pd
+
+# Add the dashboard directory to path for imports
+import sys
+import os
+dashboard_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'modules', 'ca_hcd_housing_element', 'dashboard')
+sys.path.insert(0, dashboard_path)
+
+from dashboard_aggregates import DashboardAggregateCache, STAMP_PATH_ENV, build_aggregates, default_stamp_path
+
+
+def sample_sources(progress_offset=0.0):
+    strategic = {'total_jurisdictions': 4, 'compliant_count': 1, 'avg_progress': 40.0}
+    counties = pd.DataFrame({
+        'county_name': ['Los Angeles', 'Alameda'],
+        'jurisdiction_count': [88, 14],
+        'avg_progress': [30.5 + progress_offset, 61.0],
+        'compliant_count': [2, 1],
+        'builders_remedy_count': [12, 3],
+        'streamlining_count': [30, 6]
+    })
+    jurisdictions = pd.DataFrame({
+        'jurisdiction_name': ['Oakland', 'Fremont', 'Los Angeles', 'Long Beach'],
+        'county_name': ['Alameda', 'Alameda', 'Los Angeles', 'Los Angeles'],
+        'overall_progress': [62.0, 12.0, 35.0, 81.0],
+        'compliance_status': ['At Risk', 'Non-Compliant', 'At Risk', 'Compliant'],
+        'builders_remedy_exposed': [False, True, False, False],
+        'ministerial_approval_required': [False, True, True, False],
+        'sb35_10_percent_required': [False, False, True, False],
+        'sb35_50_percent_required': [False, True, False, False],
+        'performance_category': ['Good', 'Critical', 'Behind Schedule', 'Excellent']
+    })
+    return strategic, counties, jurisdictions
+
+
+class TestDashboardAggregates(unittest.TestCase):
+    """Callbacks answered from one snapshot, rebuilt only when the ETL stamp changes"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.stamp_path = os.path.join(self.temp_dir, 'etl_completed.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_filters_and_opportunity_labels_from_precomputed_masks(self):
+        aggregates = build_aggregates(*sample_sources())
+        self.assertEqual(list(aggregates.jurisdictions['jurisdiction_name']),
+                         ['Long Beach', 'Oakland', 'Los Angeles', 'Fremont'])
+        self.assertEqual(list(aggregates.jurisdictions['opportunities']),
+                         ['None', 'None', '📋 10% SB35', "🏗️ Builder's Remedy | ⚡ 50% SB35"])
+        self.assertEqual([o['value'] for o in aggregates.county_options], ['Alameda', 'Los Angeles'])
+
+        filtered = aggregates.filter_jurisdictions(['Critical', 'Behind Schedule'], ['builders_remedy', 'streamlining'], None)
+        self.assertEqual(list(filtered['jurisdiction_name']), ['Los Angeles', 'Fremont'])
+        filtered = aggregates.filter_jurisdictions(None, ['sb35_10'], ['Alameda'])
+        self.assertEqual(len(filtered), 0)
+        self.assertEqual(len(aggregates.filter_jurisdictions([], [], [])), 4)
+        self.assertEqual(filtered.head(50).to_dict('records'), [])
+
+    def test_repeated_text_is_categorical(self):
+        aggregates = build_aggregates(*sample_sources())
+        jurisdictions = aggregates.jurisdictions
+        self.assertIsInstance(jurisdictions['county_name'].dtype, pd.CategoricalDtype)
+        # Mostly-unique text stays text
+        self.assertNotIsInstance(jurisdictions['jurisdiction_name'].dtype, pd.CategoricalDtype)
+        self.assertEqual(aggregates.counties['jurisdiction_count'].dtype, 'int8')
+
+        # Object-dtype text (pre-3.0 pandas, or frames built that way) is converted too
+        strategic, counties, frame = sample_sources()
+        frame['county_name'] = frame['county_name'].astype(object)
+        self.assertIsInstance(build_aggregates(strategic, counties, frame).jurisdictions['county_name'].dtype,
+                              pd.CategoricalDtype)
+
+    def test_rebuilds_and_drops_memoized_responses_when_etl_completes(self):
+        calls = []
+
+        def loader():
+            calls.append(time.time())
+            return sample_sources(progress_offset=len(calls))
+
+        cache = DashboardAggregateCache(loader, stamp_path=self.stamp_path)
+        self.assertIsNone(cache.current_version)
+        self.assertEqual(calls, [])
+        renders = []
+        build = lambda aggregates: renders.append(aggregates.version) or aggregates.counties['avg_progress'].tolist()
+
+        first = cache.memoize('county-progress', (['Alameda'],), build)
+        self.assertEqual(cache.memoize('county-progress', (['Alameda'],), build), first)
+        cache.memoize('county-progress', (['Los Angeles'],), build)
+        self.assertEqual((cache.builds, len(renders)), (1, 2))
+        self.assertEqual(cache.current_version, renders[0])
+
+        # The ETL writes its completion stamp: next request sees a new snapshot and version
+        with open(self.stamp_path, 'w') as f:
+            f.write('{"completed_at": "2025-07-01T00:00:00"}')
+        second = cache.memoize('county-progress', (['Alameda'],), build)
+        self.assertEqual((cache.builds, len(renders)), (2, 3))
+        self.assertNotEqual(renders[0], renders[2])
+        self.assertEqual(second, [32.5, 61.0])
+        self.assertIs(cache.get(), cache.get())
+
+    def test_stamp_path_is_configurable_and_outside_the_source_tree(self):
+        with mock.patch.dict(os.environ, {STAMP_PATH_ENV: self.stamp_path}):
+            self.assertEqual(default_stamp_path(), self.stamp_path)
+
+        with mock.patch.dict(os.environ, {'XDG_CACHE_HOME': self.temp_dir}):
+            os.environ.pop(STAMP_PATH_ENV, None)
+            self.assertEqual(default_stamp_path(),
+                             os.path.join(self.temp_dir, 'ca_hcd_housing_element', 'etl_completed.json'))
+        package_dir = os.path.realpath(os.path.dirname(dashboard_path))
+        self.assertFalse(os.path.realpath(default_stamp_path()).startswith(package_dir + os.sep))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the SQLite deal cache store
+"""
+import unittest
+import tempfile
+import shutil
+import json
+import sqlite3
+from pathlib import Path
+from unittest import mock
+
+# Add the workforce_analyst directory to path for imports
+import sys
+import os
+workforce_analyst_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'modules', 'workforce_analyst')
+sys.path.insert(0, workforce_analyst_path)
+
+import deal_cache_store
+from deal_cache_store import DB_PATH_ENV, DealCacheStore, default_db_path, get_deal_cache_store
+
+
+class TestDealCacheStore(unittest.TestCase):
+    """Metadata listings from indexed columns; payloads only through load()"""
+
+    def setUp(self):
+        self.cache_dir = Path(tempfile.mkdtemp())
+        legacy = {
+            'deal_name': 'Sunset Gardens - El Cajon, CA',
+            'extracted_date': '2025-07-01T10:00:00',
+            'version': '1.0',
+            'data': {'Property Name': 'Sunset Gardens', 'Number of Units': '48'}
+        }
+        (self.cache_dir / 'Sunset-Gardens-El-Cajon-CA.json').write_text(json.dumps(legacy, indent=2))
+        (self.cache_dir / 'Broken.json').write_text('{not json')
+        self.store = DealCacheStore(self.cache_dir / 'deal_cache.sqlite', json_dir=self.cache_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_existing_json_files_are_imported_once(self):
+        self.assertEqual(self.store.load('Sunset Gardens - El Cajon, CA'),
+                         ({'Property Name': 'Sunset Gardens', 'Number of Units': '48'}, '2025-07-01T10:00:00'))
+        info = self.store.list_info()
+        self.assertEqual([(d['deal_name'], d['filename'], d['field_count']) for d in info],
+                         [('Sunset Gardens - El Cajon, CA', 'Sunset-Gardens-El-Cajon-CA.json', 2)])
+
+        # Reopening does not re-import (a deleted deal stays deleted even though nothing else changed)
+        self.store.delete('Sunset Gardens - El Cajon, CA')
+        (self.cache_dir / 'Sunset-Gardens-El-Cajon-CA.json').write_text('{}')
+        reopened = DealCacheStore(self.cache_dir / 'deal_cache.sqlite', json_dir=self.cache_dir)
+        self.assertEqual(reopened.totals()['deal_count'], 0)
+
+    def test_listing_and_totals_do_not_read_payloads(self):
+        for i in range(10):
+            self.store.save(f'Deal {i}', {f'Field {n}': str(n) for n in range(i + 1)})
+        self.assertTrue((self.cache_dir / 'Deal-9.json').exists())  # mirrored for the BOTN desktop tools
+
+        # Corrupt every payload: metadata queries must still work because they never touch the column
+        with sqlite3.connect(self.cache_dir / 'deal_cache.sqlite') as conn:
+            conn.execute("UPDATE deals SET data = 'not json'")
+        conn.close()
+        recent = self.store.list_info(limit=3)
+        self.assertEqual([d['deal_name'] for d in recent], ['Deal 9', 'Deal 8', 'Deal 7'])
+        self.assertEqual(recent[0]['data_fields'], 10)
+        totals = self.store.totals()
+        self.assertEqual(totals['deal_count'], 11)
+        self.assertGreater(totals['size_mb'], 0)
+
+        self.store.save('Deal 9', {'Property Name': 'Deal 9'})
+        self.assertEqual(self.store.load('Deal 9')[0], {'Property Name': 'Deal 9'})
+        self.assertEqual(self.store.clear(), 11)
+        self.assertEqual(self.store.totals(), {'deal_count': 0, 'size_mb': 0.0})
+        self.assertFalse((self.cache_dir / 'Deal-9.json').exists())
+
+    def test_default_database_is_configurable_and_outside_the_source_tree(self):
+        db_path = self.cache_dir / 'db' / 'deals.sqlite'
+        with mock.patch.dict(os.environ, {DB_PATH_ENV: str(db_path)}), \
+                mock.patch.object(deal_cache_store, 'DEFAULT_CACHE_DIR', str(self.cache_dir)), \
+                mock.patch.object(deal_cache_store, '_default_store', None):
+            store = get_deal_cache_store()
+            self.assertEqual(store.db_path, db_path)
+            self.assertEqual(store.totals()['deal_count'], 1)  # JSON files in deal_cache/ are still imported
+
+        with mock.patch.dict(os.environ, {'XDG_CACHE_HOME': str(self.cache_dir / 'cache')}):
+            os.environ.pop(DB_PATH_ENV, None)
+            self.assertEqual(default_db_path(), self.cache_dir / 'cache' / 'workforce_analyst' / 'deal_cache.sqlite')
+        self.assertNotIn(Path(workforce_analyst_path).resolve(), default_db_path().resolve().parents)
+
+
+if __name__ == '__main__':
+    unittest.main()
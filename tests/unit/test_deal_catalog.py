@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the incremental SQLite deal folder catalog
+"""
+import unittest
+import tempfile
+import shutil
+import threading
+import time
+from pathlib import Path
+
+# Add the workforce_analyst directory to path for imports
+import sys
+import os
+workforce_analyst_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'modules', 'workforce_analyst')
+sys.path.insert(0, workforce_analyst_path)
+
+from deal_catalog import DealCatalog, shared_catalog
+
+
+def classify(pdf_files, excel_files, sizes):
+    """Same shape as DealFinder._classify_files: OM by name else largest PDF; rent rolls / T12s"""
+    named = [f for f in pdf_files if 'om' in f.stem.lower().split()]
+    om_file = named[0] if named else (max(pdf_files, key=lambda f: sizes[f]) if pdf_files else None)
+    return om_file, [f for f in excel_files if 'rent roll' in f.name.lower() or 't12' in f.name.lower()]
+
+
+def touch(path, size=10):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b'x' * size)
+
+
+class TestDealCatalog(unittest.TestCase):
+    """Reads come from SQLite; refreshes re-list only directories whose mtime moved"""
+
+    def setUp(self):
+        self.work_dir = Path(tempfile.mkdtemp())
+        self.deals_dir = self.work_dir / 'Deals'
+        touch(self.deals_dir / 'Bayside' / 'Bayside OM.pdf')
+        touch(self.deals_dir / 'Bayside' / 'Financials' / 'Rent Roll 2024.xlsx')
+        touch(self.deals_dir / 'Bayside' / 'Archive' / 'Old T12.xlsx')
+        touch(self.deals_dir / 'Camden' / 'Photos' / 'site.jpg')
+        touch(self.deals_dir / 'Camden' / 'Docs' / 'big.pdf', size=500)
+        touch(self.deals_dir / 'Camden' / 'Docs' / 'small.pdf', size=5)
+        self.db_path = self.work_dir / 'deal_catalog.sqlite'
+        self.catalog = DealCatalog(self.deals_dir, self.db_path, classify)
+
+    def tearDown(self):
+        self.catalog.stop_background_rescan()
+        shutil.rmtree(self.work_dir)
+
+    def test_incremental_refresh_only_relists_changed_directories(self):
+        first = self.catalog.refresh()
+        deals = {d['name']: d for d in self.catalog.deals()}
+        self.assertEqual(sorted(deals), ['Bayside', 'Camden'])
+        self.assertEqual(deals['Bayside']['om_file'].name, 'Bayside OM.pdf')
+        self.assertEqual([f.name for f in deals['Bayside']['financial_files']], ['Rent Roll 2024.xlsx'])
+        self.assertEqual(deals['Bayside']['total_files'], 3)  # OM, rent roll and the Financials folder; Archive skipped
+        self.assertEqual(deals['Camden']['om_file'].name, 'big.pdf')
+        self.assertEqual(first['directories_listed'], 5)
+
+        # Nothing changed: every directory is statted, none is listed, no deal recomputed
+        reopened = DealCatalog(self.deals_dir, self.db_path, classify)
+        unchanged = reopened.refresh()
+        self.assertEqual((unchanged['directories_listed'], unchanged['deals_updated']), (0, 0))
+
+        touch(self.deals_dir / 'Camden' / 'Docs' / 'Camden T12.xlsx')
+        shutil.rmtree(self.deals_dir / 'Camden' / 'Photos')
+        changed = reopened.refresh()
+        self.assertEqual((changed['directories_listed'], changed['deals_updated']), (2, 1))
+        camden = {d['name']: d for d in reopened.deals()}['Camden']
+        self.assertEqual([f.name for f in camden['financial_files']], ['Camden T12.xlsx'])
+        self.assertEqual(camden['total_files'], 4)  # Docs folder + 3 files; Photos is gone
+
+    def test_background_rescan_picks_up_new_and_removed_deals(self):
+        self.catalog.refresh()
+        self.catalog.start_background_rescan(interval_seconds=0.1)
+        touch(self.deals_dir / 'Sunset Gardens' / 'Offering Memo.pdf')
+        shutil.rmtree(self.deals_dir / 'Bayside')
+
+        deadline = time.time() + 5
+        while time.time() < deadline:
+            names = [d['name'] for d in self.catalog.deals()]
+            if names == ['Camden', 'Sunset Gardens']:
+                break
+            time.sleep(0.05)
+        self.assertEqual(names, ['Camden', 'Sunset Gardens'])
+
+    def test_shared_catalog_starts_one_rescan_thread_across_reruns(self):
+        def rescan_threads():
+            return [t for t in threading.enumerate() if t.name == 'deal-catalog-rescan' and t.is_alive()]
+
+        before = len(rescan_threads())
+        shared_db = self.work_dir / 'shared.sqlite'
+        # Every Streamlit rerun builds a fresh DealFinder (and classify bound method)
+        catalogs = [shared_catalog(self.deals_dir, shared_db, lambda *files: classify(*files), rescan_interval=60)
+                    for _ in range(5)]
+        self.addCleanup(catalogs[0].stop_background_rescan)
+
+        self.assertTrue(all(catalog is catalogs[0] for catalog in catalogs))
+        self.assertEqual(len(rescan_threads()), before + 1)
+        catalogs[0].stop_background_rescan()
+        self.assertEqual(len(rescan_threads()), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the shared DownloadEngine against a local Range-capable HTTP server
+"""
+import unittest
+import tempfile
+import shutil
+import hashlib
+import json
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the data_intelligence directory to path for imports
+import sys
+import os
+data_intelligence_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'modules', 'data_intelligence')
+sys.path.insert(0, data_intelligence_path)
+
+from download_engine import DownloadEngine, DownloadJob
+
+
+class StubFileHandler(BaseHTTPRequestHandler):
+    """Serves in-memory files with ETag and single byte-range support"""
+    protocol_version = 'HTTP/1.1'
+    files = {}
+    requests_seen = []
+    truncate_once = set()
+
+    def do_GET(self):
+        body = self.files.get(self.path)
+        self.requests_seen.append((self.path, self.headers.get('Range')))
+        if body is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        start = 0
+        range_header = self.headers.get('Range')
+        if range_header and self.headers.get('If-Range') in (None, etag):
+            start = int(range_header.split('=')[1].split('-')[0])
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{len(body) - 1}/{len(body)}')
+        else:
+            self.send_response(200)
+        payload = body[start:]
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+
+        if self.path in self.truncate_once:
+            # Simulate a dropped connection half way through the transfer
+            self.truncate_once.discard(self.path)
+            self.wfile.write(payload[:len(payload) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestDownloadEngine(unittest.TestCase):
+    """Test parallel download, resume, verification and manifest skipping"""
+
+    def setUp(self):
+        StubFileHandler.files = {f'/data/file{i}.csv': (f'row,{i}\n' * 50000).encode() for i in range(4)}
+        StubFileHandler.requests_seen = []
+        StubFileHandler.truncate_once = set()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubFileHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+
+        self.work_dir = Path(tempfile.mkdtemp())
+        self.manifest_path = self.work_dir / 'download_manifest.json'
+        self.engine = self._make_engine()
+
+    def tearDown(self):
+        self.engine.close()
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.work_dir)
+
+    def _make_engine(self):
+        return DownloadEngine(self.manifest_path, max_workers=4, retries=2, chunk_size=4096)
+
+    def _jobs(self):
+        return [DownloadJob(self.base_url + path, self.work_dir / 'out' / Path(path).name)
+                for path in sorted(StubFileHandler.files)]
+
+    def test_parallel_download_then_rerun_skips_everything(self):
+        results = self.engine.download_many(self._jobs())
+        self.assertTrue(all(r.status == 'downloaded' for r in results))
+        for job in self._jobs():
+            self.assertEqual(job.dest.read_bytes(), StubFileHandler.files['/data/' + job.dest.name])
+
+        StubFileHandler.requests_seen = []
+        self.engine.close()
+        rerun = self._make_engine().download_many(self._jobs())
+        self.assertTrue(all(r.status == 'unchanged' for r in rerun))
+        self.assertEqual(StubFileHandler.requests_seen, [])
+
+    def test_interrupted_download_resumes_with_range(self):
+        path = '/data/file1.csv'
+        StubFileHandler.truncate_once = {path}
+        job = DownloadJob(self.base_url + path, self.work_dir / 'file1.csv')
+
+        result = self.engine.download(job)
+        self.assertEqual(result.status, 'resumed')
+        self.assertEqual(job.dest.read_bytes(), StubFileHandler.files[path])
+        self.assertIsNone(StubFileHandler.requests_seen[0][1])
+        resume_from = int(StubFileHandler.requests_seen[1][1].split('=')[1].rstrip('-'))
+        self.assertGreater(resume_from, 0)
+        self.assertLess(result.bytes_transferred, len(StubFileHandler.files[path]))
+
+    def test_checksum_mismatch_is_rejected(self):
+        job = DownloadJob(self.base_url + '/data/file2.csv', self.work_dir / 'file2.csv', sha256='0' * 64)
+        result = self.engine.download(job)
+        self.assertEqual(result.status, 'failed')
+        self.assertEqual(result.error, 'checksum mismatch')
+        self.assertFalse(job.dest.exists())
+        self.assertFalse((self.work_dir / 'file2.csv.part').exists())
+
+        good = hashlib.sha256(StubFileHandler.files['/data/file2.csv']).hexdigest()
+        job.sha256 = good
+        self.assertEqual(self.engine.download(job).status, 'downloaded')
+        with open(self.manifest_path) as f:
+            self.assertEqual(json.load(f)['files'][str(job.dest)]['sha256'], good)
+
+    def test_missing_file_is_not_retried(self):
+        result = self.engine.download(DownloadJob(self.base_url + '/data/missing.csv', self.work_dir / 'missing.csv'))
+        self.assertEqual((result.status, result.http_status), ('failed', 404))
+        self.assertEqual(len(StubFileHandler.requests_seen), 1)
+
+    def test_changed_file_on_disk_is_downloaded_again(self):
+        job = self._jobs()[0]
+        self.engine.download(job)
+        job.dest.write_bytes(b'truncated')
+        self.assertEqual(self.engine.download(job).status, 'downloaded')
+        self.assertEqual(job.dest.read_bytes(), StubFileHandler.files['/data/file0.csv'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the checkpointed, sidecar-backed ChromaDB bulk loader
+Uses a stub collection and embedding model, so neither ChromaDB nor a sentence-transformers model is needed.
+"""
+import unittest
+import tempfile
+import shutil
+import json
+from pathlib import Path
+
+import numpy as np
+
+# Add the QAP processing directory to path for imports
+import sys
+import os
+qap_processing_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'modules', 'qap_processing')
+sys.path.insert(0, qap_processing_path)
+
+from enhanced_chromadb_loader import EmbeddingSidecarStore, EnhancedChromaDBLoader, chunk_content_hash
+
+MODEL_NAME = "stub-model"
+
+
+class StubEmbeddingModel:
+    """Deterministic 8-dimensional vectors; records every text it is asked to encode"""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False):
+        self.encoded.extend(texts)
+        return np.array([[len(text), sum(map(ord, text)) % 97, 1, 2, 3, 4, 5, 6] for text in texts], dtype=np.float32)
+
+
+class StubCollection:
+    """Keeps the last upsert per id; optionally fails on the Nth upsert call"""
+
+    def __init__(self, fail_on_call=None):
+        self.rows = {}
+        self.calls = 0
+        self.fail_on_call = fail_on_call
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self.calls += 1
+        if self.calls == self.fail_on_call:
+            raise RuntimeError("connection lost")
+        for chunk_id, embedding, metadata in zip(ids, embeddings, metadatas):
+            self.rows[chunk_id] = (embedding, metadata['content_hash'])
+
+
+class StubChromaDB:
+    def __init__(self, collection, embedding_model):
+        self.collection = collection
+        self.embedding_model = embedding_model
+
+
+def make_loader(chroma_db):
+    """Loader wired to a stub database, bypassing the real ChromaVectorDatabase"""
+    loader = EnhancedChromaDBLoader.__new__(EnhancedChromaDBLoader)
+    loader.config = {"vector_database": {"embedding_model": MODEL_NAME, "collection_name": "test"}}
+    loader.chroma_db = chroma_db
+    loader.stats = {'chunks_loaded': 0, 'total_enhanced_features': 0,
+                    'states_processed': set(), 'strategies_used': set()}
+    return loader
+
+
+def write_jsonl(path, chunks):
+    with open(path, 'w', encoding='utf-8') as f:
+        for chunk in chunks:
+            f.write(json.dumps(chunk) + "\n")
+
+
+def chunks_for(state, count, text=None):
+    return [{"chunk_id": f"{state}_{i}", "content": text or f"{state} QAP section {i} scoring criteria",
+             "state_code": state, "strategy": "complex_outline"} for i in range(count)]
+
+
+class TestEmbeddingSidecarStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_vectors_persist_and_grow_past_initial_capacity(self):
+        store = EmbeddingSidecarStore(self.temp_dir / "store", initial_capacity=2)
+        hashes = [f"h{i}" for i in range(5)]
+        vectors = np.arange(15, dtype=np.float32).reshape(5, 3)
+        store.add_many(hashes[:2], vectors[:2])
+        store.add_many(hashes, vectors)  # the first two are already stored and not appended again
+        store.flush()
+
+        reopened = EmbeddingSidecarStore(self.temp_dir / "store")
+        self.assertEqual(len(reopened), 5)
+        self.assertIn("h4", reopened)
+        np.testing.assert_array_equal(reopened.get_many(["h3", "h0"]), vectors[[3, 0]])
+
+
+class TestBulkLoadEnhancedChunks(unittest.TestCase):
+    """Checkpointed bulk load: embed once per chunk text, resume mid-file, skip unchanged files"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.store_dir = self.temp_dir / "embedding_store"
+        self.files = [self.temp_dir / "CA.jsonl", self.temp_dir / "TX.jsonl"]
+        write_jsonl(self.files[0], chunks_for("CA", 5))
+        write_jsonl(self.files[1], chunks_for("TX", 3))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def run_load(self, collection, model, files=None):
+        loader = make_loader(StubChromaDB(collection, model))
+        return loader.bulk_load_enhanced_chunks(files or self.files, store_dir=self.store_dir, upsert_batch_size=2)
+
+    def test_embeddings_reused_by_content_hash_across_runs(self):
+        model = StubEmbeddingModel()
+        first = self.run_load(StubCollection(), model)
+        self.assertEqual((first['chunks_upserted'], first['chunks_embedded'], first['chunks_reused']), (8, 8, 0))
+
+        # A fresh collection (e.g. a rebuild) with the checkpoint gone: every vector comes from the sidecar
+        (self.store_dir / "bulk_load_checkpoint.json").unlink()
+        model = StubEmbeddingModel()
+        collection = StubCollection()
+        second = self.run_load(collection, model)
+        self.assertEqual(model.encoded, [])
+        self.assertEqual((second['chunks_upserted'], second['chunks_embedded'], second['chunks_reused']), (8, 0, 8))
+        self.assertEqual(len(collection.rows), 8)
+
+        # Duplicate text within a new file is embedded once
+        duplicates = self.temp_dir / "FL.jsonl"
+        write_jsonl(duplicates, chunks_for("FL", 4, text="Florida tie-breaker lottery"))
+        model = StubEmbeddingModel()
+        third = self.run_load(StubCollection(), model, files=[duplicates])
+        self.assertEqual(model.encoded, ["Florida tie-breaker lottery"])
+        self.assertEqual((third['chunks_embedded'], third['chunks_reused']), (1, 3))
+
+    def test_interrupted_batch_resumes_partway_through_the_file(self):
+        # Batches of 2: CA is 0-1, 2-3, 4. The second upsert fails.
+        model = StubEmbeddingModel()
+        collection = StubCollection(fail_on_call=2)
+        with self.assertRaises(RuntimeError):
+            self.run_load(collection, model)
+        self.assertEqual(sorted(collection.rows), ["CA_0", "CA_1"])
+        checkpoint = json.loads((self.store_dir / "bulk_load_checkpoint.json").read_text())
+        self.assertEqual(checkpoint['files'][str(self.files[0])]['chunks_done'], 2)
+        self.assertFalse(checkpoint['files'][str(self.files[0])]['complete'])
+
+        resumed_collection = StubCollection()
+        resumed_model = StubEmbeddingModel()
+        summary = self.run_load(resumed_collection, resumed_model)
+        self.assertEqual(sorted(resumed_collection.rows), ["CA_2", "CA_3", "CA_4", "TX_0", "TX_1", "TX_2"])
+        self.assertEqual(summary['chunks_seen'], 6)
+        # CA_2/CA_3 were embedded before the failed upsert; the sidecar already has them
+        self.assertEqual(summary['chunks_reused'], 2)
+        self.assertNotIn("CA QAP section 2 scoring criteria", resumed_model.encoded)
+
+    def test_unchanged_files_are_skipped_and_changed_files_reloaded(self):
+        empty = self.temp_dir / "EMPTY.jsonl"
+        empty.write_text("\n")
+        files = self.files + [empty]
+        self.run_load(StubCollection(), StubEmbeddingModel(), files=files)
+        checkpoint = json.loads((self.store_dir / "bulk_load_checkpoint.json").read_text())
+        self.assertTrue(all(checkpoint['files'][str(path)]['complete'] for path in files))
+
+        collection = StubCollection()
+        summary = self.run_load(collection, StubEmbeddingModel(), files=files)
+        self.assertEqual((summary['files_skipped'], summary['chunks_seen'], collection.calls), (3, 0, 0))
+
+        write_jsonl(self.files[1], chunks_for("TX", 4))
+        collection = StubCollection()
+        summary = self.run_load(collection, StubEmbeddingModel(), files=files)
+        self.assertEqual(summary['files_skipped'], 2)
+        self.assertEqual(sorted(collection.rows), ["TX_0", "TX_1", "TX_2", "TX_3"])
+        self.assertEqual((summary['chunks_embedded'], summary['chunks_reused']), (1, 3))
+
+    def test_vectors_are_keyed_by_model_and_text(self):
+        model = StubEmbeddingModel()
+        collection = StubCollection()
+        self.run_load(collection, model, files=self.files[:1])
+        embedding, content_hash = collection.rows["CA_0"]
+        self.assertEqual(content_hash, chunk_content_hash("CA QAP section 0 scoring criteria", MODEL_NAME))
+        self.assertAlmostEqual(float(np.linalg.norm(embedding)), 1.0, places=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
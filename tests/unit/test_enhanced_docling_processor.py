@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Docling QAP processor's conversion cache and process-pool pipeline
+Docling itself is stubbed: the converter returns a small fake document.
+"""
+import unittest
+import tempfile
+import shutil
+import asyncio
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+# Add the QAP processing directory to path for imports
+import sys
+import os
+qap_processing_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'modules', 'qap_processing')
+sys.path.insert(0, qap_processing_path)
+
+try:
+    import enhanced_docling_processor
+    from enhanced_docling_processor import EnhancedDoclingProcessor
+    PROCESSOR_AVAILABLE = True
+except ImportError:
+    PROCESSOR_AVAILABLE = False
+
+
+def fake_document(pdf_path):
+    text = Path(pdf_path).read_text()
+    return SimpleNamespace(
+        pages=[1, 2],
+        tables=[SimpleNamespace(data=[['Criteria', 'Points'], ['Transit proximity', '7']])],
+        sections=[SimpleNamespace(title='Section 10.1 Threshold', text=f'{text} eligible basis and qualified basis', level=1),
+                  SimpleNamespace(title='Section 10.2 Scoring', text='Maximum points for the compliance period', level=2)]
+    )
+
+
+class StubConverter:
+    def __init__(self):
+        self.calls = []
+
+    def convert(self, pdf_path):
+        self.calls.append(Path(pdf_path).name)
+        return SimpleNamespace(document=fake_document(pdf_path))
+
+
+def stub_init_worker():
+    pass
+
+
+def stub_convert_in_worker(pdf_path, state_code):
+    """Pool worker stand-in: 'slow' QAPs take longer; every call leaves a marker file"""
+    if 'slow' in Path(pdf_path).read_text():
+        time.sleep(1.0)
+    Path(f"{pdf_path}.{os.getpid()}.{time.monotonic_ns()}.converted").touch()
+    return EnhancedDoclingProcessor._structure_from_docling(fake_document(pdf_path), state_code)
+
+
+@unittest.skipUnless(PROCESSOR_AVAILABLE, "psutil not installed")
+class TestDoclingConversionCache(unittest.TestCase):
+    """Docling runs once per PDF content; cached structures are reused across runs"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.pdf_path = self.temp_dir / "CA_2025_QAP.pdf"
+        self.pdf_path.write_text("%PDF-1.4 CA QAP v1")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def make_processor(self, converter):
+        processor = EnhancedDoclingProcessor(base_path=str(self.temp_dir))
+        processor._docling_converter = converter
+        return processor
+
+    def test_cache_hit_and_invalidation_when_the_file_changes(self):
+        converter = StubConverter()
+        processor = self.make_processor(converter)
+        first, hit = processor.get_converted_structure(self.pdf_path, 'CA')
+        self.assertFalse(hit)
+        self.assertEqual(first['sections'][0]['section_id'], 'CA_section_0000')
+        self.assertEqual(first['docling_metadata']['tables_detected'], 1)
+
+        again, hit = processor.get_converted_structure(self.pdf_path, 'CA')
+        self.assertTrue(hit)
+        self.assertEqual(again, first)
+        self.assertEqual(converter.calls, ['CA_2025_QAP.pdf'])
+
+        # A new process (fresh processor) reads the conversion from disk
+        reopened = self.make_processor(StubConverter())
+        self.assertEqual(reopened.get_converted_structure(self.pdf_path, 'CA'), (first, True))
+        self.assertEqual(reopened._docling_converter.calls, [])
+
+        # Changed PDF content misses the cache; so does the same PDF under another state code
+        self.pdf_path.write_text("%PDF-1.4 CA QAP v2 (amended)")
+        changed, hit = reopened.get_converted_structure(self.pdf_path, 'CA')
+        self.assertFalse(hit)
+        self.assertIn('amended', changed['sections'][0]['content'])
+        self.assertFalse(reopened.get_converted_structure(self.pdf_path, 'NV')[1])
+        self.assertEqual(len(reopened._docling_converter.calls), 2)
+
+    def test_cached_structure_is_chunked_like_a_fresh_one(self):
+        processor = self.make_processor(StubConverter())
+        fresh, _ = processor.extract_enhanced_structure_with_docling(self.pdf_path, 'CA')
+        cached, _ = processor.extract_enhanced_structure_with_docling(self.pdf_path, 'CA')
+        self.assertFalse(fresh['docling_metadata']['cache_hit'])
+        self.assertTrue(cached['docling_metadata']['cache_hit'])
+        self.assertEqual([c['content'] for c in cached['enhanced_chunks']],
+                         [c['content'] for c in fresh['enhanced_chunks']])
+        self.assertTrue(fresh['enhanced_chunks'])
+
+    def test_failed_conversion_is_not_cached(self):
+        class BrokenConverter(StubConverter):
+            def convert(self, pdf_path):
+                raise RuntimeError("layout model crashed")
+
+        processor = self.make_processor(BrokenConverter())
+        with self.assertRaises(RuntimeError):
+            processor.get_converted_structure(self.pdf_path, 'CA')
+        processor._docling_converter = StubConverter()
+        self.assertFalse(processor.get_converted_structure(self.pdf_path, 'CA')[1])
+
+
+@unittest.skipUnless(PROCESSOR_AVAILABLE, "psutil not installed")
+class TestConcurrentQAPProcessing(unittest.TestCase):
+    """Pool conversions yield in completion order, each result tied to its own QAP"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.qaps = []
+        for state_code, body in [('CA', 'slow CA QAP'), ('TX', 'TX QAP'), ('NV', 'NV QAP')]:
+            path = self.temp_dir / f"{state_code}_QAP.pdf"
+            path.write_text(f"%PDF-1.4 {body}")
+            self.qaps.append((path, state_code))
+        self.processor = EnhancedDoclingProcessor(base_path=str(self.temp_dir))
+        patcher = mock.patch.multiple(enhanced_docling_processor, _convert_qap_in_worker=stub_convert_in_worker,
+                                      _init_docling_worker=stub_init_worker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def collect(self):
+        async def run():
+            return [outcome async for outcome in self.processor.iter_qaps_as_completed(self.qaps, max_workers=3)]
+        return asyncio.run(run())
+
+    def conversions(self):
+        return sorted(path.name.split('.')[0] for path in self.temp_dir.glob('*.converted'))
+
+    def test_results_arrive_in_completion_order(self):
+        outcomes = self.collect()
+        self.assertEqual([o['error'] for o in outcomes], [None, None, None])
+        self.assertEqual(sorted(o['state_code'] for o in outcomes[:2]), ['NV', 'TX'])
+        self.assertEqual(outcomes[-1]['state_code'], 'CA')  # the slow conversion finishes last
+        for outcome in outcomes:
+            structure = outcome['structure']
+            self.assertEqual(structure['state_code'], outcome['state_code'])
+            self.assertTrue(structure['sections'][0]['section_id'].startswith(f"{outcome['state_code']}_"))
+            self.assertEqual(outcome['metrics'].sections_extracted, 2)
+        self.assertEqual(self.conversions(), ['CA_QAP', 'NV_QAP', 'TX_QAP'])
+
+        # Second pass: every conversion comes from the cache, no pool work
+        outcomes = self.collect()
+        self.assertTrue(all(o['structure']['docling_metadata']['cache_hit'] for o in outcomes))
+        self.assertEqual(len(self.conversions()), 3)
+
+    def test_concurrent_summary_collects_every_qap(self):
+        results = asyncio.run(self.processor.process_multiple_qaps_concurrent(self.qaps))
+        self.assertEqual(sorted(results['qap_results']), ['CA', 'NV', 'TX'])
+        self.assertEqual(results['aggregate_metrics']['successful_qaps'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
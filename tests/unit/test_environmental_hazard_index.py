@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the grid-indexed environmental hazard radius search
+Hits and distances are checked against a brute-force geodesic scan of every (site, hazard) pair.
+"""
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add the TDHCA RAG code directory to path for imports
+import sys
+import os
+tdhca_code_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'modules', 'data_intelligence', 'TDHCA_RAG', 'code')
+sys.path.insert(0, tdhca_code_path)
+
+from environmental_hazard_index import (EnvironmentalHazardIndex, assign_risk_levels, distance_miles,
+                                        standardize_hazard_points)
+
+try:
+    from geopy.distance import geodesic
+    GEOPY_AVAILABLE = True
+except ImportError:
+    GEOPY_AVAILABLE = False
+
+CELL_DEGREES = 0.02
+# Pairs this close to the radius may fall either side of it depending on the distance model
+BOUNDARY_BAND_MILES = 0.001
+
+# Site centers: on a cell corner, on a cell edge, mid-cell, and far enough north that
+# a mile of longitude spans several cells
+SITES = pd.DataFrame({
+    'site_id': ['houston_corner', 'austin_edge', 'sacramento_mid', 'fairbanks_north', 'no_coords'],
+    'latitude': [29.76, 30.27, 38.571, 64.84, np.nan],
+    'longitude': [-95.36, -97.7431, -121.4873, -147.72, -97.0],
+})
+
+
+def synthetic_hazards(rng):
+    """Hazards scattered around each site, plus points a hair either side of nearby cell edges"""
+    rows = []
+    for _, site in SITES.dropna().iterrows():
+        lat_scale = 3.0 / 69.0
+        lon_scale = 3.0 / (69.0 * np.cos(np.radians(site['latitude'])))
+        for _ in range(150):
+            rows.append((site['latitude'] + rng.uniform(-1, 1) * lat_scale,
+                         site['longitude'] + rng.uniform(-1, 1) * lon_scale))
+
+        base_row = np.floor(site['latitude'] / CELL_DEGREES) * CELL_DEGREES
+        base_col = np.floor(site['longitude'] / CELL_DEGREES) * CELL_DEGREES
+        for k in range(-3, 5):
+            edge_lat = base_row + k * CELL_DEGREES
+            edge_lon = base_col + k * CELL_DEGREES
+            for eps in (-1e-9, 0.0, 1e-9, -1e-5, 1e-5):
+                rows.append((edge_lat + eps, site['longitude'] + rng.uniform(-1, 1) * lon_scale))
+                rows.append((site['latitude'] + rng.uniform(-1, 1) * lat_scale, edge_lon + eps))
+                rows.append((edge_lat + eps, edge_lon + eps))
+
+    raw = pd.DataFrame(rows, columns=['LATITUDE', 'LONGITUDE'])
+    raw['SITE_ID'] = [f"LPST-{i:05d}" for i in range(len(raw))]
+    raw['SITE_NAME'] = [f"Station {i}" for i in range(len(raw))]
+    half = len(raw) // 2
+    return [standardize_hazard_points(raw.iloc[:half], 'tceq_lpst', 'Petroleum Contamination'),
+            standardize_hazard_points(raw.iloc[half:], 'tceq_dry_cleaners', 'Solvent Contamination')]
+
+
+def brute_force_hits(sites, hazards, radius_miles):
+    """Every (site_id, hazard_site_id) -> geodesic miles, plus the pairs too close to the radius to call"""
+    hits, borderline = {}, set()
+    for _, site in sites.dropna(subset=['latitude', 'longitude']).iterrows():
+        for _, hazard in hazards.iterrows():
+            miles = geodesic((site['latitude'], site['longitude']), (hazard['latitude'], hazard['longitude'])).miles
+            pair = (site['site_id'], hazard['site_id'])
+            if abs(miles - radius_miles) <= BOUNDARY_BAND_MILES:
+                borderline.add(pair)
+            elif miles <= radius_miles:
+                hits[pair] = miles
+    return hits, borderline
+
+
+@unittest.skipUnless(GEOPY_AVAILABLE, "geopy not installed")
+class TestQueryRadiusAgainstBruteForce(unittest.TestCase):
+    """Grid lookup finds exactly the hazards a full geodesic scan finds, at the same distances"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.frames = synthetic_hazards(np.random.default_rng(20240611))
+        cls.index = EnvironmentalHazardIndex.from_frames(cls.frames, cell_degrees=CELL_DEGREES)
+        cls.hazards = pd.concat(cls.frames, ignore_index=True)
+
+    def assertMatchesBruteForce(self, index, radius_miles):
+        hits = index.query_radius(SITES, radius_miles=radius_miles)
+        expected, borderline = brute_force_hits(SITES, self.hazards, radius_miles)
+        found = {(row.site_id, row.hazard_site_id): row for row in hits.itertuples(index=False)}
+
+        self.assertEqual(len(found), len(hits), msg="duplicate (site, hazard) pairs")
+        self.assertEqual(set(found) - borderline, set(expected), msg=f"radius {radius_miles}")
+        for pair, miles in expected.items():
+            self.assertAlmostEqual(found[pair].distance_miles, miles, delta=0.0006, msg=pair)
+        self.assertNotIn('no_coords', set(hits['site_id']))
+        return hits, expected
+
+    def test_hits_and_distances_match_geodesic_scan(self):
+        for radius_miles in [0.095, 0.5, 1.0, 2.5]:
+            hits, expected = self.assertMatchesBruteForce(self.index, radius_miles)
+            self.assertTrue(expected)
+            for site_id in SITES['site_id'].dropna():
+                self.assertTrue(hits.loc[hits['site_id'] == site_id, 'distance_miles'].is_monotonic_increasing)
+
+        # Every site has hazards straddling cell edges within a mile; make sure some were hit on both sides
+        hits = self.index.query_radius(SITES, radius_miles=1.0)
+        lat_cells = np.floor((hits['hazard_latitude'] + 90.0) / CELL_DEGREES)
+        site_cells = hits['site_id'].map(dict(zip(SITES['site_id'], np.floor((SITES['latitude'] + 90.0) / CELL_DEGREES))))
+        self.assertTrue((lat_cells != site_cells).any())
+        self.assertTrue((lat_cells == site_cells).any())
+
+    def test_coarse_and_fine_grids_agree(self):
+        for cell_degrees in [0.005, 0.5]:
+            index = EnvironmentalHazardIndex.from_frames(self.frames, cell_degrees=cell_degrees)
+            self.assertMatchesBruteForce(index, 1.0)
+
+    def test_risk_levels_and_summary_follow_distances(self):
+        hits = self.index.query_radius(SITES, radius_miles=1.0)
+        geodesic_miles = [geodesic((lat, lon), (hlat, hlon)).miles for lat, lon, hlat, hlon in zip(
+            hits['site_id'].map(dict(zip(SITES['site_id'], SITES['latitude']))),
+            hits['site_id'].map(dict(zip(SITES['site_id'], SITES['longitude']))),
+            hits['hazard_latitude'], hits['hazard_longitude'])]
+        thresholds = np.array([0.095, 0.25, 0.5, 1.0])
+        clear = np.min(np.abs(np.subtract.outer(geodesic_miles, thresholds)), axis=1) > BOUNDARY_BAND_MILES
+        self.assertEqual(list(hits['risk_level'][clear]), list(assign_risk_levels(np.array(geodesic_miles)[clear])))
+
+        summary = EnvironmentalHazardIndex.summarize_hits(hits, SITES).set_index('site_id')
+        self.assertEqual(summary.loc['no_coords', 'overall_risk_level'], 'NO RISK')
+        self.assertEqual(summary.loc['no_coords', 'hazard_count'], 0)
+        for site_id, site_hits in hits.groupby('site_id'):
+            self.assertEqual(summary.loc[site_id, 'hazard_count'], len(site_hits))
+            self.assertEqual(summary.loc[site_id, 'nearest_hazard_miles'], site_hits['distance_miles'].min())
+
+    def test_saved_index_answers_the_same(self):
+        temp_dir = Path(tempfile.mkdtemp())
+        try:
+            self.index.save(temp_dir / "index")
+            loaded = EnvironmentalHazardIndex.load(temp_dir / "index")
+            pd.testing.assert_frame_equal(loaded.query_radius(SITES, radius_miles=1.0),
+                                          self.index.query_radius(SITES, radius_miles=1.0), check_dtype=False)
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+class TestDistanceMiles(unittest.TestCase):
+    @unittest.skipUnless(GEOPY_AVAILABLE, "geopy not installed")
+    def test_agrees_with_geodesic_within_a_foot_at_screening_radii(self):
+        rng = np.random.default_rng(7)
+        lat = rng.uniform(-60, 70, 200)
+        lon = rng.uniform(-180, 180, 200)
+        bearing = rng.uniform(0, 2 * np.pi, 200)
+        miles = rng.uniform(0, 3, 200)
+        lat2 = lat + miles * np.cos(bearing) / 69.0
+        lon2 = lon + miles * np.sin(bearing) / (69.0 * np.cos(np.radians(lat)))
+        expected = [geodesic((a, b), (c, d)).miles for a, b, c, d in zip(lat, lon, lat2, lon2)]
+        np.testing.assert_allclose(distance_miles(lat, lon, lat2, lon2), expected, atol=1 / 5280)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Unit tests for tiered routing in HybridExtractionOrchestrator using stub model backends
+"""
+import unittest
+import tempfile
+import shutil
+import threading
+import time
+from pathlib import Path
+
+# Add the TDHCA_RAG code directory to path for imports
+import sys
+import os
+tdhca_code_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                               'modules', 'data_intelligence', 'TDHCA_RAG', 'code')
+sys.path.insert(0, tdhca_code_path)
+
+from hybrid_extraction_orchestrator import HybridExtractionOrchestrator, ModelType
+from ultimate_tdhca_extractor import UltimateProjectData
+
+
+def make_project(name, financial_confidence, total_development_cost=20_000_000):
+    project = UltimateProjectData()
+    project.application_number = name
+    project.project_name = name
+    project.city = 'Dallas'
+    project.street_address = '100 Main St'
+    project.full_address = '100 Main St, Dallas, TX 75201'
+    project.total_units = 120
+    project.unit_mix = {'2BR': 120}
+    project.total_development_cost = total_development_cost
+    project.confidence_scores = {'overall': 0.9, 'address': 0.95, 'financial_data': financial_confidence}
+    return project
+
+
+class StubTier:
+    """Sleeps like a model call and tracks peak concurrency"""
+
+    def __init__(self, seconds, transform, usage=None):
+        self.seconds = seconds
+        self.transform = transform
+        self.usage = usage
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, *args):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.seconds)
+            project = self.transform(*args)
+        finally:
+            with self.lock:
+                self.active -= 1
+        return (project, self.usage) if self.usage else project
+
+
+class TestHybridTieredRouting(unittest.TestCase):
+    """Only low-confidence documents escalate; tiers overlap within their limits"""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.orchestrator = HybridExtractionOrchestrator(
+            self.work_dir, tier_limits={ModelType.LLAMA: 6, ModelType.CLAUDE_SONNET: 2, ModelType.CLAUDE_OPUS: 2})
+
+        # 2 clean, 2 need Sonnet, 2 need Sonnet then Opus ($50M+ deals)
+        self.documents = {
+            'clean1.pdf': make_project('clean1', 0.95), 'clean2.pdf': make_project('clean2', 0.95),
+            'fin1.pdf': make_project('fin1', 0.5), 'fin2.pdf': make_project('fin2', 0.5),
+            'big1.pdf': make_project('big1', 0.5, 60_000_000), 'big2.pdf': make_project('big2', 0.5, 60_000_000),
+        }
+
+        def enhance(project, escalation_fields, pdf_path):
+            project.confidence_scores['financial_data'] = 0.9
+            return project
+
+        self.llama = StubTier(0.2, lambda pdf_path: self.documents.get(pdf_path.name))
+        self.sonnet = StubTier(0.3, enhance, usage={'input_tokens': 20_000, 'output_tokens': 2_000})
+        self.opus = StubTier(0.3, lambda project: project)
+        self.complete = StubTier(0.1, lambda pdf_path: make_project('fallback', 0.9))
+        self.orchestrator.backends.update({
+            'llama': self.llama, 'claude_enhance': self.sonnet,
+            'opus_validate': self.opus, 'claude_complete': self.complete})
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_only_low_confidence_documents_escalate(self):
+        files = [Path(name) for name in self.documents]
+        start = time.time()
+        results = self.orchestrator.process_batch_hybrid(files)
+        wall = time.time() - start
+
+        models = {r.project_data.project_name: r.models_used for r in results}
+        self.assertEqual(models['clean1'], [ModelType.LLAMA])
+        self.assertEqual(models['fin1'], [ModelType.LLAMA, ModelType.CLAUDE_SONNET])
+        self.assertEqual(models['big2'], [ModelType.LLAMA, ModelType.CLAUDE_SONNET, ModelType.CLAUDE_OPUS])
+
+        # Sequential would be 6*0.2 + 4*0.3 + 2*0.3 = 3.0s
+        self.assertLess(wall, 2.0)
+        self.assertLessEqual(self.sonnet.peak, 2)
+        self.assertEqual(self.llama.peak, 6)
+
+        telemetry = self.orchestrator.telemetry_summary()
+        self.assertEqual(telemetry['llama3.3:70b']['calls'], 6)
+        self.assertEqual(telemetry['claude-sonnet']['calls'], 4)
+        self.assertEqual(telemetry['claude-opus']['calls'], 2)
+        self.assertEqual(telemetry['claude-sonnet']['total_tokens'], 88_000)
+        # Token priced: 4 * (20k * $3 + 2k * $15) / 1M; Opus without usage falls back to $0.50/call
+        self.assertAlmostEqual(telemetry['claude-sonnet']['total_cost'], 0.36)
+        self.assertAlmostEqual(telemetry['claude-opus']['total_cost'], 1.0)
+        self.assertEqual(sum(telemetry['claude-sonnet']['latency_histogram'].values()), 4)
+
+    def test_failed_local_extraction_falls_back_to_sonnet(self):
+        results = self.orchestrator.process_batch_hybrid([Path('unreadable.pdf')])
+        self.assertEqual(results[0].models_used, [ModelType.LLAMA, ModelType.CLAUDE_SONNET])
+        telemetry = self.orchestrator.telemetry_summary()
+        self.assertEqual(telemetry['llama3.3:70b']['failures'], 1)
+        self.assertEqual(telemetry['claude-sonnet']['calls'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
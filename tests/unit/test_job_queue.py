@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the background deal job queue
+"""
+import unittest
+import tempfile
+import shutil
+import threading
+import time
+from pathlib import Path
+
+# Add the workforce_analyst directory to path for imports
+import sys
+import os
+workforce_analyst_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'modules', 'workforce_analyst')
+sys.path.insert(0, workforce_analyst_path)
+
+from job_queue import JobQueue, files_fingerprint
+
+
+def staged_extraction(progress, deal, release=None):
+    """Stand-in for the extraction job: two timed stages"""
+    with progress.stage('Reading OM', 15):
+        if release is not None:
+            release.wait(5)
+        time.sleep(0.2)
+    with progress.stage('Reading T12', 40):
+        time.sleep(0.05)
+    return {'deal': deal}
+
+
+class TestJobQueue(unittest.TestCase):
+    """Parallel workers, stage timings, dedupe by deal + file hash"""
+
+    def setUp(self):
+        self.queue = JobQueue(max_workers=3)
+        self.work_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        self.queue.shutdown()
+        shutil.rmtree(self.work_dir)
+
+    def test_deals_run_in_parallel_with_stage_timings(self):
+        start = time.time()
+        jobs = [self.queue.submit('extract', deal, 'same-files', staged_extraction, deal)[0]
+                for deal in ('Bayside', 'Camden', 'Sunset Gardens')]
+        self.assertTrue(all(job['status'] == 'queued' for job in jobs))
+
+        finished = [list(self.queue.events(job['id']))[-1] for job in jobs]
+        # Sequential: 3 deals * 0.25s
+        self.assertLess(time.time() - start, 0.6)
+        for job, deal in zip(finished, ('Bayside', 'Camden', 'Sunset Gardens')):
+            self.assertEqual((job['status'], job['percent'], job['result']), ('succeeded', 100, {'deal': deal}))
+            self.assertEqual([s['name'] for s in job['stages']], ['Reading OM', 'Reading T12'])
+            self.assertGreaterEqual(job['stages'][0]['seconds'], 0.2)
+
+    def test_same_deal_and_files_is_deduplicated(self):
+        om_file = self.work_dir / 'Bayside OM.pdf'
+        om_file.write_bytes(b'%PDF-1.4 offering memo')
+        fingerprint = files_fingerprint([om_file])
+        release = threading.Event()
+
+        first, deduplicated = self.queue.submit('extract', 'Bayside', fingerprint, staged_extraction, 'Bayside', release)
+        self.assertFalse(deduplicated)
+        second, deduplicated = self.queue.submit('extract', 'Bayside', files_fingerprint([om_file]),
+                                                 staged_extraction, 'Bayside', release)
+        self.assertTrue(deduplicated)
+        self.assertEqual(second['id'], first['id'])
+        release.set()
+        self.assertEqual(list(self.queue.events(first['id']))[-1]['status'], 'succeeded')
+
+        # A changed file is a new job; a failed job can be resubmitted
+        om_file.write_bytes(b'%PDF-1.4 revised offering memo')
+        changed, deduplicated = self.queue.submit('extract', 'Bayside', files_fingerprint([om_file]),
+                                                  staged_extraction, 'Bayside')
+        self.assertFalse(deduplicated)
+        self.assertNotEqual(changed['id'], first['id'])
+
+        def broken(progress):
+            raise ValueError('No data extracted')
+
+        failed, _ = self.queue.submit('botn', 'Bayside', 'data', broken)
+        self.assertEqual(list(self.queue.events(failed['id']))[-1]['error'], 'No data extracted')
+        retried, deduplicated = self.queue.submit('botn', 'Bayside', 'data', broken)
+        self.assertFalse(deduplicated)
+        self.assertNotEqual(retried['id'], failed['id'])
+
+    def test_botn_fingerprint_covers_data_and_template(self):
+        template = self.work_dir / '80AMIBOTN.xlsx'
+        template.write_bytes(b'template v1')
+        data = {'Property Name': 'Bayside', 'Number of Units': '120'}
+        base = files_fingerprint([template], payload={'data': data, 'deal_path': '/deals/Bayside'})
+
+        self.assertEqual(base, files_fingerprint([template], payload={'deal_path': '/deals/Bayside', 'data': dict(data)}))
+        self.assertNotEqual(base, files_fingerprint([template], payload={'data': {**data, 'Number of Units': '96'},
+                                                                         'deal_path': '/deals/Bayside'}))
+        self.assertNotEqual(base, files_fingerprint([template], payload={'data': data, 'deal_path': '/deals/Camden'}))
+        template.write_bytes(b'template v2')
+        self.assertNotEqual(base, files_fingerprint([template], payload={'data': data, 'deal_path': '/deals/Bayside'}))
+
+
+if __name__ == '__main__':
+    unittest.main()
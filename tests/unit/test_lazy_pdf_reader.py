@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the lazy TDHCA PDF reader's cheap page signals
+"""
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+
+# Add the TDHCA RAG code directory to path for imports
+import sys
+import os
+tdhca_code_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'modules', 'data_intelligence', 'TDHCA_RAG', 'code')
+sys.path.insert(0, tdhca_code_path)
+
+try:
+    from lazy_pdf_reader import LazyPDFReader
+    from ultimate_tdhca_extractor import UltimateTDHCAExtractor
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PYPDF2_AVAILABLE = False
+
+LETTER = (612, 792)
+PAGES = [
+    # (content stream, extra stream dictionary entries, media box)
+    (b"BT /F1 12 Tf 72 720 Td (Site Control) Tj ET", b"", LETTER),
+    (b"BT /F1 12 Tf 72 720 Td [(Unit) -250 (Mix)] TJ ET", b"", LETTER),
+    (b"0 0 m 300 300 l S 50 50 200 100 re f", b"", LETTER),
+    (b"this is not a deflate stream", b" /Filter /FlateDecode", LETTER),
+    (b"BT /F1 12 Tf 72 720 Td (A-101 Site Plan) Tj ET", b"", (2592, 1728)),
+]
+
+
+def write_pdf(path, pages):
+    """Minimal PDF writer so each page's content stream is exactly what the test says"""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_refs = []
+    for content, stream_dict, (width, height) in pages:
+        objects.append(b"<< /Length %d%s >>\nstream\n%s\nendstream" % (len(content), stream_dict, content))
+        contents_ref = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Contents %d 0 R "
+                       b"/Resources << /Font << /F1 3 0 R >> >> >>" % (width, height, contents_ref))
+        page_refs.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(page_refs), len(page_refs))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    Path(path).write_bytes(bytes(out))
+
+
+@unittest.skipUnless(PYPDF2_AVAILABLE, "PyPDF2 not installed")
+class TestLazyPDFReader(unittest.TestCase):
+    """Signals tell text, blank, drawing-sheet and corrupt pages apart without extracting text"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.pdf_path = self.temp_dir / "application.pdf"
+        write_pdf(self.pdf_path, PAGES)
+        self.reader = LazyPDFReader(self.pdf_path)
+
+    def tearDown(self):
+        self.reader.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_text_show_operators_mark_text_pages(self):
+        self.assertEqual(self.reader.page_count, 5)
+        for page_num, expected in [(0, 'Site Control'), (1, 'Unit')]:
+            signals = self.reader.page_signals(page_num)
+            self.assertIsNone(signals['content_error'])
+            self.assertEqual(signals['text_ops'], 1)
+            self.assertTrue(self.reader.has_text(signals))
+            self.assertFalse(signals['drawing_sheet'])
+            self.assertIn(expected, self.reader.page_text(page_num))
+
+    def test_drawing_only_page_has_no_text(self):
+        signals = self.reader.page_signals(2)
+        self.assertIsNone(signals['content_error'])
+        self.assertGreater(signals['content_bytes'], 0)
+        self.assertFalse(self.reader.has_text(signals))
+        self.assertEqual(self.reader.page_text(2).strip(), '')
+
+    def test_corrupt_content_stream_is_reported_not_blank(self):
+        signals = self.reader.page_signals(3)
+        self.assertIsNotNone(signals['content_error'])
+        self.assertEqual(signals['content_bytes'], 0)
+        # A blank page has no error; that is what keeps the two apart
+        self.assertIsNone(self.reader.page_signals(2)['content_error'])
+
+    def test_oversized_page_is_a_drawing_sheet(self):
+        signals = self.reader.page_signals(4)
+        self.assertTrue(signals['drawing_sheet'])
+        self.assertFalse(self.reader.page_signals(0)['drawing_sheet'])
+
+    def test_page_text_is_extracted_once_and_timed(self):
+        first = self.reader.page_text(0)
+        self.assertIs(self.reader.page_text(0), first)
+        self.assertEqual(self.reader.timing_summary()['pages_extracted'], 1)
+        self.reader.release(0)
+        self.assertNotIn(0, self.reader._text)
+
+    def test_smart_extraction_classes_corrupt_page_unreadable(self):
+        extractor = UltimateTDHCAExtractor(str(self.temp_dir))
+        text, stats = extractor.smart_extract_pdf_text(self.pdf_path)
+        sections = [(s['start'], s['end'], s['type']) for s in stats['sections']]
+        self.assertEqual(sections, [(0, 2, 'tdhca_application'), (2, 3, 'no_text'),
+                                    (3, 4, 'unreadable'), (4, 5, 'architectural')])
+        self.assertIn('Site Control', text)
+        self.assertEqual(stats['processed_pages'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the batched, prefix-cached LIHTC inference engine
+Uses a tiny random Llama with a SentencePiece-style tokenizer (dummy prefix, byte fallback)
+built in a temp directory, so no model download or ChromaDB is needed.
+"""
+import unittest
+import tempfile
+import shutil
+import json
+import threading
+import urllib.error
+import urllib.request
+
+# Add the LIHTC LLM deployment directory to path for imports
+import sys
+import os
+lihtc_llm_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'modules', 'qap_processing', 'lihtc_llm_deployment')
+sys.path.insert(0, lihtc_llm_path)
+
+try:
+    import torch
+    from tokenizers import Tokenizer, decoders, models, normalizers, pre_tokenizers, processors, trainers
+    from transformers import LlamaConfig, LlamaForCausalLM, PreTrainedTokenizerFast
+    from lihtc_inference import PROMPT_PREAMBLE, LIHTCInferenceEngine, format_question_prompt, make_batch_api_server
+    INFERENCE_AVAILABLE = True
+except ImportError:
+    INFERENCE_AVAILABLE = False
+
+QUESTIONS = [
+    "What is the 130% basis boost?",
+    "Which QCT rules apply in Texas?",
+    "How long is the compliance period?"
+]
+
+
+def build_tiny_model(model_dir):
+    """Random 2-layer Llama plus a small BPE tokenizer that prepends '▁' like SentencePiece"""
+    tokenizer = Tokenizer(models.BPE(unk_token="<unk>", byte_fallback=True))
+    tokenizer.normalizer = normalizers.Sequence([normalizers.Prepend("▁"), normalizers.Replace(" ", "▁")])
+    tokenizer.pre_tokenizer = pre_tokenizers.Metaspace(replacement="▁", prepend_scheme="first", split=False)
+    tokenizer.decoder = decoders.Sequence([decoders.Replace("▁", " "), decoders.ByteFallback(), decoders.Fuse(),
+                                           decoders.Strip(" ", 1, 0)])
+    trainer = trainers.BpeTrainer(vocab_size=400, special_tokens=["<unk>", "<s>", "</s>"] +
+                                  [f"<0x{i:02X}>" for i in range(256)])
+    tokenizer.train_from_iterator([PROMPT_PREAMBLE + format_question_prompt(q) for q in QUESTIONS] * 5, trainer)
+    tokenizer.post_processor = processors.TemplateProcessing(single="<s> $A", special_tokens=[("<s>", 1)])
+    fast = PreTrainedTokenizerFast(tokenizer_object=tokenizer, bos_token="<s>", eos_token="</s>", unk_token="<unk>")
+    fast.save_pretrained(model_dir)
+
+    torch.manual_seed(0)
+    config = LlamaConfig(vocab_size=fast.vocab_size, hidden_size=32, intermediate_size=64, num_hidden_layers=2,
+                         num_attention_heads=4, num_key_value_heads=4, max_position_embeddings=512,
+                         bos_token_id=1, eos_token_id=2)
+    LlamaForCausalLM(config).save_pretrained(model_dir)
+
+
+@unittest.skipUnless(INFERENCE_AVAILABLE, "torch/transformers not installed")
+class TestLIHTCInferenceEngine(unittest.TestCase):
+    """Batched, prefix-cached generation gives the same answers as one uncached prompt at a time"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.model_dir = tempfile.mkdtemp()
+        build_tiny_model(cls.model_dir)
+        cls.engine = LIHTCInferenceEngine(cls.model_dir, chromadb_path=None, quantize=None)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.engine.stop_batching()
+        shutil.rmtree(cls.model_dir)
+
+    def uncached_answers(self, questions):
+        return [self.engine.generate_batch([question], max_length=8, use_prefix_cache=False, do_sample=False)[0]
+                for question in questions]
+
+    def test_prefix_cached_batch_matches_uncached_prompts(self):
+        tokenizer = self.engine.tokenizer
+        full_ids = tokenizer(PROMPT_PREAMBLE + format_question_prompt(QUESTIONS[0]))["input_ids"]
+        prefix_ids = self.engine._prefix_ids
+        self.assertEqual(full_ids[:len(prefix_ids)], prefix_ids)
+        # Tokenizing the question part on its own re-adds the dummy '▁' - the ids the cache must not use
+        separate = tokenizer(format_question_prompt(QUESTIONS[0]), add_special_tokens=False)["input_ids"]
+        self.assertNotEqual(separate, full_ids[len(prefix_ids):])
+
+        input_ids, attention_mask, cacheable = self.engine._encode_prompts(
+            [PROMPT_PREAMBLE + format_question_prompt(q) for q in QUESTIONS])
+        self.assertTrue(cacheable)
+        self.assertEqual(input_ids[0, attention_mask[0].bool()].tolist(), full_ids)
+
+        batched = self.engine.generate_batch(QUESTIONS, max_length=8, do_sample=False)
+        self.assertEqual(batched, self.uncached_answers(QUESTIONS))
+
+    def test_misaligned_prefix_falls_back_to_uncached_prompts(self):
+        prefix_ids = self.engine._prefix_ids
+        self.engine._prefix_ids = prefix_ids[:-1] + [prefix_ids[-1] + 1]
+        try:
+            _, _, cacheable = self.engine._encode_prompts([PROMPT_PREAMBLE + format_question_prompt(QUESTIONS[1])])
+            self.assertFalse(cacheable)
+            fallback = self.engine.generate_batch(QUESTIONS[:2], max_length=8, do_sample=False)
+        finally:
+            self.engine._prefix_ids = prefix_ids
+        self.assertEqual(fallback, self.uncached_answers(QUESTIONS[:2]))
+
+    def test_batch_api_status_codes(self):
+        server = make_batch_api_server(self.engine, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f"http://127.0.0.1:{server.server_address[1]}/qa"
+
+        def post(body):
+            request = urllib.request.Request(url, data=body, method="POST")
+            try:
+                with urllib.request.urlopen(request, timeout=60) as response:
+                    return response.status, json.loads(response.read())
+            except urllib.error.HTTPError as e:
+                return e.code, json.loads(e.read())
+
+        status, body = post(json.dumps({"question": QUESTIONS[0]}).encode())
+        self.assertEqual(status, 200)
+        self.assertEqual(body["results"][0]["question"], QUESTIONS[0])
+        self.assertEqual(post(b"not json")[0], 400)
+        self.assertEqual(post(json.dumps({"questions": [""]}).encode())[0], 400)
+
+        def broken_model(questions, max_length=1024):
+            raise RuntimeError("model crashed")
+
+        self.engine.lihtc_qa_batch = broken_model
+        try:
+            status, body = post(json.dumps({"question": QUESTIONS[1]}).encode())
+        finally:
+            del self.engine.lihtc_qa_batch
+        self.assertEqual((status, body["error"]), (500, "model crashed"))
+
+
+if __name__ == '__main__':
+    unittest.main()
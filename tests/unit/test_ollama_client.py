@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the pooled Ollama client and shared Docling cache against a stub Ollama server
+"""
+import unittest
+import tempfile
+import shutil
+import threading
+import time
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add the lihtc_analyst directory to path for imports
+import sys
+import os
+lihtc_analyst_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'modules', 'lihtc_analyst')
+sys.path.insert(0, lihtc_analyst_path)
+
+import fir_tree_extractor_fixed
+from fir_tree_extractor_fixed import ExtractionConfig, FirTreeAnalyzer
+from ollama_client import OllamaClient
+from docling_conversion_cache import DoclingConversionCache
+
+
+class StubOllama(BaseHTTPRequestHandler):
+    """/api/generate that takes `delay` seconds and tracks peak concurrency"""
+    delay = 0.3
+    lock = threading.Lock()
+    active = peak = calls = 0
+
+    def do_POST(self):
+        cls = type(self)
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with cls.lock:
+            cls.active += 1
+            cls.calls += 1
+            cls.peak = max(cls.peak, cls.active)
+        try:
+            time.sleep(cls.delay)
+        finally:
+            with cls.lock:
+                cls.active -= 1
+        payload = json.dumps({'response': json.dumps({'model': body['model'], 'noi': 70000})}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestOllamaClient(unittest.TestCase):
+    """In-flight limit, response cache, concurrent category extraction"""
+
+    def setUp(self):
+        StubOllama.active = StubOllama.peak = StubOllama.calls = 0
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubOllama)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.api_url = f"http://127.0.0.1:{self.server.server_address[1]}/api/generate"
+        self.work_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.work_dir)
+
+    def test_in_flight_limit_and_prompt_cache(self):
+        with OllamaClient(self.api_url, max_in_flight=2, cache_dir=self.work_dir / 'ollama') as client:
+            futures = [client.submit('gpt-oss:20b', f'prompt {i}') for i in range(6)]
+            duplicate = client.submit('gpt-oss:20b', 'prompt 5')  # still queued: shares the request
+            self.assertTrue(all(f.result() for f in futures))
+            self.assertEqual(duplicate.result(), futures[5].result())
+            self.assertEqual(StubOllama.peak, 2)
+            self.assertEqual(StubOllama.calls, 6)
+
+            self.assertEqual(client.generate('gpt-oss:20b', 'prompt 0'), futures[0].result())
+            self.assertNotEqual(client.generate('gpt-oss:120b', 'prompt 0'), futures[0].result())
+            self.assertEqual(StubOllama.calls, 7)
+
+        with OllamaClient(self.api_url, max_in_flight=2, cache_dir=self.work_dir / 'ollama') as reopened:
+            reopened.generate('gpt-oss:20b', 'prompt 3')
+            self.assertEqual(reopened.stats['cache_hits'], 1)
+        self.assertEqual(StubOllama.calls, 7)
+
+    def test_categories_run_concurrently_and_share_conversions(self):
+        docs_dir = self.work_dir / 'Due_Diligence'
+        docs_dir.mkdir()
+        for name in ["Fir Tree Park Audited Financial Statements (final 2024).pdf",
+                     "8) 2003 Original HAP Assignment Contract from Seller to CHAPA (final signed) .pdf",
+                     "Fir Tree OCAF Certification Letter  HAP Contracts 2023 copy.pdf",
+                     "1735867 pm p211 Occupancy Report.pdf"]:
+            (docs_dir / name).write_bytes(f'%PDF-1.4 {name}'.encode())
+
+        conversions = []
+
+        def fake_docling(pdf_path):
+            conversions.append(pdf_path.name)
+            time.sleep(0.05)
+            return f'# {pdf_path.name}\nNet Operating Income 70,000'
+
+        original_base = fir_tree_extractor_fixed.BASE_DIR
+        fir_tree_extractor_fixed.BASE_DIR = docs_dir
+        try:
+            config = ExtractionConfig(ollama_api_url=self.api_url, ollama_max_in_flight=4, cache_dir=self.work_dir / 'cache')
+            documents = DoclingConversionCache(config.cache_dir / 'docling', converter=fake_docling)
+            analyzer = FirTreeAnalyzer(config, documents=documents)
+            start = time.time()
+            results = analyzer.extract_all_categories()
+            wall = time.time() - start
+
+            # Sequential: 4 model calls * 0.3s + 4 conversions * 0.05s = 1.4s
+            self.assertLess(wall, 0.9)
+            self.assertEqual(StubOllama.calls, 4)
+            self.assertEqual(results['financial']['noi'], 70000)
+
+            # The same PDF read again (any extractor, any run) is neither re-converted nor re-prompted
+            analyzer.extract_all_categories()
+            self.assertEqual(StubOllama.calls, 4)
+            self.assertEqual(len(conversions), 4)
+            analyzer.close()
+        finally:
+            fir_tree_extractor_fixed.BASE_DIR = original_base
+
+
+if __name__ == '__main__':
+    unittest.main()
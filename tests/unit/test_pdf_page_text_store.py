@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the persistent QAP page text store and its keyword index
+"""
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+from unittest import mock
+
+# Add the QAP processing directory to path for imports
+import sys
+import os
+qap_processing_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'modules', 'qap_processing')
+sys.path.insert(0, qap_processing_path)
+
+import pdf_page_text_store
+from pdf_page_text_store import PageTextStore, STORE_ROOT_ENV, default_store_root
+
+try:
+    from reportlab.pdfgen import canvas
+    import pdfplumber  # noqa: F401 - the store's default extraction engine
+    PDF_TOOLS_AVAILABLE = True
+except ImportError:
+    PDF_TOOLS_AVAILABLE = False
+
+PAGES = [
+    ["Section 10.101 Site Requirements", "Minimum site size and flood plain rules."],
+    [],  # blank page
+    ["Section 10.104 Minimum Construction Standards", "Each unit must meet the standards in 10 TAC."],
+    ["Scoring: Opportunity Index", "Points for proximity to grocery stores."],
+]
+
+
+def write_qap(path, pages):
+    pdf = canvas.Canvas(str(path))
+    for lines in pages:
+        for i, line in enumerate(lines):
+            pdf.drawString(72, 720 - 18 * i, line)
+        pdf.showPage()
+    pdf.save()
+
+
+@unittest.skipUnless(PDF_TOOLS_AVAILABLE, "reportlab/pdfplumber not installed")
+class TestPageTextStore(unittest.TestCase):
+    """Pages are extracted once per PDF; lookups narrow candidates through the word index"""
+
+    def setUp(self):
+        self.work_dir = Path(tempfile.mkdtemp())
+        self.store_root = self.work_dir / 'stores'
+        self.pdf_path = self.work_dir / 'TX_2025_QAP.pdf'
+        write_qap(self.pdf_path, PAGES)
+        PageTextStore._open_stores.clear()
+
+    def tearDown(self):
+        PageTextStore._open_stores.clear()
+        shutil.rmtree(self.work_dir)
+
+    def test_store_is_built_once_and_serves_page_text(self):
+        with mock.patch.object(pdf_page_text_store, '_extract_page_texts',
+                               wraps=pdf_page_text_store._extract_page_texts) as extract:
+            store = PageTextStore.for_pdf(self.pdf_path, store_root=self.store_root)
+            self.assertIs(PageTextStore.for_pdf(self.pdf_path, store_root=self.store_root), store)
+            PageTextStore._open_stores.clear()
+            reopened = PageTextStore.for_pdf(self.pdf_path, store_root=self.store_root)
+        self.assertEqual(extract.call_count, 1)
+
+        self.assertEqual(reopened.page_count, 4)
+        self.assertIn('Minimum Construction Standards', reopened.page_text(3))
+        self.assertEqual(reopened.page_text(2), '')
+        self.assertEqual([n for n, _ in reopened.iter_pages()], [1, 2, 3, 4])
+        with self.assertRaises(IndexError):
+            reopened.page_text(5)
+
+    def test_keyword_index_narrows_candidate_pages(self):
+        store = PageTextStore.for_pdf(self.pdf_path, store_root=self.store_root)
+        self.assertEqual(store.index['opportunity'], [4])
+        self.assertEqual(store.candidate_pages(['construction standards']), [3])
+        self.assertEqual(store.pages_matching(['minimum construction standards', 'flood plain']), [1, 3])
+        self.assertEqual(store.pages_matching(['section', 'standards'], match_all=True), [3])
+        self.assertEqual(store.pages_matching_regex(r'10\.10[14]', required_words=['section']), [1, 3])
+
+        # Word-prefix lookups use the index too ("groc" -> "grocery")
+        self.assertEqual(store.pages_matching(['groc']), [4])
+
+    def test_default_root_is_configurable_and_outside_the_source_tree(self):
+        with mock.patch.dict(os.environ, {STORE_ROOT_ENV: str(self.store_root)}):
+            self.assertEqual(default_store_root(), self.store_root)
+            store = PageTextStore.for_pdf(self.pdf_path)
+        self.assertEqual(store.store_dir.parent, self.store_root)
+
+        with mock.patch.dict(os.environ, {'XDG_CACHE_HOME': str(self.work_dir / 'cache')}):
+            os.environ.pop(STORE_ROOT_ENV, None)
+            self.assertEqual(default_store_root(), self.work_dir / 'cache' / 'qap_page_text_store')
+        self.assertNotIn(Path(qap_processing_path).resolve(), default_store_root().resolve().parents)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Unit tests for page-range (virtual) PDF sections versus the physical split they replace
+"""
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+
+# Add the QAP processing directory to path for imports
+import sys
+import os
+qap_processing_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'modules', 'qap_processing')
+sys.path.insert(0, qap_processing_path)
+
+try:
+    import PyPDF2
+    from reportlab.pdfgen import canvas
+    from pdf_splitter import PDFSplitter, extract_virtual_sections_parallel
+    from enhanced_chunking_processor import EnhancedChunkingProcessor
+    from pdf_preprocessor import QAPPDFPreprocessor
+    PDF_TOOLS_AVAILABLE = True
+except ImportError:
+    PDF_TOOLS_AVAILABLE = False
+
+TOTAL_PAGES = 23
+PAGES_PER_SECTION = 5
+
+
+def write_qap(path, total_pages):
+    pdf = canvas.Canvas(str(path))
+    for page in range(1, total_pages + 1):
+        pdf.drawString(72, 720, f"CA 2025 QAP page {page}")
+        pdf.drawString(72, 700, f"Section 10.{300 + page} Threshold Requirements")
+        pdf.showPage()
+    pdf.save()
+
+
+def physical_split_pages(splitter, pdf_path, output_dir):
+    """Text of every page of every file the old physical split writes, in file order"""
+    pages = []
+    for section_file in splitter.split_pdf(pdf_path, output_dir):
+        with open(section_file, 'rb') as f:
+            pages.extend(page.extract_text() or "" for page in PyPDF2.PdfReader(f).pages)
+    return pages
+
+
+@unittest.skipUnless(PDF_TOOLS_AVAILABLE, "PyPDF2/reportlab not installed")
+class TestVirtualSections(unittest.TestCase):
+    """Page windows cover the document exactly once and read the same text as split files"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.pdf_path = self.temp_dir / "CA_2025_QAP.pdf"
+        write_qap(self.pdf_path, TOTAL_PAGES)
+        self.splitter = PDFSplitter(max_pages_per_section=PAGES_PER_SECTION)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_sections_cover_every_page_exactly_once(self):
+        for total_pages in [1, 4, 5, 6, 10, 23, 95, 96, 190]:
+            sections = self.splitter.plan_virtual_sections(self.pdf_path, total_pages=total_pages)
+            covered = [page for s in sections for page in range(s['start_page'], s['end_page'] + 1)]
+            self.assertEqual(covered, list(range(1, total_pages + 1)), msg=total_pages)
+            self.assertTrue(all(s['end_page'] - s['start_page'] + 1 <= PAGES_PER_SECTION for s in sections))
+            self.assertEqual([s['section_number'] for s in sections], list(range(1, len(sections) + 1)))
+
+        # Counted from the file when total_pages is not given; labels match the old split file names
+        sections = self.splitter.plan_virtual_sections(self.pdf_path)
+        self.assertEqual(len(sections), 5)
+        split_files = self.splitter.split_pdf(self.pdf_path, self.temp_dir / "split")
+        self.assertEqual([s['label'] for s in sections], [Path(f).stem for f in split_files])
+
+    def test_window_text_matches_the_physical_split(self):
+        expected = physical_split_pages(self.splitter, self.pdf_path, self.temp_dir / "split")
+        sections = self.splitter.plan_virtual_sections(self.pdf_path)
+        stitched = extract_virtual_sections_parallel(sections, max_workers=2)
+
+        pages = stitched[str(self.pdf_path)]
+        self.assertEqual([page['page_number'] for page in pages], list(range(1, TOTAL_PAGES + 1)))
+        self.assertEqual([page['text'] for page in pages], expected)
+        self.assertIn("CA 2025 QAP page 17", pages[16]['text'])
+        for section in sections:
+            in_window = [page for page in pages if page['section_number'] == section['section_number']]
+            self.assertEqual([page['page_number'] for page in in_window],
+                             list(range(section['start_page'], section['end_page'] + 1)))
+
+    def test_chunking_processor_pages_match_physical_split(self):
+        virtual = EnhancedChunkingProcessor(max_pages_per_section=PAGES_PER_SECTION, max_workers=2)
+        virtual.page_counter.max_pages = PAGES_PER_SECTION
+        virtual_result = virtual.process_pdf_for_rag(str(self.pdf_path))
+        self.assertFalse(virtual_result['claude_compatible'])
+        self.assertEqual(virtual_result['sections'], [str(self.pdf_path)])
+        self.assertEqual([s['page_range'] for s in virtual_result['chunking_plan']['sections']],
+                         [[1, 5], [6, 10], [11, 15], [16, 20], [21, 23]])
+
+        physical = EnhancedChunkingProcessor(max_pages_per_section=PAGES_PER_SECTION, virtual_sections=False,
+                                             max_workers=2)
+        physical.page_counter.max_pages = PAGES_PER_SECTION
+        physical_result = physical.process_pdf_for_rag(str(self.pdf_path), str(self.temp_dir / "physical"))
+        self.assertEqual(len(physical_result['sections']), 5)
+
+        virtual_pages = [(p['page_number'], p['text']) for p in virtual.extract_pages(virtual_result)]
+        physical_pages = [(p['page_number'], p['text']) for p in physical.extract_pages(physical_result)]
+        self.assertEqual(virtual_pages, physical_pages)
+        self.assertEqual(len(virtual_pages), TOTAL_PAGES)
+
+    def test_preprocessor_queues_one_item_per_window(self):
+        preprocessor = QAPPDFPreprocessor(max_pages=PAGES_PER_SECTION)
+        result = preprocessor.preprocess_single_pdf(str(self.pdf_path))
+        self.assertTrue(result['split_performed'])
+        self.assertEqual(result['ready_for_chunking'], [str(self.pdf_path)])
+        self.assertFalse((self.temp_dir / "split_sections").exists())
+
+        config = preprocessor.generate_chunking_pipeline_config({
+            'chunking_ready_files': result['ready_for_chunking'],
+            'page_windows': {str(self.pdf_path): result['page_windows']}
+        })
+        ranges = [item['page_range'] for item in config['processing_queue']]
+        covered = [page for start, end in ranges for page in range(start, end + 1)]
+        self.assertEqual(covered, list(range(1, TOTAL_PAGES + 1)))
+        self.assertEqual(config['processing_queue'][0]['section_info'], "01_pages_001-005")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Unit tests for StateAdminCodeManager conditional fetching against a local HTTP stub
+"""
+import unittest
+import tempfile
+import shutil
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+# Add the qap_processing directory to path for imports
+import sys
+import os
+qap_processing_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'modules', 'qap_processing')
+sys.path.insert(0, qap_processing_path)
+
+from state_admin_code_fetchers import StateAdminCodeManager
+
+
+class StubRegulationHandler(BaseHTTPRequestHandler):
+    """Serves one HTML page per path with ETag revalidation"""
+    pages = {}
+    requests_seen = []
+
+    def do_GET(self):
+        body = self.pages.get(self.path, "").encode('utf-8')
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        self.requests_seen.append((self.path, self.headers.get('If-None-Match')))
+
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def hpd_page(subsection_b):
+    return f"<html><main><p>Rules</p><p>(a) Purpose of the rules.</p><p>(b) {subsection_b}</p></main></html>"
+
+
+class TestStateAdminCodeManager(unittest.TestCase):
+    """Test conditional GET, persistent store and section diffs"""
+
+    def setUp(self):
+        StubRegulationHandler.pages = {
+            '/about/administration/hpd-rules': hpd_page("Income limits apply."),
+            '/rules/EXECUTIVE_ORDER_26': hpd_page("Executive order text."),
+            '/rules/LIHTC_GUIDELINES': hpd_page("Guideline text."),
+        }
+        StubRegulationHandler.requests_seen = []
+        self.server = HTTPServer(('127.0.0.1', 0), StubRegulationHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.cache_dir = tempfile.mkdtemp()
+        self.manager = self._make_manager()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.manager.store.conn.close()
+        shutil.rmtree(self.cache_dir)
+
+    def _make_manager(self):
+        manager = StateAdminCodeManager(cache_dir=self.cache_dir, min_host_interval=0.0)
+        manager.fetchers['NY'].base_url = f"http://127.0.0.1:{self.server.server_port}"
+        return manager
+
+    def test_first_fetch_reports_added_regulations(self):
+        results, updates = self.manager.refresh_states(['NY'])
+        self.assertEqual(sum(r.success for r in results), 3)
+        self.assertEqual(sorted(u.change_type for u in updates), ['added'] * 3)
+        self.assertEqual(self.manager.get_cache_summary()['NY'], 3)
+
+    def test_unchanged_refresh_revalidates_and_reports_nothing(self):
+        self.manager.refresh_states(['NY'])
+        StubRegulationHandler.requests_seen = []
+
+        # A fresh manager over the same cache directory must reuse the persisted validators
+        self.manager.store.conn.close()
+        self.manager = self._make_manager()
+        results, updates = self.manager.refresh_states(['NY'])
+
+        self.assertEqual(sum(r.success for r in results), 3)
+        self.assertEqual(updates, [])
+        self.assertTrue(all(etag for _, etag in StubRegulationHandler.requests_seen))
+
+    def test_changed_subsection_is_reported_as_modified(self):
+        self.manager.refresh_states(['NY'])
+        StubRegulationHandler.pages['/about/administration/hpd-rules'] = hpd_page("Income limits changed.")
+
+        _, updates = self.manager.refresh_states(['NY'])
+
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(updates[0].source_id, 'NY_RULE_HPD_RULES')
+        self.assertEqual(updates[0].change_type, 'modified')
+        self.assertEqual(updates[0].section_affected, '(b)')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Unit tests for StreamingXlsxReader against openpyxl's formula and data_only loads
+"""
+import unittest
+import tempfile
+import shutil
+import zipfile
+from datetime import datetime
+from pathlib import Path
+
+import openpyxl
+
+# Add the lihtc_analyst directory to path for imports
+import sys
+import os
+lihtc_analyst_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'modules', 'lihtc_analyst')
+sys.path.insert(0, lihtc_analyst_path)
+
+from streaming_xlsx_reader import StreamingXlsxReader
+
+NS = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" ' \
+     'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet'
+
+
+def write_ctcac_like_workbook(path, filler_rows=3000):
+    """Workbook as Excel saves it: cached <v> next to <f>, shared formulas, a date style,
+    merged cells after sheetData and a polluted used range on the checklist sheet"""
+    application_rows = [
+        '<row r="1"><c r="A1" t="s"><v>0</v></c><c r="B1" t="s"><v>1</v></c></row>',
+        '<row r="2"><c r="A2" t="s"><v>2</v></c><c r="B2"><v>120</v></c><c r="C2"><f>B2*2</f><v>240</v></c></row>',
+        '<row r="3"><c r="A3" t="s"><v>3</v></c><c r="B3" s="1"><v>45292</v></c>'
+        '<c r="C3"><f t="shared" ref="C3:C5" si="0">B3+1</f><v>45293</v></c></row>',
+        '<row r="4"><c r="B4"><v>1.5</v></c><c r="C4"><f t="shared" si="0"/><v>2.5</v></c>'
+        '<c r="D4" t="str"><f>IF(B4&gt;1,"Yes","No")</f><v>Yes</v></c></row>',
+        '<row r="5"><c r="B5" t="b"><v>1</v></c><c r="C5"><f t="shared" si="0"/><v>2</v></c>'
+        '<c r="E5" t="inlineStr"><is><t>inline note</t></is></c></row>',
+        '<row r="7"><c r="A7" t="s"><v>4</v></c><c r="AZ7"><v>99</v></c></row>',
+    ]
+    application = (f'<?xml version="1.0" encoding="UTF-8"?><worksheet {NS}><dimension ref="A1:AZ7"/>'
+                   f'<sheetData>{"".join(application_rows)}</sheetData>'
+                   f'<mergeCells count="2"><mergeCell ref="A1:B1"/><mergeCell ref="D4:E4"/></mergeCells></worksheet>')
+    filler = ''.join(f'<row r="{r}"><c r="A{r}"><v>{r}</v></c></row>' for r in range(1, filler_rows + 1))
+    checklist = (f'<?xml version="1.0" encoding="UTF-8"?><worksheet {NS}><dimension ref="A1:A{filler_rows}"/>'
+                 f'<sheetData>{filler}</sheetData><mergeCells count="1"><mergeCell ref="A1:C1"/></mergeCells></worksheet>')
+    strings = ['Project Name', 'Sunrise Villas', 'Total Units', 'Placed in Service', 'Notes']
+
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as z:
+        z.writestr('[Content_Types].xml',
+                   '<?xml version="1.0" encoding="UTF-8"?>'
+                   '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                   '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                   '<Default Extension="xml" ContentType="application/xml"/>'
+                   '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+                   '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                   '<Override PartName="/xl/worksheets/sheet2.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                   '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+                   '<Override PartName="/xl/sharedStrings.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+                   '</Types>')
+        z.writestr('_rels/.rels',
+                   '<?xml version="1.0" encoding="UTF-8"?>'
+                   '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                   '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+                   '</Relationships>')
+        z.writestr('xl/workbook.xml',
+                   f'<?xml version="1.0" encoding="UTF-8"?><workbook {NS}><sheets>'
+                   '<sheet name="Application" sheetId="1" r:id="rId1"/>'
+                   '<sheet name="Application Checklist" sheetId="2" r:id="rId2"/>'
+                   '</sheets></workbook>')
+        z.writestr('xl/_rels/workbook.xml.rels',
+                   '<?xml version="1.0" encoding="UTF-8"?>'
+                   '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                   f'<Relationship Id="rId1" Type="{REL}" Target="worksheets/sheet1.xml"/>'
+                   f'<Relationship Id="rId2" Type="{REL}" Target="worksheets/sheet2.xml"/>'
+                   '<Relationship Id="rId3" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+                   '<Relationship Id="rId4" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" Target="sharedStrings.xml"/>'
+                   '</Relationships>')
+        z.writestr('xl/styles.xml',
+                   f'<?xml version="1.0" encoding="UTF-8"?><styleSheet {NS}>'
+                   '<fonts count="1"><font/></fonts><fills count="1"><fill><patternFill patternType="none"/></fill></fills><borders count="1"><border/></borders>'
+                   '<cellStyleXfs count="1"><xf numFmtId="0"/></cellStyleXfs>'
+                   '<cellXfs count="2"><xf numFmtId="0"/><xf numFmtId="14" applyNumberFormat="1"/></cellXfs>'
+                   '</styleSheet>')
+        z.writestr('xl/sharedStrings.xml',
+                   f'<?xml version="1.0" encoding="UTF-8"?><sst {NS} count="{len(strings)}">'
+                   + ''.join(f'<si><t>{s}</t></si>' for s in strings) + '</sst>')
+        z.writestr('xl/worksheets/sheet1.xml', application)
+        z.writestr('xl/worksheets/sheet2.xml', checklist)
+
+
+class TestStreamingXlsxReader(unittest.TestCase):
+    """One pass gives what openpyxl needs two full loads for"""
+
+    def setUp(self):
+        self.work_dir = Path(tempfile.mkdtemp())
+        self.path = self.work_dir / '2024_4pct_R1_24-409.xlsx'
+        write_ctcac_like_workbook(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_values_and_formulas_match_both_openpyxl_loads(self):
+        wb_formulas = openpyxl.load_workbook(self.path, data_only=False)
+        wb_values = openpyxl.load_workbook(self.path, data_only=True)
+        ws_formulas, ws_values = wb_formulas['Application'], wb_values['Application']
+
+        with StreamingXlsxReader(self.path) as reader:
+            scan = reader.read_sheet('Application')
+
+        for cell in scan.cells:
+            expected_value = ws_values.cell(row=cell.row, column=cell.col).value
+            self.assertEqual(cell.value, expected_value, cell.coordinate)
+            self.assertIs(type(cell.value), type(expected_value), cell.coordinate)
+            expected_formula = ws_formulas.cell(row=cell.row, column=cell.col).value
+            if isinstance(expected_formula, str) and expected_formula.startswith('='):
+                self.assertEqual(cell.formula, expected_formula, cell.coordinate)
+            else:
+                self.assertIsNone(cell.formula, cell.coordinate)
+
+        non_empty = sum(1 for row in ws_values.iter_rows() for c in row if c.value is not None)
+        self.assertEqual(len(scan.cells), non_empty)
+        self.assertEqual((scan.max_row, scan.max_column), (ws_formulas.max_row, ws_formulas.max_column))
+        self.assertEqual(sorted(scan.merged_cells), sorted(str(r) for r in ws_formulas.merged_cells.ranges))
+
+        cells = {c.coordinate: c for c in scan.cells}
+        self.assertEqual(cells['B3'].value, datetime(2024, 1, 1))
+        self.assertEqual(cells['C5'].formula, '=B5+1')  # shared formula translated to its own row
+
+    def test_range_limits_stop_parsing_but_keep_merges(self):
+        with StreamingXlsxReader(self.path) as reader:
+            self.assertEqual(reader.dimension('Application Checklist'), (3000, 1))
+            scan = reader.read_sheet('Application Checklist', max_row=10, max_col=5)
+            self.assertEqual([c.row for c in scan.cells], list(range(1, 11)))
+            self.assertTrue(scan.truncated)
+            self.assertEqual(scan.merged_cells, ['A1:C1'])
+
+            limited = reader.read_sheet('Application', max_row=5, max_col=3)
+            self.assertTrue(all(c.row <= 5 and c.col <= 3 for c in limited.cells))
+            self.assertEqual(limited.merged_cells, ['A1:B1', 'D4:E4'])
+
+
+if __name__ == '__main__':
+    unittest.main()